@@ -0,0 +1,59 @@
+"""
+benchmarks/bench_batch.py
+Scaling of the offline batch renderer (core.batch / src/main.py) with the worker count:
+--files synthetic .hlr sessions (gestures/synthetic.py) are rendered to video + canvas
+with 1, 2, 4, ... workers up to the core count, and the aggregate frames/sec and
+speedup over one worker are printed. --inputs renders real webcam videos / recordings
+instead (MediaPipe then runs once per frame, in each worker's own graph).
+Run: python benchmarks/bench_batch.py [--files 8] [--workers 1 2 4 8] [--inputs DIR] [--no-video]
+"""
+
+import argparse, os, shutil, sys, tempfile, time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.batch import find_inputs, render_all
+from gestures.synthetic import SESSIONS, make_session, write_session
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--files", type=int, default=8)
+    ap.add_argument("--workers", type=int, nargs="*", default=None)
+    ap.add_argument("--inputs", nargs="*", default=None, help="videos / .hlr files or directories")
+    ap.add_argument("--no-video", action="store_true")
+    args = ap.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="batch_")
+    try:
+        if args.inputs:
+            files = find_inputs(args.inputs)
+        else:
+            kinds = [k for k in SESSIONS if k != 'idle']
+            files = [write_session(os.path.join(tmp, f"{i:02d}_{kinds[i % len(kinds)]}.hlr"),
+                                   make_session(kinds[i % len(kinds)], seed=i))
+                     for i in range(args.files)]
+        cores = os.cpu_count() or 1
+        counts = args.workers or sorted({min(2 ** k, cores) for k in range(cores.bit_length() + 1)})
+        print(f"{len(files)} files, {cores} cores")
+        print(f"{'workers':>8} {'frames':>7} {'wall s':>7} {'fps':>7} {'speedup':>8}")
+        base = None
+        for workers in counts:
+            out = os.path.join(tmp, f"out{workers}")
+            t0 = time.perf_counter()
+            results = list(render_all(files, out, workers=workers, video=not args.no_video))
+            wall = time.perf_counter() - t0
+            frames = sum(r.frames for r in results)
+            fps = frames / wall
+            base = base or fps
+            print(f"{workers:>8} {frames:>7} {wall:>7.1f} {fps:>7.1f} {fps / base:>7.2f}x")
+            for r in results:
+                if r.error:
+                    print(f"   {r.path}: {r.error}")
+            shutil.rmtree(out)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+benchmarks/bench_draw_engine.py
+Per-frame cost of DrawEngine.draw as the drawing grows, and the cost of a
+full layer rebuild (after undo/erase) with batched polylines.
+Run: python benchmarks/bench_draw_engine.py
+"""
+
+import os, sys, time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.draw_engine import DrawEngine
+
+WIN_W, WIN_H = 1280, 720
+SEGMENT_COUNTS = [10, 100, 1000, 10000]
+FRAMES = 30
+LEGACY_MAX_SEGMENTS = 1000  # legacy draw is O(segments * frame size); skip beyond this
+
+
+def legacy_draw(strokes, frame):
+    """DrawEngine.draw before the cached layer: every segment, every frame"""
+    for stroke in strokes:
+        for i in range(1, len(stroke)):
+            x1, y1, color1, thick1 = stroke[i - 1]
+            x2, y2, color2, thick2 = stroke[i]
+            cv2.line(frame, (x1, y1), (x2, y2), color1, thick1, lineType=cv2.LINE_AA)
+            overlay = frame.copy()
+            cv2.line(overlay, (x1, y1), (x2, y2), color1, thick1 + 8)
+            frame = cv2.addWeighted(overlay, 0.08, frame, 0.92, 0)
+    return frame
+
+
+def make_drawing(segments, seed=0, points_per_stroke=50):
+    """Random-walk strokes totalling `segments` segments"""
+    rng = np.random.default_rng(seed)
+    drawer = DrawEngine(stroke_thickness=6, min_distance=0, simplify_tolerance=0)   # every sample is a segment
+    done = 0
+    while done < segments:
+        n = min(points_per_stroke, segments - done + 1)
+        x, y = rng.integers(100, WIN_W - 100), rng.integers(100, WIN_H - 190)
+        for _ in range(n):
+            x = int(np.clip(x + rng.integers(-12, 13), 0, WIN_W - 1))
+            y = int(np.clip(y + rng.integers(-12, 13), 0, WIN_H - 1))
+            drawer.update((x, y), "DRAW")
+        drawer.update(None, "STOP")
+        done += n - 1
+    return drawer
+
+
+def time_rebuild(drawer, repeats=5):
+    cam = np.full((WIN_H, WIN_W, 3), 90, np.uint8)
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        drawer.invalidate()
+        drawer.draw(cam.copy())
+    return (time.perf_counter() - t0) / repeats * 1000.0
+
+
+def time_frames(fn, frames=FRAMES):
+    cam = np.full((WIN_H, WIN_W, 3), 90, np.uint8)
+    fn(cam.copy())  # warm-up (builds the cached layer)
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        fn(cam.copy())
+    return (time.perf_counter() - t0) / frames * 1000.0
+
+
+def main():
+    print(f"{'segments':>10} {'cached ms/frame':>16} {'rebuild ms':>11} {'legacy ms/frame':>16}")
+    for n in SEGMENT_COUNTS:
+        drawer = make_drawing(n)
+        cached = time_frames(drawer.draw)
+        rebuild = time_rebuild(drawer)
+        if n <= LEGACY_MAX_SEGMENTS:
+            frames = max(1, FRAMES // max(1, n // 100))
+            legacy = f"{time_frames(lambda f: legacy_draw(drawer.strokes, f), frames):16.2f}"
+        else:
+            legacy = f"{'skipped':>16}"
+        print(f"{n:>10} {cached:16.2f} {rebuild:11.2f} {legacy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+benchmarks/bench_erase.py
+Radius erase per frame: the demo's rebuild-every-stroke hypot loop vs DrawEngine.erase_at.
+Run: python benchmarks/bench_erase.py
+"""
+
+import os, sys, time, math
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.draw_engine import DrawEngine
+
+WIN_W, WIN_H = 1280, 720
+POINT_COUNTS = [1_000, 100_000, 1_000_000]
+POINTS_PER_STROKE = 200
+ERASE_RADIUS = 25
+FRAMES = 50
+COLOR = (0, 0, 255)
+
+
+def make_drawer(n, seed=0):
+    """n random-walk points in strokes of POINTS_PER_STROKE"""
+    rng = np.random.default_rng(seed)
+    drawer = DrawEngine(stroke_thickness=6, stroke_color=COLOR)
+    for s in range(0, n, POINTS_PER_STROKE):
+        k = min(POINTS_PER_STROKE, n - s)
+        start = rng.integers((0, 0), (WIN_W, WIN_H))
+        walk = np.cumsum(rng.integers(-6, 7, (k, 2)), axis=0) + start
+        walk = np.clip(walk, 0, (WIN_W - 1, WIN_H - 1))
+        drawer.store.extend(walk[:, 0], walk[:, 1], COLOR, 6)
+        drawer.store.end_stroke()
+    drawer.store.reindex()
+    return drawer
+
+
+def legacy_erase(strokes, px, py, erase_radius=ERASE_RADIUS):
+    """The eraser loop from tests/test_gesture_tracker.py"""
+    new_strokes = []
+    for stroke in strokes:
+        new_stroke = [pt for pt in stroke if math.hypot(pt[0] - px, pt[1] - py) > erase_radius]
+        if new_stroke: new_strokes.append(new_stroke)
+    return new_strokes if new_strokes else [[]]
+
+
+def eraser_path(frames, seed=1):
+    rng = np.random.default_rng(seed)
+    return rng.integers((0, 0), (WIN_W, WIN_H), (frames, 2)).tolist()
+
+
+def main():
+    print(f"{'points':>10} {'erase_at ms/frame':>18} {'legacy ms/frame':>16} {'speedup':>8}")
+    for n in POINT_COUNTS:
+        drawer = make_drawer(n)
+        path = eraser_path(FRAMES)
+        t0 = time.perf_counter()
+        for p in path:
+            drawer.erase_at(p, ERASE_RADIUS)
+        fast = (time.perf_counter() - t0) / FRAMES * 1000.0
+
+        strokes = list(make_drawer(n).strokes)
+        frames = max(1, FRAMES * 1000 // n)
+        t0 = time.perf_counter()
+        for p in path[:frames]:
+            strokes = legacy_erase(strokes, *p)
+        slow = (time.perf_counter() - t0) / frames * 1000.0
+        print(f"{n:>10} {fast:18.3f} {slow:16.2f} {slow / fast:7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
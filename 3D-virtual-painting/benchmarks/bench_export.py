@@ -0,0 +1,90 @@
+"""
+benchmarks/bench_export.py
+How long the render loop is stalled by a save: cv2.imwrite inline (the old
+save_canvas_image) against handing the frame to core.exporter.Exporter, for PNG
+compression levels 1/3/9 on a --width x --height frame with strokes drawn on it.
+Also times an SVG export of a --points point drawing and video recording at 30 fps.
+Run: python benchmarks/bench_export.py [--width 1280 --height 720] [--points 100000]
+"""
+
+import argparse, os, shutil, sys, tempfile, time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.draw_engine import DrawEngine
+from core.exporter import Exporter
+
+
+def make_drawer(n_points, w, h, seed=0):
+    rng = np.random.default_rng(seed)
+    drawer = DrawEngine(min_distance=0, simplify_tolerance=0)   # exactly --points points
+    steps = rng.integers(-6, 7, (n_points, 2))
+    done = 0
+    while done < n_points:
+        start = rng.integers(50, min(w, h) - 50, 2)
+        pts = np.clip(start + np.cumsum(steps[done:done + 200], axis=0), 0, [w - 1, h - 1])
+        drawer.store.extend(pts[:, 0], pts[:, 1], tuple(int(c) for c in rng.integers(0, 256, 3)), 6)
+        drawer.store.end_stroke()
+        done += len(pts)
+    return drawer
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--points", type=int, default=100000)
+    ap.add_argument("--saves", type=int, default=10)
+    args = ap.parse_args()
+    w, h = args.width, args.height
+    out = tempfile.mkdtemp(prefix="export_")
+
+    drawer = make_drawer(args.points, w, h)
+    cam = np.random.default_rng(1).integers(0, 256, (h, w, 3), dtype=np.uint8)
+    frame = drawer.draw(cam.copy())
+
+    print(f"{'png level':>10} {'inline ms':>10} {'exporter ms':>12} {'written in ms':>14}")
+    for level in (1, 3, 9):
+        t0 = time.perf_counter()
+        for i in range(args.saves):
+            cv2.imwrite(os.path.join(out, f"inline_{i}.png"), frame, [cv2.IMWRITE_PNG_COMPRESSION, level])
+        inline = (time.perf_counter() - t0) / args.saves * 1000
+        with Exporter(max_pending=args.saves, png_compression=level) as ex:
+            stalls, futs = [], []
+            t_all = time.perf_counter()
+            for i in range(args.saves):
+                t0 = time.perf_counter()
+                futs.append(ex.save_png(frame, os.path.join(out, f"bg_{i}.png")))
+                stalls.append(time.perf_counter() - t0)
+            for f in futs:
+                f.result()
+            total = (time.perf_counter() - t_all) / args.saves * 1000
+        print(f"{level:>10} {inline:>10.1f} {np.mean(stalls) * 1000:>12.2f} {total:>14.1f}")
+
+    with Exporter() as ex:
+        t0 = time.perf_counter()
+        fut = ex.save_svg(drawer, os.path.join(out, "drawing.svg"), (w, h))
+        stall = time.perf_counter() - t0
+        fut.result()
+        total = time.perf_counter() - t0
+    print(f"svg   {args.points} points: {stall * 1000:.1f} ms on the render loop,"
+          f" {total * 1000:.0f} ms until written ({os.path.getsize(fut.result()) / 1e6:.1f} MB)")
+
+    with Exporter(max_pending=4) as ex:
+        ex.start_video(os.path.join(out, "session.mp4"), (w, h), fps=30)
+        stalls = []
+        for i in range(90):
+            t0 = time.perf_counter()
+            ex.write_frame(frame)
+            stalls.append(time.perf_counter() - t0)
+            time.sleep(max(0.0, 1 / 30 - (time.perf_counter() - t0)))
+    print(f"video 90 frames at 30 fps: {np.mean(stalls) * 1000:.2f} ms/frame on the render loop,"
+          f" {ex.video_frames} written, {ex.dropped_frames} dropped")
+    shutil.rmtree(out)
+
+
+if __name__ == "__main__":
+    main()
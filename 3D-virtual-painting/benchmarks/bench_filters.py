@@ -0,0 +1,111 @@
+"""
+benchmarks/bench_filters.py
+Pointer lag and jitter per landmark filter, against the ground-truth index-tip
+trajectories of the synthetic sessions (gestures/synthetic.py), replayed from .hlr
+recordings with gaussian landmark noise (--noise px) at 30 fps. The pointer is scored at the
+time it reaches the screen, --latency ms after capture (the capture -> inference ->
+render delay that predict_ms is meant to hide).
+  rmse   - pointer error vs the true tip at display time while moving (px)
+  lag    - time shift of the true trajectory that best matches the pointer (ms,
+           negative = ahead)
+  jitter - RMS frame-to-frame pointer motion while the hand is held still (px)
+"legacy" is the previous pipeline: HandTracker's 5-point moving average followed
+by the demo's weighted smooth_point_deque.
+Run: python benchmarks/bench_filters.py [--noise 2.0] [--latency 33] [--sessions scribble colors undo]
+"""
+
+import argparse, os, sys, tempfile, time
+from collections import deque
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.session import smooth_point_deque
+from gestures.gesture_tracker import HandTracker
+from gestures.recording import ReplaySource
+from gestures.synthetic import make_session, write_session
+
+CONFIGS = [
+    ("raw", None, {"smooth_factor": 1}),
+    ("legacy", None, {}),
+    ("moving_avg5", "moving_average", {"window": 5}),
+    ("one_euro", "one_euro", {}),
+    ("kalman", "kalman", {}),
+    ("one_euro+33ms", "one_euro", {"predict_ms": 33}),
+    ("kalman+33ms", "kalman", {"predict_ms": 33}),
+]
+
+
+def pointer_track(path, spec, kwargs):
+    if spec is None:
+        tracker = HandTracker(**kwargs)
+    else:
+        tracker = HandTracker(filter=spec, filter_kwargs=kwargs)
+    buf = deque(maxlen=8)
+    out, times, per_frame = [], [], []
+    for f in ReplaySource(path):
+        t0 = time.perf_counter()
+        tracker.set_landmarks(f.landmarks, f.handedness, f.scores, timestamp=f.timestamp)
+        pts = tracker.get_finger_positions(f.image)
+        per_frame.append(time.perf_counter() - t0)
+        p = pts["index"] if pts else None
+        if p is not None and spec is None and not kwargs:
+            p = smooth_point_deque(buf, p, mix=0.65)
+        out.append(p if p is not None else (np.nan, np.nan))
+        times.append(f.timestamp)
+    return np.array(out, float), np.array(times), np.mean(per_frame) * 1e6
+
+
+def metrics(out, times, truth, latency=0.0):
+    speed = np.zeros(len(truth))
+    speed[1:-1] = np.linalg.norm(truth[2:] - truth[:-2], axis=1) / 2.0
+    moving = speed > 0.5
+    still = speed < 0.05
+    ok = ~np.isnan(out[:, 0]) & ~np.isnan(truth[:, 0])
+    def truth_at(t):
+        return np.stack([np.interp(t, times, truth[:, k]) for k in (0, 1)], axis=1)
+    shown = times + latency
+    err = np.linalg.norm(out - truth_at(shown), axis=1)
+    rmse = np.sqrt(np.mean(err[moving & ok] ** 2))
+    best = None
+    for d in np.arange(-0.100, 0.250, 0.002):
+        e = np.mean(np.sum((out - truth_at(shown - d))[moving & ok] ** 2, axis=1))
+        if best is None or e < best[0]:
+            best = (e, d)
+    step = np.linalg.norm(np.diff(out, axis=0), axis=1)
+    both = still[1:] & still[:-1] & ok[1:] & ok[:-1]
+    jitter = np.sqrt(np.mean(step[both] ** 2)) if both.any() else float("nan")
+    return rmse, best[1] * 1000.0, jitter
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--noise", type=float, default=2.0)
+    ap.add_argument("--latency", type=float, default=33.0)
+    ap.add_argument("--sessions", nargs="*", default=["scribble", "colors", "undo"])
+    args = ap.parse_args()
+
+    out_dir = tempfile.mkdtemp(prefix="filters_")
+    sessions = []
+    for name in args.sessions:
+        s = make_session(name, noise_px=args.noise, seed=1)
+        sessions.append((write_session(os.path.join(out_dir, name + ".hlr"), s), s["truth"][:, 0]))
+
+    print(f"noise sigma {args.noise} px, 30 fps, display latency {args.latency:.0f} ms,"
+          f" sessions: {', '.join(args.sessions)}")
+    print(f"{'filter':>14} {'rmse px':>8} {'lag ms':>7} {'jitter px':>10} {'us/frame':>9}")
+    for label, spec, kwargs in CONFIGS:
+        rows = []
+        for path, truth in sessions:
+            out, times, us = pointer_track(path, spec, kwargs)
+            rows.append(metrics(out, times, truth, args.latency / 1000.0) + (us,))
+        rmse, lag, jitter, us = np.nanmean(np.array(rows), axis=0)
+        print(f"{label:>14} {rmse:8.2f} {lag:7.1f} {jitter:10.2f} {us:9.1f}")
+    for path, _ in sessions:
+        os.remove(path)
+    os.rmdir(out_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+benchmarks/bench_flow.py
+Frame-budget scheduling (gestures.flow_tracking.FlowScheduler) against full inference
+on every frame. Synthetic sessions (gestures/synthetic.py) are rendered as a textured
+hand skeleton over a noisy background; the "detector" returns the session's landmarks
+after sleeping --detect-ms, standing in for MediaPipe on a slow CPU. With --mediapipe
+--video FILE the real model runs instead and its every-frame output is the reference.
+Reports per-frame cost, skip ratio, budget compliance and the index-tip (pointer)
+error and pinch-state agreement of the scheduled landmarks vs the full-inference replay.
+Run: python benchmarks/bench_flow.py [--budget-ms 33] [--detect-ms 60] [--sessions scribble colors]
+"""
+
+import argparse, os, sys, time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from gestures import hand_features
+from gestures.flow_tracking import FlowScheduler
+from gestures.gesture_tracker import HAND_CONNECTIONS
+from gestures.synthetic import make_session
+
+INDEX_TIP = 8
+
+
+def render(landmarks, w, h, texture, background):
+    """Skeleton drawn thick and filled with a texture that moves with the wrist"""
+    frame = background.copy()
+    for hand in landmarks:
+        pts = np.rint(hand[:, :2] * (w, h)).astype(np.int32)
+        mask = np.zeros((h, w), np.uint8)
+        for a, b in HAND_CONNECTIONS:
+            cv2.line(mask, tuple(pts[a]), tuple(pts[b]), 255, 22)
+        for p in pts:
+            cv2.circle(mask, tuple(p), 13, 255, -1)
+        dx, dy = pts[0]
+        shifted = np.roll(texture, (dy, dx), axis=(0, 1))
+        np.copyto(frame, shifted, where=mask[:, :, None] > 0)
+    return frame
+
+
+def synthetic_run(kind, detect_ms, w, h):
+    s = make_session(kind, w, h)
+    rng = np.random.default_rng(0)
+    texture = cv2.GaussianBlur(rng.integers(90, 255, (h, w, 3), np.uint8), (0, 0), 1.5)
+    background = cv2.GaussianBlur(rng.integers(0, 70, (h, w, 3), np.uint8), (0, 0), 3.0)
+    frames, refs = [], []
+    for i, k in enumerate(s['n_hands']):
+        ref = (s['landmarks'][i, :k], s['handedness'][i, :k], s['scores'][i, :k])
+        frames.append(render(ref[0], w, h, texture, background))
+        refs.append(ref)
+    current = [0]
+
+    def detect(frame):
+        time.sleep(detect_ms / 1000.0)
+        return refs[current[0]]
+    return frames, refs, detect, current
+
+
+def mediapipe_run(path, n, w, h):
+    from gestures.gesture_tracker import HandTracker
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < n:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(cv2.resize(frame, (w, h)))
+    cap.release()
+    full = HandTracker(maxHands=1)
+    refs = [full.detect(f) for f in frames]
+    tracked = HandTracker(maxHands=1)
+    return frames, refs, tracked._detect_frame, [0]
+
+
+def evaluate(frames, refs, detect, current, budget_ms, max_stride, w, h):
+    sched = FlowScheduler(detect, budget_ms=budget_ms, max_stride=max_stride)
+    errors, agree, missed = [], [], 0
+    for i, frame in enumerate(frames):
+        current[0] = i
+        got = sched(frame)
+        ref = refs[i]
+        if len(ref[0]) and len(got[0]):
+            errors.append(np.abs((got[0][0, INDEX_TIP, :2] - ref[0][0, INDEX_TIP, :2]) * (w, h)).max())
+            pinch = [hand_features.compute(lm[:1], hd[:1], w, h)['is_pinch'][0] for lm, hd, _ in (got, ref)]
+            agree.append(pinch[0] == pinch[1])
+        elif len(ref[0]):
+            missed += 1
+    return sched.stats(), np.array(errors) if errors else np.zeros(1), np.mean(agree) if agree else 1.0, missed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget-ms", type=float, default=33.0)
+    ap.add_argument("--detect-ms", type=float, default=60.0, help="synthetic detector cost")
+    ap.add_argument("--max-stride", type=int, default=4)
+    ap.add_argument("--sessions", nargs="*", default=["scribble", "colors", "undo"])
+    ap.add_argument("--width", type=int, default=640)
+    ap.add_argument("--height", type=int, default=480)
+    ap.add_argument("--mediapipe", action="store_true")
+    ap.add_argument("--video", default=None)
+    ap.add_argument("--frames", type=int, default=300)
+    args = ap.parse_args()
+    w, h = args.width, args.height
+
+    runs = [(args.video, lambda: mediapipe_run(args.video, args.frames, w, h))] if args.mediapipe else \
+        [(kind, lambda kind=kind: synthetic_run(kind, args.detect_ms, w, h)) for kind in args.sessions]
+    print(f"budget {args.budget_ms} ms, max stride {args.max_stride}")
+    print(f"{'session':>10} {'frames':>7} {'detect ms':>10} {'flow ms':>8} {'frame ms':>9} {'skip':>6}"
+          f" {'in budget':>10} {'redetect':>9} {'ptr err px':>16} {'pinch agree':>12}")
+    for name, make in runs:
+        frames, refs, detect, current = make()
+        st, err, agree, missed = evaluate(frames, refs, detect, current, args.budget_ms, args.max_stride, w, h)
+        print(f"{os.path.basename(str(name)):>10} {st['frames']:>7} {st['detect_ms']:>10.1f} {st['flow_ms']:>8.2f}"
+              f" {st['ms_mean']:>9.1f} {st['skip_ratio']:>6.2f} {st['compliance']:>10.2f} {st['redetects']:>9}"
+              f" {err.mean():>6.2f} / {np.percentile(err, 95):>6.2f} {agree:>12.3f}"
+              + (f"  (hand missed on {missed} frames)" if missed else ""))
+
+
+if __name__ == "__main__":
+    main()
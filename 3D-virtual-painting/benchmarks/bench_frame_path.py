@@ -0,0 +1,112 @@
+"""
+benchmarks/bench_frame_path.py
+Allocation churn and frame time of the per-frame path: capture flip + resize
+(FrameSource), BGR->RGB for the detector (HandTracker), gestures + stroke compositing +
+toolbar (PaintSession) and, with --video, queuing the rendered frame for the exporter.
+"copying" is the path before core.frame_pool: every step allocates its output and the
+camera frame is copied before drawing; "pooled" reuses FramePool buffers through dst=
+and draws on the captured frame in place. The hand is a synthetic "scribble" session
+(gestures/synthetic.py) served in place of MediaPipe, so only the frame path is timed.
+Reports full-size buffers allocated per frame (FramePool), the tracemalloc peak of
+transient allocations per frame, and mean / p99 frame time (timed without tracemalloc).
+Run: python benchmarks/bench_frame_path.py [--frames 300] [--camera 1920x1080] [--size 1280x720] [--video]
+"""
+
+import argparse, os, sys, tempfile, time, tracemalloc
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.exporter import Exporter
+from core.frame_pool import FramePool
+from core.frame_source import FrameSource
+from core.session import PaintSession
+from gestures.gesture_tracker import HandTracker
+from gestures.synthetic import make_session
+
+
+class ScriptedHands:
+    """Stands in for the MediaPipe graph: returns the session's hands frame by frame"""
+
+    def __init__(self, s):
+        self.results = []
+        for i, k in enumerate(s['n_hands']):
+            hands = [SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in lm])
+                     for lm in s['landmarks'][i, :k]]
+            labels = [SimpleNamespace(classification=[SimpleNamespace(label='Right', score=0.9)])] * k
+            self.results.append(SimpleNamespace(multi_hand_landmarks=hands or None, multi_handedness=labels))
+        self.i = 0
+
+    def process(self, rgb):
+        r = self.results[self.i % len(self.results)]
+        self.i += 1
+        return r
+
+
+def run(mode, raw, s, n, size, video, trace):
+    pooled = mode == "pooled"
+    pool = FramePool(reuse=pooled)
+    w, h = size
+    tracker = HandTracker(maxHands=1, pool=pool)
+    tracker._hands = ScriptedHands(s)
+    session = PaintSession(tracker, width=w, height=h, debug=False)
+    exporter = None
+    if video:
+        exporter = Exporter(max_pending=4, pool=pool)
+        exporter.start_video(os.path.join(tempfile.mkdtemp(), "bench.avi"), size, fourcc="MJPG")
+    src = FrameSource((raw[i % len(raw)] for i in range(n)), size=size, flip=1, drop=False, pool=pool).start()
+    times, peaks = [], []
+    if trace:
+        tracemalloc.start()
+    while True:
+        captured = src.get(timeout=5.0)
+        if captured is None:
+            break
+        if trace:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        t0 = time.perf_counter()
+        frame = captured.image if pooled else pool.copy("frame", captured.image)
+        frame = tracker.findHands(frame, draw=False)
+        tracker.draw_landmarks(frame)
+        rendered = session.step(frame, timestamp=captured.seq / 30.0, copy=False)
+        if exporter is not None:
+            exporter.write_frame(rendered)
+        times.append(time.perf_counter() - t0)
+        if trace:
+            peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    if trace:
+        tracemalloc.stop()
+    src.stop()
+    if exporter is not None:
+        exporter.stop()
+    frames = max(1, len(times))
+    return np.array(times[10:]) * 1000, np.array(peaks[10:]) / 2 ** 20, pool.allocations / frames
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--camera", default="1920x1080", help="raw capture size before resize")
+    ap.add_argument("--size", default="1280x720", help="window size")
+    ap.add_argument("--video", action="store_true", help="also queue every frame for video export")
+    args = ap.parse_args()
+    cw, ch = map(int, args.camera.split("x"))
+    size = tuple(map(int, args.size.split("x")))
+    rng = np.random.default_rng(0)
+    raw = [cv2.GaussianBlur(rng.integers(0, 256, (ch, cw, 3), np.uint8), (0, 0), 3) for _ in range(4)]
+    s = make_session("scribble", *size)
+
+    print(f"{args.frames} frames, camera {args.camera} -> {args.size}" + (", video export" if args.video else ""))
+    print(f"{'':>8} {'buffers/frame':>14} {'transient MB/frame':>19} {'mean ms':>8} {'p99 ms':>8}")
+    for mode in ("copying", "pooled"):
+        _, peaks, per_frame = run(mode, raw, s, args.frames, size, args.video, trace=True)
+        times, _, _ = run(mode, raw, s, args.frames, size, args.video, trace=False)
+        print(f"{mode:>8} {per_frame:>14.2f} {peaks.mean():>19.1f} {times.mean():>8.2f} {np.percentile(times, 99):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+benchmarks/bench_gestures.py
+Per-frame cost of the gesture rule table (gestures.gesture_engine): a synthetic session's
+landmarks are reduced to feature vectors and replayed through GestureEngine with the
+painter's default rules plus --extra copies of a hold/hysteresis rule, reporting the
+mean and p95 of frame_features() + update() per frame for each rule count.
+Run: python benchmarks/bench_gestures.py [--session colors] [--extra 0 10 50 200]
+"""
+
+import argparse, os, sys, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from gestures import hand_features
+from gestures.gesture_engine import GestureEngine, GestureRule, default_rules
+from gestures.synthetic import make_session
+from ui.app_ui import toolbar_rects
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--session", default="colors")
+    ap.add_argument("--extra", type=int, nargs="*", default=[0, 10, 50, 200])
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    s = make_session(args.session, repeat=args.repeat)
+    w, h = s['size']
+    feats = [hand_features.compute(s['landmarks'][i, :k], s['handedness'][i, :k], w, h)
+             for i, k in enumerate(s['n_hands'])]
+    extra = GestureRule('extra', {'present': (1, 1), 'up_count': (2, 3), 'pinch_distance': (0, 80)},
+                        stay={'up_count': (1, 4)}, hold=0.1, release=0.05, repeat=0.5)
+
+    print(f"{len(feats)} frames of '{args.session}'")
+    print(f"{'rules':>6} {'mean us':>8} {'p95 us':>8} {'fired':>7}")
+    for n in args.extra:
+        rules = default_rules() + [extra._replace(name='extra%d' % i) for i in range(n)]
+        engine = GestureEngine(rules, toolbar_rects(w, h))
+        times, fired = [], 0
+        for f, t in zip(feats, s['timestamps']):
+            t0 = time.perf_counter()
+            v = engine.frame_features(f)
+            fired += len(engine.update(v, t))
+            times.append(time.perf_counter() - t0)
+        times = np.array(times) * 1e6
+        print(f"{len(rules):>6} {times.mean():>8.1f} {np.percentile(times, 95):>8.1f} {fired:>7}")
+
+
+if __name__ == "__main__":
+    main()
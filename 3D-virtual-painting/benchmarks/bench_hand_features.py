@@ -0,0 +1,84 @@
+"""
+benchmarks/bench_hand_features.py
+Per-frame hand feature extraction: the original per-landmark walk over MediaPipe
+protobuf objects (finger tips + fingers up + pinch, first hand only) vs converting
+the results to a (n, 21, 3) array once and computing every feature for all hands
+in one vectorized pass. MediaPipe results are faked with SimpleNamespace objects.
+Run: python benchmarks/bench_hand_features.py [--frames 20000]
+"""
+
+import argparse, math, os, sys, time
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from gestures import hand_features
+from gestures.gesture_tracker import results_to_arrays
+
+WIN_W, WIN_H = 1280, 720
+
+
+def fake_results(n_hands, seed=0):
+    rng = np.random.default_rng(seed)
+    hands = [SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y), z=float(z))
+                                       for x, y, z in rng.random((21, 3))])
+             for _ in range(n_hands)]
+    labels = [SimpleNamespace(classification=[SimpleNamespace(label=l, score=0.9)])
+              for l in ('Right', 'Left')[:n_hands]]
+    return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=labels)
+
+
+def legacy_features(results, w, h, label='Right'):
+    """Baseline HandTracker.get_finger_positions + fingers_up + pinch, one hand"""
+    hand = results.multi_hand_landmarks[0]
+    points = {}
+    for name, idx in {'thumb': 4, 'index': 8, 'middle': 12, 'ring': 16, 'pinky': 20}.items():
+        lm = hand.landmark[idx]
+        points[name] = (int(lm.x * w), int(lm.y * h))
+    status = []
+    for t, p in zip([4, 8, 12, 16, 20], [3, 6, 10, 14, 18]):
+        tip, pip = hand.landmark[t], hand.landmark[p]
+        if t != 4:
+            status.append(tip.y < pip.y)
+        elif label == 'Left':
+            status.append(tip.x > pip.x)
+        else:
+            status.append(tip.x < pip.x)
+    pinch = math.hypot(points['index'][0] - points['thumb'][0], points['index'][1] - points['thumb'][1])
+    return points, status, pinch, sum(status) == 0, sum(status) >= 4
+
+
+def vectorized_features(results, w, h):
+    landmarks, handedness, _ = results_to_arrays(results)
+    return hand_features.compute(landmarks, handedness, w, h)
+
+
+def per_frame_us(fn, results, frames):
+    fn(results, WIN_W, WIN_H)
+    t0 = time.perf_counter()
+    for _ in range(frames):
+        fn(results, WIN_W, WIN_H)
+    return (time.perf_counter() - t0) / frames * 1e6
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--frames", type=int, default=20000)
+    args = ap.parse_args()
+
+    print(f"{'hands':>5} {'legacy us':>10} {'legacy x n':>11} {'vectorized us':>14} {'features only us':>17}")
+    for n in (1, 2, 4):
+        results = fake_results(n)
+        legacy = per_frame_us(legacy_features, results, args.frames)
+        vec = per_frame_us(vectorized_features, results, args.frames)
+        landmarks, handedness, _ = results_to_arrays(results)
+        only = per_frame_us(lambda r, w, h: hand_features.compute(landmarks, handedness, w, h),
+                            results, args.frames)
+        # the legacy code handled only the first hand; n hands would cost n walks
+        print(f"{n:>5} {legacy:10.1f} {legacy * n:11.1f} {vec:14.1f} {only:17.1f}")
+
+
+if __name__ == "__main__":
+    main()
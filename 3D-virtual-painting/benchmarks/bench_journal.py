@@ -0,0 +1,99 @@
+"""
+benchmarks/bench_journal.py
+Stroke journal (core/journal.py): cost of journaling while drawing, and how long a
+session of --points points takes to come back, for a journal with undo / erase history
+and after compaction to a snapshot. A per-record struct parse of the same file is
+timed as the no-memmap baseline.
+Run: python benchmarks/bench_journal.py [--points 1000000] [--stroke 200]
+"""
+
+import argparse, os, struct, sys, tempfile, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core import journal
+from core.draw_engine import DrawEngine
+
+COLORS = [(0, 0, 255), (255, 0, 0), (0, 255, 0), (255, 255, 255)]
+
+
+def draw_session(drawer, n_points, stroke, seed=0, history=True):
+    """Random-walk strokes; with history every 10th stroke is undone, every 7th has an eraser pass"""
+    rng = np.random.default_rng(seed)
+    steps = rng.integers(-6, 7, (n_points, 2))
+    starts = rng.integers(100, 1100, (n_points // stroke + 1, 2))
+    done, k = 0, 0
+    while done < n_points:
+        drawer.change_color(COLORS[k % len(COLORS)])
+        pts = np.clip(starts[k] + np.cumsum(steps[done:done + stroke], axis=0), 0, 1279)
+        for x, y in pts.tolist():
+            drawer.update((x, y), "DRAW")
+        drawer.update(None, "STOP")
+        if history and k % 10 == 9:
+            drawer.update(None, "ERASE")
+        if history and k % 7 == 6:
+            x, y = pts[len(pts) // 2]
+            drawer.erase_at((int(x), int(y)), 20)
+        done += len(pts)
+        k += 1
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+
+def struct_parse(path):
+    """Baseline: one Python tuple per record"""
+    with open(path, "rb") as f:
+        data = f.read()[journal.HEADER.size:]
+    n = len(data) // journal.RECORD.itemsize * journal.RECORD.itemsize
+    return sum(1 for _ in struct.iter_unpack("<BBBBhh", data[:n]))
+
+
+def same(a, b):
+    return [p.tolist() for p, _, _ in a.runs()] == [p.tolist() for p, _, _ in b.runs()]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--points", type=int, default=1000000)
+    ap.add_argument("--stroke", type=int, default=200)
+    args = ap.parse_args()
+    path = os.path.join(tempfile.mkdtemp(prefix="journal_"), "session.hsj")
+
+    for history in (False, True):
+        label = "with undo/erase history" if history else "drawing only"
+        print(f"-- {args.points} points, {label}")
+        plain = DrawEngine(min_distance=0, simplify_tolerance=0)   # every one of --points is journaled
+        _, t_plain = timed(draw_session, plain, args.points, args.stroke, 0, history)
+        drawer = DrawEngine(min_distance=0, simplify_tolerance=0)
+        drawer.start_journal(path)
+        _, t_journal = timed(draw_session, drawer, args.points, args.stroke, 0, history)
+        drawer.journal.flush()
+        print(f"draw      {t_plain / args.points * 1e6:7.2f} us/point plain,"
+              f" {t_journal / args.points * 1e6:.2f} us/point journaled")
+
+        size = os.path.getsize(path)
+        store, t_load = timed(journal.load, path)
+        assert same(store, drawer.store)
+        _, t_struct = timed(struct_parse, path)
+        print(f"journal   {size / 1e6:7.2f} MB  load {t_load * 1000:7.1f} ms"
+              f"  (per-record struct parse alone {t_struct * 1000:.0f} ms)")
+
+        _, t_compact = timed(drawer.compact_journal)
+        drawer.close_journal()
+        size = os.path.getsize(path)
+        store, t_load = timed(journal.load, path)
+        assert same(store, drawer.store)
+        print(f"snapshot  {size / 1e6:7.2f} MB  load {t_load * 1000:7.1f} ms"
+              f"  (compaction {t_compact * 1000:.0f} ms, {store.n_alive} live points)")
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+benchmarks/bench_long_session.py
+Memory and per-frame cost of an all-day session: --hours of simulated drawing (one
+stroke every --stroke-every s, an eraser pass every 20th stroke, an undo every 15th)
+replayed through DrawEngine with and without a live depth (core.canvas_layer.FrozenLayer).
+Prints, per simulated hour, the bytes the engine holds (stroke store, undo history,
+checkpoints, frozen layer) and the draw() time of a full rebuild and of a plain frame.
+Run: python benchmarks/bench_long_session.py [--hours 8] [--live-strokes 500] [--width 1280 --height 720]
+"""
+
+import argparse, os, sys, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.draw_engine import DrawEngine
+
+COLORS = [(0, 0, 255), (255, 0, 0), (0, 255, 0), (255, 255, 255)]
+
+
+def engine_bytes(drawer):
+    n = drawer.store.nbytes + drawer.history.nbytes
+    n += sum(a.nbytes for snap in drawer._checkpoints.values() if snap for a in snap[1:])
+    if drawer.frozen is not None:
+        n += drawer.frozen.nbytes
+    return n
+
+
+def simulate(drawer, hours, stroke_every, w, h, seed=0):
+    """Yields (hour, strokes drawn) after each simulated hour"""
+    rng = np.random.default_rng(seed)
+    frame = np.zeros((h, w, 3), np.uint8)
+    per_hour = int(3600 / stroke_every)
+    k = 0
+    for hour in range(1, hours + 1):
+        for _ in range(per_hour):
+            drawer.change_color(COLORS[k % len(COLORS)])
+            n = int(rng.integers(30, 90))
+            pts = np.clip(rng.integers(50, [w - 50, h - 50]) + np.cumsum(rng.integers(-8, 9, (n, 2)), axis=0),
+                          0, [w - 1, h - 1])
+            for x, y in pts.tolist():
+                drawer.update((x, y), "DRAW")
+            drawer.update(None, "STOP")
+            if k % 20 == 19:
+                x, y = pts[n // 2]
+                drawer.erase_at((int(x), int(y)), 25)
+            if k % 15 == 14:
+                drawer.undo()
+            drawer.draw(frame.copy())
+            k += 1
+        yield hour, k
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hours", type=int, default=8)
+    ap.add_argument("--stroke-every", type=float, default=4.0, help="simulated seconds per stroke")
+    ap.add_argument("--live-strokes", type=int, default=500)
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    args = ap.parse_args()
+    w, h = args.width, args.height
+    frame = np.zeros((h, w, 3), np.uint8)
+
+    for live in (0, args.live_strokes):
+        drawer = DrawEngine(live_strokes=live, min_distance=0, simplify_tolerance=0)   # raw samples
+        print(f"-- live_strokes={live or 'unlimited'}")
+        print(f"{'hour':>5} {'strokes':>8} {'vector pts':>11} {'engine MB':>10} {'rebuild ms':>11} {'frame ms':>9} {'s/hour':>7}")
+        t_hour = time.perf_counter()
+        for hour, strokes in simulate(drawer, args.hours, args.stroke_every, w, h):
+            elapsed = time.perf_counter() - t_hour
+            drawer.invalidate()
+            t0 = time.perf_counter()
+            drawer.draw(frame.copy())
+            rebuild = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            for _ in range(10):
+                drawer.draw(frame.copy())
+            per_frame = (time.perf_counter() - t0) / 10
+            print(f"{hour:>5} {strokes:>8} {drawer.store.n_points:>11} {engine_bytes(drawer) / 1e6:>10.1f}"
+                  f" {rebuild * 1000:>11.1f} {per_frame * 1000:>9.2f} {elapsed:>7.1f}")
+            t_hour = time.perf_counter()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+benchmarks/bench_multi_hand.py
+Per-frame cost of PaintSession against the number of hands. The synthetic "four_hands"
+session (gestures/synthetic.py, every hand scribbling in its own quadrant) is cut down
+to its first 1, 2 and 4 hands, written as .hlr recordings and replayed through a
+PaintSession with that many hand slots; hand rows are shuffled every frame as MediaPipe
+reports them in no fixed order. Reports frames/sec and per-stage mean ms, and for
+comparison the tracker + gestures ms of running every hand through its own one-hand
+session (a per-hand loop instead of the batched slots).
+Run: python benchmarks/bench_multi_hand.py [--hands 1,2,4] [--repeat 3] [--size 1280x720]
+"""
+
+import argparse, os, sys, tempfile, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.profiler import Profiler
+from core.session import PaintSession, STAGES
+from gestures.gesture_tracker import HandTracker
+from gestures.recording import LandmarkRecording, ReplaySource
+from gestures.synthetic import make_session, write_session
+
+
+def first_hands(s, k):
+    """make_session() dict keeping only its first k hands"""
+    s = dict(s)
+    for key in ('landmarks', 'handedness', 'scores', 'truth'):
+        s[key] = s[key][:, :k]
+    s['n_hands'] = np.minimum(s['n_hands'], k)
+    return s
+
+
+def replay(path, hand=None, seed=0):
+    """Mean ms per stage replaying all hands in one session, or only row `hand` in a one-hand session"""
+    rec = LandmarkRecording(path)
+    w, h = rec.size
+    profiler = Profiler(window=len(rec))
+    hands = rec.max_hands if hand is None else 1
+    session = PaintSession(HandTracker(maxHands=hands), width=w, height=h, profiler=profiler, debug=False)
+    rng = np.random.default_rng(seed)
+    t0 = time.perf_counter()
+    for f in ReplaySource(rec):
+        rows = rng.permutation(len(f.landmarks)) if hand is None else [hand][:len(f.landmarks)]
+        session.step(f.image, f.landmarks[rows], f.handedness[rows], f.scores[rows], f.timestamp, copy=False)
+    elapsed = time.perf_counter() - t0
+    stats = profiler.summary()
+    return len(rec), elapsed, {s: stats[s]['mean'] for s in STAGES}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--hands", default="1,2,4")
+    ap.add_argument("--repeat", type=int, default=1, help="loop the synthetic script this many times")
+    ap.add_argument("--size", default="1280x720")
+    args = ap.parse_args()
+    w, h = map(int, args.size.split("x"))
+    s = make_session('four_hands', w, h, repeat=args.repeat)
+    out = tempfile.mkdtemp(prefix="multi_hand_")
+
+    print(f"{'hands':>5} {'frames':>7} {'fps':>7}" + "".join(f" {st + ' ms':>13}" for st in STAGES)
+          + f" {'per-hand sessions':>18}")
+    print(f"{'':>5} {'':>7} {'':>7}" + "".join(f" {'mean':>13}" for _ in STAGES) + f" {'tracker+gestures':>18}")
+    for k in map(int, args.hands.split(",")):
+        path = write_session(os.path.join(out, f"hands{k}.hlr"), first_hands(s, k))
+        n, elapsed, ms = replay(path)
+        looped = sum(m['tracker'] + m['gestures'] for m in (replay(path, hand)[2] for hand in range(k)))
+        cells = "".join(f" {ms[st]:13.3f}" for st in STAGES)
+        print(f"{k:>5} {n:7d} {n / elapsed:7.1f}{cells} {looped:18.3f}")
+        os.remove(path)
+    os.rmdir(out)
+
+
+if __name__ == "__main__":
+    main()
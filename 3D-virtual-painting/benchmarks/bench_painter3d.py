@@ -0,0 +1,78 @@
+"""
+benchmarks/bench_painter3d.py
+Orbit-render speed of drawing/painter3d.py: random-walk 3D strokes of 10k / 100k / 1M
+points rendered from a camera circling the painting, in "lines" mode (stroke bbox culling
++ batched polylines) and "points" mode with and without octree culling. Also reports the
+octree build time and how many points the cull keeps.
+Run: python benchmarks/bench_painter3d.py [--sizes 10000 100000 1000000] [--frames 36] [--budget 250000]
+"""
+
+import argparse, os, sys, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from drawing.painter3d import Stroke3DStore, OrbitCamera, Renderer3D
+
+
+def make_store(n_points, stroke_len=400, w=1280, h=720, seed=0):
+    rng = np.random.default_rng(seed)
+    store = Stroke3DStore(capacity=n_points)
+    colors = ((255, 0, 0), (0, 255, 0), (0, 0, 255), (0, 255, 255))
+    for k in range(max(1, n_points // stroke_len)):
+        start = rng.uniform((0, 0, -400), (w, h, 400))
+        store.extend(start + np.cumsum(rng.normal(0, 3, (stroke_len, 3)), axis=0),
+                     colors[k % len(colors)], 6)
+        store.end_stroke()
+    return store
+
+
+def orbit_fps(store, renderer, mode, frames, w, h):
+    cam = OrbitCamera(w, h)
+    # orbit closer than the fitted distance so part of the painting leaves the view
+    cam.distance *= 0.6
+    out = np.empty((h, w, 3), np.uint8)
+    renderer.render(store, cam, out, mode)  # warm-up (builds the octree)
+    kept = 0
+    t0 = time.perf_counter()
+    for i in range(frames):
+        cam.orbit(360.0 / frames, 0.0)
+        cam.pitch = 25.0 * np.sin(i / frames * 2 * np.pi)
+        renderer.render(store, cam, out, mode)
+        kept += renderer.stats.get("drawn", 0)
+    dt = time.perf_counter() - t0
+    return frames / dt, kept / frames
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    ap.add_argument("--frames", type=int, default=36)
+    ap.add_argument("--budget", type=int, default=250000, help="max_points for the capped run")
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    args = ap.parse_args()
+    w, h = args.width, args.height
+
+    print(f"{'points':>9} {'mode':<20} {'fps':>8} {'ms/frame':>9} {'drawn':>10}")
+    for n in args.sizes:
+        store = make_store(n, w=w, h=h)
+        t0 = time.perf_counter()
+        store.octree()
+        build = (time.perf_counter() - t0) * 1000.0
+        runs = (("lines", "lines", Renderer3D(w, h)),
+                ("lines, no lod", "lines", Renderer3D(w, h, lod_px=0)),
+                ("points+octree", "points", Renderer3D(w, h)),
+                ("points, no cull", "points", Renderer3D(w, h, octree=False)),
+                (f"points, {args.budget // 1000}k cap", "points", Renderer3D(w, h, max_points=args.budget)))
+        for label, mode, renderer in runs:
+            if mode == "lines" and not renderer.lod_px and n > 100000:
+                continue  # seconds per frame; not worth the wait
+            fps, kept = orbit_fps(store, renderer, mode, args.frames, w, h)
+            print(f"{store.n_points:>9} {label:<20} {fps:8.1f} {1000.0 / fps:9.2f} {kept:10.0f}")
+        print(f"{'':>9} octree build {build:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+benchmarks/bench_pipeline.py
+Serial loop vs InferencePipeline (inference in a worker process over shared memory).
+By default a synthetic detector burns CPU for --detect-ms per frame so this runs
+without MediaPipe; pass --mediapipe to use the real HandTracker in the worker.
+--render-ms adds CPU work to the render stage to stand in for toolbar/overlay/imshow.
+Run: python benchmarks/bench_pipeline.py [--frames 200] [--detect-ms 25] [--render-ms 15] [--mediapipe]
+"""
+
+import argparse, os, sys, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.draw_engine import DrawEngine
+from core.pipeline import InferencePipeline
+
+WIN_W, WIN_H = 1280, 720
+
+
+def burn(ms):
+    end = time.perf_counter() + ms / 1000.0
+    while time.perf_counter() < end:
+        pass
+
+
+def synthetic_detector(detect_ms=25.0):
+    """Busy-waits like a CPU-bound model and returns one fixed hand"""
+    hand = np.random.default_rng(0).random((1, 21, 3)).astype(np.float32)
+    def detect(frame):
+        burn(detect_ms)
+        return hand, np.array([1], np.int8), np.array([0.9], np.float32)
+    return detect
+
+
+def make_frames(n):
+    rng = np.random.default_rng(1)
+    base = rng.integers(0, 256, (WIN_H, WIN_W, 3), dtype=np.uint8)
+    return [base] * n
+
+
+def make_renderer(extra_ms=0.0):
+    """Camera copy + one stroke point at the index tip + layer composite"""
+    drawer = DrawEngine(min_distance=0, simplify_tolerance=0)   # all 2000 walk points
+    rng = np.random.default_rng(2)
+    walk = np.cumsum(rng.integers(-8, 9, (2000, 2)), axis=0) + (WIN_W // 2, WIN_H // 2)
+    for x, y in np.clip(walk, 0, (WIN_W - 1, WIN_H - 1)).tolist():
+        drawer.update((x, y), "DRAW")
+    def render(image, landmarks):
+        frame = image.copy()
+        if len(landmarks):
+            tip = landmarks[0, 8]
+            drawer.update((int(tip[0] * WIN_W), int(tip[1] * WIN_H)), "DRAW")
+        drawer.draw(frame)
+        burn(extra_ms)
+        return frame
+    return render
+
+
+def summarize(name, latencies, elapsed, n):
+    lat = np.array(latencies) * 1000.0
+    print(f"{name:>10} {n / elapsed:8.1f} fps   latency mean {lat.mean():6.1f} ms"
+          f"   p95 {np.percentile(lat, 95):6.1f} ms")
+
+
+def run_serial(frames, detect, render):
+    latencies = []
+    t0 = time.perf_counter()
+    for image in frames:
+        captured = time.perf_counter()
+        landmarks, _, _ = detect(image)
+        render(image, landmarks)
+        latencies.append(time.perf_counter() - captured)
+    return latencies, time.perf_counter() - t0
+
+
+def run_pipelined(frames, pipe, render):
+    latencies = []
+    t0 = time.perf_counter()
+    stamped = ((image, time.perf_counter()) for image in frames)
+    def tagged():
+        for seq, (image, ts) in enumerate(stamped):
+            yield _Frame(image, ts, seq)
+    for r in pipe.process(tagged()):
+        render(r.image, r.landmarks)
+        latencies.append(time.perf_counter() - r.timestamp)
+    return latencies, time.perf_counter() - t0
+
+
+class _Frame:
+    def __init__(self, image, timestamp, seq):
+        self.image, self.timestamp, self.seq = image, timestamp, seq
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--frames", type=int, default=200)
+    ap.add_argument("--detect-ms", type=float, default=25.0)
+    ap.add_argument("--render-ms", type=float, default=15.0)
+    ap.add_argument("--depth", type=int, default=1)
+    ap.add_argument("--mediapipe", action="store_true")
+    args = ap.parse_args()
+
+    frames = make_frames(args.frames)
+    render = make_renderer(args.render_ms)
+    if args.mediapipe:
+        from gestures.gesture_tracker import HandTracker
+        detect, factory, kwargs = HandTracker().detect, None, {}
+    else:
+        detect = synthetic_detector(args.detect_ms)
+        factory, kwargs = synthetic_detector, {"detect_ms": args.detect_ms}
+
+    render(frames[0], np.zeros((0, 21, 3)))  # warm the layer
+    summarize("serial", *run_serial(frames, detect, render), len(frames))
+    with InferencePipeline((WIN_H, WIN_W, 3), depth=args.depth, detector_factory=factory,
+                           detector_kwargs=kwargs) as pipe:
+        summarize("pipelined", *run_pipelined(frames, pipe, render), len(frames))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+benchmarks/bench_profiler.py
+Cost of the profiler's instrumentation: an empty `with profiler.stage(...)` block and a
+@profiler.timed function call, disabled vs enabled, against the bare statement; plus
+the headless replay (bench_replay's PaintSession loop) with profiling off and on.
+Run: python benchmarks/bench_profiler.py [--calls 200000]
+"""
+
+import argparse, os, sys, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.profiler import Profiler
+from core.session import PaintSession
+from gestures.gesture_tracker import HandTracker
+from gestures.synthetic import make_session
+
+
+def ns_per_call(fn, calls):
+    t0 = time.perf_counter()
+    fn(calls)
+    return (time.perf_counter() - t0) / calls * 1e9
+
+
+def bare(n):
+    for _ in range(n):
+        pass
+
+
+def with_stage(prof):
+    def run(n):
+        for _ in range(n):
+            with prof.stage("s"):
+                pass
+    return run
+
+
+def call(fn):
+    def run(n):
+        for _ in range(n):
+            fn()
+    return run
+
+
+def replay_fps(session_data, enabled):
+    prof = Profiler(enabled=enabled)
+    session = PaintSession(HandTracker(), profiler=prof)
+    image = session_data["blank"]
+    t0 = time.perf_counter()
+    for i, ts in enumerate(session_data["timestamps"]):
+        k = session_data["n_hands"][i]
+        session.step(image, session_data["landmarks"][i, :k], session_data["handedness"][i, :k],
+                     timestamp=ts)
+        prof.tick()
+    return len(session_data["timestamps"]) / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--calls", type=int, default=200000)
+    args = ap.parse_args()
+
+    def f():
+        return None
+    base = ns_per_call(bare, args.calls)
+    print(f"{'':>22} {'ns/call':>8} {'over bare loop':>15}")
+    rows = [("bare loop", bare), ("plain call", call(f))]
+    for enabled in (False, True):
+        prof = Profiler(enabled=enabled)
+        tag = "on" if enabled else "off"
+        rows.append((f"stage() {tag}", with_stage(prof)))
+        rows.append((f"@timed {tag}", call(prof.timed("f")(f))))
+    for name, fn in rows:
+        ns = ns_per_call(fn, args.calls)
+        print(f"{name:>22} {ns:8.0f} {ns - base:15.0f}")
+
+    data = make_session("scribble")
+    data["blank"] = np.zeros((720, 1280, 3), np.uint8)
+    replay_fps(data, False)  # warm up
+    off, on = replay_fps(data, False), replay_fps(data, True)
+    print(f"replay fps: profiler off {off:.1f}, on {on:.1f} ({(off - on) / off * 100:+.1f}% cost)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+benchmarks/bench_replay.py
+Headless benchmark of the whole gesture pipeline: landmark recordings are replayed
+through PaintSession (HandTracker features -> GestureEngine/GestureController ->
+DrawEngine -> toolbar/overlay render) as fast as possible, with no camera and no window.
+The bundled synthetic sessions (gestures/synthetic.py) are written as .hlr files to
+--out (a temp dir by default); recordings made with HandTracker.start_recording() can
+be passed with --recording. Reports frames/sec and per-stage mean/p95 ms.
+Run: python benchmarks/bench_replay.py [--sessions scribble erase ...] [--repeat 3] [--recording a.hlr]
+"""
+
+import argparse, os, sys, tempfile, time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.profiler import Profiler
+from core.session import PaintSession, STAGES
+from gestures.gesture_tracker import HandTracker
+from gestures.recording import LandmarkRecording, ReplaySource
+from gestures.synthetic import SESSIONS, make_session, write_session
+
+
+def replay(path):
+    rec = LandmarkRecording(path)
+    w, h = rec.size
+    profiler = Profiler(window=len(rec))
+    session = PaintSession(HandTracker(maxHands=rec.max_hands), width=w, height=h, profiler=profiler)
+    source = ReplaySource(rec)
+    t0 = time.perf_counter()
+    for f in source:
+        session.step(f.image, f.landmarks, f.handedness, f.scores, f.timestamp)
+    elapsed = time.perf_counter() - t0
+    return len(rec), elapsed, profiler.summary()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", nargs="*", default=list(SESSIONS))
+    ap.add_argument("--recording", nargs="*", default=[])
+    ap.add_argument("--repeat", type=int, default=1, help="loop each synthetic script this many times")
+    ap.add_argument("--out", default=None, help="keep the generated .hlr files here")
+    args = ap.parse_args()
+
+    out = args.out or tempfile.mkdtemp(prefix="replay_")
+    os.makedirs(out, exist_ok=True)
+    paths = [write_session(os.path.join(out, name + ".hlr"), make_session(name, repeat=args.repeat))
+             for name in args.sessions] + list(args.recording)
+
+    header = f"{'session':>12} {'frames':>7} {'fps':>8}" + "".join(f" {s + ' ms':>18}" for s in STAGES)
+    print(header)
+    print(f"{'':>12} {'':>7} {'':>8}" + "".join(f" {'mean / p95':>18}" for _ in STAGES))
+    for path in paths:
+        n, elapsed, stats = replay(path)
+        name = os.path.splitext(os.path.basename(path))[0]
+        cells = "".join(f" {stats[s]['mean']:8.3f} / {stats[s]['p95']:6.3f}" for s in STAGES)
+        print(f"{name:>12} {n:7d} {n / elapsed:8.1f}{cells}")
+    if not args.out:
+        for path in paths[:len(args.sessions)]:
+            os.remove(path)
+        os.rmdir(out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+benchmarks/bench_roi_tracking.py
+Full-frame inference vs RoiDetector (padded crop around the last hand, downscaled
+while tracking is confident) on a synthetic 1280x720 session: a bright "hand" moves
+along a Lissajous path and leaves the frame now and then.
+The synthetic detector's cost grows with input pixels like a real model (a few
+blur passes); pass --mediapipe --video FILE to measure real MediaPipe instead.
+Reports per-frame inference time, landmark error against full-frame and tracking-loss rate.
+Run: python benchmarks/bench_roi_tracking.py [--frames 300] [--scale 0.5] [--min-crop 192]
+"""
+
+import argparse, os, sys, time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from gestures.roi_tracking import RoiDetector
+
+WIN_W, WIN_H = 1280, 720
+HAND = 110
+
+
+def synthetic_detector(passes=3):
+    def detect(image):
+        work = image
+        for _ in range(passes):
+            work = cv2.GaussianBlur(work, (9, 9), 0)
+        ys, xs = np.nonzero(work[:, :, 0] > 127)
+        if len(xs) == 0:
+            return np.zeros((0, 21, 3), np.float32), np.zeros(0, np.int8), np.zeros(0, np.float32)
+        h, w = image.shape[:2]
+        t = np.linspace(0.0, 1.0, 21)
+        lm = np.stack([(xs.min() + t * (xs.max() - xs.min())) / w,
+                       (ys.min() + t * (ys.max() - ys.min())) / h, np.zeros(21)], axis=1)
+        return lm[None].astype(np.float32), np.array([1], np.int8), np.array([0.95], np.float32)
+    return detect
+
+
+def synthetic_frames(n):
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 90, (WIN_H, WIN_W, 3), dtype=np.uint8)
+    for k in range(n):
+        frame = base.copy()
+        if (k // 60) % 5 != 4:  # hand away for 60 frames out of every 300
+            x = int((WIN_W - HAND) * (0.5 + 0.45 * np.sin(k * 0.031)))
+            y = int((WIN_H - HAND) * (0.5 + 0.45 * np.sin(k * 0.047 + 1.0)))
+            frame[y:y + HAND, x:x + HAND] = 230
+        yield frame
+
+
+def video_frames(path, n):
+    cap = cv2.VideoCapture(path)
+    for _ in range(n):
+        ok, frame = cap.read()
+        if not ok:
+            break
+        yield cv2.resize(frame, (WIN_W, WIN_H))
+    cap.release()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--scale", type=float, default=0.5)
+    ap.add_argument("--min-crop", type=int, default=192)
+    ap.add_argument("--pad", type=float, default=0.35)
+    ap.add_argument("--max-misses", type=int, default=3)
+    ap.add_argument("--mediapipe", action="store_true")
+    ap.add_argument("--video", default=None)
+    args = ap.parse_args()
+
+    if args.mediapipe:
+        from gestures.gesture_tracker import HandTracker
+        full = HandTracker(maxHands=1)._detect_frame
+        tracked = HandTracker(maxHands=1)._detect_frame
+        frames = list(video_frames(args.video, args.frames))
+    else:
+        full = tracked = synthetic_detector()
+        frames = list(synthetic_frames(args.frames))
+
+    roi = RoiDetector(tracked, pad=args.pad, min_crop=args.min_crop, scale=args.scale,
+                      max_misses=args.max_misses)
+    full_ms, roi_ms, errors, missed = [], [], [], 0
+    for frame in frames:
+        t0 = time.perf_counter()
+        ref, _, _ = full(frame)
+        full_ms.append((time.perf_counter() - t0) * 1000.0)
+        got, _, _ = roi(frame)
+        roi_ms.append(roi.last_ms)
+        if len(ref) and len(got):
+            errors.append(np.abs((got[0, :, :2] - ref[0, :, :2]) * (WIN_W, WIN_H)).max())
+        elif len(ref):
+            missed += 1
+
+    full_ms, roi_ms = np.array(full_ms), np.array(roi_ms)
+    st = roi.stats()
+    print(f"{'mode':>6} {'mean ms':>8} {'p95 ms':>8}")
+    print(f"{'full':>6} {full_ms.mean():8.2f} {np.percentile(full_ms, 95):8.2f}")
+    print(f"{'roi':>6} {roi_ms.mean():8.2f} {np.percentile(roi_ms, 95):8.2f}"
+          f"   ({full_ms.mean() / roi_ms.mean():.1f}x)")
+    err = np.array(errors) if errors else np.zeros(1)
+    print(f"frames on crops {st['roi_frames']}/{st['frames']}   last input {st['input']}")
+    print(f"landmark error vs full frame: mean {err.mean():.1f} px, max {err.max():.1f} px;"
+          f" hand missed on {missed} frames where full-frame saw it")
+    print(f"tracking losses {st['losses']}  loss rate {st['loss_rate']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
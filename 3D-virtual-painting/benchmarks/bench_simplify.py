@@ -0,0 +1,108 @@
+"""
+benchmarks/bench_simplify.py
+Stroke ingest simplification (core/simplify.py) on replayed gesture sessions: every
+session is replayed through PaintSession twice, storing every pointer sample and with
+min-distance decimation + streaming/final RDP. Reports stored points, the full layer
+rebuild time (what undo / erase / resize pay), the replay frame rate, the largest
+distance from a raw sample to its simplified stroke, and the mean/max per-pixel
+difference of the rendered canvases. Rebuild times are the best of 20.
+Run: python benchmarks/bench_simplify.py [--sessions scribble ...] [--noise 1.0] [--repeat 1] [--tolerance 1.0] [--min-distance 2.0]
+"""
+
+import argparse, os, sys, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.draw_engine import DrawEngine
+from core.session import PaintSession
+from core.simplify import segment_distances
+from gestures.gesture_tracker import HandTracker
+from gestures.recording import LandmarkRecording
+from gestures.synthetic import SESSIONS, make_session
+
+
+class CountingDrawEngine(DrawEngine):
+    """DrawEngine that remembers whether the eraser removed anything"""
+    erased = 0
+
+    def erase_at(self, point, radius):
+        n = DrawEngine.erase_at(self, point, radius)
+        self.erased += n
+        return n
+
+
+def replay(session_data, min_distance, tolerance, repeat_rebuild=20, erase_radius=25):
+    w, h = session_data["size"]
+    drawer = CountingDrawEngine(stroke_thickness=6, min_distance=min_distance,
+                                simplify_tolerance=tolerance, max_segment=erase_radius)
+    session = PaintSession(HandTracker(maxHands=session_data["landmarks"].shape[1]), drawer,
+                           width=w, height=h, debug=False, erase_radius=erase_radius)
+    blank = np.zeros((h, w, 3), np.uint8)
+    t0 = time.perf_counter()
+    for i, ts in enumerate(session_data["timestamps"]):
+        k = session_data["n_hands"][i]
+        session.step(blank, session_data["landmarks"][i, :k], session_data["handedness"][i, :k],
+                     session_data["scores"][i, :k], ts)
+    fps = len(session_data["timestamps"]) / (time.perf_counter() - t0)
+    best = np.inf
+    for _ in range(repeat_rebuild):
+        drawer.invalidate()
+        t0 = time.perf_counter()
+        canvas = drawer.draw(blank)
+        best = min(best, time.perf_counter() - t0)
+    rebuild_ms = best * 1000.0
+    return drawer, fps, rebuild_ms, canvas.copy()
+
+
+def deviation(raw_store, simple_store):
+    """Largest distance from a live raw point to the nearest simplified stroke"""
+    raw = np.concatenate([p for p, _, _ in raw_store.runs()] or [np.zeros((0, 2))])
+    if not len(raw):
+        return 0.0
+    best = np.full(len(raw), np.inf)
+    for pts, _, _ in simple_store.runs():
+        pairs = zip(pts[:-1], pts[1:]) if len(pts) > 1 else [(pts[0], pts[0])]
+        for a, b in pairs:
+            np.minimum(best, segment_distances(raw, a, b), out=best)
+    return float(best.max())
+
+
+def load(name, noise, repeat):
+    if name.endswith(".hlr"):
+        rec = LandmarkRecording(name)
+        return {"timestamps": rec.timestamps, "landmarks": rec.landmarks, "handedness": rec.handedness,
+                "scores": rec.scores, "n_hands": rec.n_hands, "size": rec.size}
+    return make_session(name, noise_px=noise, repeat=repeat)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", nargs="*", default=[s for s in SESSIONS if s != "idle"],
+                    help="synthetic session names or .hlr recordings")
+    ap.add_argument("--noise", type=float, default=1.0, help="landmark jitter (px) of synthetic sessions")
+    ap.add_argument("--repeat", type=int, default=1, help="loop each synthetic script this many times")
+    ap.add_argument("--tolerance", type=float, default=1.0)
+    ap.add_argument("--min-distance", type=float, default=2.0)
+    args = ap.parse_args()
+
+    print(f"{'session':>10} {'points':>15} {'reduction':>9} {'rebuild ms':>15} {'speedup':>7}"
+          f" {'replay fps':>15} {'max dev px':>10} {'img diff mean/max':>17}")
+    for name in args.sessions:
+        data = load(name, args.noise, args.repeat)
+        replay(data, 0.0, 0.0)  # warm-up
+        raw, fps_raw, ms_raw, img_raw = replay(data, 0.0, 0.0)
+        simp, fps_simp, ms_simp, img_simp = replay(data, args.min_distance, args.tolerance)
+        a, b = raw.store, simp.store
+        # the eraser removes different point sets from raw and simplified strokes
+        dev = "-" if raw.erased else f"{deviation(a, b):.2f}"
+        diff = np.abs(img_raw.astype(int) - img_simp.astype(int)).max(axis=2)
+        label = os.path.splitext(os.path.basename(name))[0]
+        print(f"{label:>10} {a.n_alive:>7d} -> {b.n_alive:<5d} {a.n_alive / max(b.n_alive, 1):8.1f}x"
+              f" {ms_raw:6.2f} -> {ms_simp:<6.2f} {ms_raw / max(ms_simp, 1e-9):6.2f}x"
+              f" {fps_raw:6.0f} -> {fps_simp:<6.0f} {dev:>10} {diff.mean():9.3f} / {diff.max():<5d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+benchmarks/bench_startup.py
+Cold-start latency of the painter. Each measurement runs in a fresh interpreter:
+  - import time of the app modules (mediapipe loaded lazily) against importing mediapipe;
+  - time to first frame / tracker ready / first detected hand / first gesture, with the
+    model loaded up front before the first frame ("eager") against HandTracker.warm_up()
+    on a background thread while frames are already rendered ("lazy").
+Without --mediapipe the model is simulated: building it sleeps --load-s and each inference
+sleeps --detect-ms and returns the landmarks of a synthetic "scribble" session
+(gestures/synthetic.py); with --mediapipe --video FILE the real model runs on the video.
+Run: python benchmarks/bench_startup.py [--load-s 1.5] [--detect-ms 20] [--repeats 3]
+"""
+
+import argparse, json, os, subprocess, sys, time
+
+T_START = time.perf_counter()
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+APP_MODULES = ("gestures.gesture_tracker", "core.session", "core.pipeline", "core.frame_source",
+               "core.exporter", "core.draw_engine")
+MILESTONES = ("imports", "first_frame", "tracker_ready", "first_hand", "first_gesture")
+
+
+def import_seconds(modules):
+    code = ("import sys, time; sys.path.append(%r); t = time.perf_counter()\n"
+            "for m in %r: __import__(m)\n"
+            "print(time.perf_counter() - t)" % (SRC, tuple(modules)))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    if out.returncode:
+        return None, out.stderr.strip().splitlines()[-1]
+    return float(out.stdout.split()[-1]), None
+
+
+def simulated_mediapipe(load_s, detect_ms, w, h):
+    """Stand-in for the mediapipe module: frame i carries i + 1 in its first pixel (R + 256 G)"""
+    from types import SimpleNamespace
+    import numpy as np
+    from gestures.synthetic import make_session
+
+    s = make_session("scribble", w, h)
+
+    class Hands:
+        def __init__(self, **kwargs):
+            time.sleep(load_s)
+
+        def process(self, rgb):
+            time.sleep(detect_ms / 1000.0)
+            i = int(rgb[0, 0, 0]) + 256 * int(rgb[0, 0, 1]) - 1
+            k = s['n_hands'][i] if 0 <= i < len(s['n_hands']) else 0
+            if not k:
+                return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+            hands = [SimpleNamespace(landmark=[SimpleNamespace(x=x, y=y, z=z) for x, y, z in lm])
+                     for lm in s['landmarks'][i, :k]]
+            labels = [SimpleNamespace(classification=[SimpleNamespace(label='Right', score=0.9)])] * k
+            return SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=labels)
+
+    def frames():
+        frame = np.full((h, w, 3), 60, np.uint8)
+        for i in range(len(s['n_hands'])):
+            frame[0, 0] = (0, (i + 1) // 256, (i + 1) % 256)
+            yield frame
+    return SimpleNamespace(solutions=SimpleNamespace(hands=SimpleNamespace(Hands=Hands))), frames()
+
+
+def child(args):
+    """One cold start; prints the milestones (seconds since interpreter start) as JSON"""
+    sys.path.append(SRC)
+    from core.frame_source import FrameSource
+    from core.profiler import StartupTimer
+    from core.session import PaintSession
+    from gestures import gesture_tracker
+    startup = StartupTimer(T_START)
+    startup.mark("imports")
+    w, h = args.width, args.height
+    if args.mediapipe:
+        source = FrameSource(args.video, size=(w, h), drop=False, fps=args.fps)
+    else:
+        gesture_tracker.mp, frames = simulated_mediapipe(args.load_s, args.detect_ms, w, h)
+        source = FrameSource(frames, drop=False, fps=args.fps)
+    tracker = gesture_tracker.HandTracker(maxHands=1)
+    tracker.warm_up(background=args.child == "lazy", size=(w, h))
+    session = PaintSession(tracker, width=w, height=h, debug=False)
+    source.start()
+    for _ in range(args.frames):
+        captured = source.get(timeout=5.0)
+        if captured is None:
+            break
+        if tracker.ready:
+            startup.mark("tracker_ready")
+        frame = tracker.draw_landmarks(tracker.findHands(captured.image.copy(), draw=False))
+        session.step(frame, timestamp=captured.timestamp, copy=False)
+        startup.mark("first_frame")
+        if len(tracker.landmarks):
+            startup.mark("first_hand")
+        if session.engine.fired.any():
+            startup.mark("first_gesture")
+            break
+    source.release()
+    print(json.dumps(dict(startup.marks, error=repr(tracker.warm_error) if tracker.warm_error else None)))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--load-s", type=float, default=1.5, help="simulated model build time")
+    ap.add_argument("--detect-ms", type=float, default=20.0, help="simulated inference cost")
+    ap.add_argument("--mediapipe", action="store_true")
+    ap.add_argument("--video", default=None)
+    ap.add_argument("--fps", type=float, default=30.0)
+    ap.add_argument("--frames", type=int, default=600)
+    ap.add_argument("--width", type=int, default=640)
+    ap.add_argument("--height", type=int, default=480)
+    ap.add_argument("--repeats", type=int, default=3)
+    ap.add_argument("--child", choices=("eager", "lazy"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return child(args)
+    if args.mediapipe and not args.video:
+        ap.error("--mediapipe needs --video")
+
+    print("import time (fresh interpreter, median of %d):" % args.repeats)
+    for name, modules in (("app modules", APP_MODULES), ("mediapipe", ("mediapipe",))):
+        runs = [import_seconds(modules) for _ in range(args.repeats)]
+        times = sorted(t for t, _ in runs if t is not None)
+        print(f"{name:>12} " + (f"{times[len(times) // 2] * 1000:8.0f} ms" if times
+                                else f"   failed: {runs[0][1]}"))
+
+    model = "mediapipe on " + args.video if args.mediapipe else \
+        f"simulated model: {args.load_s:.1f} s load, {args.detect_ms:.0f} ms per frame"
+    print(f"\ncold start, {model}; ms since interpreter start (median of {args.repeats})")
+    print(f"{'':>6} " + " ".join(f"{m:>14}" for m in MILESTONES))
+    forward = [a for a in sys.argv[1:] if a != "--child"]
+    for mode in ("eager", "lazy"):
+        runs = []
+        for _ in range(args.repeats):
+            out = subprocess.run([sys.executable, __file__, "--child", mode] + forward,
+                                 capture_output=True, text=True)
+            if out.returncode:
+                print(f"{mode:>6}   failed: {out.stderr.strip().splitlines()[-1]}")
+                break
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        if not runs:
+            continue
+        if runs[0]["error"]:
+            print(f"{mode:>6}   model failed to load: {runs[0]['error']}")
+        cells = []
+        for m in MILESTONES:
+            v = sorted(r[m] for r in runs if r.get(m) is not None)
+            cells.append(f"{v[len(v) // 2] * 1000:>14.0f}" if v else f"{'-':>14}")
+        print(f"{mode:>6} " + " ".join(cells))
+
+
+if __name__ == "__main__":
+    main()
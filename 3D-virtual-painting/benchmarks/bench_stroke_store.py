@@ -0,0 +1,76 @@
+"""
+benchmarks/bench_stroke_store.py
+Memory per 100k points and append throughput: legacy list-of-tuples vs StrokeStore.
+Run: python benchmarks/bench_stroke_store.py
+"""
+
+import os, sys, time, tracemalloc
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.stroke_store import StrokeStore
+
+N_POINTS = 100_000
+POINTS_PER_STROKE = 200
+COLOR, THICKNESS = (0, 0, 255), 6
+
+
+def make_points(n=N_POINTS, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 1280, n).tolist(), rng.integers(0, 720, n).tolist()
+
+
+def fill_legacy(xs, ys):
+    strokes = [[]]
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        strokes[-1].append((x, y, COLOR, THICKNESS))
+        if (i + 1) % POINTS_PER_STROKE == 0:
+            strokes.append([])
+    return strokes
+
+
+def fill_store(xs, ys):
+    store = StrokeStore()
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        store.append(x, y, COLOR, THICKNESS)
+        if (i + 1) % POINTS_PER_STROKE == 0:
+            store.end_stroke()
+    return store
+
+
+def fill_store_bulk(xs, ys):
+    store = StrokeStore()
+    xs, ys = np.asarray(xs), np.asarray(ys)
+    for s in range(0, len(xs), POINTS_PER_STROKE):
+        store.extend(xs[s:s + POINTS_PER_STROKE], ys[s:s + POINTS_PER_STROKE], COLOR, THICKNESS)
+        store.end_stroke()
+    return store
+
+
+def measure(fill, xs, ys):
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    t0 = time.perf_counter()
+    obj = fill(xs, ys)
+    elapsed = time.perf_counter() - t0
+    mem = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    del obj
+    return mem, elapsed
+
+
+def main():
+    xs, ys = make_points()
+    print(f"{'representation':>22} {'bytes/point':>12} {'MB/100k pts':>12} {'Mpoints/s':>10}")
+    for name, fill in [("list of tuples", fill_legacy),
+                       ("StrokeStore.append", fill_store),
+                       ("StrokeStore.extend", fill_store_bulk)]:
+        mem, elapsed = measure(fill, xs, ys)
+        print(f"{name:>22} {mem / N_POINTS:12.1f} {mem / 1e6 * 100_000 / N_POINTS:12.2f} "
+              f"{N_POINTS / elapsed / 1e6:10.2f}")
+
+
+if __name__ == "__main__":
+    main()
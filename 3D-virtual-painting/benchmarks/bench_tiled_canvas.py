@@ -0,0 +1,93 @@
+"""
+benchmarks/bench_tiled_canvas.py
+Per-frame composite cost and raster memory against the size of the drawing. "canvas" is a
+CanvasLayer as large as the drawing (what a screen-sized canvas would need to hold the same
+world); "tiled" is core.tiled_canvas.TiledCanvas seen through a --size viewport, panned
+across the drawing, at zoom 1 and zoomed out. With --max-mb the tiles beyond the budget are
+spilled to disk and the bench also reports spills / reloads while panning.
+The drawing is random scribbles filling an N x N world (N = --extents).
+Run: python benchmarks/bench_tiled_canvas.py [--extents 1000,4000,16000] [--size 1280x720] [--max-mb 64]
+"""
+
+import argparse, os, sys, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.canvas_layer import CanvasLayer
+from core.tiled_canvas import TiledCanvas
+
+COLORS = [(255, 0, 0), (0, 0, 255), (0, 255, 0), (0, 255, 255)]
+
+
+def scribbles(extent, rng, density=2.0):
+    """About `density` strokes of 40 points per 256 x 256 area"""
+    n = max(1, int(density * (extent / 256.0) ** 2))
+    strokes = []
+    for k in range(n):
+        x, y = rng.uniform(0, extent, 2)
+        steps = rng.normal(0, 6, (40, 2)).cumsum(axis=0)
+        pts = np.clip(np.array([x, y]) + steps, 0, extent - 1).astype(int)
+        strokes.append([(int(px), int(py), COLORS[k % 4], 6) for px, py in pts])
+    return strokes
+
+
+def time_composite(layer, frame, frames, move=None):
+    times = []
+    for i in range(frames):
+        if move is not None:
+            move(i)
+        out = frame.copy()
+        t0 = time.perf_counter()
+        layer.composite(out)
+        times.append(time.perf_counter() - t0)
+    return np.median(times) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--extents", default="1000,4000,16000")
+    ap.add_argument("--size", default="1280x720")
+    ap.add_argument("--frames", type=int, default=60)
+    ap.add_argument("--max-mb", type=float, default=None, help="tile memory budget (default: unbounded)")
+    ap.add_argument("--canvas-limit", type=int, default=8000, help="skip the flat canvas beyond this extent")
+    args = ap.parse_args()
+    w, h = map(int, args.size.split("x"))
+    frame = np.full((h, w, 3), 60, np.uint8)
+    max_bytes = int(args.max_mb * 2 ** 20) if args.max_mb else 1 << 62
+    rng = np.random.default_rng(0)
+
+    print(f"viewport {w}x{h}, median composite ms over {args.frames} frames"
+          + (f", tile budget {args.max_mb:.0f} MB" if args.max_mb else ""))
+    print(f"{'extent':>7} {'strokes':>8} | {'canvas ms':>9} {'canvas MB':>9} | {'tiled ms':>8} "
+          f"{'zoom 1/4':>8} {'tiles':>6} {'MB':>6} {'spills':>6} {'loads':>6}")
+    for extent in map(int, args.extents.split(",")):
+        strokes = scribbles(extent, rng)
+        if extent <= args.canvas_limit:
+            flat = CanvasLayer(extent, extent)
+            flat.draw_strokes(strokes)
+            canvas = f"{time_composite(flat, np.full((extent, extent, 3), 60, np.uint8), 5):>9.1f} " \
+                     f"{(flat.color.nbytes + flat.alpha.nbytes + flat._premul.nbytes + flat._weight.nbytes) / 2 ** 20:>9.0f}"
+            del flat
+        else:
+            canvas = f"{'-':>9} {'-':>9}"
+        tiled = TiledCanvas(max_bytes=max_bytes)
+        tiled.draw_strokes(strokes)
+        vp = tiled.viewport
+        span = max(1, extent - w)
+
+        def pan(i):
+            vp.ox, vp.oy = -float(int(i * 37) % span), -float(int(i * 23) % max(1, extent - h))
+        ms1 = time_composite(tiled, frame, args.frames, pan)
+        vp.reset()
+        vp.zoom_at(0.25, (0, 0))
+        ms4 = time_composite(tiled, frame, args.frames)
+        st = tiled.stats()
+        print(f"{extent:>7} {len(strokes):>8} | {canvas} | {ms1:>8.2f} {ms4:>8.2f} {st['tiles']:>6} "
+              f"{st['mb']:>6.0f} {st['spills']:>6} {st['loads']:>6}")
+        tiled.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+benchmarks/bench_ui.py
+Per-frame cost of the toolbar + help overlay: direct drawing (draw_minimal_icons /
+draw_help, a full-frame copy and addWeighted each) against the cached sprites of
+ui.app_ui.UiLayer blitted over their ROI. The toolbar state (color, tool, highlight)
+changes every --change-every frames, which is when the sprite is re-rendered.
+Run: python benchmarks/bench_ui.py [--frames 600] [--change-every 30] [--width 1280 --height 720]
+"""
+
+import argparse, os, sys, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from ui.app_ui import PALETTE, UiLayer, draw_help, draw_minimal_icons, toolbar_rects
+
+
+def states(n, change_every):
+    tools = ("BRUSH", "ERASER")
+    for i in range(n):
+        k = i // change_every
+        yield PALETTE[k % 8], tools[(k // 8) % 2], (None if k % 3 else k % 11)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--frames", type=int, default=600)
+    ap.add_argument("--change-every", type=int, default=30)
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    args = ap.parse_args()
+    w, h = args.width, args.height
+    rects = toolbar_rects(w, h)
+    frame = np.random.default_rng(0).integers(0, 256, (h, w, 3), np.uint8)
+    ui = UiLayer(w, h, rects)
+
+    def direct(img, state, help_on):
+        draw_minimal_icons(img, rects, *state)
+        if help_on:
+            draw_help(img)
+
+    def sprites(img, state, help_on):
+        ui.draw_toolbar(img, *state)
+        if help_on:
+            ui.draw_help(img)
+
+    print(f"{args.frames} frames {w}x{h}, toolbar state changes every {args.change_every}")
+    print(f"{'':>8} {'help':>5} {'mean ms':>8} {'p95 ms':>8}")
+    for help_on in (False, True):
+        for name, fn in (("direct", direct), ("sprites", sprites)):
+            times = []
+            img = frame.copy()
+            for state in states(args.frames, args.change_every):
+                img[:] = frame
+                t0 = time.perf_counter()
+                fn(img, state, help_on)
+                times.append(time.perf_counter() - t0)
+            times = np.array(times) * 1000
+            print(f"{name:>8} {str(help_on):>5} {times.mean():>8.3f} {np.percentile(times, 95):>8.3f}")
+    print(f"toolbar sprite renders: {ui.renders}")
+
+
+if __name__ == "__main__":
+    main()
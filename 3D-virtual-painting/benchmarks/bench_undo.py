@@ -0,0 +1,81 @@
+"""
+benchmarks/bench_undo.py
+Undo / redo latency (command log + checkpoints, core/history.py) against rebuilding
+the whole stroke layer, for sessions of --strokes strokes on a --width x --height canvas.
+Each row is undo + the next draw() for: the last stroke, an eraser pass, and a clear
+(restored from its checkpoint).
+Run: python benchmarks/bench_undo.py [--strokes 1000 5000 10000] [--width 1280 --height 720]
+"""
+
+import argparse, os, sys, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.draw_engine import DrawEngine
+
+
+def make_session(n_strokes, w, h, seed=0):
+    rng = np.random.default_rng(seed)
+    drawer = DrawEngine(min_distance=0, simplify_tolerance=0)   # 40 raw points per stroke
+    cam = np.zeros((h, w, 3), np.uint8)
+    drawer.draw(cam.copy())
+    for k in range(n_strokes):
+        start = rng.integers(40, [w - 40, h - 40])
+        pts = np.clip(start + np.cumsum(rng.integers(-6, 7, (40, 2)), axis=0), 0, [w - 1, h - 1])
+        drawer.change_color(tuple(int(c) for c in rng.integers(0, 256, 3)), record=False)
+        for x, y in pts.tolist():
+            drawer.update((x, y), "DRAW")
+        drawer.update(None, "STOP")
+        if k % 200 == 199:
+            drawer.draw(cam.copy())
+    drawer.draw(cam.copy())
+    return drawer, cam
+
+
+def timed(drawer, cam, op, reps):
+    """Mean ms of op() followed by draw(), with the inverse untimed in between"""
+    out = []
+    for _ in range(reps):
+        t0 = time.perf_counter()
+        op()
+        drawer.draw(cam.copy())
+        out.append(time.perf_counter() - t0)
+        drawer.redo() if op == drawer.undo else drawer.undo()
+        drawer.draw(cam.copy())
+    return np.mean(out) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--strokes", type=int, nargs="+", default=[1000, 5000, 10000])
+    ap.add_argument("--width", type=int, default=1280)
+    ap.add_argument("--height", type=int, default=720)
+    ap.add_argument("--reps", type=int, default=20)
+    args = ap.parse_args()
+
+    print(f"{'strokes':>8} {'rebuild ms':>11} {'stroke ms':>10} {'erase ms':>9} {'clear ms':>9} {'redo ms':>8}")
+    for n in args.strokes:
+        drawer, cam = make_session(n, args.width, args.height)
+        t0 = time.perf_counter()
+        for _ in range(3):
+            drawer.invalidate()
+            drawer.draw(cam.copy())
+        rebuild = (time.perf_counter() - t0) / 3 * 1000
+
+        stroke = timed(drawer, cam, drawer.undo, args.reps)
+        drawer.undo()
+        redo = timed(drawer, cam, drawer.redo, args.reps)
+        drawer.redo()
+        drawer.erase_at((args.width // 2, args.height // 2), 40)
+        drawer.draw(cam.copy())
+        erase = timed(drawer, cam, drawer.undo, args.reps)
+        drawer.clear()
+        drawer.draw(cam.copy())
+        clear = timed(drawer, cam, drawer.undo, args.reps)
+        print(f"{n:>8} {rebuild:>11.1f} {stroke:>10.2f} {erase:>9.2f} {clear:>9.2f} {redo:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
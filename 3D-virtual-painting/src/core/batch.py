@@ -0,0 +1,163 @@
+# src/core/batch.py
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mproc
+
+import cv2
+import numpy as np
+
+from core.frame_source import FrameSource
+from core.pipeline import _mediapipe_detector
+from core.session import PaintSession
+
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+RECORDING_EXTS = (".hlr",)
+
+BatchResult = namedtuple("BatchResult", ["path", "frames", "seconds", "video", "canvas", "error"])
+
+_detect = None  # per-worker detector, built once by _init_worker
+
+
+def find_inputs(paths):
+    """Video files and .hlr recordings among paths (directories are listed, not recursed)"""
+    found = []
+    for path in paths:
+        if os.path.isdir(path):
+            names = sorted(os.listdir(path))
+            found += [os.path.join(path, n) for n in names
+                      if n.lower().endswith(VIDEO_EXTS + RECORDING_EXTS)]
+        else:
+            found.append(path)
+    return found
+
+
+def _init_worker(detector_factory, detector_kwargs):
+    global _detect
+    # one process per core already; OpenCV's own thread pool would only oversubscribe
+    cv2.setNumThreads(1)
+    _detect = detector_factory(**detector_kwargs)
+
+
+def _video_frames(path, size, flip, detect):
+    """(image, timestamp, landmarks, handedness, scores) of every frame of a video file"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError("cannot open %s" % path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    with FrameSource(cap, size=size, flip=flip, drop=False) as source:
+        i = 0
+        while not source.finished:
+            f = source.get(timeout=5.0)
+            if f is None:
+                continue
+            # hold timers run on video time, not on how fast the worker gets through it
+            yield (f.image, i / fps) + tuple(detect(f.image))
+            i += 1
+
+
+def _recording_frames(path, size):
+    from gestures.recording import ReplaySource
+    for f in ReplaySource(path):
+        image = f.image
+        if size is not None and image is not None and image.shape[1::-1] != tuple(size):
+            image = cv2.resize(image, tuple(size))
+        yield image, f.timestamp, f.landmarks, f.handedness, f.scores
+
+
+def _probe(path, size):
+    """(w, h, fps, max_hands) of an input"""
+    if path.lower().endswith(RECORDING_EXTS):
+        from gestures.recording import LandmarkRecording
+        rec = LandmarkRecording(path)
+        w, h = size or rec.size
+        fps = (len(rec) - 1) / rec.duration if rec.duration > 0 else 30.0
+        return w, h, fps, rec.max_hands
+    cap = cv2.VideoCapture(path)
+    try:
+        w, h = size or (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        return w, h, cap.get(cv2.CAP_PROP_FPS) or 30.0, None
+    finally:
+        cap.release()
+
+
+def render_file(path, out_dir, size=None, flip=None, video=True, canvas=True, fourcc="mp4v",
+                draw_landmarks=True, tracker_kwargs=None, session_kwargs=None, detect=None, hands=None):
+    """
+    Run one input headless through HandTracker -> PaintSession (GestureController,
+    DrawEngine) and write <out_dir>/<name>.mp4 (the rendered frames, as the live app
+    shows them) and <out_dir>/<name>.png (the final canvas on black).
+    Videos go through detect (the worker's MediaPipe graph by default); .hlr
+    recordings replay their stored landmarks. Returns a BatchResult; errors are
+    reported in it rather than raised, so one bad file does not stop a batch.
+    hands: hand slots of the tracker / session for videos (the detector's maxHands);
+    recordings use the number of hands they were recorded with.
+    """
+    from gestures.gesture_tracker import HandTracker
+    t0 = time.perf_counter()
+    name = os.path.splitext(os.path.basename(path))[0]
+    video_path = os.path.join(out_dir, name + ".mp4") if video else None
+    canvas_path = os.path.join(out_dir, name + ".png") if canvas else None
+    frames, writer = 0, None
+    try:
+        w, h, fps, max_hands = _probe(path, size)
+        kw = dict(tracker_kwargs or {})
+        if max_hands is not None:
+            kw.setdefault("maxHands", max_hands)
+        elif hands is not None:
+            kw.setdefault("maxHands", hands)
+        # a fresh tracker per file: filter / smoothing state must not leak between sessions
+        tracker = HandTracker(**kw)
+        session = PaintSession(tracker, width=w, height=h, **(session_kwargs or {}))
+        if max_hands is None:
+            source = _video_frames(path, size, flip, detect or _detect)
+        else:
+            source = _recording_frames(path, size)
+        for image, ts, landmarks, handedness, scores in source:
+            if image is None:
+                image = np.zeros((h, w, 3), np.uint8)
+            rendered = session.step(image, landmarks, handedness, scores, timestamp=ts)
+            if draw_landmarks:
+                tracker.draw_landmarks(rendered)
+            if video_path is not None:
+                if writer is None:
+                    writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*fourcc), fps,
+                                             rendered.shape[1::-1])
+                writer.write(rendered)
+            frames += 1
+        if canvas_path is not None:
+            cv2.imwrite(canvas_path, session.drawer.draw(np.zeros((h, w, 3), np.uint8)))
+        error = None
+    except Exception as e:
+        error = "%s: %s" % (type(e).__name__, e)
+    finally:
+        if writer is not None:
+            writer.release()
+    return BatchResult(path, frames, time.perf_counter() - t0, video_path, canvas_path, error)
+
+
+def render_all(paths, out_dir, workers=None, detector_factory=_mediapipe_detector,
+               detector_kwargs=None, **options):
+    """
+    Render every input of find_inputs(paths) in a process pool and yield BatchResults
+    as files finish. Each worker builds one detector (MediaPipe graph) and reuses it
+    for all its files; the largest files are submitted first so a long one does not
+    end up alone at the tail. workers=0 renders in this process (debugging, profiling).
+    options go to render_file; videos get as many hand slots as the detector finds hands.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    files = sorted(find_inputs(paths), key=os.path.getsize, reverse=True)
+    detector_kwargs = detector_kwargs or {}
+    options.setdefault("hands", detector_kwargs.get("maxHands"))
+    if workers == 0:
+        detect = detector_factory(**detector_kwargs)
+        for path in files:
+            yield render_file(path, out_dir, detect=detect, **options)
+        return
+    workers = min(workers or os.cpu_count() or 1, max(len(files), 1))
+    with ProcessPoolExecutor(workers, mp_context=mproc.get_context(), initializer=_init_worker,
+                             initargs=(detector_factory, detector_kwargs)) as pool:
+        futures = [pool.submit(render_file, path, out_dir, **options) for path in files]
+        for fut in as_completed(futures):
+            yield fut.result()
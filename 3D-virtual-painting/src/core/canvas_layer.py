@@ -0,0 +1,356 @@
+# src/core/canvas_layer.py
+import cv2
+import numpy as np
+
+GLOW_ALPHA = 0.08  # transparency of the soft brush glow
+GLOW_PAD = 8       # glow line is this much thicker than the brush
+
+
+class CanvasLayer:
+    """
+    Persistent raster of everything drawn so far.
+    Strokes are rasterized once into color/alpha images; compositing onto a
+    camera frame is then a fixed per-frame cost, independent of stroke count.
+    base: FrozenLayer the strokes are drawn over (strokes flattened out of the
+    vector store), or None.
+    """
+    supports_snapshot = True
+
+    def __init__(self, height, width, base=None):
+        self.height = height
+        self.width = width
+        self.base = base
+        self.color = np.zeros((height, width, 3), np.uint8)  # premultiplied by alpha
+        self.alpha = np.zeros((height, width), np.uint8)
+        # composite cache: out = frame * weight / 255 + premul
+        self._premul = np.zeros((height, width, 3), np.uint8)
+        self._weight = np.full((height, width, 3), 255, np.uint8)
+        self.bbox = None  # [x0, y0, x1, y1) of drawn content
+
+    def fits(self, height, width):
+        """True if this layer can be composited onto a height x width frame"""
+        return (self.height, self.width) == (height, width)
+
+    def reset(self):
+        """Forget all drawn content (back to the frozen base, if any)"""
+        self._reset_to_base()
+        if self.bbox is not None:
+            self._refresh(self.bbox)
+
+    def draw_segment(self, p1, p2, color, thickness):
+        """Rasterize one brush segment and refresh the composite around it"""
+        self._raster_segment(p1, p2, color, thickness)
+        rect = self._segment_rect(p1, p2, thickness)
+        if rect is not None:
+            self._grow_bbox(rect)
+            self._refresh(rect)
+
+    def draw_strokes(self, strokes):
+        """
+        Rebuild the layer from scratch.
+        strokes: iterable of [(x, y, color, thickness), ...] lists or (points Nx2, color, thickness)
+        runs. Consecutive runs sharing (color, thickness) go to OpenCV in a single
+        polylines call, so stacking order between differently styled strokes is kept.
+        """
+        self._reset_to_base()
+        lo, hi = None, None
+        for (color, thickness), polys in group_polylines(strokes):
+            cv2.polylines(self.color, polys, False, color, thickness, lineType=cv2.LINE_AA)
+            cv2.polylines(self.alpha, polys, False, 255, thickness, lineType=cv2.LINE_AA)
+            pad = (thickness + GLOW_PAD) // 2 + 2
+            pts = np.concatenate(polys)
+            g_lo, g_hi = pts.min(axis=0) - pad, pts.max(axis=0) + pad + 1
+            lo = g_lo if lo is None else np.minimum(lo, g_lo)
+            hi = g_hi if hi is None else np.maximum(hi, g_hi)
+        if lo is not None:
+            rect = self._clip(lo[0], lo[1], hi[0], hi[1])
+            if rect is not None:
+                self._grow_bbox(rect)
+        if self.bbox is not None:
+            self._refresh(self.bbox)
+
+    def redraw_rect(self, rect, strokes):
+        """
+        Re-rasterize only rect (x0, y0, x1, y1) out of the strokes that touch it,
+        given in stacking order (same forms as draw_strokes).
+        """
+        rect = self._clip(*rect)
+        if rect is None:
+            return
+        x0, y0, x1, y1 = rect
+        color = self.color[y0:y1, x0:x1]
+        alpha = self.alpha[y0:y1, x0:x1]
+        if self.base is not None and self.base.bbox is not None:
+            color[:] = self.base.color[y0:y1, x0:x1]
+            alpha[:] = self.base.alpha[y0:y1, x0:x1]
+        else:
+            color[:] = 0
+            alpha[:] = 0
+        offset = np.array([x0, y0], np.int32)
+        for (c, thickness), polys in group_polylines(strokes):
+            polys = [p - offset for p in polys]
+            cv2.polylines(color, polys, False, c, thickness, lineType=cv2.LINE_AA)
+            cv2.polylines(alpha, polys, False, 255, thickness, lineType=cv2.LINE_AA)
+        self._grow_bbox(rect)
+        # the glow reaches GLOW_PAD / 2 past the rect, so the composite around it changes too
+        r = GLOW_PAD // 2
+        self._refresh(self._clip(x0 - r, y0 - r, x1 + r, y1 + r))
+
+    def snapshot(self):
+        """Copy of the drawn content: (bbox, color, alpha) cropped to the bbox, or None if empty"""
+        if self.bbox is None:
+            return None
+        x0, y0, x1, y1 = self.bbox
+        return (tuple(self.bbox), self.color[y0:y1, x0:x1].copy(), self.alpha[y0:y1, x0:x1].copy())
+
+    def restore(self, snap):
+        """Bring back the content of a snapshot() taken on a layer of the same size"""
+        self._reset_to_base()
+        if snap is not None:
+            rect, color, alpha = snap
+            x0, y0, x1, y1 = rect
+            self.color[y0:y1, x0:x1] = color
+            self.alpha[y0:y1, x0:x1] = alpha
+            self._grow_bbox(rect)
+        if self.bbox is not None:
+            self._refresh(self.bbox)
+
+    def composite(self, frame):
+        """Blend the layer onto frame in place (single pass over the content bbox)"""
+        if self.bbox is None:
+            return frame
+        x0, y0, x1, y1 = self.bbox
+        roi = frame[y0:y1, x0:x1]
+        cv2.multiply(roi, self._weight[y0:y1, x0:x1], dst=roi, scale=1 / 255.0)
+        cv2.add(roi, self._premul[y0:y1, x0:x1], dst=roi)
+        return frame
+
+    # ---------------- internals ----------------
+    def _reset_to_base(self):
+        """color/alpha back to the frozen base (or empty), composite cache cleared"""
+        base = self.base if self.base is not None and self.base.bbox is not None else None
+        for img in (self.color, self.alpha, self._premul):
+            img[:] = 0
+        self._weight[:] = 255
+        self.bbox = None
+        if base is not None:
+            x0, y0, x1, y1 = base.bbox
+            self.color[y0:y1, x0:x1] = base.color[y0:y1, x0:x1]
+            self.alpha[y0:y1, x0:x1] = base.alpha[y0:y1, x0:x1]
+            self.bbox = list(base.bbox)
+
+    def _raster_segment(self, p1, p2, color, thickness):
+        p1 = (int(p1[0]), int(p1[1]))
+        p2 = (int(p2[0]), int(p2[1]))
+        # AA blending on a black image is exactly "over" in premultiplied space,
+        # so color holds premultiplied brush color and alpha its coverage
+        cv2.line(self.color, p1, p2, color, thickness, lineType=cv2.LINE_AA)
+        cv2.line(self.alpha, p1, p2, 255, thickness, lineType=cv2.LINE_AA)
+
+    def _segment_rect(self, p1, p2, thickness):
+        pad = (thickness + GLOW_PAD) // 2 + 2
+        return self._clip(min(p1[0], p2[0]) - pad, min(p1[1], p2[1]) - pad,
+                          max(p1[0], p2[0]) + pad + 1, max(p1[1], p2[1]) + pad + 1)
+
+    def _clip(self, x0, y0, x1, y1):
+        x0, y0 = max(0, int(x0)), max(0, int(y0))
+        x1, y1 = min(self.width, int(x1)), min(self.height, int(y1))
+        if x0 >= x1 or y0 >= y1:
+            return None
+        return x0, y0, x1, y1
+
+    def _grow_bbox(self, rect):
+        if self.bbox is None:
+            self.bbox = list(rect)
+        else:
+            b = self.bbox
+            self.bbox = [min(b[0], rect[0]), min(b[1], rect[1]),
+                         max(b[2], rect[2]), max(b[3], rect[3])]
+
+    def _refresh(self, rect):
+        """
+        Recompute premultiplied color and frame weight inside rect.
+        The glow is not rasterized per segment: it is one dilation of the brush
+        mask (and color) by GLOW_PAD / 2, which equals a hard line GLOW_PAD thicker.
+        """
+        x0, y0, x1, y1 = rect
+        r = GLOW_PAD // 2
+        sx0, sy0 = max(0, x0 - r), max(0, y0 - r)
+        sx1, sy1 = min(self.width, x1 + r), min(self.height, y1 + r)
+        inner = (slice(y0 - sy0, y1 - sy0), slice(x0 - sx0, x1 - sx0))
+        glow_composite(self.color[sy0:sy1, sx0:sx1], self.alpha[sy0:sy1, sx0:sx1], inner,
+                       self._premul[y0:y1, x0:x1], self._weight[y0:y1, x0:x1])
+
+
+_GLOW_KERNEL = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (GLOW_PAD + 1, GLOW_PAD + 1))
+
+
+def glow_composite(color, alpha, inner, premul_out, weight_out):
+    """
+    Composite cache (out = frame * weight / 255 + premul) of the `inner` (y slice, x slice)
+    part of color/alpha, whose glow comes from dilating color/alpha GLOW_PAD / 2 around it.
+    """
+    glow = cv2.dilate(alpha, _GLOW_KERNEL)[inner]
+    gc = cv2.dilate(color, _GLOW_KERNEL)[inner].astype(np.float32)
+
+    a = alpha[inner][..., None].astype(np.float32) * (1 / 255.0)
+    g = (glow[..., None] > 0).astype(np.float32) * GLOW_ALPHA
+    premul = gc * g * (1 - a) + color[inner]
+    weight = (1 - g) * (1 - a) * 255.0
+    premul_out[:] = np.clip(premul + 0.5, 0, 255).astype(np.uint8)
+    weight_out[:] = np.clip(weight + 0.5, 0, 255).astype(np.uint8)
+
+
+class FrozenLayer:
+    """
+    Raster of strokes flattened out of the vector store (the oldest ones, past
+    DrawEngine's live depth). CanvasLayer draws the live strokes over it, which gives
+    the same pixels as drawing every stroke in order. Brush color (premultiplied) and
+    coverage only, like CanvasLayer.color/alpha; the glow is still added by CanvasLayer.
+    The eraser works on it with a pixel mask.
+    """
+
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.color = np.zeros((height, width, 3), np.uint8)
+        self.alpha = np.zeros((height, width), np.uint8)
+        self.bbox = None  # [x0, y0, x1, y1) of frozen content
+
+    # same bookkeeping as CanvasLayer
+    _clip = CanvasLayer._clip
+    _grow_bbox = CanvasLayer._grow_bbox
+    snapshot = CanvasLayer.snapshot
+
+    @property
+    def nbytes(self):
+        return self.color.nbytes + self.alpha.nbytes
+
+    def draw_strokes(self, strokes):
+        """Rasterize strokes (same forms as CanvasLayer.draw_strokes) over the frozen content"""
+        for (color, thickness), polys in group_polylines(strokes):
+            cv2.polylines(self.color, polys, False, color, thickness, lineType=cv2.LINE_AA)
+            cv2.polylines(self.alpha, polys, False, 255, thickness, lineType=cv2.LINE_AA)
+            pad = thickness // 2 + 2
+            pts = np.concatenate(polys)
+            rect = self._clip(*(pts.min(axis=0) - pad), *(pts.max(axis=0) + pad + 1))
+            if rect is not None:
+                self._grow_bbox(rect)
+
+    def erase(self, x, y, radius):
+        """
+        Clear the frozen pixels within radius of (x, y).
+        Returns a patch of what was there for put(), or None if nothing was.
+        """
+        rect = self._clip(x - radius, y - radius, x + radius + 1, y + radius + 1)
+        if rect is None or self.bbox is None:
+            return None
+        x0, y0, x1, y1 = rect
+        mask = np.zeros((y1 - y0, x1 - x0), np.uint8)
+        cv2.circle(mask, (int(x) - x0, int(y) - y0), int(radius), 1, -1)
+        mask = mask.astype(bool)
+        alpha = self.alpha[y0:y1, x0:x1]
+        if not alpha[mask].any():
+            return None
+        color = self.color[y0:y1, x0:x1]
+        patch = (rect, mask, color[mask], alpha[mask])
+        color[mask] = 0
+        alpha[mask] = 0
+        return patch
+
+    def put(self, patch):
+        """Undo an erase(): put the patch's pixels back"""
+        (x0, y0, x1, y1), mask, color, alpha = patch
+        self.color[y0:y1, x0:x1][mask] = color
+        self.alpha[y0:y1, x0:x1][mask] = alpha
+
+    def clear(self):
+        self.color[:] = 0
+        self.alpha[:] = 0
+        self.bbox = None
+
+    def restore(self, snap):
+        """Bring back the content of a snapshot()"""
+        self.clear()
+        if snap is not None:
+            (x0, y0, x1, y1), color, alpha = snap
+            self.color[y0:y1, x0:x1] = color
+            self.alpha[y0:y1, x0:x1] = alpha
+            self.bbox = [x0, y0, x1, y1]
+
+    def resized(self, height, width):
+        """Copy on a canvas of another size (content is kept at its pixel position and cropped)"""
+        out = FrozenLayer(height, width)
+        if self.bbox is not None:
+            x0, y0, x1, y1 = self.bbox
+            rect = out._clip(x0, y0, x1, y1)
+            if rect is not None:
+                x0, y0, x1, y1 = rect
+                out.color[y0:y1, x0:x1] = self.color[y0:y1, x0:x1]
+                out.alpha[y0:y1, x0:x1] = self.alpha[y0:y1, x0:x1]
+                out.bbox = list(rect)
+        return out
+
+    def save(self, path):
+        """Write as a BGRA PNG (color premultiplied, as stored)"""
+        cv2.imwrite(path, np.dstack([self.color, self.alpha]))
+
+    @classmethod
+    def load(cls, path):
+        img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        if img is None or img.ndim != 3 or img.shape[2] != 4:
+            raise ValueError("not a frozen layer image: %s" % path)
+        layer = cls(img.shape[0], img.shape[1])
+        layer.color[:] = img[..., :3]
+        layer.alpha[:] = img[..., 3]
+        ys, xs = np.nonzero(layer.alpha)
+        if len(xs):
+            layer.bbox = [int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1]
+        return layer
+
+
+def group_polylines(strokes):
+    """
+    Batch strokes into [((color, thickness), [int32 Nx2 polyline, ...]), ...],
+    merging consecutive polylines of the same style.
+    Tuple strokes whose color/thickness changes mid-stroke are split at the change,
+    keeping the shared point so the polyline stays connected.
+    """
+    groups = []
+
+    def add(color, thickness, pts):
+        key = (tuple(int(c) for c in color), int(thickness))
+        if groups and groups[-1][0] == key:
+            groups[-1][1].append(pts)
+        else:
+            groups.append((key, [pts]))
+
+    for stroke in strokes:
+        if isinstance(stroke, tuple):
+            pts, color, thickness = stroke
+            if len(pts) > 1:
+                add(color, thickness, np.asarray(pts, np.int32).reshape(-1, 2))
+            continue
+        n = len(stroke)
+        run = 0
+        for j in range(1, n):
+            # segment j -> j+1 is drawn with point j's style, like the per-segment renderer
+            if j == n - 1 or stroke[j][2:] != stroke[run][2:]:
+                pts = np.array([p[:2] for p in stroke[run:j + 1]], np.int32)
+                add(stroke[run][2], stroke[run][3], pts)
+                run = j
+    return groups
+
+
+def chaikin(points, iterations=2):
+    """Chaikin corner cutting on an Nx2 polyline; endpoints are kept"""
+    pts = np.asarray(points, np.float32).reshape(-1, 2)
+    for _ in range(iterations):
+        if len(pts) < 3:
+            break
+        q = 0.75 * pts[:-1] + 0.25 * pts[1:]
+        r = 0.25 * pts[:-1] + 0.75 * pts[1:]
+        mid = np.empty((2 * len(q), 2), np.float32)
+        mid[0::2], mid[1::2] = q, r
+        pts = np.concatenate([pts[:1], mid[1:-1], pts[-1:]])
+    return np.rint(pts).astype(np.int32)
@@ -1,17 +1,27 @@
 # src/core/controller.py
+import numpy as np
+
+MODES = np.array(["STOP", "DRAW", "ERASE"])
+
+
 class GestureController:
-    def __init__(self):
+    def __init__(self, hands=1):
         self.mode = "STOP"
+        self.modes = np.full(hands, "STOP", "<U5")  # per hand slot, see update_modes()
 
-    def update_mode(self, draw_gesture, erase_gesture, fingers):
+    def update_mode(self, draw_gesture, erase_gesture, fingers=None, up_count=None):
         """
         Priority order:
         1. ERASE only when fist (0 fingers up)
         2. DRAW only when pinch and other fingers NOT closed like fist
         3. Otherwise STOP
+        up_count: fingers up, if already known (e.g. from the gesture feature vector)
         """
         # Count how many fingers are up
-        fingers_up_count = sum(fingers) if fingers else 0
+        if up_count is not None:
+            fingers_up_count = up_count
+        else:
+            fingers_up_count = sum(fingers) if fingers else 0
 
         # ✅ Highest priority – ERASE with real fist
         if erase_gesture and fingers_up_count == 0:
@@ -26,3 +36,11 @@ class GestureController:
             self.mode = "STOP"
 
         return self.mode
+
+    def update_modes(self, draw_gesture, erase_gesture, up_count):
+        """update_mode() for every hand slot at once: (hands,) arrays in, (hands,) modes out"""
+        up_count = np.asarray(up_count)
+        draw = np.asarray(draw_gesture) & (up_count >= 1)
+        self.modes = MODES[np.where(np.asarray(erase_gesture) & (up_count == 0), 2, draw)]
+        self.mode = str(self.modes[0])
+        return self.modes
@@ -1,52 +1,626 @@
 # src/core/draw_engine.py
-import cv2
+import os
+
 import numpy as np
 
+from core import journal as journal_io
+from core.canvas_layer import CanvasLayer, FrozenLayer, GLOW_PAD, chaikin
+from core.history import History, CLEAR, COLOR, ERASE
+from core.pen import Pen
+from core.simplify import StrokeSimplifier
+from core.stroke_store import StrokeStore, StrokesView
+from core.tiled_canvas import SCREEN_VIEW, TILE_SIZE, TiledCanvas, Viewport
+
+FROZEN_SUFFIX = ".frozen.png"  # the frozen layer is saved next to a journal under this name
+
+
+def _pad(thickness, extra=0):
+    """Pixels the brush + glow of a `thickness` stroke reach past its points (plus `extra`)"""
+    return thickness // 2 + GLOW_PAD // 2 + 2 + int(np.ceil(extra))
+
+
+def _bounds(points):
+    """Inclusive (x0, y0, x1, y1) of an Nx2 point array"""
+    (x0, y0), (x1, y1) = points.min(axis=0), points.max(axis=0)
+    return x0, y0, x1, y1
+
+
 class DrawEngine:
-    def __init__(self, stroke_thickness=6, stroke_color=(255, 0, 0)):
-        self.strokes = [[]]  # list of strokes [(x,y,color,thickness), ...]
+    def __init__(self, stroke_thickness=6, stroke_color=(255, 0, 0), smoothing=0,
+                 min_distance=2.0, simplify_tolerance=1.0, max_segment=20.0,
+                 history_bytes=64 << 20, checkpoint_every=50, checkpoint_bytes=32 << 20,
+                 live_strokes=0, live_points=0, world=False, tile_size=TILE_SIZE,
+                 tile_bytes=256 << 20, spill_dir=None):
+        self.store = StrokeStore()  # struct-of-arrays points, strokes and palette
         self.stroke_thickness = stroke_thickness
         self.stroke_color = stroke_color
+        self.smoothing = smoothing  # Chaikin iterations applied to finished strokes (0 = off)
+        # ingest: drop samples closer than min_distance px, simplify the open stroke to
+        # within simplify_tolerance px (0 = keep every sample), segments <= max_segment px
+        self.simplifier = StrokeSimplifier(min_distance, simplify_tolerance, max_segment)
+        self._ingest_state = None  # store state after our last append, to notice outside edits
+        self._reshaped = False     # open stroke's layer raster has segments no longer stored
+        self._smooth_cache = {}     # (generation, start, end, style) -> smoothed points
+        self.layer = None          # CanvasLayer, created on first draw()
+        self._layer_valid = False  # False -> rebuild layer from strokes on next draw()
+        self._dirty = None         # [x0, y0, x1, y1) to re-render on next draw()
+        self.journal = None        # core.journal.StrokeJournal recording every stroke op
+        # undo/redo: command log, plus layer rasters every checkpoint_every commands (and
+        # before each clear) so undoing a clear does not re-rasterize every stroke
+        self.history = History(history_bytes)
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_bytes = checkpoint_bytes
+        self._checkpoints = {}     # history serial -> CanvasLayer.snapshot() of that state
+        # live depth (0 = unlimited): past live_strokes finished strokes or live_points points,
+        # the oldest strokes are flattened into the frozen layer (batches of a quarter) and
+        # dropped from the store and history, so memory stays flat in all-day sessions
+        self.live_strokes = live_strokes
+        self.live_points = live_points
+        self.frozen = None         # FrozenLayer, created on the first flatten
+        # world=True: strokes are kept in world coordinates on a TiledCanvas (tiles of
+        # tile_size, at most tile_bytes in memory, the rest spilled to spill_dir) seen
+        # through self.viewport; points and the eraser radius passed in stay screen pixels
+        self.viewport = None
+        if world:
+            if live_strokes or live_points:
+                raise ValueError("the live depth (frozen layer) needs the screen canvas, not world=True")
+            self.viewport = Viewport()
+            self.layer = TiledCanvas(self.viewport, tile_size, tile_bytes, spill_dir)
+        # several hands drawing at once (update(..., hand=id)): every hand draws into its
+        # own pen, stored as one stroke on pen-up, so the hands never cut each other's strokes
+        self.pens = {}             # hand id -> Pen
+
+    @property
+    def strokes(self):
+        """Legacy read-only view: [[(x,y,color,thickness), ...], ...]"""
+        return StrokesView(self.store)
+
+    @strokes.setter
+    def strokes(self, strokes):
+        # strokes replaced wholesale -> cached layer is stale
+        self.store = strokes if isinstance(strokes, StrokeStore) else StrokeStore.from_tuples(strokes)
+        self._smooth_cache.clear()
+        self._set_frozen(None)
+        self.invalidate()
+        self._reset_history()
+        if self.journal is not None:
+            self.journal.clear()
+            self.journal.snapshot(self.store)
+
+    def invalidate(self):
+        """Force the cached layer to be rebuilt from strokes on the next draw()"""
+        self._layer_valid = False
+        self._dirty = None
+
+    def mark_dirty(self, x0, y0, x1, y1):
+        """Re-render only [x0, x1) x [y0, y1) of the cached layer on the next draw()"""
+        if self._dirty is None:
+            self._dirty = [x0, y0, x1, y1]
+        else:
+            d = self._dirty
+            self._dirty = [min(d[0], x0), min(d[1], y0), max(d[2], x1), max(d[3], y1)]
+
+    @property
+    def _view(self):
+        """Screen -> stroke coordinates: the viewport, or the identity on the screen canvas"""
+        return SCREEN_VIEW if self.viewport is None else self.viewport
 
-    def update(self, point, mode):
-        if len(self.strokes) == 0:
-            self.strokes.append([])
+    def to_world(self, point):
+        """Screen point -> stroke coordinates (the same point without a viewport)"""
+        return None if point is None else self._view.world_point(point)
+
+    def brush_thickness(self):
+        """stroke_thickness in stroke coordinates, so the brush looks the same at any zoom"""
+        return self._view.world_length(self.stroke_thickness)
+
+    def update(self, point, mode, hand=None, color=None):
+        """
+        hand: id of the hand drawing (gestures.hand_identity), for strokes of several hands
+        at once: each hand's DRAW / STOP continue / end its own stroke (a pen, see core.pen.Pen).
+        color: the color of that hand's stroke (default stroke_color).
+        """
+        if hand is not None and mode in ("DRAW", "STOP"):
+            self._pen_update(hand, point if mode == "DRAW" else None, mode, color)
+            return
 
         if mode == "DRAW" and point:
-            # Append point with color and thickness
-            self.strokes[-1].append((point[0], point[1], self.stroke_color, self.stroke_thickness))
+            self._draw_point(self.to_world(point), color)
 
         elif mode == "STOP":
-            if len(self.strokes[-1]) > 0:
-                self.strokes.append([])
+            self._commit_open()
 
         elif mode == "ERASE":
-            # Undo last stroke
-            for i in range(len(self.strokes) - 1, -1, -1):
-                if len(self.strokes[i]) > 0:
-                    self.strokes.pop(i)
-                    break
-
-    def change_color(self, new_color):
-        """Update brush color"""
+            self.undo()
+
+        elif mode == "REDO":
+            self.redo()
+
+    def _draw_point(self, point, color=None):
+        """Stream a (stroke coordinate) point into the store's open stroke"""
+        store = self.store
+        color = self.stroke_color if color is None else color
+        thickness = self.brush_thickness()
+        action = self._ingest(point, color, thickness)
+        if action is None:
+            return
+        if action == "move":
+            store.move_last(point[0], point[1])
+            self._reshaped = True
+            if self.journal is not None:
+                self.journal.move(point[0], point[1])
+        else:
+            # Append point with color and thickness
+            store.append(point[0], point[1], color, thickness)
+            if self.journal is not None:
+                self.journal.point(point[0], point[1], color, thickness)
+        self._ingest_state = (store, store.n_strokes, store.n_points)
+        # rasterize only the new segment into the cached layer (live pens stack above it)
+        if store.stroke_len(-1) > 1:
+            n = store.n_points
+            prev = (int(store.xs[n - 2]), int(store.ys[n - 2]))
+            self._draw_segment(prev, point, color, thickness, self.pens.values())
+
+    def _draw_segment(self, a, b, color, thickness, above=()):
+        """
+        Rasterize a streamed segment. The layer stacks stored strokes, then live pens in
+        the order they started; a segment under one of the pens `above` is re-rendered
+        in that order instead of being painted over it.
+        """
+        if self.layer is None or not self._layer_valid:
+            return
+        rect = (min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1]))
+        if any(p.overlaps(rect, _pad(thickness) + _pad(p.thickness)) for p in above):
+            self._mark_rect_dirty(rect, _pad(thickness))
+        else:
+            self.layer.draw_segment(a, b, color, thickness)
+
+    def _pen_update(self, hand, point, mode, color):
+        """DRAW (a screen point) or STOP of the hand drawing into pens[hand]"""
+        pen = self.pens.get(hand)
+        if mode == "STOP":
+            if pen is not None:
+                self._commit_pen(hand)
+            return
+        if not point:
+            return
+        color = self.stroke_color if color is None else color
+        thickness = self.brush_thickness()
+        if pen is not None and (pen.color, pen.thickness) != (color, thickness):
+            self._commit_pen(hand)   # a style change starts a new stroke, as in the store
+            pen = None
+        if pen is None:
+            pen = self.pens[hand] = Pen(self.simplifier, color, thickness)
+        segment = pen.add(self.to_world(point))
+        if segment is not None:
+            hands = list(self.pens)
+            above = [self.pens[h] for h in hands[hands.index(hand) + 1:]]
+            self._draw_segment(segment[0], segment[1], pen.color, pen.thickness, above)
+
+    def _commit_pen(self, hand):
+        """Store pens[hand]'s stroke as a finished stroke (history and journal as any other)"""
+        hands = list(self.pens)
+        below = [self.pens[h] for h in hands[:hands.index(hand)]]   # stacked under it until now
+        pen = self.pens.pop(hand)
+        if not pen.points:
+            return
+        self._commit_open()   # a stream of update(hand=None) points ends here
+        pts, stale = pen.finish()
+        store = self.store
+        store.extend(pts[:, 0], pts[:, 1], pen.color, pen.thickness)
+        if self.journal is not None:
+            self.journal.point(pts[0, 0], pts[0, 1], pen.color, pen.thickness)
+            if len(pts) > 1:
+                self.journal.points(pts[1:, 0], pts[1:, 1])
+        self._ingest_state = None
+        self._commit_open()
+        covered = pen.box is not None and any(
+            p.overlaps(pen.box, _pad(pen.thickness) + _pad(p.thickness)) for p in below)
+        if stale is not None or covered:
+            # the raster still holds the streamed segments, or stacked the earlier pen below them
+            raw = pts if stale is None else stale
+            self._mark_rect_dirty(_bounds(raw), _pad(pen.thickness, pen.simplifier.tolerance))
+
+    def _commit_pens(self):
+        """Store every live pen's stroke (before a clear, so undoing it brings them back)"""
+        for hand in list(self.pens):
+            self._commit_pen(hand)
+
+    def _pen_runs(self):
+        """Strokes still in pens, as runs for the layer: above the stored ones, in the order they started"""
+        return [p.run() for p in self.pens.values() if p.points]
+
+    def _commit_open(self):
+        """Finish the open stroke and push it to the history"""
+        store = self.store
+        if store.stroke_len(-1) == 0:
+            return
+        self._finish_open()
+        a, b = store.stroke_range(-1)
+        store.end_stroke()
+        self.history.push_stroke(store, a, b)
+        if self.journal is not None:
+            self.journal.end()
+        if self.smoothing:
+            # finished stroke is re-rendered with its smoothed outline
+            self._mark_points_dirty((a, b))
+
+    def _ingest(self, point, color, thickness):
+        """What to do with a DRAW sample: None (drop), "append" or "move" (see StrokeSimplifier)"""
+        store, simp = self.store, self.simplifier
+        if not simp.enabled:
+            return "append"
+        if self._ingest_state != (store, store.n_strokes, store.n_points):
+            # the open stroke was ended or replaced outside update(): start afresh
+            simp.reset()
+            self._reshaped = False
+        elif simp.raw and store.stroke_style(store.n_strokes - 1) != (
+                tuple(int(c) for c in color), int(thickness)):
+            # a style change starts a new stroke in the store; finish this one first
+            self._finish_open()
+        return simp.feed(point)
+
+    def _finish_open(self):
+        """Replace the open stroke with its final simplified outline and fix up the layer"""
+        store, simp = self.store, self.simplifier
+        if self._ingest_state == (store, store.n_strokes, store.n_points) and simp.raw:
+            pts = simp.finish()
+            if pts is not None:
+                store.replace_open(pts[:, 0], pts[:, 1])
+                self._reshaped = True
+                if self.journal is not None:
+                    self.journal.replace(pts[:, 0], pts[:, 1])
+            if self._reshaped:
+                # the raster still holds the streamed segments: redraw around every raw sample
+                thickness = store.stroke_style(store.n_strokes - 1)[1]   # the open stroke's, at any zoom
+                self._mark_rect_dirty(_bounds(np.array(simp.raw)), _pad(thickness, simp.tolerance))
+        simp.reset()
+        self._reshaped = False
+        self._ingest_state = None
+
+    def erase_at(self, point, radius):
+        """
+        Erase stroke points within radius of point. Strokes are split at the gap
+        rather than joined across it, and only the erased area is re-rendered.
+        Frozen strokes are erased with a pixel mask of the same radius.
+        Returns the number of points erased.
+        """
+        if point is None:
+            return 0
+        point, radius = self.to_world(point), self._view.world_length(radius)
+        self._commit_open()
+        store = self.store
+        x, y = point[0], point[1]
+        ids = store.query_radius(x, y, radius)
+        patch = self.frozen.erase(x, y, radius) if self.frozen is not None else None
+        if len(ids) or patch is not None:
+            cuts = store.erase_ids(ids) if len(ids) else ids[:0]
+            raster = (x, y, radius, patch) if patch is not None else None
+            disc = (x - radius, y - radius, x + radius, y + radius) if patch is not None else None
+            self.history.push_erase(store, ids, cuts, raster, disc)
+            if self.journal is not None:
+                self.journal.erase(x, y, radius, frozen=patch is not None)
+            self._mark_rect_dirty(self.history.done[-1].rect)
+            if store.maybe_compact(self.history):
+                self._smooth_cache.clear()
+        return len(ids)
+
+    # ---------------- history ----------------
+    def undo(self):
+        """
+        Undo the latest stroke, erase, clear or color change. With no history left the
+        last stroke is removed instead. Returns True if anything changed.
+        """
+        self._commit_open()
+        if not self.history.done:
+            ids = self.store.pop_last()
+            if ids is None:
+                return False
+            self.history.drop_redo()
+            self._mark_points_dirty(ids)
+            if self.journal is not None:
+                self.journal.pop()
+            return True
+        self.store, cmd = self.history.undo(self.store)
+        self._applied(cmd, undo=True)
+        return True
+
+    def redo(self):
+        """Re-apply the latest undone command. Returns True if there was one"""
+        self._commit_open()
+        self.store, cmd = self.history.redo(self.store)
+        if cmd is None:
+            return False
+        self._applied(cmd, undo=False)
+        return True
+
+    def _applied(self, cmd, undo):
+        """Bring color, layer and journal in line with a command history just (un)did"""
+        if cmd.kind == COLOR:
+            self.stroke_color = cmd.old if undo else cmd.new
+            return
+        if self.journal is not None:
+            self.journal.undo() if undo else self.journal.redo()
+        if cmd.raster is not None or cmd.kind == CLEAR and self.frozen is not None:
+            self._applied_raster(cmd, undo)
+        if cmd.kind == CLEAR:
+            self._smooth_cache.clear()
+            if undo:
+                self._restore_layer()
+            elif self._layer_valid:
+                self.layer.reset()
+                self._dirty = None
+        else:
+            self._mark_rect_dirty(cmd.rect)
+
+    def _applied_raster(self, cmd, undo):
+        """The frozen-layer side of an (un)done erase or clear"""
+        if cmd.kind == ERASE:
+            x, y, radius, patch = cmd.raster
+            if undo:
+                self.frozen.put(patch)
+            else:
+                cmd.raster = (x, y, radius, self.frozen.erase(x, y, radius))
+        else:  # CLEAR swaps frozen content with the command, like the store
+            snap = self.frozen.snapshot()
+            self.frozen.restore(cmd.raster)
+            cmd.raster = snap
+
+    def _reset_history(self):
+        self.history.reset()
+        self._checkpoints.clear()
+
+    def _checkpoint(self):
+        """Keep a raster copy of the up-to-date layer for the current history state"""
+        if (self.layer is None or not self._layer_valid or self.store.stroke_len(-1) > 0
+                or self.pens or not self.layer.supports_snapshot):
+            return
+        self._update_layer()
+        history = self.history
+        self._checkpoints[history.serial] = self.layer.snapshot()
+        # drop states no longer reachable by undo/redo, then the oldest over budget
+        reachable = {c.serial for c in history.done + history.undone}
+        reachable.add(history.base_serial)
+        for serial in [k for k in self._checkpoints if k not in reachable]:
+            del self._checkpoints[serial]
+        size = {k: sum(a.nbytes for a in snap[1:]) if snap else 0 for k, snap in self._checkpoints.items()}
+        while sum(size.values()) > self.checkpoint_bytes and len(size) > 1:
+            del self._checkpoints[min(size)], size[min(size)]
+
+    def _restore_layer(self):
+        """
+        Rebuild the layer for the current history state from the nearest checkpoint
+        below it, re-rendering only the areas of the commands since then.
+        """
+        if not self._layer_valid:
+            return
+        rects = []
+        for cmd in reversed(self.history.done):
+            if cmd.serial in self._checkpoints:
+                snap = self._checkpoints[cmd.serial]
+                break
+            if cmd.kind == CLEAR:
+                snap = None   # nothing was left after it
+                break
+            if cmd.rect is not None:
+                rects.append(cmd.rect)
+        else:
+            if self.history.base_serial not in self._checkpoints:
+                self.invalidate()
+                return
+            snap = self._checkpoints[self.history.base_serial]
+        self.layer.restore(snap)
+        self._dirty = None
+        for rect in rects:
+            self._mark_rect_dirty(rect)
+        for pen in self.pens.values():   # checkpoints never hold live pens
+            if pen.points:
+                self._mark_rect_dirty(_bounds(np.array(pen.points)), _pad(pen.thickness))
+
+    # ---------------- live depth ----------------
+    def _flatten(self):
+        """Rasterize the strokes past the live depth into the frozen layer and drop them"""
+        store = self.store
+        if not (self.live_strokes and store.n_strokes - 1 > self.live_strokes
+                or self.live_points and store.n_alive > self.live_points):
+            return
+        live = store.live_strokes()
+        live = live[live < store.n_strokes - 1]  # the open stroke stays a vector
+        keep = len(live)
+        if self.live_strokes and keep > self.live_strokes:
+            keep = self.live_strokes - self.live_strokes // 4
+        if self.live_points and store.n_alive > self.live_points:
+            n = store.n_points
+            csum = np.concatenate(([0], np.cumsum(store.alive[:n])))
+            ends = np.append(store.starts[1:store.n_strokes], n)
+            sizes = csum[ends[live]] - csum[store.starts[live]]
+            budget = self.live_points - self.live_points // 4 - (store.n_alive - int(sizes.sum()))
+            keep = min(keep, int(np.searchsorted(np.cumsum(sizes[::-1]), budget, side="right")))
+        if keep >= len(live):
+            return
+        old = live[:len(live) - keep]
+        boundary = int(store.starts[live[len(old)]] if keep else store.starts[store.n_strokes - 1])
+        if self.frozen is None:
+            self._set_frozen(FrozenLayer(self.layer.height, self.layer.width))
+        # drawn as they are on the layer, so the picture does not change
+        self.frozen.draw_strokes(self._render_strokes(old))
+        self.history.release(boundary)
+        store.release(boundary)
+        if store.maybe_compact(self.history):
+            self._smooth_cache.clear()
+
+    def _set_frozen(self, frozen):
+        self.frozen = frozen
+        if self.layer is not None:
+            self.layer.base = frozen
+
+    def _replay_frozen(self):
+        """Redo the loaded history's clears and frozen-pixel erases on the frozen layer (if any)"""
+        if self.frozen is None:
+            for cmd in self.history.done + self.history.undone:
+                cmd.raster = None
+            return
+        for cmd in self.history.done:
+            if cmd.kind == CLEAR:
+                cmd.raster = self.frozen.snapshot()
+                self.frozen.clear()
+            elif cmd.kind == ERASE and cmd.raster is not None:
+                x, y, radius, _ = cmd.raster
+                cmd.raster = (x, y, radius, self.frozen.erase(x, y, radius))
+
+    def _save_frozen(self, path):
+        """Keep the frozen layer next to the journal at `path` (it is not in the journal)"""
+        frozen_path = path + FROZEN_SUFFIX
+        if self.frozen is not None and self.frozen.bbox is not None:
+            self.frozen.save(frozen_path)
+        elif os.path.exists(frozen_path):
+            os.remove(frozen_path)
+
+    # ---------------- persistence ----------------
+    def start_journal(self, path):
+        """Journal every stroke op to a new file at `path`, starting from the current strokes"""
+        self.close_journal()
+        if os.path.exists(path):
+            os.remove(path)
+        self._reset_history()  # the journal can only undo what it recorded
+        self._save_frozen(path)
+        self.journal = journal_io.StrokeJournal(path)
+        self.journal.snapshot(self.store)
+        self.journal.flush()
+        return self.journal
+
+    def load_journal(self, path):
+        """Resume the session journaled at `path` (undo history included) and keep appending to it"""
+        self.close_journal()
+        history = History(self.history.max_bytes)
+        self.strokes = journal_io.load(path, history)
+        self.history = history
+        if os.path.exists(path + FROZEN_SUFFIX):
+            self._set_frozen(FrozenLayer.load(path + FROZEN_SUFFIX))
+        self._replay_frozen()
+        self.journal = journal_io.StrokeJournal(path)
+        return self.journal
+
+    def compact_journal(self):
+        """Rewrite the journal as a snapshot of the live strokes (drops the undo history)"""
+        if self.journal is None:
+            return None
+        path = self.journal.path
+        self.journal.close()
+        journal_io.compact(path, self.store)
+        self._save_frozen(path)
+        self._reset_history()
+        self.journal = journal_io.StrokeJournal(path)
+        return path
+
+    def close_journal(self):
+        """Flush and stop journaling"""
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    def change_color(self, new_color, record=True):
+        """Update brush color (record=False keeps it out of the undo history)"""
+        if record and new_color != self.stroke_color:
+            self._commit_open()
+            self.history.push_color(self.stroke_color, new_color)
         self.stroke_color = new_color
 
     def clear(self):
-        """Clear all strokes"""
-        self.strokes = [[]]
+        """Clear all strokes, frozen ones included (undoable); hands still drawing are lifted first"""
+        self._commit_open()
+        self._commit_pens()
+        self._checkpoint()
+        if self.frozen is not None:
+            self.history.push_clear(self.store, self.frozen.snapshot())
+            self.frozen.clear()
+        else:
+            self.history.push_clear(self.store)
+        self.store = StrokeStore()
+        self._smooth_cache.clear()
+        if self._layer_valid:
+            self.layer.reset()
+            self._dirty = None
+        if self.journal is not None:
+            self.journal.clear()
 
     def draw(self, frame):
-        """Smooth drawing with soft edges"""
-        for stroke in self.strokes:
-            for i in range(1, len(stroke)):
-                x1, y1, color1, thick1 = stroke[i - 1]
-                x2, y2, color2, thick2 = stroke[i]
-                cv2.line(frame, (x1, y1), (x2, y2), color1, thick1, lineType=cv2.LINE_AA)
-
-                # Soft brush glow effect
-                overlay = frame.copy()
-                cv2.line(overlay, (x1, y1), (x2, y2), color1, thick1 + 8)
-                alpha = 0.08  # transparency
-                frame = cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0)
-
-        return frame
+        """Smooth drawing with soft edges, composited from the cached stroke layer"""
+        h, w = frame.shape[:2]
+        if self.layer is None or not self.layer.fits(h, w):
+            if self.frozen is not None and (self.frozen.height, self.frozen.width) != (h, w):
+                self.frozen = self.frozen.resized(h, w)
+                self._reset_history()  # its raster patches are for the old canvas
+            self.layer = CanvasLayer(h, w, base=self.frozen)
+            self._layer_valid = False
+            self._checkpoints.clear()
+        if self.live_strokes or self.live_points:
+            self._flatten()
+        self._update_layer()
+        if self.history.serial - max(self._checkpoints, default=0) >= self.checkpoint_every:
+            self._checkpoint()
+        return self.layer.composite(frame)
+
+    def _update_layer(self):
+        """Rebuild or re-render the dirty part of the cached layer"""
+        if not self._layer_valid:
+            self.layer.draw_strokes(self._render_strokes() + self._pen_runs())
+            self._layer_valid = True
+            self._dirty = None
+        elif self._dirty is not None:
+            x0, y0, x1, y1 = self._dirty
+            touching = self.store.strokes_in_rect(x0, y0, x1, y1)
+            self.layer.redraw_rect(self._dirty, self._render_strokes(touching) + self._pen_runs())
+            self._dirty = None
+
+    def _mark_points_dirty(self, ids):
+        """Dirty the area covered by the brush + glow around the given point ids (or range)"""
+        if isinstance(ids, tuple):
+            ids = np.arange(*ids)
+        if len(ids) == 0 or not self._layer_valid:
+            return
+        self._mark_rect_dirty(self.store.bounds(ids))
+
+    def _mark_rect_dirty(self, rect, pad=None):
+        """Dirty the inclusive point bounds `rect` grown by pad (default: the widest brush + glow)"""
+        if not self._layer_valid:
+            return
+        if pad is None:
+            pad = _pad(self.store.max_thickness)
+        x0, y0, x1, y1 = rect
+        self.mark_dirty(x0 - pad, y0 - pad, x1 + pad + 1, y1 + pad + 1)
+
+    def stroke_runs(self):
+        """
+        (points Nx2, color, thickness) of every live stroke, as drawn (smoothing included),
+        pens still drawing included. Flattened strokes are only in the frozen layer.
+        """
+        return self._render_strokes() + self._pen_runs()
+
+    def _render_strokes(self, strokes=None):
+        """Live strokes (all, or the given indices) as handed to the layer; finished strokes are smoothed once"""
+        store = self.store
+        if not self.smoothing:
+            return list(store.runs(strokes))
+        full = strokes is None
+        if full:
+            strokes = store.live_strokes()
+        runs, cache = [], {}
+        for i in strokes:
+            pts = store.stroke_points(i)
+            if len(pts) == 0:
+                continue
+            color, thickness = store.stroke_style(i)
+            if i == store.n_strokes - 1 or len(pts) < 3:
+                runs.append((pts, color, thickness))  # open stroke stays raw while drawn
+                continue
+            key = (store.generation,) + store.stroke_range(i) + (len(pts), int(store.styles[i]))
+            smoothed = self._smooth_cache.get(key)
+            if smoothed is None:
+                smoothed = chaikin(pts, self.smoothing)
+            cache[key] = smoothed
+            runs.append((smoothed, color, thickness))
+        if full:
+            self._smooth_cache = cache  # drops entries of strokes that were undone/erased
+        else:
+            self._smooth_cache.update(cache)
+        return runs
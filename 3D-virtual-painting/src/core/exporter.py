@@ -0,0 +1,245 @@
+# src/core/exporter.py
+import os
+import queue
+import threading
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+
+from core.canvas_layer import group_polylines
+from core.frame_pool import FramePool
+
+_STOP = object()
+
+
+class Exporter:
+    """
+    Writes PNG snapshots, SVG drawings and session video on a background thread, so
+    the render loop never waits for an encoder or the disk.
+
+    At most `max_pending` jobs wait in the queue. save_png()/save_svg()
+    return a concurrent.futures.Future resolving to the written path (or holding the
+    error); `callback(future)` is called on the worker thread when the job is done.
+    When the queue is full a snapshot's future fails with queue.Full right away and a
+    video frame is dropped (counted in `dropped_frames`) instead of blocking.
+    Jobs without a future (video) keep their latest error in `last_error`; a video
+    that cannot be opened ends the recording, so write_frame() returns False again.
+
+    png_compression: cv2.IMWRITE_PNG_COMPRESSION level 0-9 (lower = faster, bigger).
+    Images are copied on the calling thread unless copy=False is passed; video frames
+    are copied into buffers from `pool` (core.frame_pool.FramePool) that the worker
+    hands back once written, so recording does not allocate a frame per frame.
+    """
+
+    def __init__(self, max_pending=8, png_compression=3, pool=None):
+        self.max_pending = max_pending
+        self.png_compression = png_compression
+        self.pool = pool if pool is not None else FramePool()
+        self._queue = queue.Queue()  # bounded by hand so video start/stop always get in
+        self._thread = None
+        self._video = None       # cv2.VideoWriter, only touched by the worker
+        self._video_size = None
+        self._video_path = None  # set on the calling thread while recording
+        self.written = 0
+        self.failed = 0
+        self.last_error = None   # latest exception of a job (futures also hold their own)
+        self.dropped_frames = 0
+        self.video_frames = 0
+
+    # ---------------- lifecycle ----------------
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="Exporter", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=10.0):
+        """Finish queued jobs, close a running video and stop the worker"""
+        if self._thread is None:
+            return
+        self.stop_video()
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    @property
+    def recording(self):
+        return self._video_path is not None
+
+    # ---------------- jobs ----------------
+    def save_png(self, image, path, compression=None, callback=None, copy=True):
+        """Write `image` as a PNG at `path`; returns a Future of the path"""
+        level = self.png_compression if compression is None else compression
+        img = image.copy() if copy else image
+        return self._submit(_write_png, (img, path, level), callback)
+
+    def save_svg(self, strokes, path, size, callback=None, background=None):
+        """
+        Write strokes as SVG polylines at `path`; returns a Future of the path.
+        strokes: a DrawEngine (its strokes as drawn, smoothing included) or anything
+        group_polylines() accepts, e.g. DrawEngine.strokes. The strokes are copied here;
+        building the document happens on the worker. A world-canvas DrawEngine holds world
+        coordinates, so its document covers the drawing's world bounds instead of (0, 0, size).
+        """
+        runs = strokes.stroke_runs() if hasattr(strokes, "stroke_runs") else list(strokes)
+        groups = group_polylines(runs)
+        origin = (0, 0)
+        if getattr(strokes, "viewport", None) is not None and groups:
+            origin, size = world_bounds(groups)
+        return self._submit(_write_svg, (groups, path, size, background, origin), callback)
+
+    def start_video(self, path, size, fps=30.0, fourcc="mp4v"):
+        """Record every frame passed to write_frame() into `path` ((w, h) frames)"""
+        self.stop_video()
+        self._video_path = path
+        self._put((self._open_video, (path, size, fps, fourcc)), control=True)
+
+    def write_frame(self, image, copy=True):
+        """Queue a video frame; returns False if it was dropped (not recording or queue full)"""
+        if self._video_path is None:
+            return False
+        if not copy:
+            return self._queue_frame(image, False)
+        img = self.pool.acquire(image.shape, image.dtype)
+        np.copyto(img, image)
+        return self._queue_frame(img, True)
+
+    def _queue_frame(self, img, pooled):
+        if not self._put((self._write_video, (img, pooled))):
+            if pooled:
+                self.pool.release(img)
+            self.dropped_frames += 1
+            return False
+        return True
+
+    def stop_video(self):
+        """Close the video file once its queued frames are written"""
+        if self._video_path is not None:
+            self._video_path = None
+            self._put((self._close_video, ()), control=True)
+
+    # ---------------- worker ----------------
+    def _submit(self, fn, args, callback):
+        fut = Future()
+        if callback is not None:
+            fut.add_done_callback(callback)
+        if not self._put((fn, args, fut)):
+            fut.set_exception(queue.Full("export queue is full"))
+        return fut
+
+    def _put(self, job, control=False):
+        self.start()
+        if not control and self._queue.qsize() >= self.max_pending:
+            return False
+        self._queue.put(job)
+        return True
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                break
+            fn, args = job[0], job[1]
+            fut = job[2] if len(job) > 2 else None
+            if fut is not None and not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args)
+            except Exception as e:
+                self.failed += 1
+                self.last_error = e
+                if fut is not None:
+                    fut.set_exception(e)
+                continue
+            if fut is not None:
+                self.written += 1
+                fut.set_result(result)
+
+    def _open_video(self, path, size, fps, fourcc):
+        try:
+            _make_dirs(path)
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, tuple(size))
+            if not writer.isOpened():
+                raise IOError("cannot open video writer for %s" % path)
+        except Exception:
+            if self._video_path == path:
+                self._video_path = None   # not recording: write_frame() stops queuing frames
+            raise
+        self._video = writer
+        self._video_size = tuple(size)
+
+    def _write_video(self, img, pooled=False):
+        try:
+            if self._video is None:
+                self.dropped_frames += 1   # queued before the video failed to open
+                return
+            h, w = img.shape[:2]
+            out = img
+            if (w, h) != self._video_size:
+                out = cv2.resize(img, self._video_size)
+            self._video.write(out)
+        finally:
+            if pooled:
+                self.pool.release(img)
+        self.video_frames += 1
+
+    def _close_video(self):
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+
+
+def _make_dirs(path):
+    d = os.path.dirname(os.path.abspath(path))
+    os.makedirs(d, exist_ok=True)
+
+
+def _write_png(img, path, level):
+    _make_dirs(path)
+    if not cv2.imwrite(path, img, [cv2.IMWRITE_PNG_COMPRESSION, int(level)]):
+        raise IOError("cannot write %s" % path)
+    return path
+
+
+def world_bounds(groups):
+    """(x, y) origin and (w, h) size of everything group_polylines() output paints, stroke width included"""
+    pad = max(thickness for (_, thickness), _ in groups) // 2 + 1
+    pts = np.concatenate([p.reshape(-1, 2) for _, polys in groups for p in polys])
+    lo, hi = pts.min(axis=0) - pad, pts.max(axis=0) + pad
+    return (int(lo[0]), int(lo[1])), (int(hi[0] - lo[0]), int(hi[1] - lo[1]))
+
+
+def svg_document(groups, size, background=None, origin=(0, 0)):
+    """SVG text for group_polylines() output on a (w, h) canvas whose top-left is `origin`; colors are BGR"""
+    w, h = size
+    x, y = origin
+    out = ['<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="%d %d %d %d">'
+           % (w, h, x, y, w, h)]
+    if background is not None:
+        b, g, r = background
+        out.append('<rect x="%d" y="%d" width="%d" height="%d" fill="#%02x%02x%02x"/>' % (x, y, w, h, r, g, b))
+    for ((b, g, r), thickness), polys in groups:
+        # one path per style run: "M x y L x y ..." for each polyline
+        d = " ".join("M" + " L".join(" ".join(map(str, p)) for p in poly.tolist()) for poly in polys)
+        out.append('<path d="%s" fill="none" stroke="#%02x%02x%02x" stroke-width="%d" '
+                   'stroke-linecap="round" stroke-linejoin="round"/>' % (d, r, g, b, thickness))
+    out.append("</svg>\n")
+    return "\n".join(out)
+
+
+def _write_svg(groups, path, size, background, origin=(0, 0)):
+    _make_dirs(path)
+    with open(path, "w") as f:
+        f.write(svg_document(groups, size, background, origin))
+    return path
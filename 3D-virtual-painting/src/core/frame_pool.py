@@ -0,0 +1,75 @@
+# src/core/frame_pool.py
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+
+class FramePool:
+    """
+    Preallocated frame buffers reused across frames, so the per-frame path (flip,
+    resize, color conversion, rendering) writes through OpenCV's dst= into the same
+    memory every frame instead of allocating new full-size arrays.
+
+    buffer(name, shape): a scratch array owned by one call site and overwritten on its
+        next call. Each name has a grow-only backing store, so a varying shape (e.g. ROI
+        crops) only allocates when it needs more bytes than ever before.
+    acquire(shape) / release(buf): buffers handed to another thread (e.g. video frames
+        queued for the exporter); released buffers go back on a free list per shape.
+
+    reuse=False allocates on every call (the behavior before pooling, for benchmarks).
+    `allocations` / `allocated_bytes` count the arrays actually created.
+    """
+
+    def __init__(self, reuse=True):
+        self.reuse = reuse
+        self._named = {}
+        self._free = defaultdict(list)
+        self._lock = threading.Lock()
+        self.allocations = 0
+        self.allocated_bytes = 0
+
+    def _alloc(self, shape, dtype):
+        self.allocations += 1
+        self.allocated_bytes += int(np.prod(shape)) * np.dtype(dtype).itemsize
+        return np.empty(shape, dtype)
+
+    def buffer(self, name, shape, dtype=np.uint8):
+        """Contiguous array of `shape` for call site `name`, reused while it fits"""
+        shape = tuple(shape)
+        if not self.reuse:
+            return self._alloc(shape, dtype)
+        n = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        store = self._named.get(name)
+        if store is None or store.nbytes < n:
+            store = self._named[name] = self._alloc(n, np.uint8)
+        return store[:n].view(dtype).reshape(shape)
+
+    def copy(self, name, image):
+        """image copied into the `name` buffer (a copy that does not allocate)"""
+        out = self.buffer(name, image.shape, image.dtype)
+        np.copyto(out, image)
+        return out
+
+    def acquire(self, shape, dtype=np.uint8):
+        """A buffer for another thread to own until it calls release()"""
+        key = (tuple(shape), np.dtype(dtype).str)
+        if self.reuse:
+            with self._lock:
+                if self._free[key]:
+                    return self._free[key].pop()
+        return self._alloc(key[0], dtype)
+
+    def release(self, buf):
+        if self.reuse:
+            with self._lock:
+                self._free[(buf.shape, buf.dtype.str)].append(buf)
+
+    def stats(self):
+        return {
+            'allocations': self.allocations,
+            'allocated_mb': self.allocated_bytes / 2 ** 20,
+            'named': len(self._named),
+            'pooled_mb': (sum(b.nbytes for b in self._named.values())
+                          + sum(b.nbytes for bufs in self._free.values() for b in bufs)) / 2 ** 20,
+        }
@@ -0,0 +1,208 @@
+# src/core/frame_source.py
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from core.frame_pool import FramePool
+
+Frame = namedtuple("Frame", ["image", "timestamp", "seq"])
+
+
+class FrameSource:
+    """
+    Background-thread frame capture into a small preallocated ring buffer.
+
+    source: camera index, video file path, an object with cv2.VideoCapture's read(),
+            or any iterable of BGR frames (e.g. a generator, for tests without a webcam).
+    size:   optional (w, h) resize and flip: optional cv2.flip code, both done on the
+            capture thread straight into the ring slot.
+    drop:   True  -> live policy: the consumer always gets the newest frame and frames it
+                     never saw are counted in `dropped`.
+            False -> lossless policy: the reader waits for the consumer (files, batch jobs).
+    fps:    pace iterable/file sources at this rate (None = as fast as possible).
+    retry:  keep retrying failed reads (default for camera indices) instead of ending.
+    pool:   core.frame_pool.FramePool for the resize scratch buffer (default: private).
+
+    A frame returned by get()/read() stays valid until the next get()/read() call:
+    the reader never writes into the slot the consumer holds.
+    """
+
+    def __init__(self, source=0, width=None, height=None, size=None, flip=None,
+                 buffer_size=3, drop=True, fps=None, retry=None, pool=None):
+        if buffer_size < 3:
+            raise ValueError("buffer_size must be >= 3 (newest, held and one being written)")
+        self.size = size
+        self.flip = flip
+        self.drop = drop
+        self.fps = fps
+        self.retry = isinstance(source, int) if retry is None else retry
+        self.pool = pool if pool is not None else FramePool()
+        self._cap = None
+        self._iter = None
+        if isinstance(source, (int, str)):
+            self._cap = cv2.VideoCapture(source)
+            if width:
+                self._cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            if height:
+                self._cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        elif hasattr(source, "read"):
+            self._cap = source
+        else:
+            self._iter = iter(source)
+
+        self._slots = [None] * buffer_size
+        self._meta = [None] * buffer_size    # (timestamp, seq) per slot
+        self._latest = -1                    # slot holding the newest frame
+        self._held = -1                      # slot handed to the consumer
+        self._last_seq = -1                  # seq last handed to the consumer
+        self._cond = threading.Condition()
+        self._running = False
+        self._finished = False
+        self._thread = None
+
+        self.captured = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    # ---------------- lifecycle ----------------
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="FrameSource", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        if self._cap is not None and hasattr(self._cap, "release"):
+            self._cap.release()
+
+    release = stop
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def isOpened(self):
+        if self._cap is not None and hasattr(self._cap, "isOpened"):
+            return self._cap.isOpened()
+        return True
+
+    @property
+    def finished(self):
+        """True once the source is exhausted and every captured frame was handed out"""
+        with self._cond:
+            return self._finished and self._latest_seq() <= self._last_seq
+
+    # ---------------- consumer ----------------
+    def get(self, timeout=1.0):
+        """Newest frame not seen yet as Frame(image, timestamp, seq); None on timeout/end"""
+        if self._thread is None:
+            self.start()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._latest_seq() <= self._last_seq:
+                remaining = deadline - time.monotonic()
+                if self._finished or not self._running or remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            slot = self._latest
+            ts, seq = self._meta[slot]
+            self.dropped += seq - self._last_seq - 1
+            self.delivered += 1
+            self._last_seq = seq
+            self._held = slot
+            self._cond.notify_all()
+            return Frame(self._slots[slot], ts, seq)
+
+    def read(self):
+        """cv2.VideoCapture-style (ok, frame)"""
+        frame = self.get()
+        if frame is None:
+            return False, None
+        return True, frame.image
+
+    # ---------------- reader thread ----------------
+    def _latest_seq(self):
+        return self._meta[self._latest][1] if self._latest >= 0 else -1
+
+    def _next_slot(self):
+        for k in range(1, len(self._slots) + 1):
+            slot = (self._latest + k) % len(self._slots)
+            if slot != self._held and slot != self._latest:
+                return slot
+        return (self._latest + 1) % len(self._slots)
+
+    def _grab(self):
+        if self._iter is not None:
+            return next(self._iter, None)
+        ok, frame = self._cap.read()
+        return frame if ok else None
+
+    def _run(self):
+        seq = 0
+        period = 1.0 / self.fps if self.fps else 0.0
+        next_t = time.monotonic()
+        while self._running:
+            raw = self._grab()
+            if raw is None:
+                # cameras hiccup; files and iterables are simply done
+                if self.retry and self._iter is None:
+                    time.sleep(0.05)
+                    continue
+                break
+            ts = time.perf_counter()
+
+            with self._cond:
+                if not self.drop:
+                    while self._running and self._latest_seq() > self._last_seq:
+                        self._cond.wait(0.1)
+                slot = self._next_slot()
+            self._store(slot, raw)
+            with self._cond:
+                self._meta[slot] = (ts, seq)
+                self._latest = slot
+                self.captured += 1
+                self._cond.notify_all()
+            seq += 1
+
+            if period:
+                next_t += period
+                delay = next_t - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    next_t = time.monotonic()
+        with self._cond:
+            self._finished = True
+            self._cond.notify_all()
+
+    def _store(self, slot, raw):
+        """Flip/resize raw straight into the preallocated slot"""
+        h, w = raw.shape[:2]
+        if self.size is not None:
+            w, h = self.size
+        buf = self._slots[slot]
+        if buf is None or buf.shape[:2] != (h, w) or buf.shape[2:] != raw.shape[2:]:
+            buf = np.empty((h, w) + raw.shape[2:], raw.dtype)
+            self._slots[slot] = buf
+        src = raw
+        if self.size is not None and raw.shape[:2] != (h, w):
+            if self.flip is None:
+                cv2.resize(raw, (w, h), dst=buf)
+                return
+            src = cv2.resize(raw, (w, h), dst=self.pool.buffer("source.resize", buf.shape))
+        if self.flip is not None:
+            cv2.flip(src, self.flip, dst=buf)
+        else:
+            np.copyto(buf, src)
@@ -0,0 +1,236 @@
+# src/core/history.py
+"""
+Command log behind DrawEngine undo/redo.
+
+Every edit is pushed as a Command holding just enough to invert it against the
+StrokeStore's tombstones:
+
+  STROKE  points [a, b) drawn in one gesture       undo: tombstone them   redo: restore
+  ERASE   erased point ids and the stroke cuts     undo: restore + join   redo: erase again
+  CLEAR   the StrokeStore that was cleared         undo/redo: swap stores
+  COLOR   old and new brush color                  (no store change)
+
+Undo and redo cost is proportional to the size of the command, not of the drawing.
+Dead points that undo or redo may bring back are "pinned": StrokeStore compaction
+keeps them and History.remap() follows the new ids. Commands on the far side of a
+CLEAR refer to the other store and are left alone.
+ERASE and CLEAR may also carry `raster`: whatever the caller needs to invert their
+effect on pixels that are no longer vectors (DrawEngine's frozen layer).
+History is capped at `max_bytes`; the oldest commands are dropped first, and
+release() drops the ones that touch points about to be flattened.
+"""
+import numpy as np
+
+STROKE, ERASE, CLEAR, COLOR = "stroke", "erase", "clear", "color"
+
+_COMMAND_BYTES = 64  # rough per-command overhead
+
+
+class Command:
+    __slots__ = ("kind", "serial", "a", "b", "ids", "cuts", "store", "old", "new", "rect",
+                 "raster", "nbytes")
+
+    def __init__(self, kind, serial, a=0, b=0, ids=None, cuts=None, store=None,
+                 old=None, new=None, rect=None, raster=None):
+        self.kind = kind
+        self.serial = serial  # unique, increasing; names the state after this command
+        self.a, self.b = a, b
+        self.ids, self.cuts = ids, cuts
+        self.store = store
+        self.old, self.new = old, new
+        self.rect = rect      # inclusive (x0, y0, x1, y1) of the points it touches, or None
+        self.raster = raster
+        self.nbytes = _COMMAND_BYTES + _raster_nbytes(raster)
+        if ids is not None:
+            self.nbytes += ids.nbytes + cuts.nbytes
+        if store is not None:
+            self.nbytes += store.nbytes
+
+
+class History:
+    def __init__(self, max_bytes=64 << 20):
+        self.max_bytes = max_bytes
+        self.reset()
+
+    def reset(self):
+        """Forget every command (the current strokes become the base state)"""
+        self.done = []     # applied commands, oldest first
+        self.undone = []   # undone commands, most recently undone last
+        self.nbytes = 0
+        self.n_pinned = 0  # dead points of the current store that undo/redo may restore
+        self.base_serial = 0  # serial of the state below done[0]
+        self._serial = 0
+        self._clears = 0   # CLEAR commands in done
+
+    def __len__(self):
+        return len(self.done)
+
+    @property
+    def serial(self):
+        """Serial of the current state"""
+        return self.done[-1].serial if self.done else self.base_serial
+
+    # ---------------- recording ----------------
+    def push_stroke(self, store, a, b, rect=None):
+        if b > a:
+            if rect is None:
+                rect = store.bounds(np.arange(a, b))
+            self._push(Command(STROKE, 0, a=a, b=b, rect=rect))
+
+    def push_erase(self, store, ids, cuts, raster=None, rect=None):
+        """
+        rect: inclusive area the erase touched besides the points (e.g. raster pixels).
+        The segments joining the erased points to their live neighbours are in the rect too.
+        """
+        if len(ids) or raster is not None:
+            if len(ids):
+                rect = _union(store.bounds(np.concatenate((ids, store.neighbours(ids, cuts)))), rect)
+            self._push(Command(ERASE, 0, ids=ids, cuts=cuts, rect=rect, raster=raster))
+            self.n_pinned += len(ids)
+
+    def push_clear(self, store, raster=None):
+        self._push(Command(CLEAR, 0, store=store, raster=raster))
+        self._clears += 1
+        self.n_pinned = 0
+
+    def push_color(self, old, new):
+        self._push(Command(COLOR, 0, old=old, new=new))
+
+    def _push(self, cmd):
+        self.drop_redo()
+        self._serial += 1
+        cmd.serial = self._serial
+        self.done.append(cmd)
+        self.nbytes += cmd.nbytes
+        while self.nbytes > self.max_bytes and len(self.done) > 1:
+            old = self.done.pop(0)
+            self.nbytes -= old.nbytes
+            self.base_serial = old.serial
+            if old.kind == CLEAR:
+                self._clears -= 1
+            elif old.kind == ERASE and not self._clears:
+                self.n_pinned -= len(old.ids)
+
+    def drop_redo(self):
+        """Forget the undone commands (a new edit makes them unreachable)"""
+        if not self.undone:
+            return
+        for cmd in self.undone:
+            self.nbytes -= cmd.nbytes
+        # of these, only the current store's undone strokes were pinned
+        self.n_pinned -= sum(c.b - c.a for c in _after_clear(self.undone) if c.kind == STROKE)
+        self.undone = []
+
+    def release(self, boundary):
+        """
+        Forget what refers to the current store's points below `boundary` (about to be
+        flattened): the redo list, and the oldest commands up to the last one touching
+        them. Erases carrying a raster go too, their pixels change under them.
+        """
+        self.drop_redo()
+        done, _ = self._current()
+        offset = len(self.done) - len(done)
+        last = -1
+        for k, cmd in enumerate(done):
+            if cmd.kind == STROKE and cmd.a < boundary or cmd.kind == ERASE and (
+                    cmd.raster is not None or len(cmd.ids) and cmd.ids.min() < boundary):
+                last = k
+        if last < 0:
+            return
+        dropped = self.done[:offset + last + 1]
+        del self.done[:offset + last + 1]
+        self.nbytes -= sum(c.nbytes for c in dropped)
+        self.base_serial = dropped[-1].serial
+        self._clears = sum(c.kind == CLEAR for c in self.done)
+        self._recount()
+
+    # ---------------- undo / redo ----------------
+    def undo(self, store):
+        """Invert the latest command. Returns (store to use from now on, command or None)"""
+        if not self.done:
+            return store, None
+        cmd = self.done.pop()
+        if cmd.kind == STROKE:
+            seg = store.alive[cmd.a:cmd.b]
+            store.n_dead += int(np.count_nonzero(seg))
+            seg[:] = False
+            self.n_pinned += cmd.b - cmd.a
+        elif cmd.kind == ERASE:
+            store.restore(cmd.ids)
+            store.unsplit(cmd.cuts)
+            self.n_pinned -= len(cmd.ids)
+        elif cmd.kind == CLEAR:
+            cmd.store, store = store, cmd.store
+            self._clears -= 1
+        self.undone.append(cmd)
+        if cmd.kind == CLEAR:
+            self._recount()
+        return store, cmd
+
+    def redo(self, store):
+        """Re-apply the latest undone command. Returns (store to use from now on, command or None)"""
+        if not self.undone:
+            return store, None
+        cmd = self.undone.pop()
+        if cmd.kind == STROKE:
+            store.restore(np.arange(cmd.a, cmd.b))
+            self.n_pinned -= cmd.b - cmd.a
+        elif cmd.kind == ERASE:
+            cmd.cuts = store.erase_ids(cmd.ids)
+            self.n_pinned += len(cmd.ids)
+        elif cmd.kind == CLEAR:
+            cmd.store, store = store, cmd.store
+            self._clears += 1
+        self.done.append(cmd)
+        if cmd.kind == CLEAR:
+            self._recount()
+        return store, cmd
+
+    # ---------------- compaction ----------------
+    def _current(self):
+        """(done, undone) commands that refer to the current store"""
+        return _after_clear(self.done), _after_clear(self.undone)
+
+    def _recount(self):
+        done, undone = self._current()
+        self.n_pinned = (sum(len(c.ids) for c in done if c.kind == ERASE)
+                         + sum(c.b - c.a for c in undone if c.kind == STROKE))
+
+    def pinned(self):
+        """Ids of the current store's dead points that undo/redo may restore"""
+        done, undone = self._current()
+        parts = [c.ids for c in done if c.kind == ERASE]
+        parts += [np.arange(c.a, c.b) for c in undone if c.kind == STROKE]
+        return np.concatenate(parts) if parts else np.empty(0, np.int64)
+
+    def remap(self, remap):
+        """Follow a StrokeStore.compact() id map of the current store"""
+        done, undone = self._current()
+        for cmd in done + undone:
+            if cmd.kind == STROKE:
+                cmd.a, cmd.b = int(remap[cmd.a]), int(remap[cmd.b - 1]) + 1
+            elif cmd.kind == ERASE:
+                cmd.ids, cmd.cuts = remap[cmd.ids], remap[cmd.cuts]
+
+
+def _after_clear(cmds):
+    """The commands after the last CLEAR (undone lists run from the current state outwards too)"""
+    for k in range(len(cmds) - 1, -1, -1):
+        if cmds[k].kind == CLEAR:
+            return cmds[k + 1:]
+    return cmds
+
+
+def _union(rect, other):
+    if other is None:
+        return rect
+    return (min(rect[0], other[0]), min(rect[1], other[1]),
+            max(rect[2], other[2]), max(rect[3], other[3]))
+
+
+def _raster_nbytes(raster):
+    if isinstance(raster, np.ndarray):
+        return raster.nbytes
+    if isinstance(raster, tuple):
+        return sum(_raster_nbytes(r) for r in raster)
+    return 0
@@ -0,0 +1,344 @@
+# src/core/journal.py
+"""
+Append-only binary journal of stroke operations (.hsj), written as the user draws.
+
+Layout (little endian):
+  header  8 bytes: magic b"HSJ1", version u16, reserved u16
+  record  8 bytes: op u1, b0 u1, b1 u1, b2 u1, x i2, y i2
+
+  POINT    x, y                append to the open stroke in the current style
+  STYLE    b0-b2 color, x thickness
+  END      close the open stroke
+  POP      StrokeStore.pop_last (undo with no history left)
+  ERASE    x, y, radius = b0 | b1 << 8, b2 = 1 if it also erased frozen (raster) pixels
+  CLEAR    drop everything
+  MOVE     x, y                move the last point of the open stroke
+  REPLACE  count = x | y << 16 replace the open stroke with the next `count` POINT records
+  UNDO     undo the latest command of the core.history.History
+  REDO     redo the latest undone command
+
+Every record has the same size, so a journal is loaded with one np.memmap and replayed
+run by run: consecutive POINT records become a single StrokeStore.extend, and the
+Python loop only sees the other ops. Replay keeps the same History as DrawEngine (END,
+ERASE and CLEAR push commands), so UNDO / REDO records undo the same thing they did
+live. compact() rewrites a journal as a snapshot of the live strokes (STYLE, POINT...,
+END per stroke).
+"""
+import os
+import struct
+
+import numpy as np
+
+from core.history import History
+from core.stroke_store import StrokeStore
+
+MAGIC = b"HSJ1"
+VERSION = 1
+HEADER = struct.Struct("<4sHH")
+
+POINT, STYLE, END, POP, ERASE, CLEAR, MOVE, REPLACE, UNDO, REDO = range(1, 11)
+
+RECORD = np.dtype([("op", "u1"), ("b0", "u1"), ("b1", "u1"), ("b2", "u1"),
+                   ("x", "<i2"), ("y", "<i2")])
+
+
+class StrokeJournal:
+    """
+    Writer. Records are buffered and written when `flush_every` are pending, when a
+    stroke ends and on flush()/close(), so a crash loses at most the stroke in progress.
+    An existing journal is appended to.
+    """
+
+    def __init__(self, path, flush_every=4096):
+        self.path = path
+        self.flush_every = flush_every
+        new = not os.path.exists(path) or os.path.getsize(path) < HEADER.size
+        if not new:
+            _check_header(path)
+        self._f = open(path, "ab")
+        if new:
+            self._f.truncate(0)
+            self._f.write(HEADER.pack(MAGIC, VERSION, 0))
+        else:
+            # drop a torn trailing record from an interrupted write
+            size = os.path.getsize(path)
+            whole = HEADER.size + (size - HEADER.size) // RECORD.itemsize * RECORD.itemsize
+            if whole != size:
+                self._f.truncate(whole)
+        self._pending = []  # (op, b0, b1, b2, x, y) tuples not yet written
+        self._style = None  # last STYLE written
+        self._style_arg = None  # (color, thickness) as last passed to point()
+
+    # ---------------- ops ----------------
+    def _add(self, op, x=0, y=0, b0=0, b1=0, b2=0):
+        self._pending.append((op, b0, b1, b2, int(x), int(y)))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def style(self, color, thickness):
+        key = (tuple(int(c) for c in color), int(thickness))
+        if key != self._style:
+            self._style = key
+            self._add(STYLE, key[1], 0, *key[0])
+
+    def point(self, x, y, color, thickness):
+        if (color, thickness) != self._style_arg:
+            self._style_arg = (color, thickness)
+            self.style(color, thickness)
+        self._pending.append((POINT, 0, 0, 0, int(x), int(y)))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def points(self, xs, ys):
+        """POINT records for many points at once"""
+        n = len(xs)
+        self.flush()
+        recs = np.zeros(n, RECORD)
+        recs["op"] = POINT
+        recs["x"], recs["y"] = xs, ys
+        self._f.write(recs.tobytes())
+
+    def move(self, x, y):
+        self._add(MOVE, x, y)
+
+    def replace(self, xs, ys):
+        n = len(xs)
+        self._add(REPLACE, n & 0xFFFF, n >> 16)
+        self.points(xs, ys)
+
+    def end(self):
+        self._add(END)
+        self.flush()
+
+    def pop(self):
+        self._add(POP)
+
+    def undo(self):
+        self._add(UNDO)
+
+    def redo(self):
+        self._add(REDO)
+
+    def erase(self, x, y, radius, frozen=False):
+        r = int(radius)
+        self._add(ERASE, x, y, r & 0xFF, r >> 8, int(frozen))
+
+    def clear(self):
+        self._add(CLEAR)
+        self._style = self._style_arg = None
+
+    def snapshot(self, store):
+        """Records that rebuild `store`'s live strokes on top of an empty canvas"""
+        self.flush()
+        self._f.write(snapshot_records(store).tobytes())
+        self._style = self._style_arg = None
+
+    # ---------------- file ----------------
+    def flush(self):
+        if self._pending:
+            self._f.write(np.array(self._pending, RECORD).tobytes())
+            self._pending = []
+        self._f.flush()
+
+    def close(self):
+        if self._f is not None:
+            self.flush()
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _check_header(path):
+    with open(path, "rb") as f:
+        magic, version, _ = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("%s is not a stroke journal" % path)
+    if version != VERSION:
+        raise ValueError("unsupported stroke journal version %d" % version)
+
+
+def read_records(path):
+    """The journal's records as a read-only memmap (a torn last record is ignored)"""
+    _check_header(path)
+    n = (os.path.getsize(path) - HEADER.size) // RECORD.itemsize
+    if n == 0:
+        return np.zeros(0, RECORD)
+    return np.memmap(path, RECORD, mode="r", offset=HEADER.size, shape=(n,))
+
+
+def _bulk_prefix(records, ops):
+    """
+    StrokeStore for the leading run of STYLE / POINT / END records (all of a snapshot),
+    built with numpy: strokes start after an END and where the style changes.
+    Returns (store, records consumed, current (color, thickness), (starts, ends) of the point
+    ranges each END closed, as DrawEngine pushes them to its history).
+    """
+    other = np.flatnonzero((ops != POINT) & (ops != STYLE) & (ops != END))
+    end = int(other[0]) if len(other) else len(ops)
+    ops = ops[:end]
+    at = np.arange(end)
+    style_at = np.flatnonzero(ops == STYLE)
+    rec = records[style_at]
+    keys = np.column_stack([rec["b0"], rec["b1"], rec["b2"], rec["x"]]).astype(np.int64)
+    uniq, inverse = np.unique(keys, axis=0, return_inverse=True) if len(keys) else (keys, keys[:, 0])
+    palette = [((int(b), int(g), int(r)), int(t)) for b, g, r, t in uniq.tolist()]
+    palette.append(((0, 0, 0), 1))  # points before any STYLE record
+    style_of = np.full(end, len(palette) - 1, np.int64)
+    style_of[style_at] = np.ravel(inverse)
+    last_style = np.maximum.accumulate(np.where(ops == STYLE, at, -1)) if end else at
+    current = palette[style_of[last_style[-1]]] if end and last_style[-1] >= 0 else palette[-1]
+
+    pos = np.flatnonzero(ops == POINT)
+    pstyle = np.where(last_style[pos] >= 0, style_of[np.maximum(last_style[pos], 0)], len(palette) - 1)
+    ends_before = np.cumsum(ops == END)[pos]
+    new = np.ones(len(pos), bool)
+    new[1:] = (ends_before[1:] != ends_before[:-1]) | (pstyle[1:] != pstyle[:-1])
+    starts = np.flatnonzero(new)
+    closed = not len(pos) or bool((ops[pos[-1] + 1:] == END).any())
+    store = StrokeStore.from_arrays(records["x"][pos], records["y"][pos], starts, pstyle[starts],
+                                    palette, closed)
+    # END k closes the stroke holding the last point before it
+    closes = np.unique(np.cumsum(ops == POINT)[ops == END])
+    closes = closes[closes > 0]
+    opened = starts[np.searchsorted(starts, closes - 1, side="right") - 1]
+    return store, end, current, (opened, closes)
+
+
+def _range_bounds(store, a, b):
+    """StrokeStore.bounds() of each disjoint, ascending point range [a[i], b[i]), in one pass"""
+    if not len(a):
+        return []
+    cuts = np.column_stack([a, b]).ravel()
+    if cuts[-1] == store.n_points:
+        cuts = cuts[:-1]
+    xs, ys = store.xs[:store.n_points], store.ys[:store.n_points]
+    parts = [f.reduceat(v, cuts)[::2] for f in (np.minimum, np.maximum) for v in (xs, ys)]
+    return np.column_stack(parts).tolist()
+
+
+def _index_pending(store, indexed):
+    """Add points [indexed, n_points) to the spatial index; returns n_points"""
+    if indexed < store.n_points:
+        ids = np.arange(indexed, store.n_points)
+        store.index.add_many(ids, store.xs[ids], store.ys[ids])
+    return store.n_points
+
+
+def replay(records, history=None):
+    """
+    StrokeStore holding the result of the journal records.
+    history: core.history.History to fill with the commands (e.g. DrawEngine.history).
+    """
+    if history is None:
+        history = History()
+    ops = np.asarray(records["op"])
+    store, pos, (color, thickness), (opened, closes) = _bulk_prefix(records, ops)
+    for a, b, rect in zip(opened.tolist(), closes.tolist(), _range_bounds(store, opened, closes)):
+        history.push_stroke(store, a, b, tuple(rect))
+    xs, ys = records["x"], records["y"]
+    special = np.flatnonzero(ops[pos:] != POINT) + pos
+    indexed = store.n_points  # points [0, indexed) are in the spatial index
+    for k in np.append(special, len(ops)).tolist():
+        if k > pos:  # run of POINT records
+            store.extend(xs[pos:k], ys[pos:k], color, thickness, index=False)
+        if k == len(ops):
+            break
+        op = ops[k]
+        rec = records[k]
+        pos = k + 1
+        if op == STYLE:
+            color = (int(rec["b0"]), int(rec["b1"]), int(rec["b2"]))
+            thickness = int(rec["x"])
+        elif op == END:
+            a, b = store.stroke_range(-1)
+            history.push_stroke(store, a, b)
+            store.end_stroke()
+        elif op == MOVE:
+            store.move_last(int(rec["x"]), int(rec["y"]))
+        elif op == REPLACE:
+            n = (int(rec["x"]) & 0xFFFF) | (int(rec["y"]) << 16)
+            store.replace_open(xs[pos:pos + n], ys[pos:pos + n])
+            indexed = min(indexed, store.n_points)
+            pos += n  # the POINT records after it belong to the REPLACE
+        elif op == POP:
+            store.pop_last()
+            history.drop_redo()
+        elif op == ERASE:
+            _index_pending(store, indexed)
+            x, y, r = int(rec["x"]), int(rec["y"]), int(rec["b0"]) | int(rec["b1"]) << 8
+            ids = store.query_radius(x, y, r)
+            if rec["b2"]:
+                # frozen pixels were hit too: a command even without points, and what
+                # DrawEngine.load_journal needs to erase them again
+                cuts = store.erase_ids(ids) if len(ids) else ids[:0]
+                history.push_erase(store, ids, cuts, raster=(x, y, r, None),
+                                   rect=(x - r, y - r, x + r, y + r))
+                store.maybe_compact(history)
+            elif len(ids):
+                history.push_erase(store, ids, store.erase_ids(ids))
+                store.maybe_compact(history)
+            indexed = store.n_points
+        elif op == CLEAR:
+            _index_pending(store, indexed)  # the cleared store may come back on undo
+            history.push_clear(store)
+            store = StrokeStore()
+            indexed = 0
+        elif op == UNDO or op == REDO:
+            _index_pending(store, indexed)
+            store, _ = history.undo(store) if op == UNDO else history.redo(store)
+            indexed = store.n_points
+        else:
+            raise ValueError("corrupt stroke journal: op %d at record %d" % (op, k))
+    if indexed < store.n_points:
+        store.reindex()
+    return store
+
+
+def load(path, history=None):
+    """StrokeStore rebuilt from a journal file (see replay() for `history`)"""
+    return replay(read_records(path), history)
+
+
+def snapshot_records(store):
+    """STYLE / POINT... / END records of the live strokes (the open stroke is left open)"""
+    ids = np.flatnonzero(store.alive[:store.n_points])
+    if not len(ids):
+        return np.zeros(0, RECORD)
+    owner = store.stroke_of(ids)
+    strokes, first, counts = np.unique(owner, return_index=True, return_counts=True)
+    k = len(strokes)
+    # stroke j's block: STYLE at head[j], its points, then END
+    head = first + 2 * np.arange(k)
+    recs = np.zeros(len(ids) + 2 * k, RECORD)
+    at = np.arange(len(ids)) + 2 * np.searchsorted(strokes, owner) + 1
+    recs["op"][at] = POINT
+    recs["x"][at], recs["y"][at] = store.xs[ids], store.ys[ids]
+    palette = np.array([c + (t,) for c, t in store.palette] or [(0, 0, 0, 1)], np.int64)
+    style = palette[store.styles[strokes]]
+    recs["op"][head] = STYLE
+    recs["b0"][head], recs["b1"][head], recs["b2"][head] = style[:, 0], style[:, 1], style[:, 2]
+    recs["x"][head] = style[:, 3]
+    recs["op"][head + counts + 1] = END
+    if strokes[-1] == store.n_strokes - 1:
+        recs = recs[:-1]  # the open stroke stays open
+    return recs
+
+
+def compact(path, store=None):
+    """
+    Rewrite a journal as a snapshot of its live strokes (atomically, via a temp file).
+    `store` skips the replay when the caller already holds the journal's state.
+    """
+    if store is None:
+        store = load(path)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0))
+        f.write(snapshot_records(store).tobytes())
+    os.replace(tmp, path)
+    return path
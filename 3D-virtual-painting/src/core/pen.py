@@ -0,0 +1,56 @@
+# src/core/pen.py
+import numpy as np
+
+from core.simplify import StrokeSimplifier
+
+
+class Pen:
+    """
+    Stroke of one hand drawn with DrawEngine.update(..., hand=id): rendered live and
+    stored as one whole stroke when the hand lifts. Points are stroke coordinates.
+    """
+    __slots__ = ("simplifier", "points", "color", "thickness", "reshaped", "box")
+
+    def __init__(self, template, color, thickness):
+        """template: the engine's StrokeSimplifier, whose settings the pen's own one copies"""
+        self.simplifier = StrokeSimplifier(template.min_distance, template.tolerance, template.max_length)
+        self.points = []
+        self.color = color
+        self.thickness = thickness
+        self.reshaped = False   # the raster has segments no longer in points
+        self.box = None         # inclusive [x0, y0, x1, y1] of every point rasterized so far
+
+    def add(self, point):
+        """Feed a sample; returns the new segment (a, b) to rasterize, or None"""
+        action = self.simplifier.feed(point) if self.simplifier.enabled else "append"
+        if action is None:
+            return None
+        x, y = point
+        b = self.box
+        if b is None:
+            self.box = [x, y, x, y]
+        else:
+            b[0], b[1], b[2], b[3] = min(b[0], x), min(b[1], y), max(b[2], x), max(b[3], y)
+        if action == "move":
+            self.points[-1] = point
+            self.reshaped = True
+        else:
+            self.points.append(point)
+        return (self.points[-2], point) if len(self.points) > 1 else None
+
+    def finish(self):
+        """(final points, raw points where the raster no longer matches them, else None)"""
+        raw = np.array(self.points, np.int32)
+        pts = self.simplifier.finish() if self.simplifier.enabled else None
+        if pts is None:
+            pts = raw
+        return pts, (raw if self.reshaped or len(pts) != len(raw) else None)
+
+    def overlaps(self, rect, margin):
+        """True if the inclusive rect comes within margin of anything this pen rasterized"""
+        b = self.box
+        return (b is not None and rect[0] <= b[2] + margin and b[0] <= rect[2] + margin
+                and rect[1] <= b[3] + margin and b[1] <= rect[3] + margin)
+
+    def run(self):
+        return np.array(self.points, np.int32), self.color, self.thickness
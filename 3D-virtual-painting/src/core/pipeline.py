@@ -0,0 +1,271 @@
+# src/core/pipeline.py
+import multiprocessing as mproc
+import queue
+import time
+from collections import deque, namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+
+N_LANDMARKS = 21
+
+
+class WorkerError(RuntimeError):
+    """The inference worker failed: its detector raised, or the process died"""
+
+
+PipelineResult = namedtuple(
+    "PipelineResult",
+    ["slot", "image", "landmarks", "handedness", "scores", "seq", "timestamp", "inference_ms"])
+
+
+class SharedFrameRing:
+    """
+    Fixed slots of frame + landmark buffers in one multiprocessing.shared_memory block.
+    Only slot numbers cross process boundaries; pixels and landmarks never get pickled.
+    """
+
+    def __init__(self, slots, frame_shape, max_hands=1, name=None):
+        self.slots = slots
+        self.frame_shape = tuple(frame_shape)
+        self.max_hands = max_hands
+        layout = [
+            ("frames", (slots,) + self.frame_shape, np.uint8),
+            ("landmarks", (slots, max_hands, N_LANDMARKS, 3), np.float32),
+            ("handedness", (slots, max_hands), np.int8),
+            ("scores", (slots, max_hands), np.float32),
+            ("n_hands", (slots,), np.int32),
+        ]
+        sizes = [int(np.prod(shape)) * np.dtype(dt).itemsize for _, shape, dt in layout]
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=sum(sizes))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        offset = 0
+        for (field, shape, dt), size in zip(layout, sizes):
+            setattr(self, field, np.ndarray(shape, dt, buffer=self.shm.buf, offset=offset))
+            offset += size
+
+    def spec(self):
+        """Picklable description used to attach from another process"""
+        return self.slots, self.frame_shape, self.max_hands, self.shm.name
+
+    @classmethod
+    def attach(cls, spec):
+        slots, frame_shape, max_hands, name = spec
+        return cls(slots, frame_shape, max_hands, name=name)
+
+    def close(self):
+        # drop numpy views before closing the mapping
+        for field in ("frames", "landmarks", "handedness", "scores", "n_hands"):
+            setattr(self, field, None)
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _mediapipe_detector(**tracker_kwargs):
+    """Default detector factory: one MediaPipe HandTracker per worker process, warmed up"""
+    from gestures.gesture_tracker import HandTracker
+    return HandTracker(**tracker_kwargs).warm_up(background=False).detect
+
+
+def _worker_main(spec, requests, results, detector_factory, detector_kwargs):
+    ring = SharedFrameRing.attach(spec)
+    try:
+        detect = detector_factory(**detector_kwargs)
+    except Exception as e:
+        # the parent re-raises it from start() / ready / get()
+        results.put(("error", repr(e)))
+        ring.close()
+        return
+    results.put(("ready", None))
+    try:
+        while True:
+            slot = requests.get()
+            if slot is None:
+                break
+            t0 = time.perf_counter()
+            try:
+                landmarks, handedness, scores = detect(ring.frames[slot])
+            except Exception as e:
+                results.put(("error", repr(e)))   # fails this frame only, in order
+                continue
+            k = min(len(landmarks), ring.max_hands)
+            ring.landmarks[slot, :k] = landmarks[:k]
+            ring.handedness[slot, :k] = handedness[:k]
+            ring.scores[slot, :k] = scores[:k]
+            ring.n_hands[slot] = k
+            results.put((slot, (time.perf_counter() - t0) * 1000.0))
+    finally:
+        ring.close()
+
+
+class InferencePipeline:
+    """
+    Overlaps hand inference with rendering: frame N+1 is inferred in a worker
+    process while the caller renders frame N.
+
+    Guarantees:
+      * results come back in submission order, each with the landmarks of its own
+        frame (landmarks are never paired with a newer or older image);
+      * at most `depth` frames are in flight, so a frame is rendered at most `depth`
+        frame periods after the serial loop would have rendered it;
+      * a detector that fails to build raises WorkerError from start() / ready / get(),
+        a frame whose detection raised raises it from its get() (its slot is freed), and
+        get() raises it instead of blocking once the worker process is gone;
+      * the image/landmark views in a result stay valid until release() (or the next
+        iteration of process()); nothing is dropped inside the pipeline - staleness
+        is handled upstream by FrameSource's drop policy.
+    """
+
+    def __init__(self, frame_shape, max_hands=1, depth=1, detector_factory=None,
+                 detector_kwargs=None):
+        self.depth = depth
+        self.ring = SharedFrameRing(depth + 2, frame_shape, max_hands)
+        self._free = deque(range(self.ring.slots))
+        self._pending = deque()  # (slot, seq, timestamp) in submission order
+        self._ready = False
+        self._error = None       # why the worker could not start, once known
+        ctx = mproc.get_context()
+        self._requests = ctx.Queue()
+        self._results = ctx.Queue()
+        if detector_factory is None:
+            detector_factory = _mediapipe_detector
+            detector_kwargs = dict(detector_kwargs or {}, maxHands=max_hands)
+        self._proc = ctx.Process(
+            target=_worker_main, name="InferenceWorker", daemon=True,
+            args=(self.ring.spec(), self._requests, self._results, detector_factory,
+                  detector_kwargs or {}))
+
+    def start(self, timeout=60.0, wait=True):
+        """
+        Start the worker; wait=True blocks until its detector is built. With wait=False
+        the caller can poll `ready` (frames submitted earlier wait in the queue).
+        """
+        self._proc.start()
+        if wait:
+            self._wait_ready(timeout)
+        return self
+
+    def _wait_ready(self, timeout=None):
+        if self._error is not None:
+            raise WorkerError(self._error)
+        if not self._ready:
+            kind, error = self._next_result(timeout)
+            if kind == "error":
+                self._error = "detector failed to start: " + error
+                raise WorkerError(self._error)
+            self._ready = True
+
+    def _next_result(self, timeout=None):
+        """Next message of the worker; raises WorkerError rather than waiting on a dead one"""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            wait = 0.1 if deadline is None else min(0.1, max(0.0, deadline - time.perf_counter()))
+            try:
+                return self._results.get(timeout=wait)
+            except queue.Empty:
+                if not self._proc.is_alive():
+                    try:
+                        return self._results.get(timeout=0.1)   # its last words may still be in the pipe
+                    except queue.Empty:
+                        self._error = "inference worker exited (code %s)" % self._proc.exitcode
+                        raise WorkerError(self._error)
+                if deadline is not None and time.perf_counter() >= deadline:
+                    raise
+
+    @property
+    def ready(self):
+        """True once the worker's detector is built (raises WorkerError once it has failed)"""
+        if self._error is not None:
+            raise WorkerError(self._error)
+        if not self._ready:
+            try:
+                self._wait_ready(timeout=0)
+            except queue.Empty:
+                pass
+        return self._ready
+
+    @property
+    def in_flight(self):
+        return len(self._pending)
+
+    def submit(self, image, seq=None, timestamp=None):
+        """Copy image into a free shared slot and queue it for inference; False if full"""
+        if not self._free:
+            return False
+        slot = self._free.popleft()
+        np.copyto(self.ring.frames[slot], image)
+        self._pending.append((slot, seq, time.perf_counter() if timestamp is None else timestamp))
+        self._requests.put(slot)
+        return True
+
+    def get(self, timeout=None):
+        """Oldest submitted frame with its landmarks (blocks until inferred)"""
+        if not self._pending:
+            raise RuntimeError("no frame in flight")
+        slot, seq, ts = self._pending[0]
+        self._wait_ready(timeout)
+        done_slot, inference_ms = self._next_result(timeout)
+        if done_slot == "error":
+            self._pending.popleft()
+            self._free.append(slot)
+            raise WorkerError("detection failed: " + inference_ms)
+        if done_slot != slot:
+            raise RuntimeError("inference results out of order")
+        self._pending.popleft()
+        r = self.ring
+        k = int(r.n_hands[slot])
+        return PipelineResult(slot, r.frames[slot], r.landmarks[slot, :k], r.handedness[slot, :k],
+                              r.scores[slot, :k], seq, ts, inference_ms)
+
+    def release(self, result):
+        """Hand the result's slot back for reuse"""
+        self._free.append(result.slot)
+
+    def process(self, frames):
+        """
+        Yield a PipelineResult per input, in order, keeping `depth` frames in flight.
+        frames: iterable of images or FrameSource Frame tuples.
+        """
+        held = None
+        for f in frames:
+            if held is not None:
+                self.release(held)
+                held = None
+            if hasattr(f, "image"):
+                self.submit(f.image, f.seq, f.timestamp)
+            else:
+                self.submit(f)
+            if self.in_flight > self.depth:
+                held = self.get()
+                yield held
+        while self.in_flight:
+            if held is not None:
+                self.release(held)
+            held = self.get()
+            yield held
+        if held is not None:
+            self.release(held)
+
+    def stop(self):
+        if self._proc.is_alive():
+            self._requests.put(None)
+            self._proc.join(timeout=5.0)
+            if self._proc.is_alive():
+                self._proc.terminate()
+        for q in (self._requests, self._results):
+            try:
+                while True:
+                    q.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                pass
+        self.ring.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
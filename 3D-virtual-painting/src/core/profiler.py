@@ -0,0 +1,224 @@
+# src/core/profiler.py
+import csv
+import functools
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+
+class _NullStage:
+    """Shared no-op context manager handed out while profiling is off"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("ring", "t0")
+
+    def __init__(self, ring):
+        self.ring = ring
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.ring.add((time.perf_counter() - self.t0) * 1000.0)
+        return False
+
+
+class StageRing:
+    """Last `size` samples (ms) of one stage in a preallocated array"""
+
+    def __init__(self, size):
+        self.samples = np.zeros(size)
+        self.count = 0
+        self.total = 0  # samples ever added
+
+    def add(self, ms):
+        self.samples[self.total % len(self.samples)] = ms
+        self.total += 1
+        if self.count < len(self.samples):
+            self.count += 1
+
+    def values(self):
+        return self.samples[:self.count]
+
+    def stats(self):
+        v = self.values()
+        if not len(v):
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        p50, p95, p99 = np.percentile(v, (50, 95, 99))
+        return {"count": self.total, "mean": float(v.mean()), "p50": float(p50),
+                "p95": float(p95), "p99": float(p99), "max": float(v.max())}
+
+
+class Profiler:
+    """
+    Per-stage frame timings kept in fixed-size ring buffers (the last `window` samples).
+
+        with profiler.stage("inference"):
+            ...
+        @profiler.timed("gestures")
+        def f(...): ...
+        profiler.tick()   # once per frame: records the "frame" stage (frame-to-frame time)
+
+    Disabled, stage() returns one shared no-op context manager and timed() leaves the
+    function undecorated, so instrumentation can stay in the hot loop.
+    """
+
+    def __init__(self, enabled=True, window=600):
+        self.enabled = enabled
+        self.window = window
+        self.rings = {}
+        self._last_tick = None
+        self._last_dump = None
+
+    def ring(self, name):
+        ring = self.rings.get(name)
+        if ring is None:
+            ring = self.rings[name] = StageRing(self.window)
+        return ring
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self.ring(name))
+
+    def timed(self, name=None):
+        """Decorator; the stage name defaults to the function's name"""
+        def wrap(fn):
+            if not self.enabled:
+                return fn
+            ring = self.ring(name or fn.__name__)
+            @functools.wraps(fn)
+            def inner(*args, **kw):
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kw)
+                finally:
+                    ring.add((time.perf_counter() - t0) * 1000.0)
+            return inner
+        return wrap
+
+    def add(self, name, ms):
+        if self.enabled:
+            self.ring(name).add(ms)
+
+    def tick(self):
+        """Mark the end of a frame"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._last_tick is not None:
+            self.ring("frame").add((now - self._last_tick) * 1000.0)
+        self._last_tick = now
+
+    def reset(self):
+        self.rings = {}
+        self._last_tick = None
+
+    # ---------------- reporting ----------------
+    def summary(self):
+        """{stage: {count, mean, p50, p95, p99, max}} in insertion order"""
+        return {name: ring.stats() for name, ring in self.rings.items()}
+
+    @property
+    def fps(self):
+        ring = self.rings.get("frame")
+        if ring is None or not ring.count:
+            return 0.0
+        return 1000.0 / max(ring.values().mean(), 1e-9)
+
+    def draw_overlay(self, frame, origin=(10, 170), alpha=0.6):
+        """Timing table (p50/p95/p99 ms per stage) over a translucent box"""
+        if not self.enabled or not self.rings:
+            return frame
+        rows = [f"{'stage':<12}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for name, st in self.summary().items():
+            rows.append(f"{name:<12}{st['p50']:7.1f}{st['p95']:7.1f}{st['p99']:7.1f}")
+        rows.append(f"fps {self.fps:.1f}")
+        x, y = origin
+        h = 18 * len(rows) + 8
+        y1, y2, x2 = max(0, y - 14), min(frame.shape[0], y - 14 + h), min(frame.shape[1], x + 300)
+        roi = frame[y1:y2, x:x2]
+        cv2.convertScaleAbs(roi, dst=roi, alpha=1.0 - alpha)  # darken in place
+        for i, line in enumerate(rows):
+            cv2.putText(frame, line, (x + 6, y + i * 18), cv2.FONT_HERSHEY_PLAIN, 1.0,
+                        (0, 255, 255), 1, cv2.LINE_AA)
+        return frame
+
+    def dump_csv(self, path, append=True):
+        """One row per stage, stamped with wall-clock time; appends to build a history"""
+        new = not (append and os.path.exists(path))
+        with open(path, "a" if append else "w", newline="") as f:
+            w = csv.writer(f)
+            if new:
+                w.writerow(["time", "stage", "count", "mean", "p50", "p95", "p99", "max"])
+            now = round(time.time(), 3)
+            for name, st in self.summary().items():
+                w.writerow([now, name, st["count"]] +
+                           [round(st[k], 4) for k in ("mean", "p50", "p95", "p99", "max")])
+        return path
+
+    def dump_json(self, path):
+        with open(path, "w") as f:
+            json.dump({"time": time.time(), "fps": self.fps, "stages": self.summary()}, f, indent=2)
+        return path
+
+    def maybe_dump(self, path, every=10.0):
+        """Dump (CSV or JSON by extension) at most every `every` seconds; True when written"""
+        if not self.enabled:
+            return False
+        now = time.monotonic()
+        if self._last_dump is None:
+            self._last_dump = now
+            return False
+        if now - self._last_dump < every:
+            return False
+        self._last_dump = now
+        if path.endswith(".json"):
+            self.dump_json(path)
+        else:
+            self.dump_csv(path)
+        return True
+
+
+class StartupTimer:
+    """
+    Milestones of a cold start (imports done, first frame shown, tracker ready, first hand,
+    first gesture), each recorded once in seconds since t0 (default: construction). Pass
+    the time.perf_counter() taken before the heavy imports to include them.
+    """
+
+    def __init__(self, t0=None):
+        self.t0 = time.perf_counter() if t0 is None else t0
+        self.marks = {}
+
+    def mark(self, name, when=None):
+        """Record `name` the first time only; returns True when this call recorded it"""
+        if name in self.marks:
+            return False
+        self.marks[name] = (time.perf_counter() if when is None else when) - self.t0
+        return True
+
+    def get(self, name):
+        return self.marks.get(name)
+
+    def report(self):
+        return ", ".join(f"{name} {sec * 1000:.0f} ms" for name, sec in self.marks.items())
+
+
+# shared disabled instance used as the default by instrumented classes
+NULL_PROFILER = Profiler(enabled=False)
@@ -0,0 +1,366 @@
+# src/core/session.py
+import time
+
+import cv2
+import numpy as np
+
+from core.controller import GestureController
+from core.draw_engine import DrawEngine
+from core.profiler import NULL_PROFILER
+from gestures.gesture_engine import F, GestureEngine, default_rules
+from ui.app_ui import (PALETTE, BRUSH_BUTTON, ERASER_BUTTON, SAVE_BUTTON, toolbar_rects,
+                       draw_debug_overlay, UiLayer)
+
+STAGES = ("tracker", "gestures", "draw_update", "draw", "overlay")
+ZOOM_DRAG = 200     # pointer pixels of vertical drag per 2x zoom (world canvas)
+HOVER, UP_COUNT = F['hover'], F['up_count']
+
+
+# smoothing helpers
+def lerp(a,b,t): return a + (b-a)*t
+
+def smooth_point_deque(buffer, point, mix=0.65):
+    if point is None:
+        return None
+    buffer.append(point)
+    pts = list(buffer)
+    n = len(pts)
+    if n==0: return point
+    weights = [i+1 for i in range(n)]
+    total = sum(weights)
+    avg_x = int(sum(p[0]*w for p,w in zip(pts,weights))/total)
+    avg_y = int(sum(p[1]*w for p,w in zip(pts,weights))/total)
+    last_x, last_y = pts[-1]
+    sx = int(lerp(avg_x,last_x,mix)); sy = int(lerp(avg_y,last_y,mix))
+    return (sx,sy)
+
+
+class PointerSmoother:
+    """smooth_point_deque() for every hand slot in one pass: (hands, 2) points in and out"""
+
+    def __init__(self, hands=1, window=8, mix=0.65):
+        self.window = window
+        self.mix = mix
+        self.buffer = np.zeros((hands, window, 2))     # newest sample last
+        self.count = np.zeros(hands, np.intp)
+        self.age = np.arange(window)[::-1]             # 0 = newest
+
+    def reset(self, slots=None):
+        self.count[slice(None) if slots is None else slots] = 0
+
+    def __call__(self, points, valid):
+        """valid: (hands,) bool, slots without a point keep their buffer (rows unspecified)"""
+        buf = self.buffer
+        if valid.all():
+            buf[:, :-1] = buf[:, 1:]
+            buf[:, -1] = points
+            np.minimum(self.count + 1, self.window, out=self.count)
+        else:
+            buf[valid] = np.roll(buf[valid], -1, axis=1)
+            buf[valid, -1] = points[valid]
+            self.count[valid] = np.minimum(self.count[valid] + 1, self.window)
+        # weights 1..n from the oldest of the last n samples to the newest
+        w = np.maximum(self.count[:, None] - self.age[None], 0).astype(np.float64)
+        total = np.maximum(w.sum(axis=1, keepdims=True), 1)
+        avg = np.trunc((buf * w[..., None]).sum(axis=1) / total)
+        return np.trunc(lerp(avg, buf[:, -1], self.mix)).astype(np.int32)
+
+
+class PaintSession:
+    """
+    Everything the painter does with one frame's landmarks: pointer smoothing, pinch /
+    fist / palm / V-sign / toolbar-hover gestures (GestureEngine), GestureController, DrawEngine updates
+    and rendering. No camera and no window, and all hold timers run on the frame
+    timestamps, so a live loop and a replayed recording behave the same.
+
+    step() returns the rendered frame. With a core.profiler.Profiler each step records
+    the STAGES timings.
+    pointer_smoothing: the extra weighted average on the pointer; None = only when the
+    tracker has no landmark filter (the filter already smooths the index tip).
+    min_distance / simplify_tolerance configure the default DrawEngine's stroke ingest
+    (core.simplify); 0 stores every pointer sample.
+    Gestures are a gestures.gesture_engine rule table: default_rules() built from the
+    hold / threshold arguments (a pinch ends past pinch_release px, default 1.25x
+    pinch_threshold), or `rules` to replace it.
+    With a world canvas (DrawEngine(world=True)) the pan / zoom gestures move its
+    viewport by the pointer's drag and suspend drawing and erasing meanwhile.
+    hands: hand slots (default: the tracker's maxHands). Each hand the tracker reports
+    (by its id, gestures.hand_identity) keeps a slot while it is seen, with its own
+    gesture timers, mode, tool, color (slot k starts with PALETTE[k]) and stroke; the
+    gestures and modes of all slots are evaluated together. Undo (fist), the V-sign
+    toggle and saving act on the whole drawing. active_tool / current_color /
+    pointer_pos / mode are those of slot 0.
+    """
+
+    def __init__(self, tracker, drawer=None, width=1280, height=720, hover_delay=0.5,
+                 fist_hold=0.4, erase_cooldown=0.8, pinch_hold=0.05, pinch_threshold=45,
+                 erase_radius=25, pointer_radius=7, help_duration=3.0, safe_mode=True,
+                 debug=True, on_save=None, profiler=None, pointer_smoothing=None,
+                 min_distance=2.0, simplify_tolerance=1.0, pinch_release=None, rules=None,
+                 hands=None):
+        self.tracker = tracker
+        if drawer is None:
+            # stroke segments stay shorter than the eraser so erase_at always hits a point
+            drawer = DrawEngine(stroke_thickness=6, min_distance=min_distance,
+                                simplify_tolerance=simplify_tolerance, max_segment=erase_radius)
+        self.drawer = drawer
+        if hands is None:
+            hands = getattr(tracker, "maxHands", 1)
+        self.hands = hands
+        self.controller = GestureController(hands)
+        self.width, self.height = width, height
+        self.hover_delay = hover_delay
+        self.fist_hold = fist_hold
+        self.erase_cooldown = erase_cooldown
+        self.pinch_hold = pinch_hold
+        self.pinch_threshold = pinch_threshold
+        self.erase_radius = erase_radius
+        self.pointer_radius = pointer_radius
+        self.help_duration = help_duration
+        self.safe_mode = safe_mode
+        self.debug = debug
+        self.on_save = on_save
+        if pointer_smoothing is None:
+            pointer_smoothing = getattr(tracker, "filter", None) is None
+        self.pointer_smoothing = pointer_smoothing
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self.rects = toolbar_rects(width, height)
+        self.ui = UiLayer(width, height, self.rects)
+        if rules is None:
+            rules = default_rules(pinch_threshold, pinch_release, pinch_hold, fist_hold,
+                                  erase_cooldown, hover_delay)
+        self.engine = GestureEngine(rules, self.rects, hands=hands)
+
+        # runtime state
+        self.gesture_on = True
+        self.hover_highlight = None
+        self.hover_selected_index = None
+        self.smoother = PointerSmoother(hands, window=8, mix=0.65)
+        self.slot_ids = np.full(hands, -1)          # tracker hand id per slot, -1 = free
+        self.pointers = [None] * hands
+        self.pointer_pos = None
+        self.start_time = None
+        self.tools = ["BRUSH"] * hands
+        self.colors = [PALETTE[k % len(PALETTE)] for k in range(hands)]
+        self.drawer.change_color(self.current_color, record=False)
+        self.mode = "STOP"
+        self.state = {}
+        self._save_requested = False
+        self._nav = None    # (gesture, slot, anchor, last pointer) while panning / zooming
+        self._lifted = []   # ids of hands gone since the last draw update
+        self._last_assignment = (np.zeros(0, np.int32), np.full(hands, -1))
+
+    @property
+    def active_tool(self):
+        return self.tools[0]
+
+    @active_tool.setter
+    def active_tool(self, tool):
+        self.tools[0] = tool
+
+    @property
+    def current_color(self):
+        return self.colors[0]
+
+    @current_color.setter
+    def current_color(self, color):
+        self.colors[0] = color
+
+    # function to set active tool/color when hover selection triggers
+    def apply_hover_selection(self, sel, slot=0):
+        if sel is None: return
+        if 0 <= sel <= 7:
+            self.colors[slot] = PALETTE[sel]
+            if self.hands == 1:
+                self.drawer.change_color(self.current_color)
+            self.tools[slot] = "BRUSH"
+            self.hover_selected_index = sel
+        elif sel == BRUSH_BUTTON:
+            self.tools[slot] = "BRUSH"
+        elif sel == ERASER_BUTTON:
+            self.tools[slot] = "ERASER"
+        elif sel == SAVE_BUTTON:
+            self._save_requested = True
+
+    def step(self, image, landmarks=None, handedness=None, scores=None, timestamp=None, copy=True):
+        """
+        Process one frame; image is drawn on in place when copy=False.
+        landmarks=None uses what the tracker already holds (e.g. after findHands).
+        """
+        now_t = time.perf_counter() if timestamp is None else timestamp
+        if self.start_time is None:
+            self.start_time = now_t
+        prof = self.profiler
+
+        with prof.stage("tracker"):
+            if landmarks is not None:
+                self.tracker.set_landmarks(landmarks, handedness, scores, timestamp=now_t)
+            features = self.tracker.features(image)
+            tips = self.tracker.pointers(image)
+            rows = self._assign_slots(self.tracker.ids)
+
+        with prof.stage("gestures"):
+            modes, erase_at = self._gestures(features, tips, rows, now_t)
+
+        drawer = self.drawer
+        with prof.stage("draw_update"):
+            if self.hands == 1:
+                self._lifted.clear()
+                if erase_at[0] is not None:
+                    drawer.erase_at(erase_at[0], self.erase_radius)
+                elif self.active_tool == "BRUSH":
+                    if modes[0] == "DRAW":
+                        drawer.update(self.pointer_pos, "DRAW")
+                    elif modes[0] == "STOP":
+                        drawer.update(None, "STOP")
+            else:
+                self._draw_hands(modes, erase_at)
+
+        with prof.stage("draw"):
+            frame = image.copy() if copy else image
+            for point in erase_at:
+                if point is not None:
+                    cv2.circle(frame, point, 18, (20,20,20), -1)
+            rendered = drawer.draw(frame)
+        if self._save_requested:
+            self._save_requested = False
+            if self.on_save is not None:
+                self.on_save(rendered.copy())
+
+        with prof.stage("overlay"):
+            for slot, point in enumerate(self.pointers):
+                if point:
+                    cv2.circle(rendered, point, self.pointer_radius, (255,255,255), 2)
+                    if self.hands > 1:
+                        cv2.circle(rendered, point, max(1, self.pointer_radius - 3), self.colors[slot], -1)
+            self.ui.draw_toolbar(rendered, drawer.stroke_color if self.hands == 1 else self.current_color,
+                                 self.active_tool,
+                                 highlight_index=self.hover_highlight)
+            if now_t - self.start_time < self.help_duration:
+                self.ui.draw_help(rendered)
+            if self.debug:
+                s = self.state
+                draw_debug_overlay(rendered, s["hand"], s["pinch"], s["palm_open"], s["fist"], self.mode,
+                                   self.gesture_on, self.hover_highlight)
+        return rendered
+
+    def _assign_slots(self, ids):
+        """
+        rows[s]: the tracker row of slot s's hand (-1: none). Hands keep their slot; new
+        hands take free slots in row order, extra hands beyond `hands` are ignored.
+        """
+        slot_ids, ids = self.slot_ids, np.asarray(ids)
+        last_ids, last_rows = self._last_assignment
+        if len(ids) == len(last_ids) and (ids == last_ids).all():
+            return last_rows     # the same hands in the same rows as last frame
+        match = slot_ids[:, None] == ids[None]      # (hands, n)
+        held = match.any(axis=1)
+        rows = np.where(held, match.argmax(axis=1), -1) if len(ids) else np.full(self.hands, -1)
+        gone = ~held & (slot_ids >= 0)
+        if gone.any():
+            self._lifted.extend(int(i) for i in slot_ids[gone])
+            slot_ids[gone] = -1
+            self.engine.reset(gone)
+            self.smoother.reset(gone)
+        free = np.flatnonzero(~held)
+        new = np.flatnonzero(~match.any(axis=0))[:len(free)]
+        free = free[:len(new)]
+        rows[free] = new
+        slot_ids[free] = ids[new]
+        self._last_assignment = (ids, rows)
+        return rows
+
+    def _draw_hands(self, modes, erase_at):
+        """Drawer updates of several hands: each slot continues / ends its own stroke"""
+        drawer = self.drawer
+        for hand in self._lifted:
+            drawer.update(None, "STOP", hand=hand)
+        self._lifted.clear()
+        for slot in np.flatnonzero(self.slot_ids >= 0):
+            hand = int(self.slot_ids[slot])
+            if erase_at[slot] is not None:
+                drawer.erase_at(erase_at[slot], self.erase_radius)
+            elif self.tools[slot] == "BRUSH":
+                if modes[slot] == "DRAW" and self.pointers[slot]:
+                    drawer.update(self.pointers[slot], "DRAW", hand=hand, color=self.colors[slot])
+                elif modes[slot] == "STOP":
+                    drawer.update(None, "STOP", hand=hand)
+
+    def _gestures(self, features, tips, rows, now_t):
+        """
+        Gesture logic of the painter for every slot at once; returns the controller
+        modes (hands,) and per slot the point to erase at (or None)
+        """
+        have = rows >= 0
+        raw = tips[np.maximum(rows, 0)].astype(np.float64) if len(tips) else np.zeros((self.hands, 2))
+
+        # pointer smoothing
+        smoothed = self.smoother(raw, have) if self.pointer_smoothing else raw.astype(np.int32)
+        for slot in range(self.hands):
+            if have[slot]:
+                self.pointers[slot] = tuple(smoothed[slot].tolist())
+            elif self.safe_mode:
+                self.pointers[slot] = None
+        self.pointer_pos = self.pointers[0]
+
+        # one feature row per slot, every gesture rule of every hand in one pass (gestures.gesture_engine)
+        engine = self.engine
+        v = engine.hand_features(features, rows, enabled=self.gesture_on,
+                                 pointers=np.where(have[:, None], raw, np.nan))
+        engine.update(v, now_t)
+
+        fists = engine.did_fire("fist", None)
+        if fists.any():
+            # fist (undo)
+            self.drawer.update(None, "ERASE")
+        hovered = v[:, HOVER].astype(int)
+        fired = engine.did_fire("hover", None)
+        showing = engine.is_pending("hover", None) | engine.is_active("hover", None)
+        for slot in np.flatnonzero(fired):
+            self.apply_hover_selection(int(hovered[slot]), slot)
+        showing &= ~fired
+        self.hover_highlight = int(hovered[showing.argmax()]) if showing.any() else None
+        # V sign toggles gesture control
+        if engine.did_fire("v_sign", None).any():
+            self.gesture_on = not self.gesture_on
+        is_pinch = engine.is_active("pinch", None)
+        is_palm_open = engine.is_active("palm", None)
+        if self._navigate(engine, raw, have):
+            is_pinch = is_palm_open = np.zeros(self.hands, bool)
+
+        # controller mapping
+        modes = self.controller.update_modes(is_pinch & self.gesture_on, is_palm_open & self.gesture_on,
+                                             up_count=v[:, UP_COUNT])
+        self.mode = self.controller.mode
+        self.state = {"hand": bool(have[0]), "pinch": bool(is_pinch[0]), "palm_open": bool(is_palm_open[0]),
+                      "fist": bool(fists[0])}
+
+        erase_at = [None] * self.hands
+        if self._nav is None:
+            for slot, point in enumerate(self.pointers):
+                if point and (self.tools[slot] == "ERASER"
+                              or (self.tools[slot] == "BRUSH" and modes[slot] == "ERASE")):
+                    erase_at[slot] = point
+        return modes, erase_at
+
+    def _navigate(self, engine, raw, have):
+        """Pan / zoom the world canvas by the drag of the first hand doing so; True while navigating"""
+        viewport = getattr(self.drawer, "viewport", None)
+        pan, zoom = engine.is_active("pan", None), engine.is_active("zoom", None)
+        slot = int((pan | zoom).argmax())
+        nav = "pan" if pan[slot] else "zoom" if zoom[slot] else None
+        point = tuple(raw[slot].astype(int).tolist()) if have[slot] else None
+        if viewport is None or nav is None or not self.gesture_on or point is None:
+            self._nav = None
+            return False
+        if self._nav is None or self._nav[:2] != (nav, slot):
+            self._nav = (nav, slot, point, point)
+            return True
+        _, _, anchor, last = self._nav
+        if nav == "pan":
+            viewport.pan(point[0] - last[0], point[1] - last[1])
+        else:
+            # dragging up zooms in around where the gesture started
+            viewport.zoom_at(2.0 ** ((last[1] - point[1]) / ZOOM_DRAG), anchor)
+        self._nav = (nav, slot, anchor, point)
+        return True
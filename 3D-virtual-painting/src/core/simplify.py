@@ -0,0 +1,127 @@
+# src/core/simplify.py
+import numpy as np
+
+MAX_RUN = 256  # raw points one streamed segment may stand for before it is committed anyway
+
+
+def segment_distances(points, a, b):
+    """Distance of each of the Nx2 points to the segment a-b"""
+    p = np.asarray(points, np.float64).reshape(-1, 2)
+    a = np.asarray(a, np.float64)
+    ab = np.asarray(b, np.float64) - a
+    denom = float(ab @ ab)
+    if denom == 0.0:
+        return np.hypot(p[:, 0] - a[0], p[:, 1] - a[1])
+    t = np.clip((p - a) @ ab / denom, 0.0, 1.0)
+    d = p - (a + t[:, None] * ab)
+    return np.hypot(d[:, 0], d[:, 1])
+
+
+def rdp_mask(points, tolerance, max_length=None):
+    """
+    Ramer-Douglas-Peucker: boolean mask of the Nx2 points to keep so that every
+    dropped point lies within `tolerance` pixels of the simplified polyline.
+    Endpoints are always kept; segments longer than max_length are split further.
+    """
+    pts = np.asarray(points, np.float64).reshape(-1, 2)
+    keep = np.zeros(len(pts), bool)
+    if len(pts) == 0:
+        return keep
+    keep[0] = keep[-1] = True
+    stack = [(0, len(pts) - 1)]
+    while stack:
+        s, e = stack.pop()
+        if e - s < 2:
+            continue
+        d = segment_distances(pts[s + 1:e], pts[s], pts[e])
+        k = int(d.argmax())
+        if d[k] > tolerance:
+            k += s + 1
+        elif max_length is not None and np.hypot(*(pts[e] - pts[s])) > max_length:
+            k = (s + e) // 2
+        else:
+            continue
+        keep[k] = True
+        stack.append((s, k))
+        stack.append((k, e))
+    return keep
+
+
+def max_deviation(raw, simplified):
+    """Largest distance (px) of a raw point to the simplified Nx2 polyline"""
+    raw = np.asarray(raw, np.float64).reshape(-1, 2)
+    simplified = np.asarray(simplified, np.float64).reshape(-1, 2)
+    if len(raw) == 0:
+        return 0.0
+    if len(simplified) == 1:
+        return float(segment_distances(raw, simplified[0], simplified[0]).max())
+    best = np.full(len(raw), np.inf)
+    for a, b in zip(simplified[:-1], simplified[1:]):
+        np.minimum(best, segment_distances(raw, a, b), out=best)
+    return float(best.max())
+
+
+class StrokeSimplifier:
+    """
+    Ingest filter for the open stroke.
+
+    feed(point) decides what the stroke store does with the next pointer sample:
+      None            drop it (closer than min_distance to the last stored point)
+      "append"        append it
+      "move"          replace the last stored point with it
+    Streaming simplification keeps an anchor (the last committed point) and a floating
+    end point that follows the pointer: while the segment anchor -> pointer still passes
+    within `tolerance` of every raw point since the anchor, the float is moved instead
+    of a point being added. No stored segment grows longer than max_length, so the
+    point-based eraser (StrokeStore.erase) still finds a point wherever it crosses the
+    stroke. finish() runs a full RDP pass over the stroke's raw points and returns the
+    points the finished stroke should keep (or None if the streamed points are already
+    as short).
+    """
+
+    def __init__(self, min_distance=2.0, tolerance=1.0, max_length=20.0):
+        self.min_distance = min_distance
+        self.tolerance = tolerance
+        self.max_length = max_length
+        self.reset()
+
+    @property
+    def enabled(self):
+        return self.min_distance > 0 or self.tolerance > 0
+
+    def reset(self):
+        self.raw = []   # every accepted sample of the open stroke
+        self._run = 0   # index in raw of the current anchor
+        self.n_stored = 0
+
+    def feed(self, point):
+        raw = self.raw
+        if raw:
+            last = raw[-1]
+            dx, dy = point[0] - last[0], point[1] - last[1]
+            if dx * dx + dy * dy < self.min_distance * self.min_distance:
+                return None
+        raw.append((int(point[0]), int(point[1])))
+        if self.tolerance <= 0 or len(raw) - self._run <= 2:
+            self.n_stored += 1
+            return "append"
+        anchor = raw[self._run]
+        between = raw[self._run + 1:-1]  # samples the new segment must still cover
+        if (len(between) < MAX_RUN
+                and (point[0] - anchor[0]) ** 2 + (point[1] - anchor[1]) ** 2 <= self.max_length ** 2
+                and segment_distances(between, anchor, raw[-1]).max() <= self.tolerance):
+            return "move"
+        # the previous float becomes the new anchor and the pointer floats on from it
+        self._run = len(raw) - 2
+        self.n_stored += 1
+        return "append"
+
+    def finish(self):
+        """Points (Nx2 int32) for the finished stroke, or None to keep what was streamed"""
+        if self.tolerance <= 0 or len(self.raw) < 3:
+            return None
+        pts = np.array(self.raw, np.int32)
+        keep = rdp_mask(pts, self.tolerance, self.max_length)
+        if keep.sum() >= self.n_stored:
+            return None
+        return pts[keep]
@@ -0,0 +1,83 @@
+# src/core/spatial_index.py
+import numpy as np
+
+_OFFSET = 1 << 16   # keeps cell coordinates of int16 points non-negative
+_STRIDE = 1 << 17
+
+
+class SpatialGrid:
+    """
+    Uniform grid over point ids.
+    Bulk builds go into a sorted (CSR) table built with numpy; single points
+    added afterwards sit in a small dict until the next build, and add_many()
+    batches go into sorted blocks merged like a binary counter, so there are
+    O(log n) of them. Removal is left to the caller (ids of dead points are
+    filtered out at query time).
+    """
+
+    def __init__(self, cell_size=32):
+        self.cell_size = cell_size
+        self._keys = np.empty(0, np.int64)        # sorted unique cell keys
+        self._offsets = np.zeros(1, np.int64)     # ids of _keys[k] are _ids[_offsets[k]:_offsets[k+1]]
+        self._ids = np.empty(0, np.int64)
+        self._recent = {}                         # cell key -> [ids] added since last build
+        self._blocks = []                         # [(sorted keys, ids)] from add_many, sizes decreasing
+        self.n_recent = 0
+
+    def _cell(self, v):
+        return (np.asarray(v, np.int64) // self.cell_size) + _OFFSET
+
+    def build(self, xs, ys, ids):
+        """Replace the whole index with the given points"""
+        keys = self._cell(xs) * _STRIDE + self._cell(ys)
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        self._ids = np.asarray(ids, np.int64)[order]
+        self._keys, first = np.unique(keys, return_index=True)
+        self._offsets = np.append(first, len(keys)).astype(np.int64)
+        self._recent = {}
+        self._blocks = []
+        self.n_recent = 0
+
+    def add(self, pid, x, y):
+        key = (int(x) // self.cell_size + _OFFSET) * _STRIDE + int(y) // self.cell_size + _OFFSET
+        self._recent.setdefault(key, []).append(pid)
+        self.n_recent += 1
+
+    def add_many(self, ids, xs, ys):
+        """add() for many points as one sorted block"""
+        if len(ids) == 0:
+            return
+        keys = self._cell(xs) * _STRIDE + self._cell(ys)
+        ids = np.asarray(ids, np.int64)
+        self.n_recent += len(ids)
+        while self._blocks and len(self._blocks[-1][0]) <= len(keys):
+            k, i = self._blocks.pop()
+            keys, ids = np.concatenate((k, keys)), np.concatenate((i, ids))
+        order = np.argsort(keys, kind="stable")
+        self._blocks.append((keys[order], ids[order]))
+
+    def query_rect(self, x0, y0, x1, y1):
+        """Ids of points in cells overlapping the inclusive rect [x0, x1] x [y0, y1]"""
+        cx = np.arange(self._cell(x0), self._cell(x1) + 1)
+        cy = np.arange(self._cell(y0), self._cell(y1) + 1)
+        keys = (cx[:, None] * _STRIDE + cy[None, :]).ravel()
+        parts = []
+        if len(self._keys):
+            pos = np.minimum(np.searchsorted(self._keys, keys), len(self._keys) - 1)
+            for k in pos[self._keys[pos] == keys].tolist():
+                parts.append(self._ids[self._offsets[k]:self._offsets[k + 1]])
+        for bkeys, bids in self._blocks:
+            lo = np.searchsorted(bkeys, keys, "left")
+            hi = np.searchsorted(bkeys, keys, "right")
+            for a, b in zip(lo.tolist(), hi.tolist()):
+                if b > a:
+                    parts.append(bids[a:b])
+        if self._recent:
+            for key in keys.tolist():
+                ids = self._recent.get(key)
+                if ids:
+                    parts.append(np.asarray(ids, np.int64))
+        if not parts:
+            return np.empty(0, np.int64)
+        return np.concatenate(parts)
@@ -0,0 +1,436 @@
+# src/core/stroke_store.py
+import numpy as np
+
+from core.spatial_index import SpatialGrid
+
+GRID_CELL = 32          # spatial index cell size (pixels)
+BULK_REINDEX = 256      # extend() of more points than this rebuilds the index in one numpy pass
+COMPACT_MIN_DEAD = 4096 # compact once this many points are dead and they outnumber live ones
+
+
+class StrokeStore:
+    """
+    Struct-of-arrays stroke storage.
+    Points live in growable int16 x/y buffers; stroke i owns points
+    [starts[i], starts[i + 1]) and a style index into `palette`,
+    a list of (color, thickness) pairs shared by all strokes.
+    Like the old list-of-lists, the last stroke is the open one and may be empty.
+
+    Erased/undone points are tombstoned in `alive` rather than moved, so point ids
+    stay stable for the spatial index; every stroke is a live prefix followed by
+    dead points. compact() drops the dead points once they dominate.
+    """
+
+    def __init__(self, capacity=1024):
+        self.xs = np.empty(capacity, np.int16)
+        self.ys = np.empty(capacity, np.int16)
+        self.alive = np.zeros(capacity, bool)
+        self.n_points = 0
+        self.n_dead = 0
+        self.starts = np.zeros(64, np.int64)
+        self.styles = np.zeros(64, np.uint16)
+        self.n_strokes = 1  # one open, empty stroke
+        self.palette = []   # [(color, thickness), ...]
+        self._palette_index = {}
+        self._last_style = (None, None)  # ((color, thickness) as passed, index) fast path
+        self.index = SpatialGrid(GRID_CELL)
+        self.max_segment = 0   # longest segment ever appended, bounds region queries
+        self.generation = 0    # bumped whenever point ids change (compaction)
+
+    # ---------------- building ----------------
+    def style_index(self, color, thickness):
+        """Palette index of (color, thickness), adding it if new"""
+        key = (tuple(int(c) for c in color), int(thickness))
+        idx = self._palette_index.get(key)
+        if idx is None:
+            idx = len(self.palette)
+            self.palette.append(key)
+            self._palette_index[key] = idx
+        return idx
+
+    def append(self, x, y, color, thickness):
+        """Append a point to the open stroke; a style change starts a new stroke"""
+        key, style = self._last_style
+        if key != (color, thickness):
+            style = self.style_index(color, thickness)
+            self._last_style = ((color, thickness), style)
+        last = self.n_strokes - 1
+        if self.styles[last] != style:
+            if self.n_points > self.starts[last]:
+                self._new_stroke()
+            self.styles[self.n_strokes - 1] = style
+        n = self.n_points
+        if n == len(self.xs):
+            self._grow_points(n + 1)
+        if n > self.starts[self.n_strokes - 1]:
+            seg = max(abs(int(x) - int(self.xs[n - 1])), abs(int(y) - int(self.ys[n - 1])))
+            self.max_segment = max(self.max_segment, seg)
+        self.xs[n] = x
+        self.ys[n] = y
+        self.alive[n] = True
+        self.n_points = n + 1
+        self.index.add(n, x, y)
+
+    def extend(self, xs, ys, color, thickness, index=True):
+        """
+        Append many points to the open stroke in one copy.
+        index=False leaves the spatial index stale; call reindex() before querying.
+        """
+        xs, ys = np.asarray(xs), np.asarray(ys)
+        if len(xs) == 0:
+            return
+        self.append(xs[0], ys[0], color, thickness)
+        n, s = len(xs) - 1, self.n_points
+        if s + n > len(self.xs):
+            self._grow_points(s + n)
+        self.xs[s:s + n] = xs[1:]
+        self.ys[s:s + n] = ys[1:]
+        self.alive[s:s + n] = True
+        self.n_points += n
+        if n:
+            steps = np.maximum(np.abs(np.diff(xs.astype(np.int64))), np.abs(np.diff(ys.astype(np.int64))))
+            self.max_segment = max(self.max_segment, int(steps.max()))
+        if index:
+            if n > BULK_REINDEX:
+                self.reindex()
+            else:
+                for pid in range(s, s + n):
+                    self.index.add(pid, self.xs[pid], self.ys[pid])
+
+    def move_last(self, x, y):
+        """Move the last point of the open stroke (the old index entry is left stale)"""
+        n = self.n_points
+        if n - 1 > self.starts[self.n_strokes - 1]:
+            seg = max(abs(int(x) - int(self.xs[n - 2])), abs(int(y) - int(self.ys[n - 2])))
+            self.max_segment = max(self.max_segment, seg)
+        self.xs[n - 1] = x
+        self.ys[n - 1] = y
+        self.index.add(n - 1, x, y)
+
+    def replace_open(self, xs, ys):
+        """Replace the points of the open stroke (e.g. with a simplified outline)"""
+        s = int(self.starts[self.n_strokes - 1])
+        n = len(xs)
+        if s + n > len(self.xs):
+            self._grow_points(s + n)
+        self.xs[s:s + n] = xs
+        self.ys[s:s + n] = ys
+        self.alive[s:s + n] = True
+        self.alive[s + n:self.n_points] = False
+        self.n_points = s + n
+        for pid in range(s, s + n):
+            self.index.add(pid, self.xs[pid], self.ys[pid])
+
+    def end_stroke(self):
+        """Close the open stroke (no-op if it is still empty)"""
+        if self.stroke_len(self.n_strokes - 1) > 0:
+            self._new_stroke()
+
+    def remove_stroke(self, i):
+        """Tombstone all points of stroke i. Returns their ids"""
+        s, e = self.stroke_range(i)
+        ids = np.flatnonzero(self.alive[s:e]) + s
+        self.alive[ids] = False
+        self.n_dead += len(ids)
+        return ids
+
+    def pop_last(self):
+        """Undo: remove the most recent stroke that still has live points. Returns its ids or None"""
+        for i in range(self.n_strokes - 1, -1, -1):
+            s, e = self.stroke_range(i)
+            if e > s and self.alive[s]:
+                ids = self.remove_stroke(i)
+                self.end_stroke()  # never keep appending to a stroke with dead points
+                return ids
+        return None
+
+    def erase(self, x, y, radius):
+        """
+        Tombstone live points within radius of (x, y), splitting strokes at the gap.
+        Returns the erased ids (empty array if nothing was hit).
+        """
+        ids = self.query_radius(x, y, radius)
+        if len(ids):
+            self.erase_ids(ids)
+        return ids
+
+    def erase_ids(self, ids):
+        """
+        Tombstone the given live points; each live run that follows a dead gap becomes
+        a stroke of its own. Returns the point ids where new strokes now start.
+        """
+        self.end_stroke()
+        self.alive[ids] = False
+        self.n_dead += len(ids)
+
+        owners = np.unique(self.stroke_of(ids))
+        ends = np.append(self.starts[:self.n_strokes], self.n_points)
+        s, lens = self.starts[owners], ends[owners + 1] - self.starts[owners]
+        # every point of the owning strokes, with its stroke's first point
+        first = np.repeat(s, lens)
+        pts = first + np.arange(lens.sum()) - np.repeat(np.cumsum(lens) - lens, lens)
+        pts = pts[pts > first]
+        cuts = pts[self.alive[pts] & ~self.alive[pts - 1]]
+        if len(cuts):
+            at = self.stroke_of(cuts) + 1
+            n = self.n_strokes
+            self.starts = np.insert(self.starts[:n], at, cuts)
+            self.styles = np.insert(self.styles[:n], at, self.styles[at - 1])
+            self.n_strokes = n + len(cuts)
+        return cuts
+
+    def unsplit(self, cuts):
+        """Join the strokes erase_ids() split at `cuts` back together"""
+        if len(cuts) == 0:
+            return
+        n = self.n_strokes
+        keep = ~np.isin(self.starts[:n], cuts)
+        self.starts = self.starts[:n][keep]
+        self.styles = self.styles[:n][keep]
+        self.n_strokes = len(self.starts)
+
+    def restore(self, ids):
+        """Bring tombstoned points back (the inverse of remove_stroke/erase, stroke splits kept)"""
+        ids = np.asarray(ids, np.int64)
+        ids = ids[~self.alive[ids]]
+        self.alive[ids] = True
+        self.n_dead -= len(ids)
+
+    def release(self, boundary):
+        """Tombstone every live point below id `boundary` (e.g. once it is flattened). Returns the count"""
+        alive = self.alive[:boundary]
+        n = int(np.count_nonzero(alive))
+        alive[:] = False
+        self.n_dead += n
+        return n
+
+    def compact(self, pinned=None):
+        """
+        Physically drop dead points and fully dead strokes; point ids change.
+        pinned: ids of dead points to keep (still dead), e.g. ones undo may restore.
+        Returns the old -> new id map (-1 for dropped points).
+        """
+        n, k = self.n_points, self.n_strokes
+        keep = self.alive[:n].copy()
+        if pinned is not None and len(pinned):
+            keep[pinned] = True
+        csum = np.concatenate(([0], np.cumsum(keep)))
+        ends = np.append(self.starts[1:k], n)
+        counts = csum[ends] - csum[self.starts[:k]]
+        live = counts > 0
+        live[-1] = True  # the open stroke stays, even when empty
+        n_keep = int(csum[-1])
+        self.xs[:n_keep] = self.xs[:n][keep]
+        self.ys[:n_keep] = self.ys[:n][keep]
+        self.alive[:n_keep] = self.alive[:n][keep]
+        self.alive[n_keep:n] = False
+        self.n_dead = n_keep - int(np.count_nonzero(self.alive[:n_keep]))
+        self.n_points = n_keep
+        counts = counts[live]
+        self.styles = self.styles[:k][live].copy()
+        self.starts = np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.int64)
+        self.n_strokes = len(counts)
+        self.generation += 1
+        self.reindex()
+        return np.where(keep, csum[:-1], -1)
+
+    def maybe_compact(self, history=None):
+        """
+        Compact when dead points dominate; returns True if ids changed.
+        Dead points a core.history.History may still restore are kept and its ids remapped.
+        """
+        dead = self.n_dead - (history.n_pinned if history is not None else 0)
+        if dead >= COMPACT_MIN_DEAD and 2 * dead > self.n_points:
+            remap = self.compact(history.pinned() if history is not None else None)
+            if history is not None:
+                history.remap(remap)
+            return True
+        return False
+
+    def reindex(self):
+        """Rebuild the spatial index from all live points"""
+        ids = np.flatnonzero(self.alive[:self.n_points])
+        self.index.build(self.xs[ids], self.ys[ids], ids)
+
+    # ---------------- reading ----------------
+    def __len__(self):
+        return self.n_strokes
+
+    @property
+    def n_alive(self):
+        return self.n_points - self.n_dead
+
+    def stroke_range(self, i):
+        if i < 0:
+            i += self.n_strokes
+        end = self.starts[i + 1] if i + 1 < self.n_strokes else self.n_points
+        return int(self.starts[i]), int(end)
+
+    def stroke_len(self, i):
+        """Physical length of stroke i, dead points included"""
+        s, e = self.stroke_range(i)
+        return e - s
+
+    def stroke_of(self, ids):
+        """Stroke index owning each point id"""
+        return np.searchsorted(self.starts[:self.n_strokes], ids, side="right") - 1
+
+    def stroke_points(self, i):
+        """Nx2 int32 live points of stroke i"""
+        s, e = self.stroke_range(i)
+        keep = self.alive[s:e]
+        return np.column_stack((self.xs[s:e][keep], self.ys[s:e][keep])).astype(np.int32)
+
+    def stroke_style(self, i):
+        return self.palette[self.styles[i]] if self.palette else ((0, 0, 0), 1)
+
+    def live_strokes(self):
+        """Indices of strokes that still have live points"""
+        k = self.n_strokes
+        firsts = self.starts[:k]
+        ends = np.append(self.starts[1:k], self.n_points)
+        return np.flatnonzero((ends > firsts) & self.alive[np.minimum(firsts, max(self.n_points - 1, 0))])
+
+    def runs(self, strokes=None):
+        """Yield (points Nx2 int32, color, thickness) for live strokes (all, or the given indices)"""
+        for i in (self.live_strokes() if strokes is None else strokes):
+            pts = self.stroke_points(i)
+            if len(pts):
+                color, thickness = self.palette[self.styles[i]]
+                yield pts, color, thickness
+
+    def query_radius(self, x, y, radius):
+        """Ids of live points within radius of (x, y)"""
+        cand = self.index.query_rect(x - radius, y - radius, x + radius, y + radius)
+        cand = cand[cand < self.n_points]
+        cand = cand[self.alive[cand]]
+        dx = self.xs[cand].astype(np.int64) - int(x)
+        dy = self.ys[cand].astype(np.int64) - int(y)
+        return np.unique(cand[dx * dx + dy * dy <= radius * radius])
+
+    def strokes_in_rect(self, x0, y0, x1, y1):
+        """Sorted indices of live strokes that may touch the rect"""
+        m = (self.max_segment + 1) // 2 + 1  # a crossing segment has an endpoint this close
+        cand = self.index.query_rect(x0 - m, y0 - m, x1 + m, y1 + m)
+        cand = cand[cand < self.n_points]
+        cand = cand[self.alive[cand]]
+        return np.unique(self.stroke_of(cand))
+
+    def neighbours(self, ids, cuts=()):
+        """
+        Live points sharing a segment with the given ids in their stroke; `cuts` are the
+        splits erase_ids() made after them, so points cut off by erasing the ids still count.
+        """
+        ids = np.asarray(ids, np.int64)
+        prev = ids[ids > 0] - 1
+        prev = prev[self.stroke_of(prev) == self.stroke_of(prev + 1)]
+        nxt = ids[ids < self.n_points - 1] + 1
+        nxt = nxt[(self.stroke_of(nxt) == self.stroke_of(nxt - 1)) | np.isin(nxt, cuts)]
+        out = np.concatenate((prev, nxt))
+        return out[self.alive[out]]
+
+    def bounds(self, ids):
+        """Inclusive (x0, y0, x1, y1) of the given point ids"""
+        xs, ys = self.xs[ids], self.ys[ids]
+        return int(xs.min()), int(ys.min()), int(xs.max()), int(ys.max())
+
+    @property
+    def max_thickness(self):
+        return max((t for _, t in self.palette), default=1)
+
+    def stroke_tuples(self, i):
+        """Stroke i in the legacy [(x, y, color, thickness), ...] form"""
+        pts = self.stroke_points(i)
+        if len(pts) == 0:
+            return []
+        color, thickness = self.palette[self.styles[i]]
+        return [(x, y, color, thickness) for x, y in pts.tolist()]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the numpy buffers"""
+        return (self.xs.nbytes + self.ys.nbytes + self.alive.nbytes
+                + self.starts.nbytes + self.styles.nbytes)
+
+    @classmethod
+    def from_arrays(cls, xs, ys, starts, styles, palette, closed=True):
+        """
+        Build a store in one pass from point arrays, stroke start offsets, per-stroke
+        indices into `palette` ([(color, thickness), ...]). closed=False leaves the last
+        stroke open instead of adding an empty one.
+        """
+        n, k = len(xs), len(starts)
+        store = cls(capacity=max(1024, n))
+        mapping = np.array([store.style_index(c, t) for c, t in palette] or [0], np.int64)
+        store.xs[:n], store.ys[:n] = xs, ys
+        store.alive[:n] = True
+        store.n_points = n
+        n_strokes = k + 1 if closed or k == 0 else k
+        size = max(64, n_strokes)
+        store.starts = np.zeros(size, np.int64)
+        store.styles = np.zeros(size, np.uint16)
+        store.starts[:k] = starts
+        store.styles[:k] = mapping[np.asarray(styles, np.int64)]
+        store.starts[k:n_strokes] = n
+        store.n_strokes = n_strokes
+        if n > 1:
+            steps = np.maximum(np.abs(np.diff(np.asarray(xs, np.int64))),
+                               np.abs(np.diff(np.asarray(ys, np.int64))))
+            steps[np.asarray(starts[1:], np.int64) - 1] = 0  # jumps between strokes
+            store.max_segment = int(steps.max())
+        store.reindex()
+        return store
+
+    @classmethod
+    def from_tuples(cls, strokes):
+        """Build a store from legacy [[(x, y, color, thickness), ...], ...] strokes"""
+        store = cls(capacity=max(1024, sum(len(s) for s in strokes)))
+        for stroke in strokes:
+            for x, y, color, thickness in stroke:
+                store.append(x, y, color, thickness)
+            store.end_stroke()
+        store.reindex()
+        return store
+
+    # ---------------- internals ----------------
+    def _new_stroke(self):
+        if self.n_strokes == len(self.starts):
+            self.starts = np.resize(self.starts, 2 * len(self.starts))
+            self.styles = np.resize(self.styles, 2 * len(self.styles))
+        self.starts[self.n_strokes] = self.n_points
+        self.styles[self.n_strokes] = 0
+        self.n_strokes += 1
+
+    def _grow_points(self, needed):
+        cap = max(needed, 2 * len(self.xs))
+        for name, dtype in (("xs", np.int16), ("ys", np.int16), ("alive", bool)):
+            buf = np.zeros(cap, dtype)
+            buf[:self.n_points] = getattr(self, name)[:self.n_points]
+            setattr(self, name, buf)
+
+
+class StrokesView:
+    """
+    Read-only, list-like view of a StrokeStore in the legacy
+    [[(x, y, color, thickness), ...], ...] shape, for code that iterates drawer.strokes.
+    Strokes whose points were all erased are hidden; the open stroke is always last.
+    """
+
+    def __init__(self, store):
+        self._store = store
+        live = store.live_strokes().tolist()
+        if not live or live[-1] != store.n_strokes - 1:
+            live.append(store.n_strokes - 1)
+        self._order = live
+
+    def __len__(self):
+        return len(self._order)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._store.stroke_tuples(j) for j in self._order[i]]
+        return self._store.stroke_tuples(self._order[i])
+
+    def __iter__(self):
+        for j in self._order:
+            yield self._store.stroke_tuples(j)
@@ -0,0 +1,400 @@
+# src/core/tiled_canvas.py
+import os
+import shutil
+import tempfile
+import weakref
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from core.canvas_layer import GLOW_PAD, glow_composite, group_polylines
+from core.frame_pool import FramePool
+
+TILE_SIZE = 256
+APRON = GLOW_PAD // 2   # neighbour pixels each tile keeps, so its glow needs no other tile
+WORLD_LIMIT = 32000     # stroke points are int16 (core.stroke_store)
+
+
+class Viewport:
+    """
+    World -> screen transform of a TiledCanvas: screen = world * zoom + offset.
+    pan() moves by screen pixels; zoom_at() keeps the world point under `center` in place.
+    """
+
+    def __init__(self, zoom=1.0, offset=(0.0, 0.0), min_zoom=0.125, max_zoom=8.0):
+        self.min_zoom = min_zoom
+        self.max_zoom = max_zoom
+        self.zoom = float(np.clip(zoom, min_zoom, max_zoom))
+        self.ox, self.oy = float(offset[0]), float(offset[1])
+
+    def to_world(self, x, y):
+        return (x - self.ox) / self.zoom, (y - self.oy) / self.zoom
+
+    def to_screen(self, x, y):
+        return x * self.zoom + self.ox, y * self.zoom + self.oy
+
+    def world_point(self, point):
+        """Screen point -> integer world point, within the range strokes can store"""
+        x, y = self.to_world(point[0], point[1])
+        return (int(np.clip(round(x), -WORLD_LIMIT, WORLD_LIMIT)),
+                int(np.clip(round(y), -WORLD_LIMIT, WORLD_LIMIT)))
+
+    def world_length(self, length):
+        """Screen length (brush thickness, eraser radius) -> world pixels, at least 1"""
+        return max(1, int(round(length / self.zoom)))
+
+    def pan(self, dx, dy):
+        self.ox += dx
+        self.oy += dy
+
+    def zoom_at(self, factor, center):
+        cx, cy = center
+        wx, wy = self.to_world(cx, cy)
+        self.zoom = float(np.clip(self.zoom * factor, self.min_zoom, self.max_zoom))
+        self.ox, self.oy = cx - wx * self.zoom, cy - wy * self.zoom
+
+    def world_rect(self, w, h):
+        """World (x0, y0, x1, y1) seen by a w x h screen"""
+        x0, y0 = self.to_world(0, 0)
+        x1, y1 = self.to_world(w, h)
+        return x0, y0, x1, y1
+
+    def reset(self):
+        self.zoom, self.ox, self.oy = 1.0, 0.0, 0.0
+
+
+class ScreenView:
+    """Viewport stand-in of a screen canvas: world coordinates are screen pixels"""
+
+    @staticmethod
+    def world_point(point):
+        return point
+
+    @staticmethod
+    def world_length(length):
+        return length
+
+
+SCREEN_VIEW = ScreenView()
+
+
+class _Tile:
+    """
+    One tile: color/alpha with an APRON border, composite cache of the core only, and
+    halved copies of that cache for zoomed-out views (built on demand, not in nbytes)
+    """
+    __slots__ = ("color", "alpha", "premul", "weight", "mips")
+
+    def __init__(self, size, color=None, alpha=None):
+        side = size + 2 * APRON
+        self.color = np.zeros((side, side, 3), np.uint8) if color is None else color
+        self.alpha = np.zeros((side, side), np.uint8) if alpha is None else alpha
+        self.premul = np.zeros((size, size, 3), np.uint8)
+        self.weight = np.full((size, size, 3), 255, np.uint8)
+        self.mips = {}   # k -> (premul, weight) at 1 / 2**k
+
+    @property
+    def nbytes(self):
+        return self.color.nbytes + self.alpha.nbytes + self.premul.nbytes + self.weight.nbytes
+
+
+class TiledCanvas:
+    """
+    CanvasLayer over an unbounded world: TILE_SIZE square raster tiles, allocated only
+    where strokes are, with the same draw_segment / draw_strokes / redraw_rect / reset /
+    composite interface in world coordinates. composite() blends only the tiles the
+    viewport sees, so its cost follows the screen size, not the drawing size.
+
+    Tiles live in an LRU cache: past max_bytes the least recently used ones that are
+    not on screen are written to spill_dir as PNGs (color + coverage) and dropped,
+    and are read back when drawn on or scrolled into view. spill_dir defaults to a
+    temporary directory removed by close() (or when the canvas is collected).
+    No raster snapshots (DrawEngine rebuilds after undoing a clear) and no frozen base.
+    """
+    base = None
+    supports_snapshot = False
+
+    def __init__(self, viewport=None, tile_size=TILE_SIZE, max_bytes=256 << 20, spill_dir=None,
+                 pool=None):
+        self.viewport = viewport if viewport is not None else Viewport()
+        self.tile_size = tile_size
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self._own_dir = spill_dir is None
+        self.pool = pool if pool is not None else FramePool()
+        self._tiles = OrderedDict()   # (tx, ty) -> _Tile in memory, least recently used first
+        self._spilled = {}            # (tx, ty) -> PNG path
+        self._visible = ()            # tiles composited last frame are not evicted
+        self.nbytes = 0
+        self.bbox = None              # world [x0, y0, x1, y1) of everything ever drawn
+        self.spills = 0
+        self.loads = 0
+        self.last_tiles = 0           # tiles blended by the last composite()
+
+    # ---------------- drawing (world coordinates) ----------------
+    def fits(self, height, width):
+        """The world has no size: any frame is seen through the viewport"""
+        return True
+
+    def reset(self):
+        self._tiles.clear()
+        for path in self._spilled.values():
+            if os.path.exists(path):
+                os.remove(path)
+        self._spilled.clear()
+        self.nbytes = 0
+        self.bbox = None
+
+    def draw_segment(self, p1, p2, color, thickness):
+        p1 = (int(p1[0]), int(p1[1]))
+        p2 = (int(p2[0]), int(p2[1]))
+        pad = thickness // 2 + 2
+        rect = (min(p1[0], p2[0]) - pad, min(p1[1], p2[1]) - pad,
+                max(p1[0], p2[0]) + pad + 1, max(p1[1], p2[1]) + pad + 1)
+        for key in self._keys(rect):
+            tile = self._get(key, create=True)
+            ox, oy = self._origin(key)
+            q1, q2 = (p1[0] - ox, p1[1] - oy), (p2[0] - ox, p2[1] - oy)
+            cv2.line(tile.color, q1, q2, color, thickness, lineType=cv2.LINE_AA)
+            cv2.line(tile.alpha, q1, q2, 255, thickness, lineType=cv2.LINE_AA)
+            self._refresh(key, tile, rect)
+        self._grow_bbox(rect)
+        self._evict()
+
+    def draw_strokes(self, strokes):
+        """Rebuild from scratch (same stroke forms as CanvasLayer.draw_strokes)"""
+        self.reset()
+        touched = set()
+        for (color, thickness), polys in group_polylines(strokes):
+            pad = thickness // 2 + 2
+            per_tile = {}
+            for poly in polys:
+                (x0, y0), (x1, y1) = poly.min(axis=0), poly.max(axis=0)
+                rect = (x0 - pad, y0 - pad, x1 + pad + 1, y1 + pad + 1)
+                self._grow_bbox(rect)
+                for key in self._keys(rect):
+                    per_tile.setdefault(key, []).append(poly)
+            for key, tile_polys in per_tile.items():
+                tile = self._get(key, create=True)
+                origin = np.array(self._origin(key), np.int32)
+                tile_polys = [p - origin for p in tile_polys]
+                cv2.polylines(tile.color, tile_polys, False, color, thickness, lineType=cv2.LINE_AA)
+                cv2.polylines(tile.alpha, tile_polys, False, 255, thickness, lineType=cv2.LINE_AA)
+            touched.update(per_tile)
+            self._evict()   # a drawing larger than max_bytes is rebuilt through the spill files
+        for key in touched:
+            if key in self._tiles:   # spilled ones are refreshed when loaded
+                self._refresh(key, self._tiles[key])
+        self._evict()
+
+    def redraw_rect(self, rect, strokes):
+        """Re-rasterize world rect (x0, y0, x1, y1) out of the strokes that touch it"""
+        x0, y0, x1, y1 = (int(v) for v in rect)
+        groups = group_polylines(strokes)
+        for key in self._keys((x0, y0, x1, y1)):
+            tile = self._get(key, create=bool(groups))
+            if tile is None:
+                continue
+            ox, oy = self._origin(key)
+            side = tile.alpha.shape[0]
+            ax0, ay0 = max(0, x0 - ox), max(0, y0 - oy)
+            ax1, ay1 = min(side, x1 - ox), min(side, y1 - oy)
+            color, alpha = tile.color[ay0:ay1, ax0:ax1], tile.alpha[ay0:ay1, ax0:ax1]
+            color[:] = 0
+            alpha[:] = 0
+            offset = np.array([ox + ax0, oy + ay0], np.int32)
+            for (c, thickness), polys in groups:
+                polys = [p - offset for p in polys]
+                cv2.polylines(color, polys, False, c, thickness, lineType=cv2.LINE_AA)
+                cv2.polylines(alpha, polys, False, 255, thickness, lineType=cv2.LINE_AA)
+            if not tile.alpha.any():
+                self._drop(key)   # erased empty: tiles only exist where strokes are
+                continue
+            self._refresh(key, tile, (x0, y0, x1, y1))
+        self._grow_bbox((x0, y0, x1, y1))
+        self._evict()
+
+    def restore(self, snap):
+        """Only the empty state can be restored (see supports_snapshot)"""
+        if snap is not None:
+            raise ValueError("TiledCanvas keeps no raster snapshots")
+        self.reset()
+
+    # ---------------- rendering ----------------
+    def composite(self, frame):
+        """Blend the tiles the viewport sees onto frame in place"""
+        h, w = frame.shape[:2]
+        vp, T = self.viewport, self.tile_size
+        wx0, wy0, wx1, wy1 = vp.world_rect(w, h)
+        tx0, ty0 = int(np.floor(wx0 / T)), int(np.floor(wy0 / T))
+        tx1, ty1 = int(np.ceil(wx1 / T)), int(np.ceil(wy1 / T))
+        n_range = (tx1 - tx0) * (ty1 - ty0)
+        stored = len(self._tiles) + len(self._spilled)
+        if n_range <= stored:
+            keys = [(tx, ty) for ty in range(ty0, ty1) for tx in range(tx0, tx1)
+                    if (tx, ty) in self._tiles or (tx, ty) in self._spilled]
+        else:
+            keys = [k for k in list(self._tiles) + list(self._spilled)
+                    if tx0 <= k[0] < tx1 and ty0 <= k[1] < ty1]
+        identity = vp.zoom == 1.0 and vp.ox == int(vp.ox) and vp.oy == int(vp.oy)
+        for key in keys:
+            tile = self._get(key)
+            # screen box of the tile core; neighbours share their rounded edges
+            sx0, sy0 = (int(round(v)) for v in vp.to_screen(key[0] * T, key[1] * T))
+            sx1, sy1 = (int(round(v)) for v in vp.to_screen((key[0] + 1) * T, (key[1] + 1) * T))
+            cx0, cy0, cx1, cy1 = max(0, sx0), max(0, sy0), min(w, sx1), min(h, sy1)
+            if cx0 >= cx1 or cy0 >= cy1:
+                continue
+            if identity:
+                src = (slice(cy0 - sy0, cy1 - sy0), slice(cx0 - sx0, cx1 - sx0))
+                premul, weight = tile.premul[src], tile.weight[src]
+            else:
+                premul, weight = self._scaled(tile, sx0, sy0, sx1, sy1, cx0, cy0, cx1, cy1)
+            roi = frame[cy0:cy1, cx0:cx1]
+            cv2.multiply(roi, weight, dst=roi, scale=1 / 255.0)
+            cv2.add(roi, premul, dst=roi)
+        self._visible = frozenset(keys)
+        self.last_tiles = len(keys)
+        self._evict()
+        return frame
+
+    def _scaled(self, tile, sx0, sy0, sx1, sy1, cx0, cy0, cx1, cy1):
+        """The tile's composite cache resampled to its (clipped) screen box"""
+        zoom = self.viewport.zoom
+        size = (cx1 - cx0, cy1 - cy0)
+        out = []
+        if zoom < 1.0:
+            # the cached level just above the screen size, so little is left to resample
+            k = min(int(np.floor(-np.log2(zoom) + 1e-6)), int(np.log2(self.tile_size)))
+            images = self._mip(tile, k)
+        else:
+            images = (tile.premul, tile.weight)
+        for i, img in enumerate(images):
+            if zoom < 1.0:
+                # small on screen: area-average the whole tile, then crop
+                full = cv2.resize(img, (sx1 - sx0, sy1 - sy0), interpolation=cv2.INTER_AREA,
+                                  dst=self.pool.buffer("tiles.full%d" % i, (sy1 - sy0, sx1 - sx0, 3)))
+                out.append(full[cy0 - sy0:cy1 - sy0, cx0 - sx0:cx1 - sx0])
+            else:
+                # large on screen: only the visible part is interpolated
+                m = np.float32([[zoom, 0, sx0 - cx0], [0, zoom, sy0 - cy0]])
+                out.append(cv2.warpAffine(img, m, size, flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REPLICATE,
+                                          dst=self.pool.buffer("tiles.warp%d" % i, (size[1], size[0], 3))))
+        return out
+
+    def _mip(self, tile, k):
+        """(premul, weight) of the tile at 1 / 2**k"""
+        if k == 0:
+            return tile.premul, tile.weight
+        mip = tile.mips.get(k)
+        if mip is None:
+            mip = tile.mips[k] = tuple(cv2.resize(img, None, fx=0.5, fy=0.5, interpolation=cv2.INTER_AREA)
+                                       for img in self._mip(tile, k - 1))
+        return mip
+
+    # ---------------- tiles ----------------
+    def _keys(self, rect):
+        """Tiles whose apron-padded extent overlaps world rect [x0, x1) x [y0, y1)"""
+        x0, y0, x1, y1 = (int(v) for v in rect)
+        T = self.tile_size
+        return [(tx, ty) for ty in range((y0 - APRON) // T, (y1 - 1 + APRON) // T + 1)
+                for tx in range((x0 - APRON) // T, (x1 - 1 + APRON) // T + 1)]
+
+    def _origin(self, key):
+        """World position of the tile array's (0, 0), apron included"""
+        return key[0] * self.tile_size - APRON, key[1] * self.tile_size - APRON
+
+    def _get(self, key, create=False):
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+        if key in self._spilled:
+            tile = self._load(key)
+        elif create:
+            tile = _Tile(self.tile_size)
+        else:
+            return None
+        self._tiles[key] = tile
+        self.nbytes += tile.nbytes
+        return tile
+
+    def _drop(self, key):
+        tile = self._tiles.pop(key)
+        self.nbytes -= tile.nbytes
+
+    def _refresh(self, key, tile, rect=None):
+        """Recompute the composite cache of the tile core (within world rect + glow)"""
+        T = self.tile_size
+        x0, y0, x1, y1 = 0, 0, T, T
+        if rect is not None:
+            ox, oy = key[0] * T, key[1] * T
+            x0, y0 = max(0, int(rect[0]) - APRON - ox), max(0, int(rect[1]) - APRON - oy)
+            x1, y1 = min(T, int(rect[2]) + APRON - ox), min(T, int(rect[3]) + APRON - oy)
+            if x0 >= x1 or y0 >= y1:
+                return
+        tile.mips.clear()
+        # core (x0..x1) is apron-array (x0 + APRON..); the glow reads APRON around it
+        inner = (slice(APRON, APRON + y1 - y0), slice(APRON, APRON + x1 - x0))
+        glow_composite(tile.color[y0:y1 + 2 * APRON, x0:x1 + 2 * APRON],
+                       tile.alpha[y0:y1 + 2 * APRON, x0:x1 + 2 * APRON], inner,
+                       tile.premul[y0:y1, x0:x1], tile.weight[y0:y1, x0:x1])
+
+    def _evict(self):
+        """Spill least recently used tiles that are not on screen until under max_bytes"""
+        if self.nbytes <= self.max_bytes:
+            return
+        for key in list(self._tiles):
+            if self.nbytes <= self.max_bytes:
+                break
+            if key in self._visible:
+                continue
+            tile = self._tiles[key]
+            if tile.alpha.any():
+                self._spill(key, tile)
+            self._drop(key)
+
+    def _spill(self, key, tile):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="canvas_tiles_")
+            weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+        os.makedirs(self.spill_dir, exist_ok=True)
+        path = os.path.join(self.spill_dir, "%d_%d.png" % key)
+        if not cv2.imwrite(path, np.dstack([tile.color, tile.alpha])):
+            raise IOError("cannot write %s" % path)
+        self._spilled[key] = path
+        self.spills += 1
+
+    def _load(self, key):
+        path = self._spilled.pop(key)
+        img = cv2.imread(path, cv2.IMREAD_UNCHANGED)
+        os.remove(path)
+        tile = _Tile(self.tile_size, np.ascontiguousarray(img[..., :3]), np.ascontiguousarray(img[..., 3]))
+        self._refresh(key, tile)
+        self.loads += 1
+        return tile
+
+    def _grow_bbox(self, rect):
+        r = [int(v) for v in rect]
+        b = self.bbox
+        self.bbox = r if b is None else [min(b[0], r[0]), min(b[1], r[1]), max(b[2], r[2]), max(b[3], r[3])]
+
+    # ---------------- stats / cleanup ----------------
+    def stats(self):
+        return {
+            'tiles': len(self._tiles) + len(self._spilled),
+            'in_memory': len(self._tiles),
+            'spilled': len(self._spilled),
+            'mb': self.nbytes / 2 ** 20,
+            'spills': self.spills,
+            'loads': self.loads,
+            'visible': self.last_tiles,
+        }
+
+    def close(self):
+        """Drop every tile and remove a temporary spill directory"""
+        self.reset()
+        if self._own_dir and self.spill_dir is not None:
+            shutil.rmtree(self.spill_dir, ignore_errors=True)
+            self.spill_dir = None
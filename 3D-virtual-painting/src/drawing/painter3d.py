@@ -0,0 +1,453 @@
+# src/drawing/painter3d.py
+"""
+3D strokes from hand landmarks and a CPU-only renderer.
+
+World space is in pixels, laid out like the camera image: x right, y down and z away
+from the viewer. A landmark maps to (x * w, y * h, z * w * depth_scale), since
+MediaPipe's z shares the scale of the normalized x. At the default camera pose a
+painting looks the same as on the 2D canvas; orbit() turns it around.
+"""
+import math
+
+import cv2
+import numpy as np
+
+BLACK = (0, 0, 0)
+
+
+class Stroke3DStore:
+    """
+    Struct-of-arrays 3D strokes: float32 xyz in a growable (N, 3) buffer, stroke i owns
+    points [starts[i], starts[i + 1]) and has a color, thickness and an axis-aligned
+    bounding box (bbox_min/bbox_max) kept up to date on every append.
+    The last stroke is the open one and may be empty.
+    """
+
+    def __init__(self, capacity=4096):
+        self.xyz = np.empty((capacity, 3), np.float32)
+        self.n_points = 0
+        self.starts = np.zeros(64, np.int64)
+        self.colors = np.zeros((64, 3), np.uint8)
+        self.thickness = np.ones(64, np.int32)
+        self.bbox_min = np.full((64, 3), np.inf, np.float32)
+        self.bbox_max = np.full((64, 3), -np.inf, np.float32)
+        self.n_strokes = 1
+        self.version = 0   # bumped on every change, for caches
+        self._octree = None
+        self._point_colors = None
+
+    # ---------------- building ----------------
+    def append(self, x, y, z, color, thickness):
+        """Append a point to the open stroke; a style change starts a new stroke"""
+        self.extend(np.array([[x, y, z]], np.float32), color, thickness)
+
+    def extend(self, xyz, color, thickness):
+        xyz = np.asarray(xyz, np.float32).reshape(-1, 3)
+        if not len(xyz):
+            return
+        last = self.n_strokes - 1
+        color = tuple(int(c) for c in color)
+        if self.n_points > self.starts[last] and (
+                tuple(self.colors[last]) != color or self.thickness[last] != thickness):
+            self.end_stroke()
+            last = self.n_strokes - 1
+        self.colors[last] = color
+        self.thickness[last] = thickness
+        n = self.n_points + len(xyz)
+        if n > len(self.xyz):
+            grown = np.empty((max(n, 2 * len(self.xyz)), 3), np.float32)
+            grown[:self.n_points] = self.xyz[:self.n_points]
+            self.xyz = grown
+        self.xyz[self.n_points:n] = xyz
+        self.n_points = n
+        np.minimum(self.bbox_min[last], xyz.min(axis=0), out=self.bbox_min[last])
+        np.maximum(self.bbox_max[last], xyz.max(axis=0), out=self.bbox_max[last])
+        self.version += 1
+
+    def end_stroke(self):
+        """Close the open stroke (no-op when it is empty)"""
+        last = self.n_strokes - 1
+        if self.n_points == self.starts[last]:
+            return
+        if self.n_strokes == len(self.starts):
+            grow = len(self.starts)
+            self.starts = np.concatenate([self.starts, np.zeros(grow, np.int64)])
+            self.colors = np.concatenate([self.colors, np.zeros((grow, 3), np.uint8)])
+            self.thickness = np.concatenate([self.thickness, np.ones(grow, np.int32)])
+            self.bbox_min = np.concatenate([self.bbox_min, np.full((grow, 3), np.inf, np.float32)])
+            self.bbox_max = np.concatenate([self.bbox_max, np.full((grow, 3), -np.inf, np.float32)])
+        self.starts[self.n_strokes] = self.n_points
+        self.colors[self.n_strokes] = self.colors[last]
+        self.thickness[self.n_strokes] = self.thickness[last]
+        self.n_strokes += 1
+
+    def pop_last(self):
+        """Remove the last non-empty stroke (undo); True if something was removed"""
+        self.end_stroke()
+        if self.n_strokes < 2:
+            return False
+        self.n_strokes -= 1
+        last = self.n_strokes - 1
+        self.n_points = int(self.starts[last])
+        self.bbox_min[last] = np.inf
+        self.bbox_max[last] = -np.inf
+        self.version += 1
+        return True
+
+    def clear(self):
+        self.__init__(len(self.xyz))
+
+    # ---------------- queries ----------------
+    @property
+    def points(self):
+        return self.xyz[:self.n_points]
+
+    def stroke_range(self, i):
+        end = self.starts[i + 1] if i + 1 < self.n_strokes else self.n_points
+        return int(self.starts[i]), int(end)
+
+    def ends(self):
+        """(n_strokes,) end offsets"""
+        e = np.empty(self.n_strokes, np.int64)
+        e[:-1] = self.starts[1:self.n_strokes]
+        e[-1] = self.n_points
+        return e
+
+    def stroke_of(self, ids):
+        return np.searchsorted(self.starts[:self.n_strokes], ids, side="right") - 1
+
+    def bounds(self):
+        if not self.n_points:
+            return np.zeros(3, np.float32), np.zeros(3, np.float32)
+        return self.bbox_min[:self.n_strokes].min(axis=0), self.bbox_max[:self.n_strokes].max(axis=0)
+
+    def point_colors(self):
+        """(n_points, 3) per-point colors, cached until the store changes"""
+        if self._point_colors is None or self._point_colors[0] != self.version:
+            ends = self.ends()
+            stroke = np.repeat(np.arange(self.n_strokes), ends - self.starts[:self.n_strokes])
+            self._point_colors = (self.version, self.colors[stroke])
+        return self._point_colors[1]
+
+    def octree(self, leaf_size=512, max_depth=10):
+        """Octree over the current points, rebuilt only after the store changed"""
+        if self._octree is None or self._octree.version != self.version:
+            self._octree = Octree(self.points, leaf_size, max_depth)
+            self._octree.version = self.version
+        return self._octree
+
+
+def _spread_bits(v):
+    """Insert two zero bits between the low 10 bits of each value (Morton encoding)"""
+    v = v.astype(np.uint32) & 0x3FF
+    v = (v | (v << 16)) & 0x030000FF
+    v = (v | (v << 8)) & 0x0300F00F
+    v = (v | (v << 4)) & 0x030C30C3
+    v = (v | (v << 2)) & 0x09249249
+    return v
+
+
+class Octree:
+    """
+    Linear octree: points are sorted by Morton code over a 2^max_depth grid, so every
+    octree cell is a contiguous range of `order`. Cells are found level by level with
+    searchsorted and only cells holding more than leaf_size points are split, so the
+    tree is never materialised node by node.
+    """
+
+    def __init__(self, points, leaf_size=512, max_depth=10):
+        self.leaf_size = leaf_size
+        self.depth = min(max_depth, 10)
+        self.version = None
+        self.n = len(points)
+        if self.n:
+            self.lo = points.min(axis=0).astype(np.float64)
+            span = float((points.max(axis=0) - self.lo).max())
+        else:
+            self.lo, span = np.zeros(3), 0.0
+        self.size = max(span, 1e-3) * (1.0 + 1e-6)  # cube edge
+        cells = 1 << self.depth
+        q = np.clip(((points - self.lo) / self.size * cells).astype(np.int64), 0, cells - 1)
+        codes = _spread_bits(q[:, 0]) | (_spread_bits(q[:, 1]) << 1) | (_spread_bits(q[:, 2]) << 2)
+        self.order = np.argsort(codes, kind="stable")
+        self.codes = codes[self.order].astype(np.int64)
+
+    def cell_boxes(self, prefixes, level):
+        """(n, 3) min corners and the edge length of cells at `level` given their code prefixes"""
+        q = np.zeros((len(prefixes), 3), np.int64)
+        p = prefixes.astype(np.int64)
+        for bit in range(level):
+            for axis in range(3):
+                q[:, axis] |= ((p >> (3 * bit + axis)) & 1) << bit
+        edge = self.size / (1 << level)
+        return self.lo + q * edge, edge
+
+    def cull(self, classify):
+        """
+        Indices of points in cells that classify() does not reject.
+        classify(lo (n, 3), hi (n, 3)) -> (n,) int8: 0 outside, 1 partial, 2 inside.
+        """
+        if not self.n:
+            return np.zeros(0, np.int64)
+        keep = []  # (start, end) ranges of accepted cells
+        prefixes = np.zeros(1, np.int64)
+        starts, ends = np.zeros(1, np.int64), np.array([self.n])
+        for level in range(0, self.depth + 1):
+            box_min, edge = self.cell_boxes(prefixes, level)
+            verdict = classify(box_min, box_min + edge)
+            leaf = (ends - starts <= self.leaf_size) | (level == self.depth)
+            accept = (verdict == 2) | ((verdict == 1) & leaf)
+            keep.append(np.stack([starts[accept], ends[accept]], axis=1))
+            split = (verdict == 1) & ~leaf
+            if not split.any():
+                break
+            # children of every split cell, located by searchsorted on the sorted codes
+            shift = 3 * (self.depth - level - 1)
+            child = (prefixes[split][:, None] * 8 + np.arange(8)).ravel()
+            edges = np.stack([child, child + 1], axis=1).ravel() << shift
+            bounds = np.searchsorted(self.codes, edges)
+            cs, ce = bounds[0::2], bounds[1::2]
+            nonempty = ce > cs
+            prefixes, starts, ends = child[nonempty], cs[nonempty], ce[nonempty]
+        ranges = np.concatenate(keep)
+        if not len(ranges):
+            return np.zeros(0, np.int64)
+        lengths = ranges[:, 1] - ranges[:, 0]
+        offsets = np.repeat(ranges[:, 0] - np.cumsum(lengths) + lengths, lengths)
+        return self.order[np.arange(lengths.sum()) + offsets]
+
+
+class OrbitCamera:
+    """
+    Pinhole camera orbiting `target`. yaw turns around the vertical (y) axis, pitch tilts
+    up/down, both in degrees. fit(w, h) frames a w x h painting so that yaw = pitch = 0
+    reproduces the 2D canvas pixel for pixel.
+    """
+
+    def __init__(self, width, height, target=None, distance=None, yaw=0.0, pitch=0.0,
+                 fov=60.0, near=1.0):
+        self.width, self.height = width, height
+        self.fov = fov
+        self.near = near
+        self.focal = (height / 2.0) / math.tan(math.radians(fov) / 2.0)
+        self.target = np.array(target if target is not None else (width / 2.0, height / 2.0, 0.0))
+        self.distance = self.focal if distance is None else distance
+        self.yaw, self.pitch = yaw, pitch
+
+    def orbit(self, dyaw=0.0, dpitch=0.0):
+        self.yaw = (self.yaw + dyaw) % 360.0
+        self.pitch = float(np.clip(self.pitch + dpitch, -89.0, 89.0))
+
+    def rotation(self):
+        """World -> camera rotation"""
+        a, b = math.radians(self.yaw), math.radians(self.pitch)
+        ry = np.array([[math.cos(a), 0, -math.sin(a)], [0, 1, 0], [math.sin(a), 0, math.cos(a)]])
+        rx = np.array([[1, 0, 0], [0, math.cos(b), math.sin(b)], [0, -math.sin(b), math.cos(b)]])
+        return rx @ ry
+
+    def eye(self):
+        return self.target - self.rotation().T @ np.array([0.0, 0.0, self.distance])
+
+    def to_camera(self, points):
+        """(n, 3) world -> (n, 3) camera coordinates (z = depth in front of the camera)"""
+        r = self.rotation()
+        # p @ R.T - eye @ R.T: one matmul in the points' dtype, no (n, 3) temporary
+        return points @ r.T.astype(points.dtype) - (self.eye() @ r.T).astype(points.dtype)
+
+    def project(self, points):
+        """(n, 2) pixel coordinates and (n,) depth of world points, in the points' dtype"""
+        cam = self.to_camera(points)
+        z = cam[:, 2]
+        inv = self.focal / np.maximum(z, 1e-6)
+        uv = cam[:, :2] * inv[:, None]
+        uv += (self.width / 2.0, self.height / 2.0)
+        return uv, z
+
+    def classify_boxes(self, lo, hi):
+        """Frustum test of axis-aligned boxes (n, 3) lo/hi: 0 outside, 1 partial, 2 inside"""
+        corners = lo[:, None, :] + _CORNERS[None, :, :] * (hi - lo)[:, None, :]
+        cam = self.to_camera(corners.reshape(-1, 3)).reshape(-1, 8, 3)
+        x, y, z = cam[..., 0], cam[..., 1], cam[..., 2]
+        tx = self.width / 2.0 / self.focal
+        ty = self.height / 2.0 / self.focal
+        # signed distances of every corner to the near plane and the four side planes
+        d = np.stack([z - self.near, z * tx - x, z * tx + x, z * ty - y, z * ty + y])
+        outside = (d < 0).all(axis=2).any(axis=0)
+        inside = (d >= 0).all(axis=(0, 2))
+        return np.where(outside, 0, np.where(inside, 2, 1)).astype(np.int8)
+
+
+_FAR = np.iinfo(np.int64).max
+_CORNERS = np.array([[i & 1, (i >> 1) & 1, (i >> 2) & 1] for i in range(8)], float)
+
+
+class Renderer3D:
+    """
+    Software renderer for a Stroke3DStore.
+      mode "lines":  strokes culled by their bounding boxes, all visible points projected
+                     in one numpy pass, thinned to one point per lod_px screen cell and
+                     drawn far-to-near with batched cv2.polylines (perspective thickness).
+      mode "points": octree point culling, one projection pass and a z-buffered splat
+                     (numpy scatter, nearest point wins, grown by cv2.dilate).
+                     max_points caps the points projected per frame, for orbiting very
+                     large paintings.
+    """
+
+    def __init__(self, width, height, background=BLACK, line_type=cv2.LINE_8, octree=True,
+                 lod_px=2.0, max_points=None):
+        self.width, self.height = width, height
+        self.background = background
+        self.octree = octree
+        self.lod_px = lod_px
+        self.max_points = max_points
+        self._zbuf = None
+        self.line_type = line_type
+        self.stats = {}
+
+    def render(self, store, camera, out=None, mode="lines"):
+        if out is None:
+            out = np.empty((self.height, self.width, 3), np.uint8)
+        if len(set(self.background)) == 1:
+            out.fill(self.background[0])
+        else:
+            out[:] = np.array(self.background, np.uint8)
+        if store.n_points:
+            if mode == "points":
+                self._render_points(store, camera, out)
+            else:
+                self._render_lines(store, camera, out)
+        return out
+
+    def _render_lines(self, store, camera, out):
+        n = store.n_strokes
+        starts, ends = store.starts[:n], store.ends()
+        nonempty = ends > starts
+        lo, hi = store.bbox_min[:n], store.bbox_max[:n]
+        verdict = np.zeros(n, np.int8)
+        if nonempty.any():
+            verdict[nonempty] = camera.classify_boxes(lo[nonempty].astype(np.float64),
+                                                      hi[nonempty].astype(np.float64))
+        visible = np.flatnonzero(verdict > 0)
+        self.stats = {"strokes": int(nonempty.sum()), "visible_strokes": len(visible)}
+        if not len(visible):
+            self.stats["points"] = 0
+            return
+        lengths = ends[visible] - starts[visible]
+        idx = np.repeat(starts[visible] - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        uv, z = camera.project(store.xyz[idx])
+        self.stats["points"] = len(idx)
+        ok = z > camera.near
+        # 4 fractional bits for cv2 shift=4; clipped so near-plane points cannot overflow
+        pix = np.round(np.clip(uv, -1e5, 1e5) * 16).astype(np.int32)
+        seg = np.repeat(np.arange(len(visible)), lengths)
+        if self.lod_px > 0:
+            # drop points that land in the same lod_px screen cell as their predecessor,
+            # keeping both ends of every stroke
+            cell = pix // int(16 * self.lod_px)
+            keep = np.ones(len(pix), bool)
+            keep[1:] = (cell[1:] != cell[:-1]).any(axis=1)
+            first = np.cumsum(lengths) - lengths
+            keep[first] = True
+            keep[first + lengths - 1] = True
+            pix, z, ok, seg = pix[keep], z[keep], ok[keep], seg[keep]
+            lengths = np.bincount(seg, minlength=len(visible))
+        self.stats["drawn"] = len(pix)
+        # per-stroke mean depth for far-to-near order, perspective thickness
+        depth = np.bincount(seg, weights=np.where(ok, z, 0.0)) / np.maximum(np.bincount(seg, ok), 1)
+        order = np.argsort(-depth, kind="stable")
+        offsets = np.concatenate([[0], np.cumsum(lengths)])
+        batch, key = [], None
+        for j in order:
+            s, e = offsets[j], offsets[j + 1]
+            if depth[j] <= camera.near:
+                continue
+            i = visible[j]
+            t = max(1, int(round(store.thickness[i] * camera.focal / depth[j])))
+            style = (tuple(int(c) for c in store.colors[i]), t)
+            if style != key and batch:
+                cv2.polylines(out, batch, False, key[0], key[1], self.line_type, shift=4)
+                batch = []
+            key = style
+            if ok[s:e].all():
+                batch.append(pix[s:e])
+            else:  # split where points fall behind the near plane
+                cut = np.flatnonzero(np.diff(ok[s:e].astype(np.int8))) + 1
+                for part_ok, part in zip(np.split(ok[s:e], cut), np.split(pix[s:e], cut)):
+                    if part_ok[0]:
+                        batch.append(part)
+        if batch:
+            cv2.polylines(out, batch, False, key[0], key[1], self.line_type, shift=4)
+
+    def _render_points(self, store, camera, out):
+        if self.octree:
+            idx = store.octree().cull(camera.classify_boxes)
+        else:
+            idx = np.arange(store.n_points)
+        if self.max_points and len(idx) > self.max_points:
+            # point budget: an even stride through the culled points (Morton order keeps
+            # the sample spread over the whole scene)
+            idx = idx[::-(-len(idx) // self.max_points)]
+        uv, z = camera.project(store.xyz[idx])
+        u, v = uv[:, 0], uv[:, 1]
+        ok = (z > camera.near) & (u >= 0) & (u < self.width) & (v >= 0) & (v < self.height)
+        self.stats = {"points": store.n_points, "culled_in": len(ok), "drawn": int(ok.sum())}
+        idx = idx[ok]
+        pix = v[ok].astype(np.int64) * self.width + u[ok].astype(np.int64)
+        # z-buffer without sorting: positive float32 depths order like their bit patterns,
+        # so (depth bits << 32 | point) keeps the nearest point per pixel under minimum.at
+        key = z[ok].astype(np.float32).view(np.int32).astype(np.int64) << 32
+        key |= np.arange(len(idx))
+        zbuf = self._zbuf
+        if zbuf is None or len(zbuf) != self.width * self.height:
+            zbuf = self._zbuf = np.full(self.width * self.height, _FAR, np.int64)
+        np.minimum.at(zbuf, pix, key)
+        winner = idx[zbuf[pix] & 0xFFFFFFFF]
+        zbuf[pix] = _FAR  # leave the buffer clear for the next frame
+        out.reshape(-1, 3)[pix] = store.point_colors()[winner]
+        t = int(store.thickness[:store.n_strokes].max())
+        if t > 1:
+            k = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (t, t))
+            cv2.dilate(out, k, dst=out)
+
+
+class Painter3D:
+    """
+    DrawEngine-style front end for 3D painting: update(point, mode) with point = (x, y, z)
+    in world pixels (see from_landmark) and mode "DRAW"/"STOP"/"ERASE", plus an orbit
+    camera and render().
+    """
+
+    def __init__(self, width=1280, height=720, stroke_thickness=6, stroke_color=(255, 0, 0),
+                 depth_scale=1.0):
+        self.width, self.height = width, height
+        self.stroke_thickness = stroke_thickness
+        self.stroke_color = stroke_color
+        self.depth_scale = depth_scale
+        self.store = Stroke3DStore()
+        self.camera = OrbitCamera(width, height)
+        self.renderer = Renderer3D(width, height)
+
+    def from_landmark(self, landmark):
+        """Normalized MediaPipe (x, y, z) -> world pixels"""
+        x, y, z = landmark[:3]
+        return (x * self.width, y * self.height, z * self.width * self.depth_scale)
+
+    def update(self, point, mode):
+        if mode == "DRAW" and point is not None:
+            self.store.append(point[0], point[1], point[2], self.stroke_color, self.stroke_thickness)
+        elif mode == "STOP":
+            self.store.end_stroke()
+        elif mode == "ERASE":
+            self.store.pop_last()
+
+    def change_color(self, color):
+        self.stroke_color = color
+
+    def clear(self):
+        self.store.clear()
+
+    def orbit(self, dyaw=0.0, dpitch=0.0):
+        self.camera.orbit(dyaw, dpitch)
+
+    def render(self, out=None, mode="lines"):
+        return self.renderer.render(self.store, self.camera, out, mode)
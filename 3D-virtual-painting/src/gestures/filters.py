@@ -0,0 +1,205 @@
+# src/gestures/filters.py
+"""
+Landmark filters for HandTracker. Every filter runs over the whole (n_hands, 21, 3)
+landmark array in one numpy pass per frame, keyed on frame timestamps, so an uneven
+frame rate changes the smoothing time constants instead of the lag.
+
+predict_ms extrapolates the filtered position along the filtered velocity to hide
+part of the capture -> inference -> render latency (0 = plain filtering).
+
+With stable hand ids (gestures.hand_identity) the state follows each hand: rows are
+reordered with the hands, a new hand starts from its raw measurement and the others
+keep filtering. Without ids any change of hand count or handedness restarts all hands.
+"""
+import math
+
+import numpy as np
+
+
+class LandmarkFilter:
+    """
+    Base class: per-hand state in arrays whose first axis is the hand (the names in
+    _STATE), kept for the hands whose id was in the previous frame.
+    """
+    _STATE = ()
+
+    def __init__(self, predict_ms=0.0):
+        self.predict = predict_ms / 1000.0
+        self.reset()
+
+    def reset(self):
+        self._key = None
+        self._ids = None
+        self._t = None
+
+    def __call__(self, landmarks, handedness, t, ids=None):
+        x = landmarks.astype(np.float64)
+        if ids is None:
+            # no identities: the same layout as last frame means the same hands
+            key = (landmarks.shape, bytes(np.asarray(handedness, np.int8)))
+            ids = np.arange(len(x)) if key == self._key else None
+            self._key = key
+        prev = self._ids
+        self._ids = np.arange(len(x)) if ids is None else np.asarray(ids)
+        # row of each hand in the previous state (-1: new hand)
+        if ids is None or prev is None or len(x) == 0 or len(prev) == 0:
+            pos = np.full(len(x), -1)
+        elif len(prev) == len(x) and (self._ids == prev).all():
+            pos = None    # the same hands in the same rows (the steady state)
+        else:
+            match = self._ids[:, None] == prev[None]
+            pos = np.where(match.any(axis=1), match.argmax(axis=1), -1)
+        new = None if pos is None else pos < 0
+        if new is not None and new.all():
+            self._t = t
+            self._init(x)
+            return landmarks
+        dt = t - self._t
+        if dt <= 0:
+            dt = 1.0 / 30.0  # duplicated/unstamped frame: assume nominal rate
+        self._t = t
+        fresh = None
+        if new is not None and (new.any() or len(pos) != len(prev) or (pos != np.arange(len(pos))).any()):
+            old = {name: getattr(self, name) for name in self._STATE}
+            self._init(x.copy())   # _init may keep x itself as state
+            if new.any():
+                fresh = {name: getattr(self, name)[new].copy() for name in self._STATE}
+            for name, arr in old.items():
+                getattr(self, name)[~new] = arr[pos[~new]]
+        out = self._step(x, dt).astype(np.float32)
+        if fresh is not None:
+            # hands that just appeared start from their measurement
+            for name, arr in fresh.items():
+                getattr(self, name)[new] = arr
+            out[new] = landmarks[new]
+        return out
+
+    def _init(self, x):
+        raise NotImplementedError
+
+    def _step(self, x, dt):
+        raise NotImplementedError
+
+
+class MovingAverageFilter(LandmarkFilter):
+    """Mean of the last `window` frames (HandTracker's index-tip smoothing without a filter)"""
+    _STATE = ('_hist', '_count')
+
+    def __init__(self, window=5, predict_ms=0.0):
+        self.window = window
+        LandmarkFilter.__init__(self, predict_ms)
+
+    def _init(self, x):
+        # newest sample first; each hand has its own number of samples so far
+        self._hist = np.repeat(x[:, None], self.window, axis=1)
+        self._count = np.ones(len(x), np.intp)
+
+    def _step(self, x, dt):
+        hist = self._hist
+        hist[:, 1:] = hist[:, :-1]
+        hist[:, 0] = x
+        count = self._count = np.minimum(self._count + 1, self.window)
+        tail = (1,) * (x.ndim - 1)
+        valid = np.arange(self.window) < count[:, None]
+        n = count.reshape((-1,) + tail)
+        mean = (hist * valid.reshape(valid.shape + tail)).sum(axis=1) / n
+        if self.predict:
+            # the mean trails the newest sample by (n-1)/2 frames
+            oldest = hist[np.arange(len(x)), count - 1]
+            velocity = (x - oldest) / ((n - 1) * dt)
+            mean = mean + velocity * ((n - 1) / 2.0 * dt + self.predict)
+        return mean
+
+
+class OneEuroFilter(LandmarkFilter):
+    """
+    One Euro filter (Casiez et al. 2012): an exponential smoother whose cutoff rises
+    with speed, so a still hand is heavily smoothed and a fast one barely lags.
+    min_cutoff (Hz) sets jitter at rest, beta how quickly the cutoff opens with speed
+    (speed in normalized frame units per second), d_cutoff smooths the derivative.
+    """
+    _STATE = ('_x', '_dx')
+
+    def __init__(self, min_cutoff=1.0, beta=20.0, d_cutoff=1.0, predict_ms=0.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        LandmarkFilter.__init__(self, predict_ms)
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+    def _init(self, x):
+        self._x = x
+        self._dx = np.zeros_like(x)
+
+    def _step(self, x, dt):
+        dx = (x - self._x) / dt
+        self._dx += self._alpha(self.d_cutoff, dt) * (dx - self._dx)
+        cutoff = self.min_cutoff + self.beta * np.abs(self._dx)
+        self._x = self._x + self._alpha(cutoff, dt) * (x - self._x)
+        if self.predict:
+            return self._x + self._dx * self.predict
+        return self._x
+
+
+class KalmanFilter(LandmarkFilter):
+    """
+    Constant-velocity Kalman filter, independent per coordinate (vectorized 2x2 covariances).
+    process_noise: white acceleration variance ((frame units / s^2)^2)
+    measurement_noise: landmark noise variance (frame units^2)
+    """
+    _STATE = ('_p', '_v', '_P00', '_P01', '_P11')
+
+    def __init__(self, process_noise=2.0, measurement_noise=4e-6, predict_ms=0.0):
+        self.q = process_noise
+        self.r = measurement_noise
+        LandmarkFilter.__init__(self, predict_ms)
+
+    def _init(self, x):
+        self._p = x
+        self._v = np.zeros_like(x)
+        self._P00 = np.full_like(x, self.r)
+        self._P01 = np.zeros_like(x)
+        self._P11 = np.full_like(x, 1.0)
+
+    def _step(self, z, dt):
+        q = self.q
+        # predict
+        p = self._p + self._v * dt
+        P00 = self._P00 + dt * (2.0 * self._P01 + dt * self._P11) + q * dt ** 4 / 4.0
+        P01 = self._P01 + dt * self._P11 + q * dt ** 3 / 2.0
+        P11 = self._P11 + q * dt * dt
+        # update
+        S = P00 + self.r
+        K0, K1 = P00 / S, P01 / S
+        y = z - p
+        self._p = p + K0 * y
+        self._v = self._v + K1 * y
+        self._P00 = (1.0 - K0) * P00
+        self._P01 = (1.0 - K0) * P01
+        self._P11 = P11 - K1 * P01
+        if self.predict:
+            return self._p + self._v * self.predict
+        return self._p
+
+
+FILTERS = {
+    'moving_average': MovingAverageFilter,
+    'one_euro': OneEuroFilter,
+    'kalman': KalmanFilter,
+}
+
+
+def make_filter(spec, **kw):
+    """None/'none' -> None, a name from FILTERS (+ keyword options), or a filter instance"""
+    if spec is None or spec == 'none':
+        return None
+    if isinstance(spec, str):
+        try:
+            return FILTERS[spec](**kw)
+        except KeyError:
+            raise ValueError("unknown landmark filter %r (choose from %s)" % (spec, ", ".join(FILTERS)))
+    return spec
@@ -0,0 +1,190 @@
+# src/gestures/flow_tracking.py
+import math
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from core.frame_pool import FramePool
+
+
+class FlowScheduler:
+    """
+    Wraps a detector (frame -> landmarks, handedness, scores) with a per-frame time
+    budget. While the detector alone fits the budget it runs on every frame; when it
+    does not, it runs only every `stride`-th frame, with stride chosen from the measured
+    detector and flow costs so the amortized cost fits the budget. On the frames in
+    between the landmarks are carried forward with pyramidal Lucas-Kanade optical flow
+    on their pixel positions (cv2.calcOpticalFlowPyrLK, forward-backward checked); with
+    no hand in the last detection the skipped frames simply report none.
+    Flow never skips a detection it cannot vouch for: when fewer than min_confidence
+    of the points track, the detector runs on that same frame.
+
+    budget_ms:      target milliseconds per frame (detect or flow + bookkeeping)
+    max_stride:     at most this many frames per detection
+    flow_scale:     resize factor of the grayscale frames flow runs on
+    win / levels:   Lucas-Kanade window side and pyramid levels
+    fb_threshold:   forward-backward error (pixels at flow_scale) above which a point is lost
+    min_confidence: fraction of each hand's in-frame points that must track to skip the detector
+    pool:           core.frame_pool.FramePool holding the (double-buffered) grayscale frames
+    """
+
+    def __init__(self, detect, budget_ms=33.0, max_stride=4, flow_scale=0.5, win=15, levels=2,
+                 fb_threshold=1.0, min_confidence=0.7, smoothing=0.2, window=300, pool=None):
+        self.detect = detect
+        self.budget_ms = budget_ms
+        self.max_stride = max_stride
+        self.flow_scale = flow_scale
+        self.lk_params = dict(winSize=(win, win), maxLevel=levels,
+                              criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
+        self.fb_threshold = fb_threshold
+        self.min_confidence = min_confidence
+        self.smoothing = smoothing
+        self.pool = pool if pool is not None else FramePool()
+        self._gray_side = 0       # which of the two gray buffers the next frame goes to
+
+        self.stride = 1
+        self.detect_ms = None    # running estimates (exponential moving averages)
+        self.flow_ms = None
+        self.confidence = 1.0    # fraction of visible points flow tracked (worst hand), last flow frame
+        self.last_mode = None    # 'detect' or 'flow'
+        self.last_ms = 0.0
+        self._since_detect = 0
+        self._prev_gray = None
+        self._result = None      # (landmarks, handedness, scores) of the previous frame
+
+        self._ms = deque(maxlen=window)
+        self._flowed = deque(maxlen=window)
+        self.frames = 0
+        self.flow_frames = 0
+        self.redetects = 0       # flow lost confidence and the detector ran instead
+
+    def reset(self):
+        self._prev_gray = None
+        self._result = None
+        self._since_detect = 0
+
+    def __call__(self, frame):
+        t0 = time.perf_counter()
+        self.frames += 1
+        gray, result = None, None
+        if self._prev_gray is not None and self._since_detect < self.stride:
+            gray = self._gray(frame)
+            if not len(self._result[0]):
+                result = self._result     # no hand to follow; look again at the next detection
+            elif gray.shape == self._prev_gray.shape:
+                t1 = time.perf_counter()
+                result = self._flow(gray)
+                self.flow_ms = self._ema(self.flow_ms, (time.perf_counter() - t1) * 1000.0)
+                if result is None:
+                    self.redetects += 1
+        if result is None:
+            t1 = time.perf_counter()
+            landmarks, handedness, scores = self.detect(frame)
+            self.detect_ms = self._ema(self.detect_ms, (time.perf_counter() - t1) * 1000.0)
+            result = (np.asarray(landmarks, np.float32), handedness, scores)
+            self._since_detect = 1
+            self.last_mode = 'detect'
+            self._flowed.append(False)
+        else:
+            self._since_detect += 1
+            self.flow_frames += 1
+            self.last_mode = 'flow'
+            self._flowed.append(True)
+        self._result = result
+        self.stride = self._plan()
+        # grayscale is only needed when the next frame may be served by flow
+        if self._since_detect < self.stride:
+            self._prev_gray = gray if gray is not None else self._gray(frame)
+        else:
+            self._prev_gray = None
+
+        self.last_ms = (time.perf_counter() - t0) * 1000.0
+        self._ms.append(self.last_ms)
+        return result
+
+    def _gray(self, frame):
+        # alternate between two buffers: the previous frame's gray is still needed
+        self._gray_side ^= 1
+        name = "flow.gray%d" % self._gray_side
+        h, w = frame.shape[:2]
+        if self.flow_scale == 1.0:
+            return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.pool.buffer(name, (h, w)))
+        full = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.pool.buffer("flow.gray_full", (h, w)))
+        size = (int(round(w * self.flow_scale)), int(round(h * self.flow_scale)))
+        return cv2.resize(full, size, dst=self.pool.buffer(name, (size[1], size[0])),
+                          interpolation=cv2.INTER_AREA)
+
+    def _flow(self, gray):
+        """Previous landmarks moved by optical flow, or None when too few points track"""
+        landmarks, handedness, scores = self._result
+        gw, gh = gray.shape[1], gray.shape[0]
+        pts = (landmarks[:, :, :2].reshape(-1, 1, 2) * (gw, gh)).astype(np.float32)
+        nxt, st, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, pts, None, **self.lk_params)
+        back, st_back, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, nxt, None, **self.lk_params)
+        fb = np.linalg.norm((back - pts).reshape(-1, 2), axis=1)
+        good = (st[:, 0] == 1) & (st_back[:, 0] == 1) & (fb < self.fb_threshold)
+        good = good.reshape(len(landmarks), -1)
+        # points outside the frame (e.g. a wrist below the toolbar) cannot be checked;
+        # confidence is judged on the visible ones
+        xy = pts.reshape(len(landmarks), -1, 2)
+        visible = (xy >= 0).all(axis=2) & (xy[:, :, 0] < gw) & (xy[:, :, 1] < gh)
+        n_visible = visible.sum(axis=1)
+        if n_visible.min() < 3:
+            self.confidence = 0.0
+            return None
+        tracked = (good & visible).sum(axis=1) / n_visible
+        self.confidence = float(tracked.min())
+        if self.confidence < self.min_confidence:
+            return None
+        good &= visible
+        # lost and hidden points follow their hand's median motion
+        moved = (nxt - pts).reshape(len(landmarks), -1, 2)
+        for k in range(len(landmarks)):
+            moved[k, ~good[k]] = np.median(moved[k, good[k]], axis=0)
+        out = landmarks.copy()
+        out[:, :, :2] += moved / (gw, gh)
+        return out, handedness, scores
+
+    def _ema(self, value, sample):
+        return sample if value is None else value + self.smoothing * (sample - value)
+
+    def _plan(self):
+        """Frames per detection so (detect + (stride - 1) * flow) / stride fits the budget"""
+        if self.detect_ms is None or self.detect_ms <= self.budget_ms:
+            return 1
+        flow = self.flow_ms if self.flow_ms is not None else 0.0
+        if flow >= self.budget_ms:
+            return self.max_stride
+        stride = math.ceil((self.detect_ms - flow) / (self.budget_ms - flow))
+        return int(min(max(stride, 1), self.max_stride))
+
+    # ---------------- stats ----------------
+    @property
+    def skip_ratio(self):
+        """Fraction of recent frames served by optical flow instead of the detector"""
+        return float(np.mean(self._flowed)) if self._flowed else 0.0
+
+    @property
+    def compliance(self):
+        """Fraction of recent frames that took no longer than the budget"""
+        return float(np.mean(np.array(self._ms) <= self.budget_ms)) if self._ms else 1.0
+
+    def stats(self):
+        ms = np.array(self._ms) if self._ms else np.zeros(1)
+        return {
+            'frames': self.frames,
+            'flow_frames': self.flow_frames,
+            'redetects': self.redetects,
+            'stride': self.stride,
+            'skip_ratio': self.skip_ratio,
+            'compliance': self.compliance,
+            'confidence': self.confidence,
+            'detect_ms': self.detect_ms or 0.0,
+            'flow_ms': self.flow_ms or 0.0,
+            'ms_mean': float(ms.mean()),
+            'ms_p95': float(np.percentile(ms, 95)),
+            'last_ms': self.last_ms,
+            'mode': self.last_mode,
+        }
@@ -0,0 +1,237 @@
+# src/gestures/gesture_engine.py
+"""
+Table-driven gesture state machine. Each frame the landmarks are reduced to one feature
+vector (FEATURES) and every GestureRule is evaluated against it in a single numpy pass:
+the rules are compiled into (n_rules, n_features) range tables, so adding a gesture adds
+a row, not another timer or branch in the frame loop.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+FEATURES = ('present', 'enabled', 'pinch_distance', 'up_count',
+            'thumb_up', 'index_up', 'middle_up', 'ring_up', 'pinky_up', 'hover')
+F = {name: i for i, name in enumerate(FEATURES)}
+
+_Rule = namedtuple("GestureRule", ["name", "enter", "stay", "hold", "release", "repeat",
+                                   "cooldown", "key"])
+
+
+class GestureRule(_Rule):
+    """
+    enter:    {feature: (lo, hi)} closed ranges that must all hold to start the gesture.
+    stay:     ranges that keep an active gesture alive (hysteresis); features not listed
+              keep their enter range.
+    hold:     seconds the enter condition must last before the gesture activates.
+    release:  seconds the stay condition must fail before it deactivates.
+    repeat:   fire again every `repeat` seconds while active (None = once per activation).
+    cooldown: minimum seconds between two firings, also across separate activations.
+    key:      feature whose change restarts the gesture (e.g. dwell on another button).
+    """
+    __slots__ = ()
+
+    def __new__(cls, name, enter, stay=None, hold=0.0, release=0.0, repeat=None, cooldown=0.0, key=None):
+        return super().__new__(cls, name, enter, stay or {}, hold, release, repeat, cooldown, key)
+
+
+def default_rules(pinch_threshold=45, pinch_release=None, pinch_hold=0.05, fist_hold=0.4,
+                  erase_cooldown=0.8, hover_delay=0.5, v_cooldown=1.0, nav_hold=0.15):
+    """The painter's gestures (see core.session.PaintSession)"""
+    if pinch_release is None:
+        pinch_release = pinch_threshold * 1.25
+    hand = {'present': (1, 1)}
+    return [
+        GestureRule('pinch', dict(hand, pinch_distance=(0, pinch_threshold)),
+                    stay={'pinch_distance': (0, pinch_release)}, hold=pinch_hold),
+        # held fist repeats (undo) every erase_cooldown
+        GestureRule('fist', dict(hand, up_count=(0, 0)), hold=fist_hold,
+                    repeat=erase_cooldown, cooldown=erase_cooldown),
+        GestureRule('palm', dict(hand, up_count=(4, 5))),
+        GestureRule('v_sign', dict(hand, index_up=(1, 1), middle_up=(1, 1), ring_up=(0, 0),
+                                   pinky_up=(0, 0)), repeat=v_cooldown, cooldown=v_cooldown),
+        # toolbar dwell: open palm with the index tip over a button
+        GestureRule('hover', dict(hand, enabled=(1, 1), up_count=(4, 5), hover=(0, np.inf)),
+                    hold=hover_delay, repeat=hover_delay, key='hover'),
+        # world canvas navigation: three fingers drag pans, thumb + pinky drag zooms
+        GestureRule('pan', dict(hand, thumb_up=(0, 0), index_up=(1, 1), middle_up=(1, 1),
+                                ring_up=(1, 1), pinky_up=(0, 0)), hold=nav_hold),
+        GestureRule('zoom', dict(hand, thumb_up=(1, 1), index_up=(0, 0), middle_up=(0, 0),
+                                 ring_up=(0, 0), pinky_up=(1, 1)), hold=nav_hold),
+    ]
+
+
+class GestureEngine:
+    """
+    update(features, t) advances every rule and returns the names that fired this frame.
+    Per rule it keeps: active, since when its condition has been true / false, and the
+    last firing; all are arrays indexed like `rules`.
+    rects: toolbar rects ((x1, y1), (x2, y2)) for the hover feature; once a button is
+    hovered it stays hovered until the tip leaves it by more than hover_margin pixels.
+    hands: hand slots evaluated together. The state arrays are (hands, rules) and
+    update() takes one feature row per slot, so every hand's gestures advance in the
+    same numpy pass; a slot taken over by another hand is cleared with reset(slots).
+    """
+
+    def __init__(self, rules=None, rects=(), hover_margin=8, hands=1):
+        self.rules = list(default_rules() if rules is None else rules)
+        self.names = [r.name for r in self.rules]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.hands = hands
+        n = len(self.rules)
+        # [enter, stay] x rule x feature closed ranges; unconstrained features are +-inf
+        self.lo = np.full((2, n, len(FEATURES)), -np.inf)
+        self.hi = np.full((2, n, len(FEATURES)), np.inf)
+        for i, rule in enumerate(self.rules):
+            for name, (lo, hi) in rule.enter.items():
+                self.lo[:, i, F[name]], self.hi[:, i, F[name]] = lo, hi
+            for name, (lo, hi) in rule.stay.items():
+                self.lo[1, i, F[name]], self.hi[1, i, F[name]] = lo, hi
+        self.hold = np.array([r.hold for r in self.rules], np.float64)
+        self.release = np.array([r.release for r in self.rules], np.float64)
+        self.cooldown = np.array([r.cooldown for r in self.rules], np.float64)
+        repeat = np.array([np.inf if r.repeat is None else r.repeat for r in self.rules])
+        self.period = np.maximum(repeat, self.cooldown)   # between firings while active
+        self.keyed = np.array([r.key is not None for r in self.rules], bool)
+        self.key = np.array([F[r.key] if r.key else 0 for r in self.rules], np.intp)
+        self.rects = np.array([(x1, y1, x2, y2) for (x1, y1), (x2, y2) in rects], np.float64).reshape(-1, 4)
+        self.hover_margin = hover_margin
+        self._lo4, self._hi4 = self.lo[:, None], self.hi[:, None]   # broadcast over slots
+        self._x1, self._y1, self._x2, self._y2 = (c.copy() for c in self.rects.T)
+        self.features = np.zeros((hands, len(FEATURES)))
+        self.reset()
+
+    def reset(self, slots=None):
+        """Clear every hand slot, or only `slots` (indices or a bool mask)"""
+        if slots is None:
+            shape = (self.hands, len(self.rules))
+            self.active = np.zeros(shape, bool)
+            self.on_since = np.full(shape, np.nan)       # condition true since (nan while false)
+            self.off_since = np.full(shape, np.nan)      # condition false since (nan while true)
+            self.last_fire = np.full(shape, -np.inf)
+            self.fired = np.zeros(shape, bool)
+            self.last_key = np.full(shape, np.nan)
+            self.hovered = np.full(self.hands, -1)
+            return
+        self.active[slots] = False
+        self.on_since[slots] = np.nan
+        self.off_since[slots] = np.nan
+        self.last_fire[slots] = -np.inf
+        self.fired[slots] = False
+        self.last_key[slots] = np.nan
+        self.hovered[slots] = -1
+
+    # ---------------- features ----------------
+    def hover_index(self, point, hand=0):
+        """Toolbar button under point, with hysteresis on the button already hovered"""
+        points = np.full((self.hands, 2), np.nan)
+        if point is not None:
+            points[hand] = point
+        keep = np.arange(self.hands) != hand
+        hovered = self.hovered.copy()
+        self.hover_indices(points)
+        self.hovered[keep] = hovered[keep]
+        return int(self.hovered[hand])
+
+    def hover_indices(self, points):
+        """hover_index() of every slot: points (hands, 2), nan where a slot has none"""
+        if not len(self.rects):
+            self.hovered[:] = -1
+            return self.hovered
+        x, y = points[:, :1], points[:, 1:]
+        inside = (self._x1 <= x) & (x <= self._x2) & (self._y1 <= y) & (y <= self._y2)
+        first = inside.argmax(axis=1)
+        slots = np.arange(len(points))
+        hovered = np.where(inside[slots, first], first, -1)
+        if self.hovered.max() >= 0:
+            m, k = self.hover_margin, np.maximum(self.hovered, 0)
+            x, y = points[:, 0], points[:, 1]
+            near = ((self._x1[k] - m <= x) & (x <= self._x2[k] + m)
+                    & (self._y1[k] - m <= y) & (y <= self._y2[k] + m))
+            hovered = np.where(near & (self.hovered >= 0), self.hovered, hovered)
+        self.hovered = hovered
+        return hovered
+
+    def frame_features(self, features, hand=0, enabled=True, pointer=None):
+        """
+        Feature vector of one hand from HandTracker.features() (hand_features.compute);
+        pointer (default: the index tip) is what the hover feature tests against the rects.
+        """
+        rows = np.full(self.hands, -1)
+        rows[0] = hand
+        pointers = None
+        if pointer is not None:
+            pointers = np.full((self.hands, 2), np.nan)
+            pointers[0] = pointer
+        return self.hand_features(features, rows, enabled, pointers)[0]
+
+    def hand_features(self, features, rows, enabled=True, pointers=None):
+        """
+        Feature rows of every hand slot in one pass: rows[s] is the hand of slot s in the
+        HandTracker.features() arrays (-1: none); pointers (hands, 2) replace the index
+        tips for the hover feature (nan: none). enabled may be per slot.
+        """
+        n = 0 if features is None else len(features['fingers'])
+        rows = np.where(np.asarray(rows) < n, rows, -1)
+        # one row per detected hand plus a last "no hand" row, picked by slot (-1 = last)
+        table = np.zeros((n + 1, len(FEATURES)))
+        table[n, F['pinch_distance']] = np.inf
+        if n:
+            fingers = features['fingers']
+            table[:n, F['present']] = 1
+            table[:n, F['pinch_distance']] = features['pinch_distance']
+            table[:n, F['up_count']] = fingers.sum(axis=1)
+            table[:n, F['thumb_up']:F['pinky_up'] + 1] = fingers
+        v = self.features = table[rows]
+        v[:, F['enabled']] = enabled
+        have = rows >= 0
+        if pointers is None:
+            pointers = features['tips'][rows, 1].astype(np.float64) if n else np.zeros((self.hands, 2))
+        if not have.all():
+            pointers = np.where(have[:, None], pointers, np.nan)
+        v[:, F['hover']] = self.hover_indices(pointers)
+        return v
+
+    # ---------------- rules ----------------
+    def update(self, features, t):
+        """
+        Advance all rules to time t with this frame's feature vector (one row per slot,
+        or one vector for all); returns the names fired by any slot
+        """
+        v = features.reshape(-1, len(FEATURES))
+        # enter and stay ranges of every slot and rule in one comparison; active rules use stay
+        v4 = v[None, :, None]
+        inside = ((self._lo4 <= v4) & (v4 <= self._hi4)).all(axis=3)
+        cond = np.where(self.active, inside[1], inside[0])
+        # a changed key restarts the rule, e.g. the pointer moved to another button
+        key = v[:, self.key]
+        restart = self.keyed & (key != self.last_key)
+        self.last_key = key
+        active = self.active & ~restart
+        on_since = np.where(restart, np.nan, self.on_since)
+
+        self.on_since = np.where(cond, np.fmin(on_since, t), np.nan)
+        self.off_since = np.where(cond, np.nan, np.fmin(self.off_since, t))
+        since_fire = t - self.last_fire
+        ready = ~active & (t - self.on_since >= self.hold) & (since_fire >= self.cooldown)
+        again = active & cond & (since_fire >= self.period)
+        stop = active & (t - self.off_since >= self.release)
+        self.fired = ready | again
+        self.last_fire[self.fired] = t
+        self.active = (active | ready) & ~stop
+        fired = self.fired[0] if self.hands == 1 else self.fired.any(axis=0)
+        return [self.names[i] for i in np.flatnonzero(fired)]
+
+    def is_active(self, name, hand=0):
+        """Of one slot, or (hands,) bool of all slots with hand=None (also below)"""
+        col = self.active[:, self.index[name]]
+        return col if hand is None else bool(col[hand])
+
+    def is_pending(self, name, hand=0):
+        """Enter condition true, waiting out hold / cooldown"""
+        i = self.index[name]
+        col = ~self.active[:, i] & ~np.isnan(self.on_since[:, i])
+        return col if hand is None else bool(col[hand])
+
+    def did_fire(self, name, hand=0):
+        col = self.fired[:, self.index[name]]
+        return col if hand is None else bool(col[hand])
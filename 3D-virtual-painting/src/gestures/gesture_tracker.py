@@ -1,93 +1,280 @@
 # src/gestures/gesture_tracker.py
+import threading
+import time
 import cv2
-import mediapipe as mp
-from collections import deque
+import numpy as np
+
+from core.frame_pool import FramePool
+from core.profiler import NULL_PROFILER
+from gestures import hand_features
+from gestures.filters import MovingAverageFilter, make_filter
+from gestures.flow_tracking import FlowScheduler
+from gestures.hand_identity import HandIdentity
+from gestures.recording import LandmarkRecorder
+from gestures.roi_tracking import RoiDetector
+
+# mediapipe (TensorFlow Lite, matplotlib, ...) takes longer to import than the rest of
+# the app together; it is loaded by the first HandTracker that needs the graph
+mp = None
+
+
+def _mediapipe():
+    global mp
+    if mp is None:
+        import mediapipe
+        mp = mediapipe
+    return mp
+
+# handedness codes used in landmark arrays
+HANDEDNESS = {'Left': -1, 'Right': 1}
+HANDEDNESS_LABELS = {-1: 'Left', 1: 'Right'}
+
+# same topology as mp.solutions.hands.HAND_CONNECTIONS, for drawing from arrays
+HAND_CONNECTIONS = (
+    (0, 1), (1, 2), (2, 3), (3, 4),
+    (0, 5), (5, 6), (6, 7), (7, 8),
+    (5, 9), (9, 10), (10, 11), (11, 12),
+    (9, 13), (13, 14), (14, 15), (15, 16),
+    (13, 17), (0, 17), (17, 18), (18, 19), (19, 20),
+)
+
+
+def results_to_arrays(results):
+    """
+    MediaPipe Hands results -> (landmarks (n, 21, 3) float32 normalized,
+    handedness (n,) int8 codes, scores (n,) float32).
+    """
+    hands = results.multi_hand_landmarks if results is not None else None
+    if not hands:
+        return np.zeros((0, 21, 3), np.float32), np.zeros(0, np.int8), np.zeros(0, np.float32)
+    landmarks = np.array([[(lm.x, lm.y, lm.z) for lm in hand.landmark] for hand in hands], np.float32)
+    handedness = np.zeros(len(hands), np.int8)
+    scores = np.ones(len(hands), np.float32)
+    for i, h in enumerate((results.multi_handedness or [])[:len(hands)]):
+        try:
+            handedness[i] = HANDEDNESS.get(h.classification[0].label, 0)
+            scores[i] = h.classification[0].score
+        except Exception:
+            pass
+    return landmarks, handedness, scores
+
 
 class HandTracker:
-    def __init__(self, maxHands=1, detectionConfidence=0.6, trackConfidence=0.6, smooth_factor=5):
-        self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=maxHands,
-            min_detection_confidence=detectionConfidence,
-            min_tracking_confidence=trackConfidence)
-        self.mp_draw = mp.solutions.drawing_utils
+    def __init__(self, maxHands=1, detectionConfidence=0.6, trackConfidence=0.6, smooth_factor=5,
+                 roi=None, filter=None, filter_kwargs=None, profiler=None, budget=None, pool=None):
+        """
+        roi: None/False for full-frame inference every frame, True for ROI tracking with
+             default settings, or a dict of RoiDetector options (pad, min_crop, scale,
+             confident, min_input, full_scale, max_misses, redetect_every).
+        filter: None keeps the smooth_factor moving average on the index tip; otherwise
+             'one_euro', 'kalman', 'moving_average' (options incl. predict_ms in
+             filter_kwargs) or a gestures.filters.LandmarkFilter, applied to all landmarks.
+        profiler: core.profiler.Profiler timing the "cvtColor" and "mediapipe" stages.
+        budget: None/0 runs MediaPipe on every frame; a frame budget in ms, or a dict of
+             FlowScheduler options (budget_ms, max_stride, flow_scale, min_confidence, ...),
+             skips inference while over budget and moves the landmarks by optical flow.
+        pool: core.frame_pool.FramePool for the per-frame RGB / crop / grayscale buffers.
+        Every hand gets an id that stays the same across frames (self.ids, see
+        gestures.hand_identity); filters and pointer smoothing keep their state per id.
+        """
+        self.maxHands = maxHands
+        self.detectionConfidence = detectionConfidence
+        self.trackConfidence = trackConfidence
+        self._hands = None  # MediaPipe graph, built on first detection or by warm_up()
+        self._warming = None  # threading.Event while warm_up() runs in the background
+        self.warm_error = None
         self.smooth_factor = smooth_factor
-        self.prev_points = deque(maxlen=smooth_factor)
         self.results = None
         self.hand_label = None  # 'Left' or 'Right'
+        # per-frame landmark arrays (filled by findHands or set_landmarks)
+        self.landmarks = np.zeros((0, 21, 3), np.float32)
+        self.handedness = np.zeros(0, np.int8)
+        self.scores = np.zeros(0, np.float32)
+        self.ids = np.zeros(0, np.int32)
+        self.identity = HandIdentity()
+        self._t = 0.0
+        self._features = None  # (w, h, features dict) cached for the current landmarks
+        self._pointers = None  # (w, h, (n, 2) index tips) cached likewise
+        self._pointer_filter = MovingAverageFilter(window=smooth_factor)
+        self.recorder = None  # LandmarkRecorder fed by set_landmarks()
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self.pool = pool if pool is not None else FramePool()
+        self.filter = make_filter(filter, **(filter_kwargs or {}))
+        self.raw_landmarks = self.landmarks  # before filtering
+        self.roi = None
+        if roi:
+            self.roi = RoiDetector(self._detect_frame, max_hands=maxHands, pool=self.pool,
+                                   **(roi if isinstance(roi, dict) else {}))
+        self.scheduler = None
+        if budget:
+            self.scheduler = FlowScheduler(self.roi or self._detect_frame, pool=self.pool,
+                                           **(budget if isinstance(budget, dict) else {"budget_ms": budget}))
+
+    @property
+    def mp_hands(self):
+        return _mediapipe().solutions.hands
+
+    @property
+    def mp_draw(self):
+        return _mediapipe().solutions.drawing_utils
+
+    @property
+    def hands(self):
+        if self._hands is None:
+            self._hands = self.mp_hands.Hands(
+                max_num_hands=self.maxHands,
+                min_detection_confidence=self.detectionConfidence,
+                min_tracking_confidence=self.trackConfidence)
+        return self._hands
+
+    def warm_up(self, background=True, size=(640, 480)):
+        """
+        Import mediapipe, build the graph and run it once on a blank frame, so the first
+        camera frame does not pay for model initialization. background=True does it on a
+        daemon thread; until it is done detect() reports no hands instead of blocking.
+        """
+        if self._hands is not None or self._warming is not None:
+            return self
+        blank = np.zeros((size[1], size[0], 3), np.uint8)
+
+        def run():
+            try:
+                self.hands.process(blank)
+            except Exception as e:
+                self.warm_error = e  # detect() retries and raises it on the caller's thread
+                self._hands = None
+            finally:
+                self._warming.set()
+
+        self._warming = threading.Event()
+        if background:
+            threading.Thread(target=run, name="HandTrackerWarmUp", daemon=True).start()
+        else:
+            run()
+        return self
+
+    @property
+    def ready(self):
+        """True once detection runs without waiting for the model (see warm_up)"""
+        if self._warming is not None:
+            return self._warming.is_set()
+        return self._hands is not None
+
+    def detect(self, frame):
+        """Run MediaPipe on a BGR frame and return (landmarks, handedness, scores) arrays"""
+        if self._warming is not None and not self._warming.is_set():
+            return results_to_arrays(None)
+        if self.scheduler is not None:
+            return self.scheduler(frame)
+        if self.roi is not None:
+            return self.roi(frame)
+        return self._detect_frame(frame)
+
+    def _detect_frame(self, frame):
+        with self.profiler.stage("cvtColor"):
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self.pool.buffer("tracker.rgb", frame.shape))
+        with self.profiler.stage("mediapipe"):
+            self.results = self.hands.process(rgb)
+        return results_to_arrays(self.results)
 
     def findHands(self, frame, draw=True):
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        self.results = self.hands.process(rgb)
-        self.hand_label = None
-        if self.results.multi_hand_landmarks:
-            if self.results.multi_handedness:
-                # Use first hand's handedness label
-                try:
-                    self.hand_label = self.results.multi_handedness[0].classification[0].label
-                except Exception:
-                    self.hand_label = None
+        self.set_landmarks(*self.detect(frame), frame=frame)
+        if self.roi is not None or self.scheduler is not None:
+            # results are relative to the crop (or stale on flow frames); draw from the arrays
+            return self.draw_landmarks(frame) if draw else frame
+        if self.results is not None and self.results.multi_hand_landmarks:
             for handLms in self.results.multi_hand_landmarks:
                 if draw:
                     self.mp_draw.draw_landmarks(frame, handLms, self.mp_hands.HAND_CONNECTIONS)
         return frame
 
-    def _smooth_point(self, x, y):
-        self.prev_points.append((x, y))
-        sx = int(sum(p[0] for p in self.prev_points) / len(self.prev_points))
-        sy = int(sum(p[1] for p in self.prev_points) / len(self.prev_points))
-        return sx, sy
+    def set_landmarks(self, landmarks, handedness, scores=None, timestamp=None, frame=None):
+        """
+        Use landmarks computed elsewhere (e.g. an inference worker process) for this frame.
+        While recording, the landmarks (and the frame, if the recorder stores frames) are appended.
+        """
+        self.landmarks = np.asarray(landmarks, np.float32).reshape(-1, 21, 3)
+        self.handedness = np.asarray(handedness, np.int8).reshape(-1)
+        self.scores = np.ones(len(self.landmarks), np.float32) if scores is None else np.asarray(scores, np.float32)
+        self._features = None
+        self._pointers = None
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        self._t = timestamp
+        if self.recorder is not None:
+            self.recorder.write(timestamp, self.landmarks, self.handedness, self.scores, frame)
+        self.raw_landmarks = self.landmarks
+        self.ids = self.identity(self.landmarks, self.handedness, timestamp)
+        if self.filter is not None:
+            self.landmarks = self.filter(self.landmarks, self.handedness, timestamp, ids=self.ids)
+        # Use first hand's handedness label
+        self.hand_label = HANDEDNESS_LABELS.get(int(self.handedness[0])) if len(self.handedness) else None
 
-    def _landmark_to_point(self, lm, w, h):
-        return int(lm.x * w), int(lm.y * h)
+    def start_recording(self, path, frames=False, size=(0, 0), **kw):
+        """Record every frame's landmarks to a .hlr file (see gestures.recording)"""
+        self.stop_recording()
+        self.recorder = LandmarkRecorder(path, self.maxHands, size, frames=frames, **kw)
+        return self.recorder
 
-    def get_finger_positions(self, frame):
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+    def draw_landmarks(self, frame):
+        """Draw the current landmark arrays (no MediaPipe objects needed)"""
+        h, w = frame.shape[:2]
+        for hand in self.landmarks:
+            pts = np.rint(hand[:, :2] * (w, h)).astype(np.int32)
+            for a, b in HAND_CONNECTIONS:
+                cv2.line(frame, tuple(pts[a]), tuple(pts[b]), (255, 255, 255), 2)
+            for p in pts:
+                cv2.circle(frame, tuple(p), 4, (0, 0, 255), -1)
+        return frame
+
+    def features(self, frame):
+        """
+        Per-hand features for the current frame, computed once in a vectorized pass
+        over all hands: tips (n,5,2), fingers (n,5), pinch_distance, is_pinch, is_fist, is_palm_open.
+        """
+        h, w = frame.shape[:2]
+        if self._features is None or self._features[:2] != (w, h):
+            self._features = (w, h, hand_features.compute(self.landmarks, self.handedness, w, h))
+        return self._features[2]
+
+    def pointers(self, frame):
+        """
+        (n, 2) int32 index tips of all hands; without a landmark filter each is the mean
+        of its hand's last smooth_factor tips (once per frame, in one pass over the hands).
+        """
+        h, w = frame.shape[:2]
+        if self._pointers is None or self._pointers[:2] != (w, h):
+            tips = self.features(frame)['tips'][:, 1]
+            if self.filter is None:
+                tips = self._pointer_filter(tips[:, None].astype(np.float64), self.handedness,
+                                            self._t, ids=self.ids)[:, 0].astype(np.int32)
+            self._pointers = (w, h, tips)
+        return self._pointers[2]
+
+    def get_finger_positions(self, frame, hand=0):
         """
         Returns dict: {'thumb':(x,y), 'index':(x,y), 'middle':..., 'ring':..., 'pinky':...}
         or None if no hand detected.
-        Note: index gets smoothing applied, others are raw.
+        Note: index gets moving-average smoothing when no landmark filter is set.
         """
-        if not self.results or not self.results.multi_hand_landmarks:
+        if len(self.landmarks) <= hand:
             return None
 
-        h, w, _ = frame.shape
-        hand = self.results.multi_hand_landmarks[0]
-        tips_idx = {'thumb':4, 'index':8, 'middle':12, 'ring':16, 'pinky':20}
-        points = {}
-        for name, idx in tips_idx.items():
-            lm = hand.landmark[idx]
-            x, y = self._landmark_to_point(lm, w, h)
-            if name == 'index':
-                points[name] = self._smooth_point(x, y)
-            else:
-                points[name] = (x, y)
+        tips = self.features(frame)['tips'][hand].tolist()
+        points = {name: tuple(p) for name, p in zip(hand_features.FINGER_NAMES, tips)}
+        points['index'] = tuple(self.pointers(frame)[hand].tolist())
         return points
 
-    def fingers_up(self, frame):
+    def fingers_up(self, frame, hand=0):
         """
         Returns list [thumb_up, index_up, middle_up, ring_up, pinky_up] or None
         Using tip vs pip positions (index->pinky). Thumb uses x relative to ip depending on handedness.
         """
-        if not self.results or not self.results.multi_hand_landmarks:
+        if len(self.landmarks) <= hand:
             return None
-
-        hand = self.results.multi_hand_landmarks[0]
-        # tip and pip indices
-        tips = [4, 8, 12, 16, 20]
-        pips = [3, 6, 10, 14, 18]
-        status = []
-        for t, p in zip(tips, pips):
-            tip = hand.landmark[t]
-            pip = hand.landmark[p]
-            if t != 4:
-                status.append(tip.y < pip.y)  # True if tip is above pip (finger up)
-            else:
-                # thumb: for right hand, tip.x < ip.x when thumb is open to left side of image
-                if self.hand_label == 'Right':
-                    status.append(tip.x < pip.x)
-                elif self.hand_label == 'Left':
-                    status.append(tip.x > pip.x)
-                else:
-                    # unknown handedness -> fallback to comparing x with ip
-                    status.append(tip.x < pip.x)
-        return status
+        return self.features(frame)['fingers'][hand].tolist()
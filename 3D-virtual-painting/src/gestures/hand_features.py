@@ -0,0 +1,72 @@
+# src/gestures/hand_features.py
+"""
+Vectorized per-frame hand features over MediaPipe landmark arrays.
+landmarks: (n_hands, 21, 3) float32 normalized coordinates, handedness: (n_hands,) int8
+(-1 Left, 1 Right, 0 unknown). Every function handles all hands in one numpy pass.
+"""
+import numpy as np
+
+FINGER_NAMES = ('thumb', 'index', 'middle', 'ring', 'pinky')
+TIP_IDS = np.array([4, 8, 12, 16, 20])
+PIP_IDS = np.array([3, 6, 10, 14, 18])  # thumb uses its IP joint
+THUMB_TIP, INDEX_TIP = 4, 8
+TIPS = slice(4, 21, 4)  # same as TIP_IDS, but a view instead of a fancy-index copy
+
+
+def fingers_up(landmarks, handedness):
+    """(n, 5) bool: fingers tip above pip; thumb tip outside its IP joint depending on handedness"""
+    tips = landmarks[:, TIPS]
+    pips = landmarks[:, PIP_IDS]
+    up = tips[:, :, 1] < pips[:, :, 1]
+    # right (or unknown) hand: thumb open when tip.x < ip.x; left hand mirrored
+    mirror = np.where(np.asarray(handedness) == -1, -1.0, 1.0)
+    up[:, 0] = (tips[:, 0, 0] - pips[:, 0, 0]) * mirror < 0
+    return up
+
+
+def pixel_points(landmarks, w, h):
+    """(n, 21, 2) float64 pixel coordinates of every landmark"""
+    return landmarks[:, :, :2] * np.array((w, h), np.float64)
+
+
+def tip_points(landmarks, w, h, px=None):
+    """(n, 5, 2) int32 pixel coordinates of the five finger tips (truncated like int())"""
+    px = pixel_points(landmarks, w, h) if px is None else px
+    return px[:, TIPS].astype(np.int32)
+
+
+def pinch_distance(landmarks, w, h, px=None):
+    """(n,) float32 pixel distance between thumb tip and index tip"""
+    px = pixel_points(landmarks, w, h) if px is None else px
+    d = px[:, INDEX_TIP] - px[:, THUMB_TIP]
+    return np.sqrt(np.einsum('ij,ij->i', d, d)).astype(np.float32)
+
+
+def up_count(fingers):
+    return fingers.sum(axis=1)
+
+
+def is_fist(fingers, max_fingers_up=0):
+    """(n,) bool: no more than max_fingers_up fingers up"""
+    return up_count(fingers) <= max_fingers_up
+
+
+def is_palm_open(fingers, min_fingers_up=4):
+    """(n,) bool: at least min_fingers_up fingers up"""
+    return up_count(fingers) >= min_fingers_up
+
+
+def compute(landmarks, handedness, w, h, pinch_threshold=45):
+    """All per-hand features for one frame in a single pass"""
+    fingers = fingers_up(landmarks, handedness)
+    px = pixel_points(landmarks, w, h)
+    pinch = pinch_distance(landmarks, w, h, px)
+    count = up_count(fingers)
+    return {
+        'tips': tip_points(landmarks, w, h, px),
+        'fingers': fingers,
+        'pinch_distance': pinch,
+        'is_pinch': pinch < pinch_threshold,
+        'is_fist': count == 0,
+        'is_palm_open': count >= 4,
+    }
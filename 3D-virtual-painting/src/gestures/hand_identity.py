@@ -0,0 +1,108 @@
+# src/gestures/hand_identity.py
+"""
+Stable per-hand ids across frames. MediaPipe reports the hands of a frame in no fixed
+order, so everything that keeps per-hand state (landmark filters, gesture timers, open
+strokes) is keyed on these ids instead of the row a hand happens to be in.
+"""
+import numpy as np
+
+PALM_IDS = np.array([0, 5, 9, 13, 17])  # wrist + finger MCPs: steadier than any tip
+
+
+def palm_centers(landmarks):
+    """(n, 2) normalized palm centers"""
+    return landmarks[:, PALM_IDS, :2].mean(axis=1, dtype=np.float64)
+
+
+class HandIdentity:
+    """
+    Matches each frame's hands to the tracks of the previous frames. The cost of a
+    (hand, track) pair is the distance between the hand's palm center and the track's
+    predicted one (constant velocity, normalized frame units) plus handed_cost when
+    both handedness codes are known and disagree, so two hands that cross keep their
+    ids as long as MediaPipe labels them consistently, and a one-frame label flip does
+    not swap them. Pairs are taken cheapest first; pairs costing more than max_cost are
+    not matched, and unmatched hands get new ids. Tracks unseen for more than max_missing
+    seconds are forgotten.
+    """
+
+    def __init__(self, max_cost=0.25, handed_cost=0.15, max_missing=0.5):
+        self.max_cost = max_cost
+        self.handed_cost = handed_cost
+        self.max_missing = max_missing
+        self.reset()
+
+    def reset(self):
+        self.track_ids = np.zeros(0, np.int32)
+        self.centers = np.zeros((0, 2))
+        self.velocity = np.zeros((0, 2))
+        self.handedness = np.zeros(0, np.int8)
+        self.last_seen = np.zeros(0)
+        self.next_id = 0
+
+    def __call__(self, landmarks, handedness, t):
+        """(n,) int32 ids of the frame's hands"""
+        self._forget(t)
+        n = len(landmarks)
+        if not n:
+            return np.zeros(0, np.int32)
+        centers = palm_centers(landmarks)
+        handedness = np.asarray(handedness, np.int8).reshape(-1)
+        m = len(self.track_ids)
+        track = np.full(n, -1, np.intp)
+        if m:
+            dt = (t - self.last_seen)[:, None]
+            d = centers[:, None] - (self.centers + self.velocity * dt)
+            cost = np.sqrt((d * d).sum(axis=2))
+            cost += self.handed_cost * ((handedness[:, None] * self.handedness) < 0)
+            if n == m == 1:
+                track[0] = 0 if cost[0, 0] <= self.max_cost else -1
+            else:
+                self._greedy(cost, track)
+        new = track < 0
+        if not new.any():
+            # every hand continues a track (the steady state)
+            ids = self.track_ids[track]
+            dt = np.maximum(t - self.last_seen[track], 1e-3)
+            self.velocity[track] = (centers - self.centers[track]) / dt[:, None]
+            self.centers[track] = centers
+            self.handedness[track] = np.where(handedness != 0, handedness, self.handedness[track])
+            self.last_seen[track] = t
+            return ids
+        ids = np.full(n, -1, np.int32)
+        matched = ~new
+        j = track[matched]
+        ids[matched] = self.track_ids[j]
+        # update matched tracks, add new ones
+        dt = np.maximum(t - self.last_seen[j], 1e-3)
+        self.velocity[j] = (centers[matched] - self.centers[j]) / dt[:, None]
+        self.centers[j] = centers[matched]
+        self.handedness[j] = np.where(handedness[matched] != 0, handedness[matched], self.handedness[j])
+        self.last_seen[j] = t
+        k = int(new.sum())
+        ids[new] = np.arange(self.next_id, self.next_id + k, dtype=np.int32)
+        self.next_id += k
+        self.track_ids = np.concatenate([self.track_ids, ids[new]])
+        self.centers = np.concatenate([self.centers, centers[new]])
+        self.velocity = np.concatenate([self.velocity, np.zeros((k, 2))])
+        self.handedness = np.concatenate([self.handedness, handedness[new]])
+        self.last_seen = np.concatenate([self.last_seen, np.full(k, float(t))])
+        return ids
+
+    def _greedy(self, cost, track):
+        """Pairs in cost order, each hand and track used once: at most 4 x 4 for MediaPipe's hand limit"""
+        taken = set()
+        for flat, c in zip(np.argsort(cost, axis=None).tolist(), np.sort(cost, axis=None).tolist()):
+            if c > self.max_cost:
+                break
+            i, j = divmod(flat, cost.shape[1])
+            if track[i] < 0 and j not in taken:
+                track[i] = j
+                taken.add(j)
+
+    def _forget(self, t):
+        """Drop the tracks unseen for more than max_missing"""
+        keep = t - self.last_seen <= self.max_missing
+        if not keep.all():
+            self.track_ids, self.centers, self.velocity, self.handedness, self.last_seen = (
+                a[keep] for a in (self.track_ids, self.centers, self.velocity, self.handedness, self.last_seen))
@@ -0,0 +1,194 @@
+# src/gestures/recording.py
+"""
+Compact binary landmark recordings (.hlr) and a replay source.
+
+Layout (little endian):
+  header  16 bytes: magic b"HLMR", version u16, flags u16, max_hands u16, width u16,
+          height u16, reserved u16
+  record  fixed size per frame: timestamp f8, n_hands u1, handedness i1[max_hands],
+          scores f4[max_hands], landmarks f4[max_hands, 21, 3], frame_len u4
+          followed by frame_len bytes of encoded image (only when FLAG_FRAMES is set)
+
+Without frames the records are fixed-size, so a whole file loads with one np.fromfile.
+"""
+import struct
+import time
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+MAGIC = b"HLMR"
+VERSION = 1
+FLAG_FRAMES = 1
+HEADER = struct.Struct("<4sHHHHHH")
+N_LANDMARKS = 21
+
+ReplayFrame = namedtuple(
+    "ReplayFrame", ["image", "timestamp", "seq", "landmarks", "handedness", "scores"])
+
+
+def record_dtype(max_hands):
+    return np.dtype([
+        ("timestamp", "<f8"),
+        ("n_hands", "u1"),
+        ("handedness", "i1", (max_hands,)),
+        ("scores", "<f4", (max_hands,)),
+        ("landmarks", "<f4", (max_hands, N_LANDMARKS, 3)),
+        ("frame_len", "<u4"),
+    ])
+
+
+class LandmarkRecorder:
+    """
+    Appends one record per frame. frames=True also stores each frame encoded with
+    `ext` ('.jpg' or '.png'); size=(w, h) is written to the header for replay.
+    """
+
+    def __init__(self, path, max_hands=1, size=(0, 0), frames=False, ext=".jpg", quality=90):
+        self.path = path
+        self.max_hands = max_hands
+        self.frames = frames
+        self.ext = ext
+        self.params = [int(cv2.IMWRITE_JPEG_QUALITY), quality] if ext == ".jpg" else []
+        self._rec = np.zeros(1, record_dtype(max_hands))
+        self._f = open(path, "wb")
+        self._f.write(HEADER.pack(MAGIC, VERSION, FLAG_FRAMES if frames else 0, max_hands,
+                                  size[0], size[1], 0))
+        self.count = 0
+
+    def write(self, timestamp, landmarks, handedness, scores=None, frame=None):
+        rec = self._rec[0]
+        k = min(len(landmarks), self.max_hands)
+        rec["timestamp"] = timestamp
+        rec["n_hands"] = k
+        rec["handedness"][:] = 0
+        rec["scores"][:] = 0
+        rec["landmarks"][:] = 0
+        if k:
+            rec["handedness"][:k] = np.asarray(handedness)[:k]
+            rec["scores"][:k] = 1.0 if scores is None else np.asarray(scores)[:k]
+            rec["landmarks"][:k] = np.asarray(landmarks)[:k]
+        data = b""
+        if self.frames:
+            if frame is None:
+                raise ValueError("recorder was opened with frames=True but no frame was given")
+            ok, enc = cv2.imencode(self.ext, frame, self.params)
+            data = enc.tobytes()
+        rec["frame_len"] = len(data)
+        self._f.write(self._rec.tobytes())
+        if data:
+            self._f.write(data)
+        self.count += 1
+
+    def close(self):
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LandmarkRecording:
+    """
+    A loaded .hlr file: per-frame arrays timestamps (n,), n_hands (n,),
+    landmarks (n, max_hands, 21, 3), handedness (n, max_hands), scores (n, max_hands)
+    and, if recorded, encoded frames decoded on demand by image(i).
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, flags, max_hands, width, height, _ = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError("%s is not a landmark recording" % path)
+            if version != VERSION:
+                raise ValueError("unsupported recording version %d" % version)
+            self.max_hands = max_hands
+            self.size = (width, height)
+            dtype = record_dtype(max_hands)
+            self._encoded = None
+            if flags & FLAG_FRAMES:
+                recs, self._encoded = [], []
+                while True:
+                    raw = f.read(dtype.itemsize)
+                    if len(raw) < dtype.itemsize:
+                        break
+                    rec = np.frombuffer(raw, dtype)
+                    recs.append(rec)
+                    self._encoded.append(f.read(int(rec["frame_len"][0])))
+                records = np.concatenate(recs) if recs else np.zeros(0, dtype)
+            else:
+                records = np.fromfile(f, dtype)
+        self.records = records
+        self.timestamps = records["timestamp"]
+        self.n_hands = records["n_hands"].astype(np.int32)
+        self.landmarks = records["landmarks"]
+        self.handedness = records["handedness"]
+        self.scores = records["scores"]
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def has_frames(self):
+        return self._encoded is not None
+
+    @property
+    def duration(self):
+        return float(self.timestamps[-1] - self.timestamps[0]) if len(self) > 1 else 0.0
+
+    def image(self, i):
+        if self._encoded is None:
+            return None
+        return cv2.imdecode(np.frombuffer(self._encoded[i], np.uint8), cv2.IMREAD_COLOR)
+
+    def hands(self, i):
+        """(landmarks, handedness, scores) of frame i, trimmed to the hands present"""
+        k = self.n_hands[i]
+        return self.landmarks[i, :k], self.handedness[i, :k], self.scores[i, :k]
+
+
+def save_recording(path, timestamps, landmarks, handedness, scores=None, n_hands=None,
+                   size=(0, 0), frames=None, **kw):
+    """Write whole arrays at once (synthetic sessions, conversions)"""
+    max_hands = landmarks.shape[1]
+    with LandmarkRecorder(path, max_hands, size, frames=frames is not None, **kw) as rec:
+        for i, ts in enumerate(timestamps):
+            k = max_hands if n_hands is None else int(n_hands[i])
+            rec.write(ts, landmarks[i, :k], handedness[i, :k],
+                      None if scores is None else scores[i, :k],
+                      None if frames is None else frames[i])
+    return path
+
+
+class ReplaySource:
+    """
+    Iterates a recording as ReplayFrame tuples, as fast as possible by default.
+    realtime=True sleeps to reproduce the recorded timing. Frames without a stored image
+    get `blank` (a shared black frame of the recorded size) unless blank=False.
+    """
+
+    def __init__(self, recording, realtime=False, blank=True):
+        self.recording = recording if isinstance(recording, LandmarkRecording) else LandmarkRecording(recording)
+        self.realtime = realtime
+        w, h = self.recording.size
+        self.blank = np.zeros((h, w, 3), np.uint8) if blank and w and h else None
+
+    def __len__(self):
+        return len(self.recording)
+
+    def __iter__(self):
+        rec = self.recording
+        t_start = time.perf_counter()
+        for i in range(len(rec)):
+            if self.realtime:
+                delay = rec.timestamps[i] - rec.timestamps[0] - (time.perf_counter() - t_start)
+                if delay > 0:
+                    time.sleep(delay)
+            image = rec.image(i) if rec.has_frames else self.blank
+            landmarks, handedness, scores = rec.hands(i)
+            yield ReplayFrame(image, float(rec.timestamps[i]), i, landmarks, handedness, scores)
@@ -0,0 +1,150 @@
+# src/gestures/roi_tracking.py
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from core.frame_pool import FramePool
+
+
+class RoiDetector:
+    """
+    Wraps a full-frame detector (frame -> landmarks, handedness, scores) so that, once a
+    hand is found, only a padded square crop around the previous frame's landmark bbox
+    is fed to it. While tracking is confident the crop is also downscaled (resolution
+    ladder). Landmarks always come back normalized to the full frame.
+
+    pad:          crop margin as a fraction of the bbox's longer side
+    min_crop:     smallest crop side in pixels (a near-still hand still gets context)
+    scale:        resize factor for the crop when the previous score >= confident
+    min_input:    never shrink the detector input's longer side below this
+    full_scale:   resize factor for full-frame detection (1.0 = native)
+    max_misses:   consecutive empty crops before falling back to full-frame detection
+    redetect_every: with fewer than max_hands tracked, run a full frame this often to
+                  pick up hands outside the crop (0 = never)
+    pool:         core.frame_pool.FramePool the downscaled crops are written into
+    """
+
+    def __init__(self, detect, max_hands=1, pad=0.35, min_crop=192, scale=0.5, confident=0.8,
+                 min_input=160, full_scale=1.0, max_misses=3, redetect_every=30, window=300,
+                 pool=None):
+        self.detect = detect
+        self.max_hands = max_hands
+        self.pad = pad
+        self.min_crop = min_crop
+        self.scale = scale
+        self.confident = confident
+        self.min_input = min_input
+        self.full_scale = full_scale
+        self.max_misses = max_misses
+        self.redetect_every = redetect_every
+        self.pool = pool if pool is not None else FramePool()
+
+        self.roi = None          # (x0, y0, x1, y1) crop for the next frame, None = full frame
+        self.last_score = 0.0
+        self.misses = 0
+        self._n_tracked = 0
+        self._since_full = 0
+        self.last_mode = None    # 'full' or 'roi'
+        self.last_input = None   # (w, h) fed to the detector
+        self.last_ms = 0.0
+
+        self._ms = deque(maxlen=window)
+        self.frames = 0
+        self.roi_frames = 0
+        self.roi_misses = 0
+        self.losses = 0          # times tracking was dropped back to full-frame detection
+
+    def reset(self):
+        self.roi = None
+        self.misses = 0
+        self.last_score = 0.0
+
+    def __call__(self, frame):
+        t0 = time.perf_counter()
+        H, W = frame.shape[:2]
+        self.frames += 1
+        self._since_full += 1
+        use_roi = self.roi is not None and not (
+            self.redetect_every and self._since_full >= self.redetect_every
+            and self._n_tracked < self.max_hands)
+
+        if use_roi:
+            x0, y0, x1, y1 = self.roi
+            factor = self.scale if self.last_score >= self.confident else 1.0
+            landmarks, handedness, scores = self._run(frame[y0:y1, x0:x1], factor)
+            self.roi_frames += 1
+            self.last_mode = 'roi'
+            if len(landmarks):
+                # crop-normalized -> full-frame-normalized (z scales with the crop width)
+                cw, ch = x1 - x0, y1 - y0
+                landmarks = landmarks * np.array([cw / W, ch / H, cw / W], np.float32)
+                landmarks[:, :, 0] += x0 / W
+                landmarks[:, :, 1] += y0 / H
+        else:
+            landmarks, handedness, scores = self._run(frame, self.full_scale)
+            self._since_full = 0
+            self.last_mode = 'full'
+
+        if len(landmarks):
+            self.misses = 0
+            self._n_tracked = len(landmarks)
+            self.last_score = float(scores.min())
+            self.roi = self._crop_around(landmarks, W, H)
+        elif use_roi:
+            self.roi_misses += 1
+            self.misses += 1
+            self.last_score = 0.0  # retry the kept crop at full resolution
+            if self.misses >= self.max_misses:
+                self.losses += 1
+                self.reset()
+        else:
+            self.reset()
+
+        self.last_ms = (time.perf_counter() - t0) * 1000.0
+        self._ms.append(self.last_ms)
+        return landmarks, handedness, scores
+
+    def _run(self, image, factor):
+        h, w = image.shape[:2]
+        factor = min(1.0, max(factor, self.min_input / float(max(w, h))))
+        if factor < 1.0:
+            size = (max(1, int(round(w * factor))), max(1, int(round(h * factor))))
+            image = cv2.resize(image, size, dst=self.pool.buffer("roi.input", (size[1], size[0]) + image.shape[2:]),
+                               interpolation=cv2.INTER_AREA)
+        self.last_input = (image.shape[1], image.shape[0])
+        landmarks, handedness, scores = self.detect(image)
+        return np.asarray(landmarks, np.float32), handedness, scores
+
+    def _crop_around(self, landmarks, W, H):
+        """Padded square pixel box around all hands, clipped to the frame"""
+        xy = landmarks[:, :, :2].reshape(-1, 2) * (W, H)
+        (bx0, by0), (bx1, by1) = xy.min(axis=0), xy.max(axis=0)
+        side = max(bx1 - bx0, by1 - by0)
+        side = min(max(side * (1.0 + 2.0 * self.pad), self.min_crop), W, H)
+        cx, cy = (bx0 + bx1) / 2.0, (by0 + by1) / 2.0
+        x0 = int(np.clip(cx - side / 2.0, 0, W - side))
+        y0 = int(np.clip(cy - side / 2.0, 0, H - side))
+        return x0, y0, x0 + int(side), y0 + int(side)
+
+    # ---------------- stats ----------------
+    @property
+    def loss_rate(self):
+        """Fraction of ROI frames that ended in a fall back to full-frame detection"""
+        return self.losses / float(self.roi_frames) if self.roi_frames else 0.0
+
+    def stats(self):
+        ms = np.array(self._ms) if self._ms else np.zeros(1)
+        return {
+            'frames': self.frames,
+            'roi_frames': self.roi_frames,
+            'roi_misses': self.roi_misses,
+            'losses': self.losses,
+            'loss_rate': self.loss_rate,
+            'ms_mean': float(ms.mean()),
+            'ms_p95': float(np.percentile(ms, 95)),
+            'last_ms': self.last_ms,
+            'mode': self.last_mode,
+            'input': self.last_input,
+        }
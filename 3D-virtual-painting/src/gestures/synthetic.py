@@ -0,0 +1,213 @@
+# src/gestures/synthetic.py
+"""
+Synthetic hand landmark sessions for headless tests and benchmarks.
+
+hand_landmarks() builds a plausible 21-point MediaPipe hand for a pose ('pinch', 'point',
+'palm', 'fist', 'v') with the index tip at a given pixel. make_session() scripts whole
+gesture sessions (drawing, erasing, undo, toolbar hovering) on top of it and returns the
+arrays a LandmarkRecording holds, plus the noiseless index-tip trajectory as ground truth.
+"""
+import numpy as np
+
+from gestures.recording import save_recording
+from ui.app_ui import toolbar_rects, BRUSH_BUTTON, ERASER_BUTTON
+
+FPS = 30.0
+HAND_SIZE = 120.0  # wrist -> middle MCP in pixels
+
+# right hand, palm to the camera, fingers up; hand units, image y grows downwards
+_MCP = {5: (-0.25, -0.90), 9: (-0.05, -0.95), 13: (0.15, -0.90), 17: (0.33, -0.80)}
+_LEN = {5: 1.0, 9: 1.08, 13: 1.0, 17: 0.8}
+_SEGMENTS = (0.35, 0.25, 0.20)  # mcp -> pip -> dip -> tip
+_THUMB_OPEN = [(-0.20, -0.20), (-0.40, -0.35), (-0.55, -0.50), (-0.70, -0.60)]
+_THUMB_FOLDED = [(-0.20, -0.20), (-0.35, -0.40), (-0.45, -0.55), (-0.30, -0.60)]
+
+POSES = {
+    #         thumb  index  middle ring   pinky
+    'point': (False, True, False, False, False),
+    'pinch': (False, True, False, False, False),
+    'palm':  (True, True, True, True, True),
+    'fist':  (False, False, False, False, False),
+    'v':     (False, True, True, False, False),
+    'three': (False, True, True, True, False),
+    'call':  (True, False, False, False, True),
+}
+
+
+def _pose(pose):
+    """(21, 3) landmarks in hand units with the wrist at the origin"""
+    fingers = POSES[pose]
+    pts = np.zeros((21, 3))
+    pts[1:5, :2] = _THUMB_OPEN if fingers[0] else _THUMB_FOLDED
+    for up, base in zip(fingers[1:], (5, 9, 13, 17)):
+        x, y = _MCP[base]
+        k = _LEN[base]
+        pts[base, :2] = x, y
+        if up:
+            for j, seg in enumerate(_SEGMENTS):
+                y -= seg * k
+                pts[base + 1 + j, :2] = x, y
+        else:  # curled: pip up a little, dip and tip back down below the pip
+            pts[base + 1:base + 4, :2] = (x, y - 0.25), (x + 0.02, y - 0.05), (x + 0.03, y + 0.10)
+    if pose == 'pinch':
+        tip = pts[8, :2]
+        pts[4, :2] = tip + (-0.06, 0.04)
+        pts[3, :2] = (pts[2, :2] + pts[4, :2]) / 2.0
+    pts[:, 2] = -0.03 * np.hypot(pts[:, 0], pts[:, 1])
+    return pts
+
+
+_POSE_CACHE = {name: _pose(name) for name in POSES}
+
+
+def hand_landmarks(pose, tip, w, h, handedness=1, size=HAND_SIZE):
+    """(21, 3) float32 normalized landmarks for `pose` with the index tip at pixel `tip`"""
+    pts = _POSE_CACHE[pose].copy()
+    if handedness == -1:
+        pts[:, 0] = -pts[:, 0]
+    pts[:, :2] = (pts[:, :2] - pts[8, :2]) * size + tip
+    pts[:, 0] /= w
+    pts[:, 1] /= h
+    return pts.astype(np.float32)
+
+
+class _Script:
+    """Accumulates (pose, index tip) per frame for each hand"""
+
+    def __init__(self, hands=1):
+        self.frames = [[] for _ in range(hands)]
+
+    def hold(self, hand, pose, at, seconds):
+        self.move(hand, pose, at, at, seconds)
+
+    def move(self, hand, pose, start, end, seconds, bend=0.0):
+        n = max(1, int(round(seconds * FPS)))
+        start, end = np.asarray(start, float), np.asarray(end, float)
+        normal = np.array([-(end - start)[1], (end - start)[0]])
+        for t in np.linspace(0.0, 1.0, n):
+            p = start + (end - start) * t + normal * bend * np.sin(np.pi * t)
+            self.frames[hand].append((pose, p))
+
+    def absent(self, hand, seconds):
+        self.frames[hand].extend([(None, None)] * max(1, int(round(seconds * FPS))))
+
+    def at(self, hand):
+        """Index tip of the last scripted frame of a hand"""
+        for pose, p in reversed(self.frames[hand]):
+            if p is not None:
+                return p
+        return None
+
+
+def _center(rect):
+    (x1, y1), (x2, y2) = rect
+    return (x1 + x2) / 2.0, (y1 + y2) / 2.0
+
+
+def _strokes(script, rng, w, h, count, hand=0, area=None, seconds=1.5):
+    x0, y0, x1, y1 = area or (120, 140, w - 120, h - 180)
+    for _ in range(count):
+        a = rng.uniform((x0, y0), (x1, y1))
+        b = rng.uniform((x0, y0), (x1, y1))
+        script.move(hand, 'point', script.at(hand) if script.at(hand) is not None else a, a, 0.4)
+        script.move(hand, 'pinch', a, b, seconds, bend=rng.uniform(-0.4, 0.4))
+
+
+def _script(kind, rng, w, h):
+    rects = toolbar_rects(w, h)
+    if kind == 'two_hands':
+        script = _Script(2)
+        _strokes(script, rng, w, h, 5, hand=0, area=(80, 140, w // 2 - 40, h - 180))
+        _strokes(script, rng, w, h, 5, hand=1, area=(w // 2 + 40, 140, w - 80, h - 180))
+        return script, [1, -1]
+    if kind == 'four_hands':
+        script = _Script(4)
+        ym = (140 + h - 180) // 2
+        for k, (x0, x1) in enumerate([(80, w // 2 - 40), (w // 2 + 40, w - 80)] * 2):
+            y0, y1 = (140, ym - 30) if k < 2 else (ym + 30, h - 180)
+            _strokes(script, rng, w, h, 5, hand=k, area=(x0, y0, x1, y1))
+        return script, [1, -1, 1, -1]
+    script = _Script(1)
+    if kind == 'scribble':
+        _strokes(script, rng, w, h, 8)
+    elif kind == 'erase':
+        _strokes(script, rng, w, h, 4)
+        script.move(0, 'palm', script.at(0), _center(rects[ERASER_BUTTON]), 0.5)
+        script.hold(0, 'palm', _center(rects[ERASER_BUTTON]), 0.8)
+        script.move(0, 'point', _center(rects[ERASER_BUTTON]), (150, 200), 0.6)
+        for y in range(200, h - 200, 60):
+            script.move(0, 'point', script.at(0), (w - 150, y), 0.8)
+            script.move(0, 'point', script.at(0), (150, y + 30), 0.8)
+        script.move(0, 'palm', script.at(0), _center(rects[BRUSH_BUTTON]), 0.5)
+        script.hold(0, 'palm', _center(rects[BRUSH_BUTTON]), 0.8)
+    elif kind == 'undo':
+        for _ in range(4):
+            _strokes(script, rng, w, h, 2, seconds=1.0)
+            script.hold(0, 'fist', script.at(0), 0.6)
+            script.hold(0, 'point', script.at(0), 0.9)
+    elif kind == 'colors':
+        for i in range(8):
+            c = _center(rects[i])
+            script.move(0, 'palm', script.at(0) if i else c, c, 0.4)
+            script.hold(0, 'palm', c, 0.7)
+            _strokes(script, rng, w, h, 1, seconds=1.0)
+    elif kind == 'idle':
+        for _ in range(6):
+            a = rng.uniform((100, 100), (w - 100, h - 200))
+            script.move(0, 'point', script.at(0) if script.at(0) is not None else a, a, 1.0, bend=0.3)
+            script.absent(0, 0.5)
+    else:
+        raise ValueError("unknown synthetic session %r" % kind)
+    return script, [1]
+
+
+SESSIONS = ('scribble', 'erase', 'undo', 'colors', 'idle', 'two_hands', 'four_hands')
+
+
+def make_session(kind, w=1280, h=720, seed=0, noise_px=0.0, repeat=1):
+    """
+    Scripted gesture session as a dict of arrays:
+      timestamps (n,), landmarks (n, hands, 21, 3), handedness (n, hands), scores (n, hands),
+      n_hands (n,), truth (n, hands, 2) noiseless index tip pixels (nan while absent), size.
+    noise_px adds gaussian landmark jitter of that many pixels (sigma).
+    """
+    rng = np.random.default_rng(seed)
+    script, codes = _script(kind, rng, w, h)
+    frames = [f * repeat for f in script.frames]
+    n = max(len(f) for f in frames)
+    hands = len(frames)
+    landmarks = np.zeros((n, hands, 21, 3), np.float32)
+    truth = np.full((n, hands, 2), np.nan)
+    present = np.zeros((n, hands), bool)
+    for k, hand_frames in enumerate(frames):
+        for i, (pose, tip) in enumerate(hand_frames):
+            if pose is None:
+                continue
+            landmarks[i, k] = hand_landmarks(pose, tip, w, h, codes[k])
+            truth[i, k] = tip
+            present[i, k] = True
+    if noise_px:
+        noise = rng.normal(0.0, noise_px, landmarks[..., :2].shape) / (w, h)
+        landmarks[..., :2] += noise.astype(np.float32)
+    # hands are packed to the front of each frame, as MediaPipe reports them
+    order = np.argsort(~present, axis=1, kind='stable')
+    landmarks = np.take_along_axis(landmarks, order[:, :, None, None], axis=1)
+    truth = np.take_along_axis(truth, order[:, :, None], axis=1)
+    handedness = np.where(np.take_along_axis(present, order, axis=1),
+                          np.asarray(codes, np.int8)[order], 0).astype(np.int8)
+    return {
+        'name': kind,
+        'timestamps': np.arange(n) / FPS,
+        'landmarks': landmarks,
+        'handedness': handedness,
+        'scores': np.where(handedness != 0, 0.95, 0.0).astype(np.float32),
+        'n_hands': present.sum(axis=1),
+        'truth': truth,
+        'size': (w, h),
+    }
+
+
+def write_session(path, session):
+    """Save a make_session() dict as a .hlr recording"""
+    return save_recording(path, session['timestamps'], session['landmarks'], session['handedness'],
+                          session['scores'], session['n_hands'], session['size'])
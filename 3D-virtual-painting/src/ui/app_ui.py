@@ -0,0 +1,200 @@
+# src/ui/app_ui.py
+import cv2
+import numpy as np
+
+BAR_H = 90
+
+PALETTE = [
+    (0,0,255), (255,0,0), (0,255,0), (0,255,255),
+    (255,255,255), (255,0,255), (0,128,255), (42,42,165)
+]
+COLOR_NAMES = ["Red","Blue","Green","Yellow","White","Purple","Orange","Brown"]
+
+# toolbar slots after the 8 colors
+BRUSH_BUTTON, ERASER_BUTTON, SAVE_BUTTON = 8, 9, 10
+
+
+def toolbar_rects(win_w=1280, win_h=720, bar_h=BAR_H):
+    rects = []
+    padding_x = 30
+    spacing = (win_w - 2 * padding_x) // 12
+    x = padding_x + 10
+    y1 = win_h - bar_h + 12
+    y2 = win_h - 18
+    for i in range(8):
+        rects.append(((x,y1),(x+48,y2)))
+        x += spacing
+    rects.append(((win_w-210,y1),(win_w-150,y2)))
+    rects.append(((win_w-140,y1),(win_w-80,y2)))
+    rects.append(((win_w-60,y1),(win_w-20,y2)))
+    return rects
+
+def point_in_rect(x,y,rect):
+    (x1,y1),(x2,y2) = rect
+    return x1 <= x <= x2 and y1 <= y <= y2
+
+BAR_SHADE, BAR_ALPHA = (40,40,40), 0.45
+HELP_SHADE, HELP_ALPHA = (10,10,10), 0.7
+HELP_BOX = (20, 20, 120)  # x margin, y1, y2
+
+
+# toolbar icon drawing (minimal)
+def draw_minimal_icons(frame, rects, current_color, active_tool, highlight_index=None, bar_h=BAR_H):
+    win_h, win_w = frame.shape[:2]
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (0, win_h - bar_h), (win_w, win_h), BAR_SHADE, -1)
+    cv2.addWeighted(overlay, BAR_ALPHA, frame, 1 - BAR_ALPHA, 0, frame)
+    draw_toolbar_icons(frame, rects, current_color, active_tool, highlight_index)
+
+def draw_toolbar_icons(frame, rects, current_color, active_tool, highlight_index=None):
+    # colors
+    for i, ((x1,y1),(x2,y2)) in enumerate(rects[:8]):
+        col = PALETTE[i]
+        cv2.rectangle(frame, (x1,y1),(x2,y2), col, -1)
+        cv2.rectangle(frame, (x1,y1),(x2,y2), (20,20,20), 1)
+        if col == current_color:
+            cv2.rectangle(frame, (x1-3,y1-3),(x2+3,y2+3),(255,255,255),2)
+        if highlight_index == i:
+            cv2.rectangle(frame, (x1-4,y1-4),(x2+4,y2+4),(0,255,255),2)
+    # brush
+    bx1,by1 = rects[8][0]; bx2,by2 = rects[8][1]
+    cv2.rectangle(frame,(bx1,by1),(bx2,by2),(200,200,200),-1)
+    cv2.putText(frame,"B",(bx1+14,by2-14),cv2.FONT_HERSHEY_SIMPLEX,0.9,(20,20,20),2)
+    if active_tool=="BRUSH":
+        cv2.rectangle(frame,(bx1-4,by1-4),(bx2+4,by2+4),(255,255,255),2)
+    if highlight_index==8:
+        cv2.rectangle(frame,(bx1-6,by1-6),(bx2+6,by2+6),(0,255,255),2)
+    # eraser
+    ex1,ey1 = rects[9][0]; ex2,ey2 = rects[9][1]
+    cv2.rectangle(frame,(ex1,ey1),(ex2,ey2),(120,120,120),-1)
+    pts = np.array([[ex1+6,ey2-10],[ex1+16,ey1+10],[ex2-6,ey1+10],[ex2-6,ey2-6]])
+    cv2.fillPoly(frame,[pts],(200,200,200))
+    if active_tool=="ERASER":
+        cv2.rectangle(frame,(ex1-4,ey1-4),(ex2+4,ey2+4),(255,255,255),2)
+    if highlight_index==9:
+        cv2.rectangle(frame,(ex1-6,ey1-6),(ex2+6,ey2+6),(0,255,255),2)
+    # save
+    sx1,sy1 = rects[10][0]; sx2,sy2 = rects[10][1]
+    cv2.rectangle(frame,(sx1,sy1),(sx2,sy2),(60,0,0),-1)
+    cv2.putText(frame,"S",(sx1+12,sy2-14),cv2.FONT_HERSHEY_SIMPLEX,0.9,(255,255,255),2)
+    if highlight_index==10:
+        cv2.rectangle(frame,(sx1-6,sy1-6),(sx2+6,sy2+6),(0,255,255),2)
+
+# help overlay shown for the first seconds
+def draw_help(frame):
+    win_w = frame.shape[1]
+    mx, y1, y2 = HELP_BOX
+    overlay = frame.copy()
+    cv2.rectangle(overlay, (mx,y1),(win_w-mx,y2),HELP_SHADE,-1)
+    cv2.addWeighted(overlay, HELP_ALPHA, frame, 1 - HELP_ALPHA, 0, frame)
+    draw_help_text(frame)
+
+def draw_help_text(frame, x0=0, y0=0):
+    cv2.putText(frame, "Pinch (index+thumb) = Draw   |   Palm = Erase   |   Fist = Undo", (40-x0,60-y0), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (220,220,220),2)
+    cv2.putText(frame, "Hover toolbar to select colors/tools. Toggle gestures: V sign.", (40-x0,95-y0), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (180,180,180),1)
+
+
+class Sprite:
+    """
+    An overlay rendered once and blitted at (x, y): its box is shaded with `shade` at
+    `alpha`, then the art is composited on top (premultiplied color + coverage, i.e. a
+    BGRA image split into its opaque and edge pixels). blit() touches only the box's
+    ROI of the frame: one addWeighted, one masked copy of the opaque art and a blend
+    of the few antialiased edge pixels.
+    draw(img) draws the art in sprite coordinates; it is called on a black and a white
+    canvas, and their difference gives each pixel's coverage.
+    """
+
+    def __init__(self, x, y, w, h, draw, shade, alpha):
+        self.x, self.y, self.w, self.h = x, y, w, h
+        black = np.zeros((h, w, 3), np.uint8)
+        white = np.full((h, w, 3), 255, np.uint8)
+        draw(black)
+        draw(white)
+        # black = coverage * color, white = black + (1 - coverage) * 255
+        cover = 255 - (white.astype(np.int16) - black).max(axis=2)
+        self.art = black
+        self.mask = (cover == 255).astype(np.uint8) * 255
+        edge = (cover > 0) & (cover < 255)
+        self._edge = np.nonzero(edge)
+        self._edge_keep = (255 - cover[edge]).astype(np.uint16)[:, None]
+        self._edge_art = black[edge].astype(np.uint16)
+        self.shade = np.full((h, w, 3), shade, np.uint8)
+        self.alpha = alpha
+
+    def blit(self, frame):
+        roi = frame[self.y:self.y + self.h, self.x:self.x + self.w]
+        cv2.addWeighted(self.shade, self.alpha, roi, 1 - self.alpha, 0, dst=roi)
+        cv2.copyTo(self.art, self.mask, roi)
+        if len(self._edge[0]):
+            dst = roi[self._edge].astype(np.uint16)
+            roi[self._edge] = (dst * self._edge_keep + 127) // 255 + self._edge_art
+        return frame
+
+
+class UiLayer:
+    """
+    Toolbar and help panel as cached Sprites, for a win_w x win_h frame. The toolbar
+    sprite is re-rendered only when the color, tool or highlight changes (`renders`
+    counts it); the help sprite is rendered once. Output matches draw_minimal_icons /
+    draw_help (within 1 on antialiased text edges); frames of another size fall back
+    to them.
+    """
+
+    def __init__(self, win_w=1280, win_h=720, rects=None, bar_h=BAR_H):
+        self.win_w, self.win_h, self.bar_h = win_w, win_h, bar_h
+        self.rects = toolbar_rects(win_w, win_h, bar_h) if rects is None else rects
+        self._toolbar_key = None
+        self._toolbar = None
+        self._help = None
+        self.renders = 0
+
+    def toolbar(self, current_color, active_tool, highlight_index=None):
+        key = (tuple(current_color), active_tool, highlight_index)
+        if key != self._toolbar_key:
+            y0 = self.win_h - self.bar_h
+            rects = [((x1, y1 - y0), (x2, y2 - y0)) for (x1, y1), (x2, y2) in self.rects]
+            self._toolbar = Sprite(0, y0, self.win_w, self.bar_h,
+                                   lambda img: draw_toolbar_icons(img, rects, *key),
+                                   BAR_SHADE, BAR_ALPHA)
+            self._toolbar_key = key
+            self.renders += 1
+        return self._toolbar
+
+    def help(self):
+        if self._help is None:
+            mx, y1, y2 = HELP_BOX
+            # cv2.rectangle fills both end rows / columns
+            self._help = Sprite(mx, y1, self.win_w - 2 * mx + 1, y2 - y1 + 1,
+                                lambda img: draw_help_text(img, mx, y1), HELP_SHADE, HELP_ALPHA)
+        return self._help
+
+    def _fits(self, frame):
+        return frame.shape[:2] == (self.win_h, self.win_w)
+
+    def draw_toolbar(self, frame, current_color, active_tool, highlight_index=None):
+        if not self._fits(frame):
+            draw_minimal_icons(frame, self.rects, current_color, active_tool, highlight_index, self.bar_h)
+            return frame
+        return self.toolbar(current_color, active_tool, highlight_index).blit(frame)
+
+    def draw_help(self, frame):
+        if not self._fits(frame):
+            draw_help(frame)
+            return frame
+        return self.help().blit(frame)
+
+# debug overlay
+def draw_debug_overlay(frame, detected_hand, is_pinch, is_palm_open, is_fist, mode, gesture_on, hover_highlight):
+    x, y = 10, 20
+    lines = [
+        f"HandDetected: {detected_hand}",
+        f"GestureOn: {gesture_on}",
+        f"Pinch: {is_pinch}",
+        f"PalmOpen: {is_palm_open}",
+        f"Fist: {is_fist}",
+        f"Mode: {mode}",
+        f"HoverHigh: {hover_highlight}"
+    ]
+    for i,ln in enumerate(lines):
+        cv2.putText(frame, ln, (x, y + i*20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (200,200,0), 1)
@@ -0,0 +1,42 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from ui.app_ui import PALETTE, UiLayer, draw_help, draw_minimal_icons, toolbar_rects
+
+
+def frame(w=1280, h=720, seed=0):
+    return np.random.default_rng(seed).integers(0, 256, (h, w, 3), np.uint8)
+
+
+def test_sprites_match_the_direct_drawing():
+    ui = UiLayer(1280, 720)
+    rects = toolbar_rects(1280, 720)
+    for color, tool, highlight in [(PALETTE[0], "BRUSH", None), (PALETTE[5], "ERASER", 9),
+                                   (PALETTE[7], "BRUSH", 2), (PALETTE[2], "BRUSH", 10)]:
+        img = frame()
+        expected = img.copy()
+        draw_minimal_icons(expected, rects, color, tool, highlight)
+        draw_help(expected)
+        ui.draw_toolbar(img, color, tool, highlight)
+        ui.draw_help(img)
+        diff = np.abs(img.astype(int) - expected)
+        assert diff.max() <= 1            # antialiased text edges round differently
+        assert np.array_equal(img[130:630], expected[130:630])
+
+
+def test_toolbar_renders_only_on_state_change_and_blits_its_roi():
+    ui = UiLayer(640, 480)
+    img = frame(640, 480)
+    before = img.copy()
+    for highlight in [None] * 5 + [3] * 5 + [None] * 5:
+        ui.draw_toolbar(img, PALETTE[1], "BRUSH", highlight)
+    assert ui.renders == 3
+    assert np.array_equal(img[:480 - 90], before[:480 - 90])
+    # another frame size falls back to direct drawing
+    small = frame(320, 240)
+    expected = small.copy()
+    draw_minimal_icons(expected, ui.rects, PALETTE[1], "BRUSH")
+    assert np.array_equal(ui.draw_toolbar(small, PALETTE[1], "BRUSH"), expected)
@@ -0,0 +1,89 @@
+import os, sys
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.batch import render_all
+from gestures.synthetic import make_session, write_session
+
+W, H = 640, 480
+
+
+def scripted_detector(kind, maxHands=None):
+    """Detector that plays back a synthetic session's landmarks, one frame per call"""
+    s = make_session(kind, W, H)
+    calls = iter(range(len(s['timestamps'])))
+
+    def detect(frame):
+        i = next(calls)
+        k = min(s['n_hands'][i], maxHands or 4)
+        return s['landmarks'][i, :k], s['handedness'][i, :k], s['scores'][i, :k]
+    return detect
+
+
+def video_frames(path):
+    cap = cv2.VideoCapture(path)
+    n = 0
+    while cap.read()[0]:
+        n += 1
+    cap.release()
+    return n
+
+
+def test_pool_renders_like_a_single_process(tmp_path):
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    for seed, kind in enumerate(('scribble', 'undo')):
+        write_session(str(inputs / (kind + ".hlr")), make_session(kind, W, H, seed=seed))
+    (inputs / "notes.txt").write_text("not an input")
+
+    pooled = {os.path.basename(r.path): r for r in render_all([str(inputs)], str(tmp_path / "a"), workers=2)}
+    serial = {os.path.basename(r.path): r for r in render_all([str(inputs)], str(tmp_path / "b"), workers=0)}
+    assert sorted(pooled) == ["scribble.hlr", "undo.hlr"]
+    for name, r in pooled.items():
+        assert r.error is None and r.frames > 0
+        assert video_frames(r.video) == r.frames
+        canvas = cv2.imread(r.canvas)
+        assert canvas.shape == (H, W, 3) and canvas.any()
+        assert np.array_equal(canvas, cv2.imread(serial[name].canvas))
+
+
+def test_videos_use_the_detector_and_video_time(tmp_path):
+    inputs = tmp_path / "in"
+    inputs.mkdir()
+    n = len(make_session('scribble', W, H)['timestamps'])
+    writer = cv2.VideoWriter(str(inputs / "cam.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 30.0, (W, H))
+    for _ in range(n):
+        writer.write(np.zeros((H, W, 3), np.uint8))
+    writer.release()
+    write_session(str(tmp_path / "cam.hlr"), make_session('scribble', W, H))
+    (inputs / "broken.avi").write_bytes(b"\0" * 64)
+
+    results = {os.path.basename(r.path): r for r in render_all(
+        [str(inputs)], str(tmp_path / "out"), workers=0,
+        detector_factory=scripted_detector, detector_kwargs={"kind": "scribble"}, video=False)}
+    assert results["broken.avi"].error is not None
+    r = results["cam.mp4"]
+    assert r.error is None and r.frames == n and r.video is None
+    # same landmarks at the same (frame index / fps) timestamps as the recording
+    [ref] = render_all([str(tmp_path / "cam.hlr")], str(tmp_path / "ref"), workers=0, video=False)
+    assert np.array_equal(cv2.imread(r.canvas), cv2.imread(ref.canvas))
+
+
+def test_video_renders_every_detected_hand(tmp_path):
+    s = make_session('two_hands', W, H)
+    writer = cv2.VideoWriter(str(tmp_path / "two.mp4"), cv2.VideoWriter_fourcc(*"mp4v"), 30.0, (W, H))
+    for _ in range(len(s['timestamps'])):
+        writer.write(np.zeros((H, W, 3), np.uint8))
+    writer.release()
+    [r] = render_all([str(tmp_path / "two.mp4")], str(tmp_path / "out"), workers=0, video=False,
+                     detector_factory=scripted_detector, detector_kwargs={"kind": "two_hands", "maxHands": 2})
+    assert r.error is None
+    canvas = cv2.imread(r.canvas)
+    # one hand scribbles on each half of the frame
+    assert canvas[:, :W // 2 - 20].any() and canvas[:, W // 2 + 20:].any()
+    write_session(str(tmp_path / "two.hlr"), s)
+    [ref] = render_all([str(tmp_path / "two.hlr")], str(tmp_path / "ref"), workers=0, video=False)
+    assert np.array_equal(canvas, cv2.imread(ref.canvas))
@@ -0,0 +1,250 @@
+import os, sys
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.draw_engine import DrawEngine
+
+W, H = 320, 240
+
+
+def blank():
+    return np.full((H, W, 3), 60, np.uint8)
+
+
+def scribble(drawer, start, n=20, step=(5, 3)):
+    x, y = start
+    for i in range(n):
+        drawer.update((x + i * step[0], y + (i % 4) * step[1]), "DRAW")
+    drawer.update(None, "STOP")
+
+
+def assert_close(a, b, mean_tol=0.5, outlier_frac=0.002):
+    """Polyline joins are anti-aliased slightly differently from per-segment lines"""
+    diff = np.abs(a.astype(int) - b.astype(int))
+    assert diff.mean() < mean_tol
+    assert np.mean(diff.max(axis=2) > 16) < outlier_frac
+
+
+def legacy_draw(strokes, frame):
+    """Golden reference: the original per-segment renderer with per-segment glow blend"""
+    for stroke in strokes:
+        for i in range(1, len(stroke)):
+            x1, y1, color1, thick1 = stroke[i - 1]
+            x2, y2, _, _ = stroke[i]
+            cv2.line(frame, (x1, y1), (x2, y2), color1, thick1, lineType=cv2.LINE_AA)
+            overlay = frame.copy()
+            cv2.line(overlay, (x1, y1), (x2, y2), color1, thick1 + 8)
+            frame = cv2.addWeighted(overlay, 0.08, frame, 0.92, 0)
+    return frame
+
+
+def rebuilt(drawer):
+    drawer.invalidate()
+    return drawer.draw(blank())
+
+
+def test_incremental_layer_matches_full_rebuild():
+    drawer = DrawEngine(stroke_thickness=4)
+    drawer.draw(blank())  # layer exists before any points -> incremental path
+    scribble(drawer, (20, 40))
+    drawer.change_color((0, 255, 0))
+    scribble(drawer, (30, 60))
+    incremental = drawer.draw(blank())
+    assert_close(incremental, rebuilt(drawer))
+
+
+def test_undo_and_clear_invalidate_layer():
+    drawer = DrawEngine()
+    drawer.draw(blank())
+    scribble(drawer, (20, 40))
+    only_first = drawer.draw(blank()).copy()
+    scribble(drawer, (20, 150))
+    drawer.update(None, "ERASE")
+    assert_close(drawer.draw(blank()), only_first)
+    drawer.clear()
+    assert np.array_equal(drawer.draw(blank()), blank())
+
+
+def test_strokes_assignment_invalidates_layer():
+    drawer = DrawEngine()
+    scribble(drawer, (20, 40))
+    drawer.draw(blank())
+    drawer.strokes = [[]]
+    assert np.array_equal(drawer.draw(blank()), blank())
+
+
+def test_matches_legacy_renderer_golden_image():
+    rng = np.random.default_rng(7)
+    drawer = DrawEngine(stroke_thickness=6)
+    for color in [(0, 0, 255), (255, 0, 0), (0, 255, 0), (255, 255, 255)]:
+        drawer.change_color(color)
+        x, y = rng.integers(60, W - 60), rng.integers(60, H - 60)
+        for _ in range(25):
+            x = int(np.clip(x + rng.integers(-10, 11), 0, W - 1))
+            y = int(np.clip(y + rng.integers(-10, 11), 0, H - 1))
+            drawer.update((x, y), "DRAW")
+        drawer.update(None, "STOP")
+    cam = rng.integers(60, 200, (H, W, 3), dtype=np.uint8)
+    golden = legacy_draw(drawer.strokes, cam.copy()).astype(int)
+    out = drawer.draw(cam.copy()).astype(int)
+    touched = (golden != cam).any(axis=2) | (out != cam).any(axis=2)
+    diff = np.abs(out - golden)[touched]
+    # glow is blended once instead of compounding per overlapping segment
+    assert diff.mean() < 8
+    assert np.percentile(diff, 95) < 40
+
+
+def test_smoothing_keeps_endpoints_and_caches():
+    drawer = DrawEngine(smoothing=2)
+    scribble(drawer, (20, 40))
+    drawer.draw(blank())
+    runs = drawer._render_strokes()
+    pts = runs[0][0]
+    assert tuple(pts[0]) == drawer.strokes[0][0][:2]
+    assert tuple(pts[-1]) == drawer.strokes[0][-1][:2]
+    assert drawer._render_strokes()[0][0] is pts
+
+
+def test_erase_rerenders_only_dirty_region_consistently():
+    drawer = DrawEngine(stroke_thickness=5)
+    drawer.draw(blank())
+    for y in (60, 70, 120):
+        scribble(drawer, (30, y), n=40)
+    before = drawer.draw(blank()).copy()
+    drawer.erase_at((120, 70), 15)
+    assert drawer._dirty is not None
+    partial = drawer.draw(blank()).copy()
+    assert drawer._dirty is None
+    assert_close(partial, rebuilt(drawer))
+    # strokes away from the eraser are untouched
+    assert np.array_equal(partial[110:, :], before[110:, :])
+
+
+def test_erase_redraws_the_segments_around_the_gap():
+    drawer = DrawEngine(stroke_thickness=6, min_distance=0, simplify_tolerance=0)
+    drawer.draw(blank())
+    for x in range(100, 201, 20):    # 20 px segments, longer than the eraser reaches
+        drawer.update((x, 100), "DRAW")
+    drawer.update(None, "STOP")
+    drawer.draw(blank())
+    # a few pixels of join anti-aliasing differ anyway; stale segment ends are ~80-160
+    for point in ((140, 100), (200, 100)):   # a middle point, then an endpoint
+        drawer.erase_at(point, 5)
+        partial = drawer.draw(blank()).copy()
+        assert_close(partial, rebuilt(drawer), outlier_frac=1e-4)
+    drawer.undo()
+    drawer.undo()
+    partial = drawer.draw(blank()).copy()
+    assert_close(partial, rebuilt(drawer), outlier_frac=1e-4)
+
+
+def test_ingest_simplification_bounds_deviation_and_keeps_layer_consistent():
+    from core.simplify import max_deviation
+    rng = np.random.default_rng(3)
+    t = np.linspace(0, 1, 120)
+    raw = np.column_stack([40 + 240 * t, 120 + 60 * np.sin(6 * t)]) + rng.normal(0, 0.4, (120, 2))
+    raw = np.rint(raw).astype(int)
+    drawer = DrawEngine(stroke_thickness=4, min_distance=2.0, simplify_tolerance=1.0)
+    drawer.draw(blank())
+    for x, y in raw:
+        drawer.update((int(x), int(y)), "DRAW")
+        end = drawer.store.stroke_points(-1)[-1]
+        assert np.hypot(*(end - (x, y))) < 2.0   # the stroke follows the pointer
+    drawer.update(None, "STOP")
+    kept = drawer.store.stroke_points(0)
+    assert len(kept) < len(raw) // 3
+    assert tuple(kept[0]) == tuple(raw[0]) and tuple(kept[-1]) == tuple(raw[-1])
+    assert max_deviation(raw, kept) <= 2.0 + 1e-6   # min_distance + tolerance
+    assert_close(drawer.draw(blank()), rebuilt(drawer))
+
+
+def test_simplified_straight_line_can_still_be_erased():
+    drawer = DrawEngine(min_distance=2.0, simplify_tolerance=1.0, max_segment=20)
+    for x in range(0, 300, 3):
+        drawer.update((x, 50), "DRAW")
+    drawer.update(None, "STOP")
+    assert drawer.store.n_alive < 20
+    assert drawer.erase_at((150, 50), 12) > 0
+
+
+def test_two_hands_draw_their_own_strokes(tmp_path):
+    path = str(tmp_path / "two.hsj")
+    drawer = DrawEngine(stroke_thickness=4, min_distance=0, simplify_tolerance=0)
+    drawer.start_journal(path)
+    drawer.draw(blank())
+    for i in range(20):
+        drawer.update((20 + 5 * i, 40), "DRAW", hand=0, color=(0, 0, 255))
+        if 5 <= i < 15:
+            drawer.update((30 + 5 * i, 150), "DRAW", hand=1, color=(0, 255, 0))
+        elif i == 15:
+            drawer.update(None, "STOP", hand=1)     # lifts while hand 0 goes on
+    live = drawer.draw(blank())
+    assert [len(s) for s in drawer.strokes if s] == [10] and len(drawer.stroke_runs()) == 2
+    drawer.update(None, "STOP", hand=0)
+    assert not drawer.pens
+    # one stroke per pen-down / pen-up, stored as the hands lift
+    strokes = [s for s in drawer.strokes if s]
+    assert [(len(s), s[0][2]) for s in strokes] == [(10, (0, 255, 0)), (20, (0, 0, 255))]
+    assert_close(live, drawer.draw(blank()))
+    assert_close(live, rebuilt(drawer))
+    drawer.journal.flush()
+    resumed = DrawEngine()
+    resumed.load_journal(path)
+    assert [s for s in resumed.strokes if s] == strokes
+    drawer.update(None, "ERASE")                    # undo takes hand 0's whole stroke
+    assert [len(s) for s in drawer.strokes if s] == [10]
+    assert (drawer.draw(blank())[38:43, 20:120] == blank()[38:43, 20:120]).all()
+
+
+def test_clear_with_hands_down_undoes_cleanly():
+    drawer = DrawEngine(stroke_thickness=5, checkpoint_every=1, min_distance=0, simplify_tolerance=0)
+    drawer.draw(blank())
+    scribble(drawer, (30, 150))
+    drawer.draw(blank())
+    for x in range(40, 140, 10):
+        drawer.update((x, 60), "DRAW", hand=11, color=(0, 255, 0))
+        before = drawer.draw(blank()).copy()        # checkpoints are due every frame
+    drawer.clear()                                   # hand 11 is lifted and cleared with the rest
+    assert not drawer.pens and len(drawer.store.live_strokes()) == 0
+    assert (drawer.draw(blank()) == blank()).all()
+    drawer.undo()                                    # both strokes come back, no pixels without one
+    assert len([s for s in drawer.strokes if s]) == 2
+    undone = drawer.draw(blank()).copy()
+    assert np.array_equal(undone, before)
+    assert_close(undone[40:80], rebuilt(drawer)[40:80], outlier_frac=1e-4)
+
+    drawer.clear()
+    for x in range(40, 140, 10):                     # a hand still down keeps its stroke on screen
+        drawer.update((x, 100), "DRAW", hand=12)
+        drawer.draw(blank())
+    drawer.undo()                                    # ... when the layer is restored under it
+    undone = drawer.draw(blank()).copy()
+    assert_close(undone[40:120], rebuilt(drawer)[40:120], outlier_frac=1e-4)
+    assert not np.array_equal(undone[95:105], blank()[95:105])
+
+
+def test_crossing_strokes_stack_the_same_live_and_rebuilt():
+    drawer = DrawEngine(stroke_thickness=7, min_distance=0, simplify_tolerance=0)
+    drawer.draw(blank())
+
+    def check():
+        live = drawer.draw(blank()).copy()
+        assert_close(live, rebuilt(drawer), outlier_frac=1e-4)
+
+    for i in range(12):          # hand 0 across, a hand=None stroke down through it
+        drawer.update((60 + i * 10, 100), "DRAW", hand=0, color=(0, 0, 255))
+        drawer.update((110, 60 + i * 8), "DRAW", color=(255, 0, 0))
+        check()
+    drawer.update(None, "STOP")
+    check()
+    for i in range(12):          # hand 1 down through hand 0's stroke while hand 0 goes on
+        drawer.update((150, 60 + i * 8), "DRAW", hand=1, color=(0, 255, 0))
+        drawer.update((180 + i * 5, 100), "DRAW", hand=0)
+        check()
+    drawer.update(None, "STOP", hand=1)
+    check()
+    drawer.update(None, "STOP", hand=0)
+    check()
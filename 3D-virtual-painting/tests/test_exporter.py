@@ -0,0 +1,105 @@
+import os, queue, sys, threading
+
+import cv2
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.draw_engine import DrawEngine
+from core.exporter import Exporter
+
+
+def test_png_and_svg_are_written_off_thread(tmp_path):
+    img = np.zeros((40, 60, 3), np.uint8)
+    img[10:20, 5:15] = (0, 0, 255)
+    drawer = DrawEngine(min_distance=0, simplify_tolerance=0)   # every sample, as the svg path below
+    drawer.change_color((0, 128, 255))
+    for x in range(10, 50, 10):
+        drawer.update((x, 20), "DRAW")
+    drawer.update(None, "STOP")
+
+    done = []
+    with Exporter(png_compression=9) as ex:
+        png = ex.save_png(img, str(tmp_path / "out" / "a.png"), callback=done.append)
+        svg = ex.save_svg(drawer, str(tmp_path / "a.svg"), (60, 40))
+        drawer.clear()   # the export works on the strokes as they were
+        assert png.result(timeout=5) == str(tmp_path / "out" / "a.png")
+        svg.result(timeout=5)
+    assert done == [png]
+    assert np.array_equal(cv2.imread(png.result()), img)
+    text = open(svg.result()).read()
+    assert 'viewBox="0 0 60 40"' in text
+    assert 'd="M10 20 L20 20 L30 20 L40 20"' in text and 'stroke="#ff8000"' in text
+    assert ex.written == 2 and ex.failed == 0
+
+
+def test_world_canvas_svg_covers_the_world_drawing(tmp_path):
+    drawer = DrawEngine(stroke_thickness=4, world=True, min_distance=0, simplify_tolerance=0)
+    drawer.viewport.pan(-500, 300)               # world (600, -250) is now on screen at (100, 50)
+    drawer.update((100, 50), "DRAW")
+    drawer.update((160, 50), "DRAW")
+    drawer.update(None, "STOP")
+    drawer.viewport.zoom_at(2.0, (0, 0))
+    drawer.update((100, 100), "DRAW")            # world (550, -250)
+    drawer.update((100, 140), "DRAW")
+    drawer.update(None, "STOP")
+
+    with Exporter() as ex:
+        text = open(ex.save_svg(drawer, str(tmp_path / "w.svg"), (60, 40), background=(0, 0, 0)).result(timeout=5)).read()
+    assert 'viewBox="547 -253 116 26"' in text and 'width="116" height="26"' in text
+    assert '<rect x="547" y="-253" width="116" height="26"' in text
+    assert 'M600 -250 L660 -250' in text and 'M550 -250 L550 -230' in text
+
+
+def test_full_queue_fails_fast(tmp_path):
+    ex = Exporter(max_pending=1).start()
+    busy, gate = threading.Event(), threading.Event()
+    ex._submit(lambda: busy.set() or gate.wait(), (), None)   # occupies the worker
+    assert busy.wait(5)
+    first = ex.save_png(np.zeros((4, 4, 3), np.uint8), str(tmp_path / "1.png"))
+    second = ex.save_png(np.zeros((4, 4, 3), np.uint8), str(tmp_path / "2.png"))
+    with pytest.raises(queue.Full):
+        second.result(timeout=0)
+    ex.start_video(str(tmp_path / "v.avi"), (4, 4), fourcc="MJPG")   # control jobs always get in
+    assert not ex.write_frame(np.zeros((4, 4, 3), np.uint8)) and ex.dropped_frames == 1
+    ex.stop_video()
+    gate.set()
+    assert first.result(timeout=5)
+    ex.max_pending = 8   # the stop_video job may still be queued
+    bad = ex.save_png(np.zeros((4, 4, 3), np.uint8), str(tmp_path / "x.unknown"))
+    with pytest.raises(cv2.error):
+        bad.result(timeout=5)
+    ex.stop()
+    assert ex.failed == 1
+
+
+def test_video_recording(tmp_path):
+    path = str(tmp_path / "s.avi")
+    ex = Exporter(max_pending=64)
+    ex.start_video(path, (64, 48), fps=10, fourcc="MJPG")
+    for i in range(10):
+        ex.write_frame(np.full((48, 64, 3), i * 20, np.uint8))
+    ex.write_frame(np.zeros((24, 32, 3), np.uint8))   # resized to the video size
+    ex.stop()
+    assert not ex.recording
+    assert ex.video_frames == 11 and ex.dropped_frames == 0
+    cap = cv2.VideoCapture(path)
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == 11
+    cap.release()
+
+
+def test_video_that_cannot_open_stops_recording(tmp_path, capsys):
+    (tmp_path / "file").write_text("")
+    ex = Exporter()
+    gate = threading.Event()
+    ex._submit(gate.wait, (), None)   # holds the worker until the frame is queued
+    ex.start_video(str(tmp_path / "file" / "v.avi"), (32, 24), fourcc="MJPG")   # its dir is a file
+    assert ex.write_frame(np.zeros((24, 32, 3), np.uint8))
+    gate.set()
+    ex.save_png(np.zeros((4, 4, 3), np.uint8), str(tmp_path / "sync.png")).result(timeout=5)
+    assert not ex.recording and ex.failed == 1 and isinstance(ex.last_error, OSError)
+    assert not ex.write_frame(np.zeros((24, 32, 3), np.uint8))
+    ex.stop()
+    assert ex.video_frames == 0 and ex.dropped_frames == 1   # the frame queued before it failed
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,77 @@
+import os, sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from gestures.filters import KalmanFilter, OneEuroFilter, MovingAverageFilter, make_filter
+from gestures.gesture_tracker import HandTracker
+
+RIGHT = np.array([1], np.int8)
+
+
+def run(f, track, noise=0.0, seed=0):
+    rng = np.random.default_rng(seed)
+    out = []
+    for i, x in enumerate(track):
+        lm = np.full((1, 21, 3), x, np.float32) + rng.normal(0, noise, (1, 21, 3)).astype(np.float32)
+        out.append(f(lm, RIGHT, i / 30.0)[0, 8, 0])
+    return np.array(out)
+
+
+@pytest.mark.parametrize("f", [OneEuroFilter(), KalmanFilter(), MovingAverageFilter()])
+def test_filters_reduce_jitter_at_rest(f):
+    out = run(f, np.full(120, 0.5), noise=0.002)
+    assert np.std(np.diff(out[30:])) < 0.7 * 0.002 * np.sqrt(2)
+    assert abs(out[30:].mean() - 0.5) < 0.001
+
+
+def test_prediction_removes_constant_velocity_lag():
+    track = 0.1 + 0.3 * np.arange(90) / 30.0  # 0.3 frame widths per second
+    plain = run(KalmanFilter(), track)
+    ahead = run(KalmanFilter(predict_ms=100), track)
+    assert abs(plain[-1] - track[-1]) < 1e-3
+    assert abs(ahead[-1] - (track[-1] + 0.03)) < 1e-3
+    # one euro lags at constant speed; prediction moves it ahead of the plain output
+    euro, euro_ahead = run(OneEuroFilter(), track), run(OneEuroFilter(predict_ms=33), track)
+    assert euro[-1] < track[-1] < euro_ahead[-1]
+
+
+def test_state_restarts_when_hands_change():
+    f = KalmanFilter()
+    a = np.zeros((1, 21, 3), np.float32)
+    f(a, RIGHT, 0.0)
+    f(a, RIGHT, 1 / 30.0)
+    two = np.ones((2, 21, 3), np.float32)
+    assert np.array_equal(f(two, np.array([1, -1], np.int8), 2 / 30.0), two)
+    assert f(np.zeros((0, 21, 3), np.float32), [], 3 / 30.0).shape == (0, 21, 3)
+
+
+@pytest.mark.parametrize("cls", [OneEuroFilter, KalmanFilter, MovingAverageFilter])
+def test_state_follows_hand_ids(cls):
+    rng = np.random.default_rng(1)
+    tracks = 0.5 + rng.normal(0, 0.01, (3, 40, 21, 3)).cumsum(axis=1).astype(np.float32)
+    alone = [cls(predict_ms=20) for _ in range(3)]
+    joint = cls(predict_ms=20)
+    for i in range(40):
+        # MediaPipe order changes every frame; hand 2 only shows up at frame 15
+        ids = np.array([1, 0] if i % 2 else [0, 1]) if i < 15 else np.array([2, 1, 0])
+        out = joint(tracks[ids, i], np.ones(len(ids), np.int8), i / 30.0, ids=ids)
+        for row, k in enumerate(ids):
+            t0 = 15 if k == 2 else 0
+            expect = alone[k](tracks[k, i:i + 1], RIGHT, i / 30.0) if i >= t0 else None
+            assert np.allclose(out[row], expect[0], atol=1e-6)
+
+
+def test_tracker_filters_landmarks_and_keeps_raw():
+    with pytest.raises(ValueError):
+        make_filter('median')
+    tracker = HandTracker(filter='one_euro', filter_kwargs={'min_cutoff': 0.5})
+    frame = np.zeros((720, 1280, 3), np.uint8)
+    for i, x in enumerate([0.5, 0.6]):
+        tracker.set_landmarks(np.full((1, 21, 3), x, np.float32), RIGHT, timestamp=i / 30.0)
+    assert np.allclose(tracker.raw_landmarks, 0.6)
+    assert 0.5 < tracker.landmarks[0, 8, 0] < 0.6
+    # no moving average on top of the filter
+    assert tracker.get_finger_positions(frame)['index'][0] == int(tracker.landmarks[0, 8, 0] * 1280)
@@ -0,0 +1,79 @@
+import os, sys, time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from gestures.flow_tracking import FlowScheduler
+
+W, H, SIDE = 640, 480, 120
+GRID = np.stack(np.meshgrid(np.linspace(0.15, 0.85, 7), np.linspace(0.2, 0.8, 3)), -1).reshape(-1, 2)
+
+
+def texture(seed):
+    noise = np.random.default_rng(seed).integers(0, 256, (SIDE, SIDE), np.uint8)
+    return cv2.GaussianBlur(noise, (0, 0), 2.0) // 2 + 130   # bright, smooth enough for LK
+
+
+def scene(x, y, patch):
+    frame = np.full((H, W, 3), 30, np.uint8)
+    frame[y:y + SIDE, x:x + SIDE] = patch[:, :, None]
+    return frame
+
+
+def slow_detector(delay, calls):
+    """Finds the bright patch and puts 21 landmarks on a grid inside it"""
+    def detect(frame):
+        calls.append(1)
+        time.sleep(delay)
+        ys, xs = np.nonzero(frame[:, :, 0] > 100)
+        if len(xs) == 0:
+            return np.zeros((0, 21, 3), np.float32), np.zeros(0, np.int8), np.zeros(0, np.float32)
+        pts = (xs.min(), ys.min()) + GRID * SIDE
+        lm = np.zeros((1, 21, 3), np.float32)
+        lm[0, :, :2] = pts / (W, H)
+        return lm, np.array([1], np.int8), np.array([0.95], np.float32)
+    return detect
+
+
+def test_skips_inference_over_budget_and_follows_the_hand():
+    calls = []
+    sched = FlowScheduler(slow_detector(0.015, calls), budget_ms=6.0, max_stride=4)
+    patch = texture(0)
+    errors = []
+    for k in range(40):
+        x, y = 60 + 4 * k, 100 + 2 * k
+        landmarks, _, _ = sched(scene(x, y, patch))
+        truth = ((x, y) + GRID * SIDE)[8]
+        errors.append(np.abs(landmarks[0, 8, :2] * (W, H) - truth).max())
+    assert sched.stride == 4 and sched.skip_ratio > 0.6 and len(calls) < 15
+    assert max(errors) < 1.5
+    st = sched.stats()
+    assert st['redetects'] == 0 and st['compliance'] > 0.6 and st['flow_ms'] < 6.0
+
+
+def test_redetects_when_flow_loses_the_hand():
+    calls = []
+    sched = FlowScheduler(slow_detector(0.01, calls), budget_ms=3.0, max_stride=8)
+    patch = texture(1)
+    for k in range(6):
+        sched(scene(100 + 3 * k, 100, patch))
+    while sched.last_mode != 'detect':
+        sched(scene(118, 100, patch))
+    sched(scene(121, 100, patch))
+    assert sched.last_mode == 'flow' and sched.stride > 2
+    n = len(calls)
+    # the hand jumps elsewhere: flow cannot vouch for the points, detection runs right away
+    landmarks, _, _ = sched(scene(400, 300, texture(2)))
+    assert len(calls) == n + 1 and sched.last_mode == 'detect' and sched.redetects == 1
+    assert np.allclose(landmarks[0, 0, :2] * (W, H), (400, 300) + GRID[0] * SIDE, atol=0.5)
+
+
+def test_under_budget_runs_every_frame():
+    calls = []
+    sched = FlowScheduler(slow_detector(0.0, calls), budget_ms=1000.0)
+    patch = texture(3)
+    for k in range(10):
+        sched(scene(50 + k, 50, patch))
+    assert len(calls) == 10 and sched.skip_ratio == 0.0 and sched.compliance == 1.0
@@ -0,0 +1,61 @@
+import os, sys, time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.exporter import Exporter
+from core.frame_pool import FramePool
+from core.frame_source import FrameSource
+from gestures.flow_tracking import FlowScheduler
+
+
+def test_buffers_are_reused_and_grow_only():
+    pool = FramePool()
+    a = pool.buffer("x", (48, 64, 3))
+    a[:] = 7
+    assert pool.buffer("x", (48, 64, 3)).base is a.base
+    small = pool.buffer("x", (10, 20))               # a smaller crop fits the same store
+    assert small.shape == (10, 20) and small.flags.c_contiguous and pool.allocations == 1
+    assert pool.buffer("x", (4, 4), np.float32).dtype == np.float32
+    pool.buffer("x", (96, 128, 3))
+    assert pool.allocations == 2
+
+    b = pool.acquire((4, 4, 3))
+    pool.release(b)
+    assert pool.acquire((4, 4, 3)) is b and pool.acquire((4, 4, 3)) is not b
+
+    fresh = FramePool(reuse=False)
+    fresh.buffer("x", (4, 4))
+    fresh.buffer("x", (4, 4))
+    assert fresh.allocations == 2
+
+
+def test_steady_state_frame_path_does_not_allocate(tmp_path):
+    rng = np.random.default_rng(0)
+    texture = cv2.GaussianBlur(rng.integers(0, 256, (120, 160, 3), np.uint8), (0, 0), 2)
+    raw = [np.roll(texture, 2 * i, axis=1) for i in range(30)]   # a slow pan flow can follow
+    pool = FramePool()
+    lm = np.full((1, 21, 3), 0.5, np.float32)
+    lm[0, :, 0] = np.linspace(0.3, 0.7, 21)
+    sched = FlowScheduler(lambda f: (lm, np.array([1], np.int8), np.ones(1, np.float32)),
+                          budget_ms=0.001, max_stride=3, pool=pool)
+    ex = Exporter(max_pending=64, pool=pool)
+    ex.start_video(str(tmp_path / "v.avi"), (96, 72), fps=10, fourcc="MJPG")
+    counts = []
+    with FrameSource(iter(raw), size=(96, 72), flip=1, drop=False, pool=pool) as src:
+        while True:
+            f = src.get(timeout=2.0)
+            if f is None:
+                break
+            assert np.array_equal(f.image, cv2.flip(cv2.resize(raw[f.seq], (96, 72)), 1))
+            sched(f.image)
+            ex.write_frame(f.image)
+            while ex.video_frames <= f.seq:   # written and its buffer handed back
+                time.sleep(0.001)
+            counts.append(pool.allocations)
+    ex.stop()
+    assert ex.video_frames == 30 and sched.flow_frames > 10
+    # resize scratch, two flow grays + the full-size one, one video buffer; then nothing
+    assert counts[5] == counts[-1] <= 6
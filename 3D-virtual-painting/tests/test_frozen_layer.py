@@ -0,0 +1,93 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core import stroke_store
+from core.draw_engine import DrawEngine, FROZEN_SUFFIX
+from test_draw_engine import assert_close, blank, rebuilt, scribble
+
+COLORS = [(0, 0, 255), (255, 0, 0), (0, 255, 0)]
+
+
+def paint(drawers, rng, n_strokes):
+    for k in range(n_strokes):
+        x, y = (int(v) for v in rng.integers(10, 200, 2))
+        n = int(rng.integers(3, 25))
+        for d in drawers:
+            d.change_color(COLORS[k % 3])
+            scribble(d, (x, y), n=n, step=(4, 3))
+            if k % 5 == 0:
+                d.draw(blank())
+
+
+def test_flattened_strokes_render_the_same_with_bounded_store(monkeypatch):
+    monkeypatch.setattr(stroke_store, "COMPACT_MIN_DEAD", 64)
+    for smoothing in (0, 2):
+        rng = np.random.default_rng(smoothing)
+        full = DrawEngine(stroke_thickness=5, smoothing=smoothing, min_distance=0, simplify_tolerance=0)
+        limited = DrawEngine(stroke_thickness=5, smoothing=smoothing, live_strokes=12, live_points=150,
+                             min_distance=0, simplify_tolerance=0)
+        sizes = []
+        for _ in range(12):
+            paint([full, limited], rng, 15)
+            limited.draw(blank())
+            sizes.append(limited.store.n_points)
+            assert len(limited.strokes) <= 13 and limited.store.n_alive <= 150 + 25
+        assert max(sizes) < 4 * 150                # dead points are compacted away
+        assert len(full.strokes) > 150
+        assert_close(limited.draw(blank()).copy(), full.draw(blank()))
+        assert_close(rebuilt(limited).copy(), rebuilt(full))   # rebuilds start from the frozen layer
+        limited.undo()                            # history never reaches a flattened stroke
+        while limited.undo():
+            pass
+        assert limited.frozen.bbox is not None and len(limited.strokes) == 1
+
+
+def test_eraser_and_clear_work_on_frozen_pixels():
+    drawer = DrawEngine(stroke_thickness=6, live_strokes=2)
+    for y in range(30, 200, 25):
+        scribble(drawer, (20, y), n=30, step=(8, 0))
+    drawer.draw(blank())
+    assert drawer.frozen.bbox is not None
+    before = drawer.draw(blank()).copy()
+
+    drawer.erase_at((100, 55), 12)              # a frozen stroke
+    assert not drawer.frozen.alpha[55, 90:111].any()
+    erased = drawer.draw(blank()).copy()
+    assert np.array_equal(erased[55, 95:106], blank()[55, 95:106])
+    drawer.undo()
+    assert_close(drawer.draw(blank()).copy(), before)
+    drawer.redo()
+    assert np.array_equal(drawer.draw(blank()), erased)
+
+    drawer.clear()
+    assert drawer.frozen.bbox is None
+    assert np.array_equal(drawer.draw(blank()), blank())
+    drawer.undo()
+    assert np.array_equal(drawer.draw(blank()), erased)
+
+
+def test_frozen_layer_is_saved_with_the_journal(tmp_path):
+    path = str(tmp_path / "f.hsj")
+    drawer = DrawEngine(stroke_thickness=6, live_strokes=3)
+    drawer.start_journal(path)
+    for y in range(30, 200, 25):
+        scribble(drawer, (20, y), n=30, step=(8, 0))
+    drawer.draw(blank())
+    drawer.compact_journal()
+    assert os.path.exists(path + FROZEN_SUFFIX)
+    scribble(drawer, (40, 20), n=20, step=(5, 9))
+    drawer.erase_at((100, 55), 12)              # frozen pixels, after the snapshot
+    expected = drawer.draw(blank()).copy()
+    drawer.close_journal()
+
+    resumed = DrawEngine(stroke_thickness=6, live_strokes=3)
+    resumed.load_journal(path)
+    assert not resumed.frozen.alpha[55, 90:111].any()
+    resumed.undo()                                # the erase, frozen pixels included
+    assert resumed.frozen.alpha[55, 90:111].any()
+    resumed.redo()
+    assert_close(resumed.draw(blank()).copy(), expected)
+    resumed.close_journal()
@@ -0,0 +1,68 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from gestures.gesture_engine import F, FEATURES, GestureEngine, GestureRule, default_rules
+
+
+def vec(**values):
+    v = np.zeros(len(FEATURES))
+    v[F['present']] = 1
+    v[F['pinch_distance']] = 200
+    v[F['hover']] = -1
+    for name, x in values.items():
+        v[F[name]] = x
+    return v
+
+
+def run(engine, frames, dt=1 / 30.0):
+    """frames: list of feature vectors; returns the names fired on each frame"""
+    return [engine.update(v, i * dt) for i, v in enumerate(frames)]
+
+
+def test_pinch_hold_and_hysteresis():
+    engine = GestureEngine(default_rules(pinch_threshold=45, pinch_hold=0.05))
+    dists = [60, 40, 40, 40, 50, 54, 58, 40, 50]
+    active = []
+    for i, d in enumerate(dists):
+        engine.update(vec(pinch_distance=d, up_count=2), i / 30.0)
+        active.append(engine.is_active('pinch'))
+    # starts once under 45 px for 50 ms, survives the 50-56 px wobble, ends past 56.25
+    assert active == [False, False, False, True, True, True, False, False, False]
+    assert not engine.is_active('pinch')
+
+
+def test_fist_repeats_with_cooldown_and_needs_a_hand():
+    engine = GestureEngine(default_rules(fist_hold=0.4, erase_cooldown=0.8))
+    fired = [t for t in np.arange(0, 2.0, 0.05) if 'fist' in engine.update(vec(up_count=0), t)]
+    assert np.allclose(fired, [0.4, 1.2])
+    engine.reset()
+    assert not any('fist' in engine.update(vec(present=0), t) for t in np.arange(0, 2.0, 0.05))
+
+
+def test_hover_dwell_restarts_on_another_button():
+    rects = [((0, 0), (50, 50)), ((60, 0), (110, 50))]
+    engine = GestureEngine(default_rules(hover_delay=0.5), rects, hover_margin=5)
+    fired = []
+    for i, x in enumerate([20] * 6 + [53] * 3 + [80] * 6):
+        v = vec(up_count=5, enabled=1, hover=engine.hover_index((x, 20)))
+        if 'hover' in engine.update(v, i * 0.25):
+            fired.append((i * 0.25, int(v[F['hover']])))
+    # 53 px is past button 0 but within its margin; button 1 starts its own dwell
+    assert fired == [(0.5, 0), (1.0, 0), (1.5, 0), (2.0, 0), (2.75, 1), (3.25, 1)]
+
+
+def test_cost_does_not_grow_with_the_rule_count():
+    import time
+    rule = GestureRule('extra', {'present': (1, 1), 'up_count': (2, 3)},
+                       stay={'up_count': (1, 4)}, hold=0.1, repeat=0.5)
+    timings = []
+    for n in (5, 200):
+        engine = GestureEngine(default_rules() + [rule._replace(name='r%d' % i) for i in range(n)])
+        frames = [vec(up_count=i % 6, pinch_distance=i % 90) for i in range(300)]
+        t0 = time.perf_counter()
+        run(engine, frames)
+        timings.append(time.perf_counter() - t0)
+    assert timings[1] < 3 * timings[0]
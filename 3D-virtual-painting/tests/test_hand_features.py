@@ -0,0 +1,70 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from gestures import hand_features
+from gestures.gesture_tracker import HandTracker
+
+W, H = 1280, 720
+
+
+def random_hands(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.random((n, 21, 3)).astype(np.float32)
+
+
+def legacy_fingers(hand, label):
+    """Per-landmark walk from the original HandTracker.fingers_up"""
+    status = []
+    for t, p in zip([4, 8, 12, 16, 20], [3, 6, 10, 14, 18]):
+        tip, pip = hand[t], hand[p]
+        if t != 4:
+            status.append(bool(tip[1] < pip[1]))
+        elif label == 'Left':
+            status.append(bool(tip[0] > pip[0]))
+        else:
+            status.append(bool(tip[0] < pip[0]))
+    return status
+
+
+def test_fingers_up_matches_per_hand_walk_for_both_hands():
+    landmarks = random_hands(64)
+    handedness = np.array([-1, 1, 0, 1] * 16, np.int8)
+    up = hand_features.fingers_up(landmarks, handedness)
+    assert up.shape == (64, 5)
+    labels = {-1: 'Left', 1: 'Right', 0: None}
+    for hand, code, row in zip(landmarks, handedness, up):
+        assert row.tolist() == legacy_fingers(hand, labels[int(code)])
+
+
+def test_tips_pinch_and_palm_checks():
+    landmarks = random_hands(3, seed=1)
+    landmarks[1, :, 1] = 0.9
+    landmarks[1, hand_features.TIP_IDS, 1] = 0.1  # every tip above its pip
+    landmarks[1, 4, 0], landmarks[1, 3, 0] = 0.2, 0.3
+    f = hand_features.compute(landmarks, np.array([1, 1, 1], np.int8), W, H)
+    for hand, tips in zip(landmarks, f['tips']):
+        for k, idx in enumerate(hand_features.TIP_IDS):
+            assert tuple(tips[k]) == (int(float(hand[idx, 0]) * W), int(float(hand[idx, 1]) * H))
+    thumb, index = landmarks[:, 4, :2] * (W, H), landmarks[:, 8, :2] * (W, H)
+    assert np.allclose(f['pinch_distance'], np.linalg.norm(index - thumb, axis=1), atol=1e-3)
+    assert f['is_palm_open'][1] and not f['is_fist'][1]
+    assert (f['is_fist'] == (f['fingers'].sum(axis=1) == 0)).all()
+
+
+def test_tracker_accessors_use_array_pass():
+    tracker = HandTracker(maxHands=2)
+    frame = np.zeros((H, W, 3), np.uint8)
+    assert tracker.fingers_up(frame) is None and tracker.get_finger_positions(frame) is None
+    landmarks = random_hands(2, seed=2)
+    tracker.set_landmarks(landmarks, [-1, 1])
+    assert tracker.hand_label == 'Left'
+    assert tracker.fingers_up(frame) == legacy_fingers(landmarks[0], 'Left')
+    assert tracker.fingers_up(frame, hand=1) == legacy_fingers(landmarks[1], 'Right')
+    points = tracker.get_finger_positions(frame, hand=1)
+    assert points['thumb'] == (int(float(landmarks[1, 4, 0]) * W), int(float(landmarks[1, 4, 1]) * H))
+    assert tracker.features(frame)['fingers'].shape == (2, 5)
+    tracker.set_landmarks(np.zeros((0, 21, 3)), [])
+    assert tracker.features(frame)['fingers'].shape == (0, 5)
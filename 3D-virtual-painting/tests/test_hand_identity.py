@@ -0,0 +1,37 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from gestures.hand_identity import HandIdentity
+from gestures.synthetic import hand_landmarks
+
+W, H = 640, 480
+
+
+def frame(tips, codes):
+    return np.stack([hand_landmarks('point', tip, W, H, c) for tip, c in zip(tips, codes)]), np.array(codes, np.int8)
+
+
+def test_ids_survive_row_order_and_crossing_hands():
+    identity = HandIdentity()
+    for i in range(40):
+        # the hands swap sides over 40 frames; MediaPipe's row order changes every frame
+        left, right = (100 + 11 * i, 240), (540 - 11 * i, 260)
+        lm, codes = frame([left, right], [1, -1])
+        order = [i % 2, 1 - i % 2]
+        ids = identity(lm[order], codes[order], i / 30.0)
+        assert ids[order.index(0)] == 0 and ids[order.index(1)] == 1
+    assert identity.next_id == 2
+
+
+def test_new_ids_for_new_and_long_gone_hands():
+    identity = HandIdentity(max_missing=0.5)
+    lm, codes = frame([(200, 200)], [1])
+    assert identity(lm, codes, 0.0).tolist() == [0]
+    both, codes2 = frame([(200, 200), (450, 300)], [1, -1])
+    assert identity(both, codes2, 0.1).tolist() == [0, 1]
+    assert identity(lm[:0], codes[:0], 0.2).tolist() == []
+    assert identity(lm, codes, 0.4).tolist() == [0]     # back within max_missing
+    assert identity(lm, codes, 1.5).tolist() == [2]     # gone for longer: a new hand
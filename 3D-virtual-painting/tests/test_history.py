@@ -0,0 +1,101 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core import stroke_store
+from core.draw_engine import DrawEngine
+from test_draw_engine import assert_close, blank, rebuilt, scribble
+
+COLORS = [(0, 0, 255), (255, 0, 0), (0, 255, 0)]
+
+
+def random_edits(drawer, rng, n_ops, check):
+    """Random strokes / erases / clears / color changes / undos / redos, checked against saved states"""
+    state = lambda: (list(drawer.strokes), drawer.stroke_color)
+    states, pos = [state()], 0   # states[pos] is current; states[pos + 1:] can be redone
+    for _ in range(n_ops):
+        r = rng.random()
+        if r < 0.35:
+            x, y = rng.integers(20, 300), rng.integers(20, 220)
+            scribble(drawer, (int(x), int(y)), n=int(rng.integers(2, 30)), step=(3, 2))
+        elif r < 0.5:
+            live = np.flatnonzero(drawer.store.alive[:drawer.store.n_points])
+            if not len(live):
+                continue
+            k = rng.choice(live)
+            drawer.erase_at((int(drawer.store.xs[k]), int(drawer.store.ys[k])), int(rng.integers(3, 20)))
+        elif r < 0.55:
+            drawer.clear()
+        elif r < 0.62:
+            drawer.change_color(COLORS[rng.integers(len(COLORS))])
+            if drawer.stroke_color == states[pos][1]:
+                continue
+        elif r < 0.85:
+            if pos > 0:
+                assert drawer.undo()
+                pos -= 1
+                assert state() == states[pos]
+            check()
+            continue
+        else:
+            if pos + 1 < len(states):
+                assert drawer.redo()
+                pos += 1
+                assert state() == states[pos]
+            else:
+                assert not drawer.redo()
+            check()
+            continue
+        states[pos + 1:] = [state()]
+        pos += 1
+    return states[pos]
+
+
+def test_undo_redo_matches_saved_states_through_compaction(monkeypatch):
+    monkeypatch.setattr(stroke_store, "COMPACT_MIN_DEAD", 8)
+    rng = np.random.default_rng(5)
+    drawer = DrawEngine(stroke_thickness=3, checkpoint_every=7)
+    compactions = []
+    def check():
+        compactions.append(drawer.store.generation)
+        assert drawer.history.n_pinned == len(drawer.history.pinned())
+    random_edits(drawer, rng, 600, check)
+    assert max(compactions) > 0    # dead points were compacted away while undo still worked
+    # and the stack unwinds all the way back
+    while drawer.history.done:
+        drawer.undo()
+    assert drawer.store.n_alive == 0
+
+
+def test_layer_follows_undo_redo_and_clear_checkpoints():
+    rng = np.random.default_rng(2)
+    drawer = DrawEngine(stroke_thickness=4, checkpoint_every=5)
+    drawer.draw(blank())
+
+    def check():
+        assert_close(drawer.draw(blank()).copy(), rebuilt(drawer))
+    random_edits(drawer, rng, 150, check)
+
+    for y in range(20, 200, 15):
+        scribble(drawer, (30, y), n=40)
+    drawer.erase_at((100, 100), 25)
+    before = drawer.draw(blank()).copy()
+    drawer.clear()
+    assert np.array_equal(drawer.draw(blank()), blank())
+    drawer.undo()
+    assert drawer._layer_valid                     # restored from the checkpoint, not rebuilt
+    assert np.array_equal(drawer.draw(blank()), before)
+    drawer.redo()
+    assert np.array_equal(drawer.draw(blank()), blank())
+
+
+def test_history_memory_cap_falls_back_to_removing_strokes():
+    drawer = DrawEngine(history_bytes=600)
+    for y in range(10, 200, 20):
+        scribble(drawer, (10, y), n=5)
+    assert len(drawer.history) < 10 and drawer.history.nbytes <= 600
+    for _ in range(10):
+        assert drawer.undo()
+    assert drawer.store.n_alive == 0 and not drawer.undo()
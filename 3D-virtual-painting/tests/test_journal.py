@@ -0,0 +1,100 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core import journal
+from core.draw_engine import DrawEngine
+
+RED, BLUE = (0, 0, 255), (255, 0, 0)
+
+
+def session(drawer, rng, strokes=12):
+    for k in range(strokes):
+        drawer.change_color(RED if k % 3 else BLUE)
+        x, y = rng.integers(40, 600, 2)
+        for _ in range(rng.integers(5, 60)):
+            x, y = x + rng.integers(-8, 9), y + rng.integers(-8, 9)
+            drawer.update((int(x), int(y)), "DRAW")
+        drawer.update(None, "STOP")
+        if k % 5 == 4:
+            drawer.update(None, "ERASE")
+        if k % 4 == 3:
+            drawer.erase_at((int(x), int(y)), 15)
+
+
+def test_journal_round_trip_and_compaction(tmp_path):
+    path = str(tmp_path / "s.hsj")
+    rng = np.random.default_rng(1)
+    for simplify in (0.0, 1.0):
+        drawer = DrawEngine(min_distance=simplify * 2, simplify_tolerance=simplify)
+        drawer.start_journal(path)
+        session(drawer, rng)
+        drawer.clear()
+        session(drawer, rng)
+        drawer.update((5, 5), "DRAW")   # left open, as after a crash mid-stroke
+        drawer.update((9, 7), "DRAW")
+        drawer.journal.flush()
+        expected = list(drawer.strokes)
+
+        resumed = DrawEngine()
+        resumed.load_journal(path)
+        assert list(resumed.strokes) == expected
+        # drawing continues into the same journal
+        resumed.update(None, "STOP")
+        resumed.update((100, 100), "DRAW")
+        resumed.update(None, "STOP")
+        expected = list(resumed.strokes)
+        before = os.path.getsize(path)
+        resumed.compact_journal()
+        assert os.path.getsize(path) < before
+        resumed.close_journal()
+        again = DrawEngine()
+        again.load_journal(path)
+        assert list(again.strokes) == expected
+        again.close_journal()
+
+
+def test_torn_record_is_ignored(tmp_path):
+    path = str(tmp_path / "t.hsj")
+    drawer = DrawEngine(min_distance=0, simplify_tolerance=0)
+    drawer.start_journal(path)
+    for x in range(10, 60, 5):
+        drawer.update((x, 20), "DRAW")
+    drawer.update(None, "STOP")
+    drawer.close_journal()
+    with open(path, "ab") as f:
+        f.write(b"\x01\x00\x00")   # half of a POINT record
+    assert len(journal.load(path).stroke_points(0)) == 10
+    drawer.load_journal(path)      # appending trims the torn bytes first
+    drawer.update((80, 20), "DRAW")
+    drawer.close_journal()
+    assert len(journal.load(path).stroke_points(1)) == 1
+
+
+def test_resumed_session_keeps_undo_history(tmp_path):
+    path = str(tmp_path / "u.hsj")
+    rng = np.random.default_rng(3)
+    drawer = DrawEngine()
+    drawer.start_journal(path)
+    session(drawer, rng, strokes=8)
+    states = [list(drawer.strokes)]
+    drawer.clear()
+    session(drawer, rng, strokes=4)
+    states.append(list(drawer.strokes))
+    for _ in range(6):
+        drawer.undo()
+    drawer.redo()
+    expected = list(drawer.strokes)
+    drawer.close_journal()
+
+    resumed = DrawEngine()
+    resumed.load_journal(path)
+    assert list(resumed.strokes) == expected
+    while resumed.redo():
+        pass
+    assert list(resumed.strokes) == states[1]
+    while list(resumed.strokes) != states[0]:   # back through the clear
+        assert resumed.undo()
+    resumed.close_journal()
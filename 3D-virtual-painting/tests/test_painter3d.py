@@ -0,0 +1,71 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from drawing.painter3d import Stroke3DStore, OrbitCamera, Painter3D
+
+
+def random_strokes(n_strokes=60, length=200, seed=0):
+    rng = np.random.default_rng(seed)
+    store = Stroke3DStore()
+    for k in range(n_strokes):
+        start = rng.uniform((0, 0, -300), (1280, 720, 300))
+        store.extend(start + np.cumsum(rng.normal(0, 4, (length, 3)), axis=0),
+                     (255, 0, 0) if k % 2 else (0, 255, 0), 4)
+        store.end_stroke()
+    return store
+
+
+def test_store_strokes_and_bounding_boxes():
+    store = Stroke3DStore(capacity=4)
+    store.append(10, 20, 5, (255, 0, 0), 6)
+    store.append(30, 10, -5, (255, 0, 0), 6)
+    store.append(40, 40, 0, (0, 0, 255), 6)      # color change starts a new stroke
+    store.end_stroke()
+    assert store.n_points == 3 and store.n_strokes == 3   # two strokes + the open one
+    assert store.stroke_range(0) == (0, 2) and store.stroke_range(1) == (2, 3)
+    assert np.array_equal(store.bbox_min[0], [10, 10, -5])
+    assert np.array_equal(store.bbox_max[0], [30, 20, 5])
+    assert store.pop_last() and store.n_points == 2
+    assert store.pop_last() and store.n_points == 0
+    assert not store.pop_last()
+
+
+def test_octree_cull_keeps_every_visible_point():
+    store = random_strokes()
+    cam = OrbitCamera(1280, 720)
+    for yaw, pitch in ((0, 0), (70, 20), (180, -40), (250, 10)):
+        cam.yaw, cam.pitch = yaw, pitch
+        idx = store.octree(leaf_size=64).cull(cam.classify_boxes)
+        uv, z = cam.project(store.points)
+        visible = ((z > cam.near) & (uv[:, 0] >= 0) & (uv[:, 0] < 1280)
+                   & (uv[:, 1] >= 0) & (uv[:, 1] < 720))
+        assert np.isin(np.flatnonzero(visible), idx).all()
+        assert len(idx) < store.n_points or visible.all()
+
+
+def test_default_camera_matches_the_2d_canvas():
+    cam = OrbitCamera(1280, 720)
+    pts = np.array([[100.0, 200.0, 0.0], [640.0, 360.0, 0.0], [1200.0, 50.0, 0.0]])
+    uv, z = cam.project(pts)
+    assert np.allclose(uv, pts[:, :2])
+    # nearer points (negative landmark z) spread away from the center
+    uv, _ = cam.project(np.array([[1000.0, 360.0, -100.0]]))
+    assert uv[0, 0] > 1000
+
+
+def test_painter_draws_and_orbits():
+    painter = Painter3D(320, 240, stroke_thickness=3)
+    for t in np.linspace(0, 1, 50):
+        painter.update(painter.from_landmark((0.2 + 0.6 * t, 0.5, -0.05 * t)), "DRAW")
+    painter.update(None, "STOP")
+    for mode in ("lines", "points"):
+        front = painter.render(mode=mode)
+        assert front.any(axis=2)[120].sum() > 100   # a horizontal line across the view
+    painter.orbit(90, 0)                              # side view: the line is seen end-on
+    side = painter.render()
+    assert 0 < side.any(axis=2).sum() < front.any(axis=2).sum()
+    painter.update(None, "ERASE")
+    assert not painter.render().any()
@@ -0,0 +1,129 @@
+import os, sys, threading, time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.pipeline import InferencePipeline, WorkerError
+from gestures import gesture_tracker
+
+
+def fake_detector(delay=0.0):
+    """Detector that encodes the frame's first pixel value into its landmarks"""
+    def detect(frame):
+        time.sleep(delay)
+        v = float(frame[0, 0, 0])
+        lms = np.full((1, 21, 3), v / 255.0, np.float32)
+        return lms, np.array([1], np.int8), np.array([0.9], np.float32)
+    return detect
+
+
+def slow_factory(build=0.3):
+    """A detector that takes `build` seconds to construct, like loading the model"""
+    time.sleep(build)
+    return fake_detector()
+
+
+def test_results_in_order_with_their_own_landmarks():
+    frames = [np.full((24, 32, 3), i, np.uint8) for i in range(12)]
+    with InferencePipeline((24, 32, 3), depth=2, detector_factory=fake_detector,
+                           detector_kwargs={"delay": 0.002}) as pipe:
+        seen = []
+        for r in pipe.process(frames):
+            assert r.image[0, 0, 0] == round(r.landmarks[0, 0, 0] * 255)
+            assert r.handedness.tolist() == [1]
+            seen.append(int(r.image[0, 0, 0]))
+    assert seen == list(range(12))
+
+
+def test_inference_overlaps_rendering():
+    frames = [np.zeros((24, 32, 3), np.uint8)] * 10
+    with InferencePipeline((24, 32, 3), depth=1, detector_factory=fake_detector,
+                           detector_kwargs={"delay": 0.03}) as pipe:
+        t0 = time.perf_counter()
+        for _ in pipe.process(frames):
+            time.sleep(0.03)  # "render"
+        elapsed = time.perf_counter() - t0
+    # serial would take 10 * (30 + 30) ms
+    assert elapsed < 0.5
+
+
+def test_start_without_waiting_for_the_detector():
+    pipe = InferencePipeline((24, 32, 3), depth=1, detector_factory=slow_factory)
+    t0 = time.perf_counter()
+    pipe.start(wait=False)
+    assert time.perf_counter() - t0 < 0.2 and not pipe.ready
+    pipe.submit(np.full((24, 32, 3), 7, np.uint8), 0, 0.0)   # queued until the worker is up
+    r = pipe.get(timeout=10)
+    assert pipe.ready and r.image[0, 0, 0] == 7
+    pipe.stop()
+
+
+def test_tracker_warms_up_in_the_background(monkeypatch):
+    release, built = threading.Event(), []
+
+    class Hands:
+        def __init__(self, **kwargs):
+            built.append(kwargs)
+
+        def process(self, rgb):
+            release.wait(5)
+            return SimpleNamespace(multi_hand_landmarks=None, multi_handedness=None)
+
+    fake = SimpleNamespace(solutions=SimpleNamespace(hands=SimpleNamespace(Hands=Hands)))
+    monkeypatch.setattr(gesture_tracker, "mp", fake)
+    tracker = gesture_tracker.HandTracker(maxHands=1).warm_up()
+    assert not tracker.ready
+    # the preview keeps running: no hands reported instead of blocking on the model
+    frame = np.zeros((48, 64, 3), np.uint8)
+    assert len(tracker.detect(frame)[0]) == 0 and tracker.findHands(frame) is frame
+    release.set()
+    tracker._warming.wait(5)
+    assert tracker.ready and tracker.warm_error is None and len(built) == 1
+    assert len(tracker.detect(frame)[0]) == 0
+
+
+def broken_factory():
+    raise ImportError("no hand model")
+
+
+def flaky_detector():
+    """Raises on frames whose first pixel is odd"""
+    detect = fake_detector()
+
+    def flaky(frame):
+        if frame[0, 0, 0] % 2:
+            raise ValueError("bad frame")
+        return detect(frame)
+    return flaky
+
+
+def test_worker_errors_are_raised_not_waited_on():
+    pipe = InferencePipeline((24, 32, 3), depth=1, detector_factory=broken_factory).start(wait=False)
+    pipe.submit(np.zeros((24, 32, 3), np.uint8), 0, 0.0)
+    with pytest.raises(WorkerError, match="no hand model"):
+        pipe.get()                       # no timeout: must not block on the failed worker
+    with pytest.raises(WorkerError):
+        pipe.ready
+    pipe.stop()
+
+    with InferencePipeline((24, 32, 3), depth=1, detector_factory=flaky_detector) as pipe:
+        for i in range(3):
+            pipe.submit(np.full((24, 32, 3), i, np.uint8), i, 0.0)
+        assert pipe.get(timeout=10).seq == 0
+        with pytest.raises(WorkerError, match="bad frame"):
+            pipe.get(timeout=10)
+        r = pipe.get(timeout=10)         # the worker goes on with the next frame
+        assert r.seq == 2 and r.image[0, 0, 0] == 2 and pipe.in_flight == 0
+
+    pipe = InferencePipeline((24, 32, 3), depth=1, detector_factory=fake_detector).start()
+    pipe._proc.terminate()
+    pipe._proc.join(5)
+    pipe.submit(np.zeros((24, 32, 3), np.uint8), 0, 0.0)
+    with pytest.raises(WorkerError, match="exited"):
+        pipe.get()
+    with pytest.raises(WorkerError, match="exited"):
+        pipe.ready
+    pipe.stop()
@@ -0,0 +1,70 @@
+import csv, json, os, sys, time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.profiler import Profiler, StartupTimer
+
+
+def test_stage_timer_decorator_and_percentiles():
+    prof = Profiler(window=100)
+    for ms in range(1, 201):
+        prof.add("fake", float(ms))
+    st = prof.summary()["fake"]
+    # only the last 100 samples (101..200) are kept
+    assert st["count"] == 200 and st["max"] == 200.0
+    assert st["p50"] == np.percentile(np.arange(101, 201), 50)
+    assert st["p99"] > st["p95"] > st["p50"]
+
+    with prof.stage("sleep"):
+        time.sleep(0.01)
+    @prof.timed()
+    def work(x):
+        return x * 2
+    assert work(3) == 6
+    summary = prof.summary()
+    assert summary["sleep"]["mean"] >= 9.0
+    assert summary["work"]["count"] == 1
+
+
+def test_disabled_is_a_no_op():
+    prof = Profiler(enabled=False)
+    def work():
+        return 1
+    assert prof.timed("work")(work) is work
+    assert prof.stage("a") is prof.stage("b")
+    with prof.stage("a"):
+        pass
+    prof.add("a", 1.0)
+    prof.tick()
+    assert prof.summary() == {}
+    frame = np.zeros((100, 100, 3), np.uint8)
+    assert not prof.draw_overlay(frame).any()
+
+
+def test_dumps_and_overlay(tmp_path):
+    prof = Profiler()
+    for _ in range(3):
+        with prof.stage("render"):
+            pass
+        prof.tick()
+    path = str(tmp_path / "t.csv")
+    prof.dump_csv(path)
+    prof.dump_csv(path)
+    rows = list(csv.DictReader(open(path)))
+    assert [r["stage"] for r in rows] == ["render", "frame"] * 2
+    data = json.load(open(prof.dump_json(str(tmp_path / "t.json"))))
+    assert data["stages"]["render"]["count"] == 3 and data["fps"] > 0
+    frame = np.zeros((400, 400, 3), np.uint8)
+    assert prof.draw_overlay(frame).any()
+
+
+def test_startup_timer_records_each_milestone_once():
+    t0 = time.perf_counter()
+    timer = StartupTimer(t0)
+    assert timer.mark("first_frame", when=t0 + 0.25)
+    assert not timer.mark("first_frame")
+    timer.mark("first_hand", when=t0 + 1.5)
+    assert timer.get("first_frame") == 0.25 and timer.get("first_gesture") is None
+    assert timer.report() == "first_frame 250 ms, first_hand 1500 ms"
@@ -0,0 +1,96 @@
+import os, sys
+from collections import deque
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.profiler import Profiler
+from core.session import PaintSession, PointerSmoother, STAGES, smooth_point_deque
+from gestures.gesture_tracker import HandTracker
+from gestures.recording import LandmarkRecording, ReplaySource
+from gestures.synthetic import make_session, write_session
+
+
+def test_round_trip_without_frames(tmp_path):
+    s = make_session('two_hands', seed=3)
+    path = write_session(str(tmp_path / 'two.hlr'), s)
+    rec = LandmarkRecording(path)
+    assert len(rec) == len(s['timestamps']) and rec.max_hands == 2 and rec.size == (1280, 720)
+    assert np.array_equal(rec.n_hands, s['n_hands'])
+    assert np.array_equal(rec.landmarks, s['landmarks'])
+    assert np.array_equal(rec.handedness, s['handedness'])
+    assert np.allclose(rec.timestamps, s['timestamps'])
+    frames = list(ReplaySource(rec))
+    assert [f.seq for f in frames] == list(range(len(rec)))
+    assert frames[0].image.shape == (720, 1280, 3)
+    assert len(frames[-1].landmarks) == s['n_hands'][-1]
+
+
+def test_tracker_records_frames(tmp_path):
+    path = str(tmp_path / 'live.hlr')
+    tracker = HandTracker(maxHands=1)
+    tracker.start_recording(path, frames=True, size=(64, 48), ext='.png')
+    s = make_session('scribble')
+    images = [np.full((48, 64, 3), i, np.uint8) for i in range(5)]
+    for i, img in enumerate(images):
+        tracker.set_landmarks(s['landmarks'][i], s['handedness'][i], timestamp=i / 30.0, frame=img)
+    tracker.stop_recording()
+    rec = LandmarkRecording(path)
+    assert rec.has_frames and len(rec) == 5
+    for i, f in enumerate(ReplaySource(rec)):
+        assert np.array_equal(f.image, images[i])
+        assert np.allclose(f.landmarks, s['landmarks'][i])
+
+
+def test_replay_drives_session_headless(tmp_path):
+    path = write_session(str(tmp_path / 'erase.hlr'), make_session('erase'))
+    profiler = Profiler()
+    session = PaintSession(HandTracker(), profiler=profiler, debug=False)
+    tools = set()
+    for f in ReplaySource(path):
+        session.step(f.image, f.landmarks, f.handedness, f.scores, f.timestamp)
+        tools.add(session.active_tool)
+    # the scripted palm hover selects the eraser, sweeps over the strokes and goes back
+    assert tools == {'BRUSH', 'ERASER'} and session.active_tool == 'BRUSH'
+    store = session.drawer.store
+    assert 0 < store.n_alive < len(store.xs)
+    stats = profiler.summary()
+    assert all(stats[k]['count'] == len(ReplaySource(path)) for k in STAGES)
+
+
+def test_replayed_hands_keep_their_own_strokes(tmp_path):
+    s = make_session('four_hands', seed=2)
+    path = write_session(str(tmp_path / 'four.hlr'), s)
+    session = PaintSession(HandTracker(maxHands=4), debug=False)
+    rng = np.random.default_rng(0)
+    for f in ReplaySource(path):
+        order = rng.permutation(len(f.landmarks))        # MediaPipe reports hands in any order
+        session.step(f.image, f.landmarks[order], f.handedness[order], f.scores[order], f.timestamp)
+    # the hands leave together; strokes of hands that leave mid-stroke are finished
+    session.step(f.image, f.landmarks[:0], f.handedness[:0], f.scores[:0], f.timestamp + 1 / 30.0)
+    assert session.tracker.identity.next_id == 4 and not session.drawer.pens
+    strokes = [st for st in session.drawer.strokes if st]
+    assert len(strokes) == 20
+    # each hand draws in its own quadrant, with its own color
+    w, h = s['size']
+    colors = {}
+    for st in strokes:
+        ends = np.array([st[0][:2], st[-1][:2]])     # curves may bulge out of the area, ends do not
+        quadrant = set((ends[:, 0] > w / 2) + 2 * (ends[:, 1] > (h - 40) / 2))
+        assert len(quadrant) == 1
+        colors.setdefault(quadrant.pop(), set()).add(st[0][2])
+    assert len(colors) == 4 and all(len(c) == 1 for c in colors.values())
+    assert len(set.union(*colors.values())) == 4
+
+
+def test_pointer_smoother_matches_deque_smoothing():
+    rng = np.random.default_rng(4)
+    smoother = PointerSmoother(hands=3)
+    buffers = [deque(maxlen=8) for _ in range(3)]
+    for i in range(30):
+        points = rng.integers(0, 1000, (3, 2))
+        valid = rng.random(3) < 0.8
+        out = smoother(points.astype(np.float64), valid)
+        for k in np.flatnonzero(valid):
+            assert tuple(out[k]) == smooth_point_deque(buffers[k], tuple(points[k].tolist()))
@@ -0,0 +1,62 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from gestures.roi_tracking import RoiDetector
+
+W, H = 640, 480
+
+
+def blob_detector(inputs):
+    """Finds the bright square, returns 21 landmarks on its outline normalized to the input"""
+    def detect(image):
+        inputs.append(image.shape[:2])
+        ys, xs = np.nonzero(image[:, :, 0] > 127)
+        if len(xs) == 0:
+            return np.zeros((0, 21, 3), np.float32), np.zeros(0, np.int8), np.zeros(0, np.float32)
+        h, w = image.shape[:2]
+        t = np.linspace(0.0, 1.0, 21)
+        lm = np.stack([(xs.min() + t * (xs.max() + 1 - xs.min())) / w,
+                       (ys.min() + t * (ys.max() + 1 - ys.min())) / h,
+                       np.zeros(21)], axis=1)
+        return lm[None].astype(np.float32), np.array([1], np.int8), np.array([0.95], np.float32)
+    return detect
+
+
+def frame_with_hand(x, y, size=60):
+    frame = np.zeros((H, W, 3), np.uint8)
+    if x is not None:
+        frame[y:y + size, x:x + size] = 255
+    return frame
+
+
+def test_crop_tracking_maps_back_to_full_frame():
+    inputs = []
+    roi = RoiDetector(blob_detector(inputs), pad=0.5, min_crop=128, scale=0.5, min_input=64)
+    for k in range(10):
+        x, y = 100 + 8 * k, 200 + 4 * k
+        landmarks, _, _ = roi(frame_with_hand(x, y))
+        assert len(landmarks) == 1
+        assert abs(landmarks[0, 0, 0] * W - x) < 2.5 and abs(landmarks[0, 0, 1] * H - y) < 2.5
+        assert abs(landmarks[0, -1, 0] * W - (x + 60)) < 2.5
+    assert inputs[0] == (H, W)
+    assert roi.last_mode == 'roi'
+    # crop is 60 * 2 = 120 -> min_crop 128, then the confident crop is halved
+    assert all(max(s) <= 128 for s in inputs[1:]) and max(inputs[-1]) == 64
+    assert roi.roi_frames == 9 and roi.losses == 0
+
+
+def test_falls_back_to_full_frame_after_misses():
+    inputs = []
+    roi = RoiDetector(blob_detector(inputs), max_misses=3, min_crop=128)
+    roi(frame_with_hand(50, 50))
+    # hand jumps out of the crop: three empty crops, then a full frame finds it again
+    for _ in range(3):
+        assert len(roi(frame_with_hand(500, 380))[0]) == 0
+    assert roi.roi is None and roi.losses == 1
+    landmarks, _, _ = roi(frame_with_hand(500, 380))
+    assert inputs[-1] == (H, W) and len(landmarks) == 1
+    st = roi.stats()
+    assert st['roi_misses'] == 3 and st['loss_rate'] == 1 / 3.0
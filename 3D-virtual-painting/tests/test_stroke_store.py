@@ -0,0 +1,91 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.stroke_store import StrokeStore, StrokesView
+from core.draw_engine import DrawEngine
+
+RED, BLUE = (0, 0, 255), (255, 0, 0)
+
+
+def test_append_and_legacy_view():
+    drawer = DrawEngine(stroke_thickness=4, stroke_color=RED, min_distance=0, simplify_tolerance=0)
+    for p in [(1, 2), (3, 4), (5, 6)]:
+        drawer.update(p, "DRAW")
+    drawer.update(None, "STOP")
+    drawer.change_color(BLUE)
+    drawer.update((7, 8), "DRAW")
+    strokes = list(drawer.strokes)
+    assert strokes == [[(1, 2, RED, 4), (3, 4, RED, 4), (5, 6, RED, 4)], [(7, 8, BLUE, 4)]]
+    assert len(drawer.strokes) == 2
+    assert drawer.strokes[-1] == [(7, 8, BLUE, 4)]
+    assert drawer.store.palette == [(RED, 4), (BLUE, 4)]
+
+
+def test_color_change_mid_stroke_starts_new_stroke():
+    store = StrokeStore()
+    store.append(0, 0, RED, 2)
+    store.append(1, 1, RED, 2)
+    store.append(2, 2, BLUE, 2)
+    assert [store.stroke_len(i) for i in range(len(store))] == [2, 1]
+
+
+def test_undo_removes_last_non_empty_stroke():
+    drawer = DrawEngine(min_distance=0, simplify_tolerance=0)
+    for start in (0, 100):
+        for i in range(3):
+            drawer.update((start + i, start), "DRAW")
+        drawer.update(None, "STOP")
+    drawer.update(None, "ERASE")
+    assert [len(s) for s in drawer.strokes] == [3, 0]
+    drawer.update(None, "ERASE")
+    drawer.update(None, "ERASE")
+    assert drawer.store.n_alive == 0 and list(drawer.strokes) == [[]]
+
+
+def test_round_trip_from_tuples_and_growth():
+    rng = np.random.default_rng(1)
+    strokes = [[(int(x), int(y), RED if k % 2 else BLUE, 6) for x, y in rng.integers(0, 1280, (n, 2))]
+               for k, n in enumerate([3000, 1, 700])]
+    store = StrokeStore.from_tuples(strokes)
+    view = [store.stroke_tuples(i) for i in range(len(store))]
+    assert view[:3] == strokes and view[3] == []
+    store.remove_stroke(1)
+    assert list(StrokesView(store)) == [strokes[0], strokes[2], []]
+    assert store.n_alive == 3700
+    store.compact()
+    assert list(StrokesView(store)) == [strokes[0], strokes[2], []]
+    assert store.n_points == 3700 and len(store) == 3
+
+
+def test_erase_splits_stroke_at_gap():
+    drawer = DrawEngine(stroke_color=RED, min_distance=0, simplify_tolerance=0)
+    for x in range(0, 100, 5):
+        drawer.update((x, 50), "DRAW")
+    drawer.update(None, "STOP")
+    assert drawer.erase_at((50, 50), 12) == 5  # x = 40..60
+    left, right, open_stroke = list(drawer.strokes)
+    assert [p[0] for p in left] == list(range(0, 40, 5))
+    assert [p[0] for p in right] == list(range(65, 100, 5))
+    assert open_stroke == []
+    assert drawer.erase_at((500, 500), 12) == 0
+    # undo joins the halves again, redo splits them
+    drawer.update(None, "ERASE")
+    assert [len(s) for s in drawer.strokes] == [20, 0]
+    drawer.redo()
+    assert [len(s) for s in drawer.strokes] == [8, 7, 0]
+    # pop_last removes only the newer half
+    drawer.store.pop_last()
+    assert [len(s) for s in drawer.strokes] == [8, 0]
+
+
+def test_radius_query_matches_brute_force():
+    rng = np.random.default_rng(3)
+    store = StrokeStore()
+    xs, ys = rng.integers(0, 640, 5000), rng.integers(0, 480, 5000)
+    store.extend(xs, ys, RED, 4)
+    for x, y in rng.integers(0, 640, (1, 2)).tolist() + [(-10, 5), (320, 240)]:
+        want = np.flatnonzero((xs - x) ** 2 + (ys - y) ** 2 <= 30 ** 2)
+        assert np.array_equal(store.query_radius(x, y, 30), want)
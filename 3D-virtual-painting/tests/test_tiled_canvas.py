@@ -0,0 +1,77 @@
+import os, sys
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from core.draw_engine import DrawEngine
+from core.session import PaintSession
+from core.tiled_canvas import TiledCanvas, Viewport
+from gestures.gesture_tracker import HandTracker
+from gestures.synthetic import hand_landmarks
+from test_draw_engine import assert_close, blank, rebuilt, scribble
+
+
+def paint(drawer):
+    scribble(drawer, (20, 30), n=40, step=(6, 4))
+    drawer.change_color((255, 0, 0))
+    scribble(drawer, (250, 10), n=30, step=(1, 7))   # crosses the tile border at x=256
+
+
+def test_world_canvas_matches_screen_canvas_at_identity():
+    screen, world = DrawEngine(stroke_thickness=5), DrawEngine(stroke_thickness=5, world=True, tile_size=64)
+    for d in (screen, world):
+        paint(d)
+    live = world.draw(blank())
+    assert_close(live, screen.draw(blank()))
+    assert_close(rebuilt(world), live)
+    assert world.erase_at((30, 32), 12) > 0 and screen.erase_at((30, 32), 12) > 0
+    assert_close(world.draw(blank()), screen.draw(blank()))
+
+
+def test_tiles_only_where_strokes_are_and_spill_round_trip(tmp_path):
+    canvas = TiledCanvas(tile_size=64, max_bytes=1, spill_dir=str(tmp_path))
+    far = [[(10020, 10020, (0, 0, 255), 4), (10040, 10020, (0, 0, 255), 4)]]
+    canvas.draw_strokes([[(20, 20, (0, 255, 0), 4), (40, 30, (0, 255, 0), 4)]] + far)
+    assert canvas.stats()['tiles'] == 2
+    before = canvas.composite(blank())
+    canvas.viewport.pan(-9900, -9900)
+    canvas.composite(blank())                   # the first tile is no longer visible: spilled
+    assert canvas.stats()['spilled'] == 1 and len(os.listdir(tmp_path)) == 1
+    canvas.viewport.reset()
+    loads = canvas.loads
+    assert np.array_equal(canvas.composite(blank()), before) and canvas.loads == loads + 1
+
+    canvas.redraw_rect((0, 0, 64, 64), far)     # erased empty: the tile goes away
+    assert canvas.stats()['tiles'] == 1
+
+
+def test_pan_and_zoom_map_screen_points_to_world():
+    vp = Viewport()
+    vp.pan(30, -20)
+    vp.zoom_at(2.0, (100, 100))
+    assert np.allclose(vp.to_screen(*vp.to_world(100, 100)), (100, 100))
+    assert np.allclose(vp.to_world(100, 100), (70, 120))
+
+    drawer = DrawEngine(stroke_thickness=4, world=True)
+    drawer.viewport.zoom_at(2.0, (0, 0))
+    drawer.update((100, 60), "DRAW")
+    drawer.update((140, 60), "DRAW")
+    drawer.update(None, "STOP")
+    assert drawer.strokes[0][0][:2] == (50, 30) and drawer.strokes[0][0][3] == 2
+    out = drawer.draw(blank())
+    assert out[60, 120, 0] > 200 and out[60, 80, 0] < 100   # drawn where the finger was
+
+
+def test_pan_and_zoom_gestures_move_the_viewport():
+    session = PaintSession(HandTracker(), DrawEngine(world=True), width=640, height=480, debug=False)
+    vp = session.drawer.viewport
+    frames = [('three', (200 + 4 * i, 300)) for i in range(30)] + [('point', (320, 300))] * 5 \
+        + [('call', (320, 300 - 4 * i)) for i in range(30)]
+    for i, (pose, tip) in enumerate(frames):
+        lm = hand_landmarks(pose, tip, 640, 480)[None]
+        session.step(np.zeros((480, 640, 3), np.uint8), lm, np.array([1], np.int8),
+                     np.ones(1, np.float32), timestamp=i / 30.0)
+        if i == 29:
+            assert 70 < vp.ox < 120 and vp.oy == 0 and vp.zoom == 1.0
+    assert 1.25 < vp.zoom < 1.8 and session.drawer.store.n_alive == 0